@@ -8,6 +8,9 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import add_months, cint, flt, getdate, nowdate
 
+from condominium_management.committee_management.kpi_batch import get_meeting_attendance_rate
+from condominium_management.physical_spaces.space_utilization import get_utilization_rate
+
 
 class CommitteeKPI(Document):
 	def validate(self):
@@ -87,23 +90,10 @@ class CommitteeKPI(Document):
 			completed = len([a for a in agreements if a.status == "Completado"])
 			self.agreement_completion_rate = (completed / len(agreements)) * 100
 
-		# Meeting Attendance Rate
-		meetings = frappe.get_all(
-			"Committee Meeting", filters={"meeting_date": ["between", [start_date, end_date]]}
-		)
-
-		if meetings:
-			total_attendance = 0
-			total_possible = 0
-
-			for meeting in meetings:
-				meeting_doc = frappe.get_doc("Committee Meeting", meeting.name)
-				attendance_summary = meeting_doc.get_attendance_summary()
-				total_attendance += attendance_summary.get("attending_count", 0)
-				total_possible += attendance_summary.get("total_attendees", 0)
-
-			if total_possible > 0:
-				self.meeting_attendance_rate = (total_attendance / total_possible) * 100
+		# Meeting Attendance Rate (una consulta agregada sobre Meeting Attendee)
+		attendance_rate = get_meeting_attendance_rate(start_date, end_date)
+		if attendance_rate is not None:
+			self.meeting_attendance_rate = attendance_rate
 
 		# Poll Participation Rate
 		polls = frappe.get_all(
@@ -175,27 +165,8 @@ class CommitteeKPI(Document):
 		# Agreement Fulfillment Rate (same as completion rate but for operational context)
 		self.agreement_fulfillment_rate = self.agreement_completion_rate
 
-		# Space Utilization Rate
-		space_usage = frappe.get_all(
-			"Committee Meeting",
-			filters={"meeting_date": ["between", [start_date, end_date]]},
-			fields=["physical_space"],
-		)
-
-		events_space_usage = frappe.get_all(
-			"Community Event",
-			filters={"event_date": ["between", [start_date, end_date]]},
-			fields=["physical_space"],
-		)
-
-		total_space_uses = len(space_usage) + len(events_space_usage)
-		total_available_spaces = frappe.db.count("Physical Space", {"is_active": 1})
-
-		if total_available_spaces > 0:
-			# Simple calculation - could be more sophisticated
-			days_in_month = (end_date - start_date).days + 1
-			possible_uses = total_available_spaces * days_in_month
-			self.space_utilization_rate = (total_space_uses / possible_uses) * 100
+		# Space Utilization Rate: franjas ocupadas sobre franjas disponibles
+		self.space_utilization_rate = get_utilization_rate(start_date, end_date)
 
 		# Placeholder values for metrics that require other modules
 		self.maintenance_resolution_time = "2:00:00"  # 2 hours placeholder
@@ -6,11 +6,14 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import add_to_date, get_datetime, now_datetime
 
+from condominium_management.committee_management.kpi_batch import ATTENDING_STATUSES
+
 
 class CommitteeMeeting(Document):
 	def validate(self):
 		self.validate_meeting_date()
 		self.validate_physical_space()
+		self.set_attendance_rate()
 
 	def validate_meeting_date(self):
 		if self.meeting_date and self.status == "Planificada":
@@ -23,6 +26,20 @@ class CommitteeMeeting(Document):
 				_("Se requiere espacio físico para reuniones {0}.").format(self.meeting_format.lower())
 			)
 
+	def set_attendance_rate(self):
+		"""Guarda la tasa de asistencia al terminar la reunión.
+
+		El valor persistido permite que el dashboard promedie asistencia con un AVG
+		sobre la columna en lugar de cargar cada reunión.
+		"""
+		if self.status != "Terminada":
+			self.attendance_rate = None
+			return
+
+		total = len(self.attendees or [])
+		attending = sum(1 for a in self.attendees or [] if a.attendance_status in ATTENDING_STATUSES)
+		self.attendance_rate = (attending / total) * 100 if total else 0
+
 	def on_update(self):
 		if self.status == "Terminada":
 			self.create_follow_up_tasks()
@@ -130,3 +147,13 @@ class CommitteeMeeting(Document):
 			order_by="meeting_date asc",
 			limit=limit,
 		)
+
+
+def on_doctype_update():
+	# Una sola reunión por ocurrencia de un programa; las reuniones manuales
+	# (sin serie ni ocurrencia) no se ven afectadas porque NULL no colisiona
+	frappe.db.add_unique(
+		"Committee Meeting",
+		["meeting_series", "occurrence_date"],
+		constraint_name="unique_series_occurrence",
+	)
@@ -216,6 +216,20 @@ class TestCommitteeMeetingCorrected(CommitteeTestBase):
 		meeting.save()
 		self.assertEqual(meeting.status, "Planificada")
 
+	def test_attendance_rate_set_on_completion(self):
+		"""La tasa de asistencia solo se guarda cuando la reunión está terminada"""
+		meeting = frappe.new_doc("Committee Meeting")
+		meeting.status = "Planificada"
+		for status in ["Presente", "Virtual", "Ausente", "Excusado"]:
+			meeting.append("attendees", {"person_name": f"CTEST {status}", "attendance_status": status})
+
+		meeting.set_attendance_rate()
+		self.assertIsNone(meeting.attendance_rate)
+
+		meeting.status = "Terminada"
+		meeting.set_attendance_rate()
+		self.assertEqual(meeting.attendance_rate, 50)
+
 	def test_meeting_format_options(self):
 		"""Test Virtual meeting format (others require complex dependencies)"""
 		meeting = frappe.get_doc(
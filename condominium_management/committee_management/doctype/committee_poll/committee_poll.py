@@ -5,6 +5,10 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import cint, flt, getdate, now_datetime, nowdate
 
+from condominium_management.committee_management.doctype.poll_response.poll_response import (
+	get_response_counts,
+)
+
 
 class CommitteePoll(Document):
 	def validate(self):
@@ -65,8 +69,13 @@ class CommitteePoll(Document):
 		if not self.poll_options:
 			return
 
-		# Get poll responses (this would come from a Poll Response DocType)
-		# For now, we'll calculate from the poll_options table if it has response data
+		# Las respuestas registradas en Poll Response son la fuente de verdad; los contadores
+		# de cada opción solo se sincronizan si la encuesta ya existe en BD
+		if not self.is_new():
+			counts = get_response_counts(self.name).get(self.name, {})
+			for option in self.poll_options:
+				option.response_count = counts.get(option.option_text, 0)
+
 		total_responses = 0
 
 		for option in self.poll_options:
@@ -120,24 +129,57 @@ class CommitteePoll(Document):
 		if not option_found:
 			frappe.throw(f"Opción '{option_text}' no encontrada")
 
-		# Create poll response record (this would be a separate DocType)
-		# response_data = {
-		#     "doctype": "Poll Response",
-		#     "poll": self.name,
-		#     "option_text": option_text,
-		#     "respondent_type": respondent_type,
-		#     "respondent_id": respondent_id,
-		#     "response_date": now_datetime(),
-		#     "comment": comment,
-		#     "is_anonymous": self.is_anonymous,
-		# }
-
-		# For now, just update the count in the option
-		option_found.response_count = (option_found.response_count or 0) + 1
+		# El índice único de Poll Response resuelve las carreras entre respuestas simultáneas
+		# del mismo respondiente; la encuesta no se bloquea ni se vuelve a guardar
+		try:
+			frappe.get_doc(
+				{
+					"doctype": "Poll Response",
+					"poll": self.name,
+					"option_text": option_text,
+					"respondent_type": respondent_type,
+					"respondent_id": respondent_id,
+					"response_date": now_datetime(),
+					"comment": comment if self.allow_comments else None,
+					"is_anonymous": self.is_anonymous,
+				}
+			).insert(ignore_permissions=True)
+		except (frappe.DuplicateEntryError, frappe.UniqueValidationError):
+			frappe.throw("Ya ha respondido esta encuesta")
 
-		# Recalculate results
-		self.calculate_results()
-		self.save()
+		# Incrementos atómicos: solo se tocan las filas de opciones y los totales de la encuesta.
+		# La encuesta se actualiza primero; su bloqueo de fila serializa las respuestas
+		# simultáneas, de modo que los porcentajes leen el total ya incrementado
+		frappe.db.sql(
+			"""
+			UPDATE `tabCommittee Poll`
+			SET total_responses = IFNULL(total_responses, 0) + 1,
+				participation_rate = CASE
+					WHEN IFNULL(total_eligible_voters, 0) > 0
+					THEN (IFNULL(total_responses, 0) + 1) * 100 / total_eligible_voters
+					ELSE 0
+				END
+			WHERE name = %(poll)s
+		""",
+			{"poll": self.name},
+		)
+		# Cada expresión usa el conteo previo más el incremento, sin depender del orden
+		# en que se evalúan las asignaciones
+		frappe.db.sql(
+			"""
+			UPDATE `tabPoll Option`
+			SET response_percentage = (IFNULL(response_count, 0) + IF(name = %(option)s, 1, 0)) * 100
+					/ (SELECT total_responses FROM `tabCommittee Poll` WHERE name = %(poll)s),
+				response_count = IFNULL(response_count, 0) + IF(name = %(option)s, 1, 0)
+			WHERE parent = %(poll)s AND parenttype = 'Committee Poll'
+		""",
+			{"option": option_found.name, "poll": self.name},
+		)
+
+		option_found.response_count = (option_found.response_count or 0) + 1
+		self.total_responses = (self.total_responses or 0) + 1
+		for option in self.poll_options:
+			option.response_percentage = (option.response_count or 0) * 100 / self.total_responses
 
 		return True
 
@@ -153,9 +195,12 @@ class CommitteePoll(Document):
 
 	def has_already_responded(self, respondent_type, respondent_id):
 		"""Check if respondent has already responded to this poll"""
-		# This would check the Poll Response DocType
-		# For now, return False
-		return False
+		return bool(
+			frappe.db.exists(
+				"Poll Response",
+				{"poll": self.name, "respondent_type": respondent_type, "respondent_id": respondent_id},
+			)
+		)
 
 	def close_poll(self, closed_by=None):
 		"""Close the poll and finalize results"""
@@ -206,6 +251,28 @@ class CommitteePoll(Document):
 
 		return summary
 
+	@frappe.whitelist()
+	def get_poll_results(self):
+		"""Resultados calculados directamente desde Poll Response (una sola consulta agrupada)"""
+		counts = get_response_counts(self.name).get(self.name, {})
+		total = sum(counts.values())
+
+		return {
+			"poll": self.name,
+			"total_responses": total,
+			"participation_rate": (total / self.total_eligible_voters) * 100
+			if self.total_eligible_voters
+			else 0,
+			"options": [
+				{
+					"option_text": option.option_text,
+					"response_count": counts.get(option.option_text, 0),
+					"response_percentage": (counts.get(option.option_text, 0) / total) * 100 if total else 0,
+				}
+				for option in self.poll_options
+			],
+		}
+
 	def get_winning_option(self):
 		"""Get the option with the most responses"""
 		if not self.poll_options:
@@ -7,11 +7,18 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import add_days, add_months, getdate, now_datetime, nowdate
 
+from condominium_management.committee_management.meeting_recurrence import (
+	get_rule_meeting_counts,
+	get_rule_occurrences,
+	materialize_upcoming_meetings,
+)
+
 
 class MeetingSchedule(Document):
 	def validate(self):
 		self.validate_schedule_period()
 		self.validate_meeting_dates()
+		self.validate_recurrence_rule()
 		self.set_created_by()
 		self.calculate_meeting_counts()
 
@@ -45,6 +52,20 @@ class MeetingSchedule(Document):
 					f"La fecha de reunión {meeting.meeting_date} no corresponde al año del programa {self.schedule_year}"
 				)
 
+	def validate_recurrence_rule(self):
+		"""Validate the recurrence rule compiles and has occurrences in the schedule year"""
+		if not self.recurrence_rule:
+			return
+
+		self.recurrence_rule = self.recurrence_rule.strip().upper()
+		if not get_rule_occurrences(
+			self.recurrence_rule,
+			self.schedule_year,
+			f"{self.schedule_year}-01-01",
+			f"{self.schedule_year}-12-31",
+		):
+			frappe.throw(f"La regla de recurrencia no genera reuniones en el año {self.schedule_year}")
+
 	def set_created_by(self):
 		"""Set created_by field to current committee member if applicable"""
 		if not self.created_by:
@@ -56,20 +77,19 @@ class MeetingSchedule(Document):
 				self.created_by = committee_member
 
 	def calculate_meeting_counts(self):
-		"""Calculate meeting counts"""
-		if not self.scheduled_meetings:
-			self.meetings_created_count = 0
-			self.pending_meetings_count = 0
-			return
-
+		"""Calculate meeting counts, including meetings generated by the recurrence rule"""
 		created_count = len([m for m in self.scheduled_meetings if m.meeting_created])
-		self.meetings_created_count = created_count
+		rule_meetings = 0 if self.is_new() else get_rule_meeting_counts([self.name]).get(self.name, 0)
+
+		self.meetings_created_count = created_count + rule_meetings
 		self.pending_meetings_count = len(self.scheduled_meetings) - created_count
 
 	def on_submit(self):
 		"""Actions when schedule is submitted"""
-		self.approval_status = "Aprobado"
-		self.approved_by = self.get_current_committee_member()
+		self.db_set(
+			{"approval_status": "Aprobado", "approved_by": self.get_current_committee_member()},
+			update_modified=False,
+		)
 
 		if self.auto_create_meetings:
 			self.create_upcoming_meetings()
@@ -80,59 +100,16 @@ class MeetingSchedule(Document):
 		return frappe.db.get_value("Committee Member", {"user": current_user, "is_active": 1}, "name")
 
 	def create_upcoming_meetings(self):
-		"""Create meetings for upcoming dates"""
-		today = getdate(nowdate())
-
-		for scheduled_meeting in self.scheduled_meetings:
-			meeting_date = getdate(scheduled_meeting.meeting_date)
+		"""Create meetings for the upcoming lookahead window"""
+		result = materialize_upcoming_meetings(schedules=[self.name])
 
-			# Only create meetings for future dates or dates within the next 30 days
-			if meeting_date >= today and not scheduled_meeting.meeting_created:
-				meeting_doc = self.create_committee_meeting(scheduled_meeting)
-				if meeting_doc:
-					scheduled_meeting.meeting_created = 1
-					scheduled_meeting.linked_meeting = meeting_doc.name
-
-		self.calculate_meeting_counts()
-		self.last_sync_date = now_datetime()
-		self.save()
-
-	def create_committee_meeting(self, scheduled_meeting):
-		"""Create a committee meeting from scheduled meeting"""
-		try:
-			meeting_doc = frappe.get_doc(
-				{
-					"doctype": "Committee Meeting",
-					"meeting_title": f"Reunión {scheduled_meeting.meeting_type} - {self.schedule_period} {self.schedule_year}",
-					"meeting_date": scheduled_meeting.meeting_date,
-					"meeting_type": scheduled_meeting.meeting_type,
-					"meeting_format": "Presencial",  # Default, can be changed later
-					"physical_space": scheduled_meeting.tentative_location,
-					"is_scheduled_meeting": 1,
-					"meeting_series": self.name,
-				}
-			)
+		self.meetings_created_count, self.pending_meetings_count, self.last_sync_date = frappe.db.get_value(
+			"Meeting Schedule",
+			self.name,
+			["meetings_created_count", "pending_meetings_count", "last_sync_date"],
+		)
 
-			# Add suggested topics as agenda items
-			if scheduled_meeting.suggested_topics:
-				topics = scheduled_meeting.suggested_topics.split("\n")
-				for _i, topic in enumerate(topics):
-					if topic.strip():
-						meeting_doc.append(
-							"agenda_items",
-							{
-								"topic_title": topic.strip(),
-								"topic_category": "Operativo",
-								"priority": "Media",
-							},
-						)
-
-			meeting_doc.insert()
-			return meeting_doc
-
-		except Exception as e:
-			frappe.log_error(f"Error creating committee meeting: {e!s}")
-			return None
+		return result
 
 	def sync_scheduled_meetings(self):
 		"""Sync and create any pending meetings"""
@@ -307,13 +284,7 @@ class MeetingSchedule(Document):
 	@staticmethod
 	def check_pending_meetings():
 		"""Check for pending meetings that need to be created (scheduled task)"""
-		active_schedules = frappe.get_all(
-			"Meeting Schedule", filters={"docstatus": 1, "auto_create_meetings": 1}, fields=["name"]
-		)
-
-		for schedule in active_schedules:
-			schedule_doc = frappe.get_doc("Meeting Schedule", schedule.name)
-			schedule_doc.create_upcoming_meetings()
+		return materialize_upcoming_meetings()
 
 	@staticmethod
 	def send_meeting_reminders():
@@ -0,0 +1,61 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+
+
+class PollResponse(Document):
+	def before_insert(self):
+		if not self.response_date:
+			self.response_date = now_datetime()
+
+
+def on_doctype_update():
+	"""Índices de Poll Response.
+
+	El índice único (poll, respondent_type, respondent_id) es la garantía real contra
+	respuestas duplicadas: dos inserts concurrentes del mismo respondiente hacen que
+	el segundo falle con DuplicateEntryError sin necesidad de bloquear la encuesta.
+	"""
+	frappe.db.add_unique(
+		"Poll Response",
+		["poll", "respondent_type", "respondent_id"],
+		constraint_name="unique_poll_respondent",
+	)
+	frappe.db.add_index("Poll Response", ["poll", "option_text"], index_name="poll_option_index")
+
+
+def get_response_counts(polls):
+	"""Conteo de respuestas por opción para varias encuestas en una sola consulta.
+
+	Args:
+		polls: Nombre de encuesta o lista de nombres
+
+	Returns:
+		dict: {poll: {option_text: count}}
+	"""
+	if isinstance(polls, str):
+		polls = [polls]
+
+	polls = list(set(polls or []))
+	if not polls:
+		return {}
+
+	rows = frappe.db.sql(
+		"""
+		SELECT poll, option_text, COUNT(*) AS response_count
+		FROM `tabPoll Response`
+		WHERE poll IN %(polls)s
+		GROUP BY poll, option_text
+	""",
+		{"polls": polls},
+		as_dict=True,
+	)
+
+	counts = {poll: {} for poll in polls}
+	for row in rows:
+		counts[row.poll][row.option_text] = row.response_count
+
+	return counts
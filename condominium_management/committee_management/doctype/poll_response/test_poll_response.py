@@ -0,0 +1,73 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from condominium_management.committee_management.doctype.poll_response.poll_response import (
+	get_response_counts,
+)
+
+
+class TestPollResponse(FrappeTestCase):
+	def setUp(self):
+		self.poll = frappe.get_doc(
+			{
+				"doctype": "Committee Poll",
+				"poll_title": "Encuesta CTEST Poll Response",
+				"poll_type": "Comité",
+				"target_audience": "Solo Comité",
+				"start_date": nowdate(),
+				"results_visibility": "Inmediato",
+				"poll_options": [
+					{"option_text": "Sí", "option_order": 1},
+					{"option_text": "No", "option_order": 2},
+				],
+			}
+		)
+		self.poll.insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.db.delete("Poll Response", {"poll": self.poll.name})
+		frappe.delete_doc("Committee Poll", self.poll.name, force=True, ignore_permissions=True)
+		frappe.db.commit()
+
+	def _make_response(self, respondent_id, option_text="Sí"):
+		response = frappe.get_doc(
+			{
+				"doctype": "Poll Response",
+				"poll": self.poll.name,
+				"option_text": option_text,
+				"respondent_type": "Committee Member",
+				"respondent_id": respondent_id,
+			}
+		)
+		response.flags.ignore_links = True
+		return response.insert(ignore_permissions=True)
+
+	def test_response_date_is_set(self):
+		"""La fecha de respuesta se asigna al insertar."""
+		response = self._make_response("CTEST-MEMBER-1")
+		self.assertTrue(response.response_date)
+
+	def test_duplicate_respondent_is_rejected(self):
+		"""El índice único impide que el mismo respondiente responda dos veces."""
+		self._make_response("CTEST-MEMBER-1")
+
+		with self.assertRaises((frappe.DuplicateEntryError, frappe.UniqueValidationError)):
+			self._make_response("CTEST-MEMBER-1", option_text="No")
+
+	def test_get_response_counts_groups_by_option(self):
+		"""Los conteos se agrupan por encuesta y opción."""
+		self._make_response("CTEST-MEMBER-1", "Sí")
+		self._make_response("CTEST-MEMBER-2", "Sí")
+		self._make_response("CTEST-MEMBER-3", "No")
+
+		counts = get_response_counts([self.poll.name])
+
+		self.assertEqual(counts[self.poll.name], {"Sí": 2, "No": 1})
+
+	def test_get_response_counts_empty(self):
+		"""Sin encuestas no se ejecuta la consulta."""
+		self.assertEqual(get_response_counts([]), {})
@@ -0,0 +1,407 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Committee Management - Cálculo masivo de KPIs
+=============================================
+
+Calcula los KPIs de gobernanza, operación y cumplimiento de uno o varios periodos
+mensuales con consultas agrupadas por mes (una por fuente de datos, sin importar
+cuántos miembros, reuniones o acuerdos existan) y hace upsert de los registros
+Committee KPI en bloque.
+"""
+
+import calendar
+from datetime import date
+
+import frappe
+from frappe.utils import flt, getdate, now_datetime, nowdate
+
+from condominium_management.physical_spaces.space_utilization import get_utilization
+
+# Estados de asistencia que cuentan como presente
+ATTENDING_STATUSES = ("Presente", "Virtual")
+
+# Campos que el motor escribe en Committee KPI
+KPI_FIELDS = (
+	"assembly_participation_rate",
+	"agreement_completion_rate",
+	"meeting_attendance_rate",
+	"poll_participation_rate",
+	"voting_participation_rate",
+	"community_engagement_score",
+	"event_budget_efficiency",
+	"community_event_participation",
+	"agreement_fulfillment_rate",
+	"space_utilization_rate",
+	"document_update_status",
+	"transparency_index",
+)
+
+
+def get_period_dates(year, month):
+	"""Primer y último día de un periodo mensual"""
+	last_day = calendar.monthrange(year, month)[1]
+	return date(year, month, 1), date(year, month, last_day)
+
+
+def calculate_period_kpis(periods):
+	"""Calcula y guarda los KPIs de los periodos indicados.
+
+	Args:
+		periods: Lista de tuplas (year, month)
+
+	Returns:
+		dict: {"inserted": int, "updated": int, "metrics": {(year, month): {campo: valor}}}
+	"""
+	periods = sorted({(int(year), int(month)) for year, month in periods})
+	if not periods:
+		return {"inserted": 0, "updated": 0, "metrics": {}}
+
+	metrics = collect_period_metrics(periods)
+	result = upsert_kpi_records(metrics)
+	result["metrics"] = metrics
+
+	return result
+
+
+def collect_period_metrics(periods):
+	"""Métricas de todos los periodos con una consulta agrupada por fuente.
+
+	Returns:
+		dict: {(year, month): {campo: valor}}
+	"""
+	start_date = get_period_dates(*periods[0])[0]
+	end_date = get_period_dates(*periods[-1])[1]
+
+	metrics = {period: {} for period in periods}
+
+	_apply_governance_metrics(metrics, start_date, end_date)
+	_apply_operational_metrics(metrics, start_date, end_date)
+	_apply_compliance_metrics(metrics, end_date)
+
+	for values in metrics.values():
+		values["agreement_fulfillment_rate"] = values.get("agreement_completion_rate")
+		values["community_engagement_score"] = _engagement_score(values)
+
+	return metrics
+
+
+def get_meeting_attendance_rate(start_date, end_date):
+	"""Tasa de asistencia agregada de las reuniones del rango en una sola consulta"""
+	row = frappe.db.sql(
+		"""
+		SELECT
+			SUM(CASE WHEN ma.attendance_status IN %(attending)s THEN 1 ELSE 0 END) AS attended,
+			COUNT(ma.name) AS total
+		FROM `tabMeeting Attendee` ma
+		INNER JOIN `tabCommittee Meeting` cm
+			ON cm.name = ma.parent AND ma.parenttype = 'Committee Meeting'
+		WHERE DATE(cm.meeting_date) BETWEEN %(start)s AND %(end)s
+	""",
+		{"attending": ATTENDING_STATUSES, "start": start_date, "end": end_date},
+		as_dict=True,
+	)[0]
+
+	if not row.total:
+		return None
+
+	return flt(row.attended) / row.total * 100
+
+
+def _grouped_by_month(query, start_date, end_date, extra=None):
+	"""Ejecuta una consulta agrupada por (year, month) y la indexa por periodo"""
+	values = {"start": start_date, "end": end_date}
+	values.update(extra or {})
+
+	rows = frappe.db.sql(query, values, as_dict=True)
+	return {(int(row.period_year), int(row.period_month)): row for row in rows}
+
+
+def _apply_governance_metrics(metrics, start_date, end_date):
+	assemblies = _grouped_by_month(
+		"""
+		SELECT YEAR(assembly_date) AS period_year, MONTH(assembly_date) AS period_month,
+			AVG(IFNULL(current_quorum_percentage, 0)) AS value
+		FROM `tabAssembly Management`
+		WHERE docstatus = 1 AND DATE(assembly_date) BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+	)
+
+	agreements = _grouped_by_month(
+		"""
+		SELECT YEAR(agreement_date) AS period_year, MONTH(agreement_date) AS period_month,
+			COUNT(*) AS total,
+			SUM(CASE WHEN status = 'Completado' THEN 1 ELSE 0 END) AS completed
+		FROM `tabAgreement Tracking`
+		WHERE agreement_date BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+	)
+
+	attendance = _grouped_by_month(
+		"""
+		SELECT YEAR(cm.meeting_date) AS period_year, MONTH(cm.meeting_date) AS period_month,
+			SUM(CASE WHEN ma.attendance_status IN %(attending)s THEN 1 ELSE 0 END) AS attended,
+			COUNT(ma.name) AS total
+		FROM `tabMeeting Attendee` ma
+		INNER JOIN `tabCommittee Meeting` cm
+			ON cm.name = ma.parent AND ma.parenttype = 'Committee Meeting'
+		WHERE DATE(cm.meeting_date) BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+		{"attending": ATTENDING_STATUSES},
+	)
+
+	polls = _grouped_by_month(
+		"""
+		SELECT YEAR(start_date) AS period_year, MONTH(start_date) AS period_month,
+			AVG(IFNULL(participation_rate, 0)) AS value
+		FROM `tabCommittee Poll`
+		WHERE start_date BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+	)
+
+	votings = _grouped_by_month(
+		"""
+		SELECT YEAR(voting_start_time) AS period_year, MONTH(voting_start_time) AS period_month,
+			AVG(IFNULL(total_voting_power_present, 0)) AS value
+		FROM `tabVoting System`
+		WHERE DATE(voting_start_time) BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+	)
+
+	for period, values in metrics.items():
+		if period in assemblies:
+			values["assembly_participation_rate"] = flt(assemblies[period].value)
+
+		if period in agreements and agreements[period].total:
+			row = agreements[period]
+			values["agreement_completion_rate"] = flt(row.completed) / row.total * 100
+
+		if period in attendance and attendance[period].total:
+			row = attendance[period]
+			values["meeting_attendance_rate"] = flt(row.attended) / row.total * 100
+
+		if period in polls:
+			values["poll_participation_rate"] = flt(polls[period].value)
+
+		if period in votings:
+			values["voting_participation_rate"] = flt(votings[period].value)
+
+
+def _apply_operational_metrics(metrics, start_date, end_date):
+	events = _grouped_by_month(
+		"""
+		SELECT YEAR(event_date) AS period_year, MONTH(event_date) AS period_month,
+			SUM(CASE WHEN status = 'Completado' THEN IFNULL(budget_amount, 0) ELSE 0 END) AS total_budget,
+			SUM(CASE WHEN status = 'Completado' THEN IFNULL(total_actual_cost, 0) ELSE 0 END) AS total_actual_cost,
+			SUM(CASE WHEN status = 'Completado' THEN IFNULL(expected_attendance, 0) ELSE 0 END) AS total_expected,
+			SUM(CASE WHEN status = 'Completado' THEN IFNULL(actual_attendance, 0) ELSE 0 END) AS total_actual
+		FROM `tabCommunity Event`
+		WHERE event_date BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		start_date,
+		end_date,
+	)
+
+	# Utilización por mes desde los mapas de ocupación, en una sola consulta agregada
+	utilization = {
+		row.period: row.utilization for row in get_utilization(start_date, end_date, period="month")
+	}
+
+	for period, values in metrics.items():
+		event_row = events.get(period)
+
+		if event_row and flt(event_row.total_budget) > 0:
+			values["event_budget_efficiency"] = (
+				flt(event_row.total_actual_cost) / event_row.total_budget * 100
+			)
+
+		if event_row and flt(event_row.total_expected) > 0:
+			values["community_event_participation"] = (
+				flt(event_row.total_actual) / event_row.total_expected * 100
+			)
+
+		period_key = f"{period[0]}-{period[1]:02d}"
+		if period_key in utilization:
+			values["space_utilization_rate"] = utilization[period_key]
+
+
+def _apply_compliance_metrics(metrics, end_date):
+	"""Métricas acumuladas hasta el cierre de cada periodo.
+
+	Una consulta agrupada por mes trae todo el histórico hasta el último periodo y los
+	acumulados por periodo se obtienen con una suma corrida en memoria.
+	"""
+	agreements = frappe.db.sql(
+		"""
+		SELECT period_year, period_month, SUM(created) AS created, SUM(pending_due) AS pending_due
+		FROM (
+			SELECT YEAR(agreement_date) AS period_year, MONTH(agreement_date) AS period_month,
+				1 AS created, 0 AS pending_due
+			FROM `tabAgreement Tracking`
+			WHERE agreement_date <= %(end)s
+			UNION ALL
+			SELECT YEAR(due_date), MONTH(due_date), 0, 1
+			FROM `tabAgreement Tracking`
+			WHERE due_date <= %(end)s AND status != 'Completado'
+		) agreement_months
+		GROUP BY period_year, period_month
+		ORDER BY period_year, period_month
+	""",
+		{"end": end_date},
+		as_dict=True,
+	)
+
+	meetings = _grouped_by_month(
+		"""
+		SELECT YEAR(meeting_date) AS period_year, MONTH(meeting_date) AS period_month,
+			COUNT(*) AS total,
+			SUM(CASE WHEN status = 'Terminada' THEN 1 ELSE 0 END) AS completed
+		FROM `tabCommittee Meeting`
+		WHERE DATE(meeting_date) BETWEEN %(start)s AND %(end)s
+		GROUP BY period_year, period_month
+	""",
+		get_period_dates(*min(metrics))[0],
+		end_date,
+	)
+
+	created_total = 0
+	pending_total = 0
+	monthly = iter(agreements)
+	row = next(monthly, None)
+
+	for period in sorted(metrics):
+		values = metrics[period]
+
+		while row and (int(row.period_year), int(row.period_month)) <= period:
+			created_total += int(row.created or 0)
+			pending_total += int(row.pending_due or 0)
+			row = next(monthly, None)
+
+		if created_total:
+			values["document_update_status"] = (created_total - pending_total) / created_total * 100
+
+		if period in meetings and meetings[period].total:
+			values["transparency_index"] = flt(meetings[period].completed) / meetings[period].total
+
+
+def _engagement_score(values):
+	scores = [
+		values[field] / 100
+		for field in (
+			"assembly_participation_rate",
+			"poll_participation_rate",
+			"voting_participation_rate",
+			"community_event_participation",
+		)
+		if values.get(field)
+	]
+
+	return sum(scores) / len(scores) if scores else None
+
+
+def upsert_kpi_records(metrics):
+	"""Inserta o actualiza en bloque un registro Committee KPI por periodo.
+
+	Los registros existentes se localizan con una sola consulta; los nuevos se insertan
+	con bulk_insert y los existentes se actualizan con bulk_update. En un registro
+	existente solo se escriben las métricas que el lote calculó y el estado no se toca
+	salvo que siga en "Calculado" (no se pisan Borrador, Aprobado ni Publicado).
+	"""
+	periods = list(metrics)
+	existing = {
+		(row.period_year, row.period_month): row
+		for row in frappe.get_all(
+			"Committee KPI",
+			filters={
+				"period_year": ["in", sorted({year for year, _ in periods})],
+				"period_month": ["in", sorted({month for _, month in periods})],
+			},
+			fields=["name", "period_year", "period_month", "status"],
+		)
+	}
+
+	today = nowdate()
+	timestamp = now_datetime()
+	user = frappe.session.user
+
+	updates = {}
+	new_rows = []
+
+	for period, values in metrics.items():
+		if period in existing:
+			record = {field: values[field] for field in KPI_FIELDS if values.get(field) is not None}
+			record["calculation_date"] = today
+			if existing[period].status == "Calculado":
+				record["status"] = "Calculado"
+
+			# bulk_update escribe las mismas columnas para todo su lote: se agrupa por columnas
+			updates.setdefault(tuple(record), {})[existing[period].name] = record
+			continue
+
+		record = {field: values.get(field) for field in KPI_FIELDS}
+		record["status"] = "Calculado"
+		record["calculation_date"] = today
+
+		# El nombre usa el año completo del periodo: es determinista y no colisiona con el
+		# autoname KPI-{YY}-{MM} (basado en la fecha de creación) de los registros manuales
+		year, month = period
+		new_rows.append(
+			[
+				f"KPI-{year}-{month:02d}",
+				timestamp,
+				timestamp,
+				user,
+				user,
+				0,
+				year,
+				month,
+				*(record[field] for field in (*KPI_FIELDS, "status", "calculation_date")),
+			]
+		)
+
+	if new_rows:
+		frappe.db.bulk_insert(
+			"Committee KPI",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"docstatus",
+				"period_year",
+				"period_month",
+				*KPI_FIELDS,
+				"status",
+				"calculation_date",
+			],
+			values=new_rows,
+		)
+
+	for doc_updates in updates.values():
+		frappe.db.bulk_update("Committee KPI", doc_updates)
+
+	return {"inserted": len(new_rows), "updated": sum(len(doc_updates) for doc_updates in updates.values())}
+
+
+def calculate_current_period_kpis():
+	"""KPIs del mes en curso (usado por el job diario)"""
+	today = getdate(nowdate())
+	return calculate_period_kpis([(today.year, today.month)])
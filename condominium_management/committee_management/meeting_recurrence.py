@@ -0,0 +1,347 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Committee Management - Motor de recurrencia de reuniones
+=======================================================
+
+Cada Meeting Schedule guarda su recurrencia como una regla compacta estilo RRULE
+(RFC 5545) más las fechas explícitas de su tabla de reuniones. El motor expande solo
+la ventana de anticipación (lookahead) de todos los programas a la vez, descarta las
+ocurrencias ya materializadas usando la llave indexada (meeting_series,
+occurrence_date) de Committee Meeting e inserta las reuniones faltantes en bloque.
+"""
+
+from datetime import datetime, time
+
+import frappe
+from dateutil.rrule import rrulestr
+from frappe import _
+from frappe.utils import add_days, cint, get_time, getdate, now_datetime, nowdate
+
+from condominium_management.utils import reserve_series_names
+
+DEFAULT_LOOKAHEAD_DAYS = 30
+DEFAULT_MEETING_TIME = "18:00:00"
+
+# Scheduled Meeting Item usa tipos de planeación; Committee Meeting solo tiene
+# Ordinaria/Extraordinaria/Emergencia/Trabajo
+MEETING_TYPE_MAP = {"Ordinaria": "Ordinaria"}
+DEFAULT_MEETING_TYPE = "Trabajo"
+
+# Reuniones generadas por la regla de recurrencia: las del programa que ninguna fila
+# de su tabla enlaza
+RULE_MEETINGS_QUERY = """
+	SELECT cm.meeting_series, COUNT(*) AS created
+	FROM `tabCommittee Meeting` cm
+	WHERE cm.meeting_series IN %(schedules)s
+		AND NOT EXISTS (
+			SELECT 1 FROM `tabScheduled Meeting Item` item
+			WHERE item.parenttype = 'Meeting Schedule' AND item.parent = cm.meeting_series
+				AND item.linked_meeting = cm.name
+		)
+	GROUP BY cm.meeting_series
+"""
+
+
+def parse_recurrence_rule(rule, schedule_year):
+	"""Compila una regla de recurrencia acotada al año del programa.
+
+	Args:
+		rule: Regla RRULE sin DTSTART, p. ej. "FREQ=MONTHLY;BYMONTHDAY=15"
+		schedule_year: Año del programa (la regla empieza el 1 de enero)
+
+	Returns:
+		dateutil.rrule.rrule
+	"""
+	rule = (rule or "").strip()
+	if rule.upper().startswith("RRULE:"):
+		rule = rule[6:]
+
+	try:
+		return rrulestr(rule, dtstart=datetime(cint(schedule_year), 1, 1))
+	except (ValueError, TypeError) as e:
+		frappe.throw(_("Regla de recurrencia inválida '{0}': {1}").format(rule, e))
+
+
+def get_rule_occurrences(rule, schedule_year, start_date, end_date):
+	"""Fechas de la regla dentro de [start_date, end_date] y del año del programa"""
+	year_start = datetime(cint(schedule_year), 1, 1)
+	year_end = datetime(cint(schedule_year), 12, 31, 23, 59, 59)
+
+	window_start = max(datetime.combine(getdate(start_date), time.min), year_start)
+	window_end = min(datetime.combine(getdate(end_date), time.max), year_end)
+	if window_start > window_end:
+		return []
+
+	compiled = parse_recurrence_rule(rule, schedule_year)
+	return [occurrence.date() for occurrence in compiled.between(window_start, window_end, inc=True)]
+
+
+def materialize_upcoming_meetings(schedules=None, today=None):
+	"""Crea las Committee Meetings faltantes de la ventana de anticipación.
+
+	Args:
+		schedules: Nombres de Meeting Schedule a procesar. Por defecto, todos los
+			programas aprobados con creación automática.
+		today: Fecha de referencia (para pruebas)
+
+	Returns:
+		dict: {"schedules": int, "created": int}
+	"""
+	today = getdate(today or nowdate())
+
+	filters = {"docstatus": 1}
+	if schedules is None:
+		filters["auto_create_meetings"] = 1
+	else:
+		filters["name"] = ["in", list(schedules) or [""]]
+
+	schedule_rows = frappe.get_all(
+		"Meeting Schedule",
+		filters=filters,
+		fields=[
+			"name",
+			"schedule_year",
+			"schedule_period",
+			"recurrence_rule",
+			"recurrence_meeting_type",
+			"recurrence_time",
+			"recurrence_location",
+			"lookahead_days",
+		],
+	)
+	if not schedule_rows:
+		return {"schedules": 0, "created": 0}
+
+	schedules_by_name = {schedule.name: schedule for schedule in schedule_rows}
+	horizon = add_days(today, max(cint(s.lookahead_days) or DEFAULT_LOOKAHEAD_DAYS for s in schedule_rows))
+
+	occurrences = _collect_occurrences(schedules_by_name, today, horizon)
+	pending = _exclude_materialized(occurrences, today, horizon)
+
+	created = _insert_meetings(pending, schedules_by_name)
+	_refresh_schedule_counts(list(schedules_by_name))
+
+	return {"schedules": len(schedule_rows), "created": created}
+
+
+def _collect_occurrences(schedules_by_name, today, horizon):
+	"""Ocurrencias de todos los programas en la ventana, indexadas por (programa, fecha)"""
+	occurrences = {}
+
+	# Reglas de recurrencia: se expanden en memoria, solo dentro de la ventana
+	for schedule in schedules_by_name.values():
+		if not schedule.recurrence_rule:
+			continue
+
+		schedule_horizon = add_days(today, cint(schedule.lookahead_days) or DEFAULT_LOOKAHEAD_DAYS)
+		for occurrence_date in get_rule_occurrences(
+			schedule.recurrence_rule, schedule.schedule_year, today, schedule_horizon
+		):
+			occurrences[(schedule.name, occurrence_date)] = frappe._dict(
+				schedule=schedule.name,
+				occurrence_date=occurrence_date,
+				meeting_type=schedule.recurrence_meeting_type or "Ordinaria",
+				meeting_time=schedule.recurrence_time,
+				location=schedule.recurrence_location,
+				topics=None,
+				item=None,
+			)
+
+	# Fechas explícitas de la tabla: una sola consulta para todos los programas; si
+	# coinciden con la regla, la fila explícita prevalece
+	items = frappe.get_all(
+		"Scheduled Meeting Item",
+		filters={
+			"parenttype": "Meeting Schedule",
+			"parent": ["in", list(schedules_by_name)],
+			"meeting_created": 0,
+			"meeting_date": ["between", [today, horizon]],
+		},
+		fields=[
+			"name",
+			"parent",
+			"meeting_date",
+			"meeting_type",
+			"tentative_time",
+			"tentative_location",
+			"suggested_topics",
+		],
+	)
+
+	for item in items:
+		schedule = schedules_by_name[item.parent]
+		occurrence_date = getdate(item.meeting_date)
+		if occurrence_date > add_days(today, cint(schedule.lookahead_days) or DEFAULT_LOOKAHEAD_DAYS):
+			continue
+
+		occurrences[(item.parent, occurrence_date)] = frappe._dict(
+			schedule=item.parent,
+			occurrence_date=occurrence_date,
+			meeting_type=item.meeting_type,
+			meeting_time=item.tentative_time,
+			location=item.tentative_location,
+			topics=item.suggested_topics,
+			item=item.name,
+		)
+
+	return occurrences
+
+
+def _exclude_materialized(occurrences, today, horizon):
+	"""Descarta las ocurrencias que ya tienen Committee Meeting (índice único)"""
+	if not occurrences:
+		return []
+
+	existing = {
+		(row.meeting_series, getdate(row.occurrence_date))
+		for row in frappe.get_all(
+			"Committee Meeting",
+			filters={
+				"meeting_series": ["in", sorted({schedule for schedule, _ in occurrences})],
+				"occurrence_date": ["between", [today, horizon]],
+			},
+			fields=["meeting_series", "occurrence_date"],
+		)
+	}
+
+	return [occurrence for key, occurrence in sorted(occurrences.items()) if key not in existing]
+
+
+def _insert_meetings(pending, schedules_by_name):
+	if not pending:
+		return 0
+
+	timestamp = now_datetime()
+	user = frappe.session.user
+
+	# Mismo formato que el autoname de Committee Meeting: MTG-{YY}-{MM}-{###}
+	names = reserve_series_names(f"MTG-{timestamp:%y}-{timestamp:%m}-", len(pending))
+
+	meeting_rows = []
+	agenda_rows = []
+	item_updates = {}
+
+	for name, occurrence in zip(names, pending, strict=True):
+		schedule = schedules_by_name[occurrence.schedule]
+		meeting_date = datetime.combine(
+			occurrence.occurrence_date, get_time(occurrence.meeting_time or DEFAULT_MEETING_TIME)
+		)
+
+		meeting_rows.append(
+			[
+				name,
+				timestamp,
+				timestamp,
+				user,
+				user,
+				f"Reunión {occurrence.meeting_type} - {schedule.schedule_period} {schedule.schedule_year}",
+				meeting_date,
+				MEETING_TYPE_MAP.get(occurrence.meeting_type, DEFAULT_MEETING_TYPE),
+				"Presencial" if occurrence.location else "Virtual",
+				occurrence.location,
+				1,
+				occurrence.schedule,
+				occurrence.occurrence_date,
+				"Planificada",
+			]
+		)
+
+		topics = [topic.strip() for topic in (occurrence.topics or "").split("\n") if topic.strip()]
+		for idx, topic in enumerate(topics, start=1):
+			agenda_rows.append(
+				[
+					frappe.generate_hash(length=10),
+					timestamp,
+					timestamp,
+					user,
+					user,
+					name,
+					"Committee Meeting",
+					"agenda_items",
+					idx,
+					topic,
+				]
+			)
+
+		if occurrence.item:
+			item_updates[occurrence.item] = {"meeting_created": 1, "linked_meeting": name}
+
+	frappe.db.bulk_insert(
+		"Committee Meeting",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"meeting_title",
+			"meeting_date",
+			"meeting_type",
+			"meeting_format",
+			"physical_space",
+			"is_scheduled_meeting",
+			"meeting_series",
+			"occurrence_date",
+			"status",
+		],
+		values=meeting_rows,
+	)
+
+	if agenda_rows:
+		frappe.db.bulk_insert(
+			"Meeting Agenda Item",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"idx",
+				"topic_title",
+			],
+			values=agenda_rows,
+		)
+
+	if item_updates:
+		frappe.db.bulk_update("Scheduled Meeting Item", item_updates, update_modified=False)
+
+	return len(meeting_rows)
+
+
+def get_rule_meeting_counts(schedule_names):
+	"""Reuniones generadas por la regla de cada programa, {programa: total}"""
+	if not schedule_names:
+		return {}
+
+	return dict(frappe.db.sql(RULE_MEETINGS_QUERY, {"schedules": list(schedule_names)}))
+
+
+def _refresh_schedule_counts(schedule_names):
+	"""Recalcula los contadores de todos los programas con un solo UPDATE.
+
+	meetings_created_count suma las fechas de la tabla ya materializadas y las reuniones
+	generadas por la regla. pending_meetings_count solo cuenta fechas de la tabla: la
+	regla no tiene un número fijo de ocurrencias pendientes, se expande por ventana.
+	"""
+	frappe.db.sql(
+		f"""
+		UPDATE `tabMeeting Schedule` ms
+		LEFT JOIN (
+			SELECT parent, COUNT(*) AS total, SUM(meeting_created) AS created
+			FROM `tabScheduled Meeting Item`
+			WHERE parenttype = 'Meeting Schedule' AND parent IN %(schedules)s
+			GROUP BY parent
+		) items ON items.parent = ms.name
+		LEFT JOIN ({RULE_MEETINGS_QUERY}) rule_meetings ON rule_meetings.meeting_series = ms.name
+		SET ms.meetings_created_count = IFNULL(items.created, 0) + IFNULL(rule_meetings.created, 0),
+			ms.pending_meetings_count = IFNULL(items.total, 0) - IFNULL(items.created, 0),
+			ms.last_sync_date = %(now)s
+		WHERE ms.name IN %(schedules)s
+	""",
+		{"schedules": schedule_names, "now": now_datetime()},
+	)
@@ -3,15 +3,18 @@
 
 import frappe
 from frappe import _
-from frappe.utils import add_days, flt, getdate, nowdate
+from frappe.utils import add_days, cint, flt, getdate, nowdate
+
+# Ventana por defecto (días) para métricas históricas del dashboard
+DEFAULT_ATTENDANCE_WINDOW_DAYS = 90
 
 
 @frappe.whitelist()
-def get_committee_dashboard_data():
+def get_committee_dashboard_data(attendance_window_days=DEFAULT_ATTENDANCE_WINDOW_DAYS):
 	"""Get comprehensive data for the committee executive dashboard"""
 
 	dashboard_data = {
-		"overview_metrics": get_overview_metrics(),
+		"overview_metrics": get_overview_metrics(attendance_window_days),
 		"recent_meetings": get_recent_meetings(),
 		"pending_agreements": get_pending_agreements(),
 		"active_polls": get_active_polls(),
@@ -25,7 +28,7 @@ def get_committee_dashboard_data():
 	return dashboard_data
 
 
-def get_overview_metrics():
+def get_overview_metrics(attendance_window_days=DEFAULT_ATTENDANCE_WINDOW_DAYS):
 	"""Get overview metrics for the dashboard"""
 	try:
 		return {
@@ -38,7 +41,7 @@ def get_overview_metrics():
 				"Agreement Tracking", {"status": ["in", ["Pendiente", "En Progreso"]]}
 			),
 			"completed_agreements_this_month": get_completed_agreements_this_month(),
-			"average_meeting_attendance": get_average_meeting_attendance(),
+			"average_meeting_attendance": get_average_meeting_attendance(attendance_window_days),
 		}
 	except Exception as e:
 		frappe.log_error(f"Error getting overview metrics: {e!s}")
@@ -61,27 +64,25 @@ def get_completed_agreements_this_month():
 		return 0
 
 
-def get_average_meeting_attendance():
-	"""Calculate average meeting attendance rate"""
-	try:
-		meetings = frappe.get_all(
-			"Committee Meeting", filters={"meeting_status": "Completada"}, fields=["name"]
-		)
-
-		if not meetings:
-			return 0
+def get_average_meeting_attendance(window_days=DEFAULT_ATTENDANCE_WINDOW_DAYS):
+	"""Calculate average meeting attendance rate over the last window_days.
 
-		total_attendance = 0
-		meeting_count = 0
-
-		for meeting in meetings:
-			meeting_doc = frappe.get_doc("Committee Meeting", meeting.name)
-			if hasattr(meeting_doc, "get_attendance_summary"):
-				summary = meeting_doc.get_attendance_summary()
-				total_attendance += summary.get("attendance_rate", 0)
-				meeting_count += 1
-
-		return round(total_attendance / meeting_count, 1) if meeting_count > 0 else 0
+	Usa la tasa guardada en cada reunión terminada (attendance_rate), así que es un
+	solo AVG sobre el índice de meeting_date y nunca recorre todo el historial.
+	"""
+	try:
+		window_days = cint(window_days) or DEFAULT_ATTENDANCE_WINDOW_DAYS
+
+		average = frappe.db.sql(
+			"""
+			SELECT AVG(attendance_rate)
+			FROM `tabCommittee Meeting`
+			WHERE status = 'Terminada' AND meeting_date >= %s
+		""",
+			add_days(nowdate(), -window_days),
+		)[0][0]
+
+		return round(flt(average), 1)
 	except Exception:
 		return 0
 
@@ -3,22 +3,21 @@
 
 import frappe
 from frappe import _
-from frappe.utils import add_days, getdate, nowdate
+from frappe.utils import add_days, get_datetime, getdate, now_datetime, nowdate
+
+from condominium_management.committee_management.kpi_batch import calculate_current_period_kpis
+from condominium_management.committee_management.meeting_recurrence import materialize_upcoming_meetings
 
 
 def check_pending_meetings():
-	"""Daily task to check for pending meetings that need to be created"""
+	"""Daily task to materialize upcoming meetings of all auto-creating schedules"""
 	try:
-		# Get active meeting schedules with auto-creation enabled
-		schedules = frappe.get_all(
-			"Meeting Schedule", filters={"docstatus": 1, "auto_create_meetings": 1}, fields=["name"]
-		)
-
-		for schedule in schedules:
-			schedule_doc = frappe.get_doc("Meeting Schedule", schedule.name)
-			schedule_doc.create_upcoming_meetings()
+		result = materialize_upcoming_meetings()
 
-		frappe.log_error(f"Processed {len(schedules)} meeting schedules", "Check Pending Meetings")
+		frappe.log_error(
+			f"Processed {result['schedules']} meeting schedules, created {result['created']} meetings",
+			"Check Pending Meetings",
+		)
 
 	except Exception as e:
 		frappe.log_error(f"Error in check_pending_meetings: {e!s}")
@@ -29,22 +28,33 @@ def check_overdue_agreements():
 	try:
 		today = getdate(nowdate())
 
-		# Find agreements that are overdue
+		# Find agreements that just became overdue
 		overdue_agreements = frappe.get_all(
 			"Agreement Tracking",
-			filters={"status": ["not in", ["Completado", "Cancelado"]], "due_date": ["<", today]},
-			fields=["name", "agreement_title", "responsible_person", "due_date"],
+			filters={
+				"status": ["not in", ["Completado", "Cancelado", "Vencido"]],
+				"due_date": ["<", today],
+			},
+			fields=["name", "agreement_number", "responsible_party", "due_date"],
 		)
 
-		for agreement in overdue_agreements:
-			# Update status to overdue
-			agreement_doc = frappe.get_doc("Agreement Tracking", agreement.name)
-			if agreement_doc.status != "Vencido":
-				agreement_doc.status = "Vencido"
-				agreement_doc.save()
+		if overdue_agreements:
+			# Un solo UPDATE en lugar de get_doc + save por acuerdo
+			frappe.db.sql(
+				"""
+				UPDATE `tabAgreement Tracking`
+				SET status = 'Vencido', modified = %(modified)s, modified_by = %(user)s
+				WHERE name IN %(names)s
+			""",
+				{
+					"names": [agreement.name for agreement in overdue_agreements],
+					"modified": now_datetime(),
+					"user": frappe.session.user,
+				},
+			)
 
-				# Create escalation notification
-				create_overdue_notification(agreement_doc)
+			# Create escalation notifications
+			create_overdue_notifications(overdue_agreements)
 
 		frappe.log_error(
 			f"Processed {len(overdue_agreements)} overdue agreements", "Check Overdue Agreements"
@@ -57,45 +67,11 @@ def check_overdue_agreements():
 def calculate_daily_kpis():
 	"""Daily task to calculate and update KPIs"""
 	try:
-		# Get all active committee members
-		committee_members = frappe.get_all("Committee Member", filters={"is_active": 1}, fields=["name"])
-
-		current_month = nowdate()[5:7]
-		current_year = nowdate()[:4]
-
-		for member in committee_members:
-			# Find or create current month KPI record
-			kpi_record = frappe.db.get_value(
-				"Committee KPI",
-				{
-					"committee_member": member.name,
-					"kpi_period": "Mensual",
-					"kpi_year": current_year,
-					"kpi_month": current_month,
-				},
-				"name",
-			)
-
-			if not kpi_record:
-				# Create new KPI record for current month
-				kpi_doc = frappe.get_doc(
-					{
-						"doctype": "Committee KPI",
-						"committee_member": member.name,
-						"kpi_period": "Mensual",
-						"kpi_year": current_year,
-						"kpi_month": current_month,
-					}
-				)
-				kpi_doc.insert()
-			else:
-				# Update existing KPI record
-				kpi_doc = frappe.get_doc("Committee KPI", kpi_record)
-				kpi_doc.calculate_performance_metrics()
-				kpi_doc.save()
+		result = calculate_current_period_kpis()
 
 		frappe.log_error(
-			f"Updated KPIs for {len(committee_members)} committee members", "Calculate Daily KPIs"
+			f"Committee KPIs: {result['inserted']} inserted, {result['updated']} updated",
+			"Calculate Daily KPIs",
 		)
 
 	except Exception as e:
@@ -112,16 +88,16 @@ def send_meeting_reminders():
 			"Committee Meeting",
 			filters={
 				"meeting_date": ["between", [nowdate(), next_week]],
-				"meeting_status": ["in", ["Programada", "En Curso"]],
+				"status": "Planificada",
 			},
-			fields=["name", "meeting_title", "meeting_date", "meeting_time"],
+			fields=["name", "meeting_title", "meeting_date"],
 		)
 
-		for meeting in upcoming_meetings:
-			send_meeting_reminder_notifications(meeting)
+		created = send_meeting_reminder_notifications(upcoming_meetings)
 
 		frappe.log_error(
-			f"Sent reminders for {len(upcoming_meetings)} upcoming meetings", "Send Meeting Reminders"
+			f"Sent {created} reminders for {len(upcoming_meetings)} upcoming meetings",
+			"Send Meeting Reminders",
 		)
 
 	except Exception as e:
@@ -150,55 +126,138 @@ def generate_weekly_reports():
 		frappe.log_error(f"Error in generate_weekly_reports: {e!s}")
 
 
-def create_overdue_notification(agreement_doc):
-	"""Create notification for overdue agreement"""
+def create_overdue_notifications(agreements):
+	"""Create notifications for overdue agreements"""
 	try:
-		if agreement_doc.responsible_person:
-			user = frappe.db.get_value("Committee Member", agreement_doc.responsible_person, "user")
-			if user:
-				# Create high priority ToDo
-				todo_doc = frappe.get_doc(
-					{
-						"doctype": "ToDo",
-						"allocated_to": user,
-						"description": f"VENCIDO: {agreement_doc.agreement_title} (vencido el {agreement_doc.due_date})",
-						"reference_type": "Agreement Tracking",
-						"reference_name": agreement_doc.name,
-						"date": nowdate(),
-						"priority": "High",
-					}
-				)
-				todo_doc.insert()
+		member_users = get_member_users(agreement.responsible_party for agreement in agreements)
+		today = nowdate()
+
+		todos = [
+			{
+				"allocated_to": member_users[agreement.responsible_party],
+				"description": f"VENCIDO: {agreement.agreement_number or agreement.name} (vencido el {agreement.due_date})",
+				"reference_type": "Agreement Tracking",
+				"reference_name": agreement.name,
+				"date": today,
+				"priority": "High",
+			}
+			for agreement in agreements
+			if member_users.get(agreement.responsible_party)
+		]
+
+		return bulk_create_todos(todos)
 
 	except Exception as e:
 		frappe.log_error(f"Error creating overdue notification: {e!s}")
+		return 0
 
 
-def send_meeting_reminder_notifications(meeting):
-	"""Send reminder notifications for meeting"""
+def send_meeting_reminder_notifications(meetings):
+	"""Send reminder notifications for meetings"""
 	try:
-		meeting_doc = frappe.get_doc("Committee Meeting", meeting.name)
-
-		for attendee in meeting_doc.attendees:
-			if attendee.committee_member:
-				user = frappe.db.get_value("Committee Member", attendee.committee_member, "user")
-				if user:
-					# Create reminder ToDo
-					todo_doc = frappe.get_doc(
-						{
-							"doctype": "ToDo",
-							"allocated_to": user,
-							"description": f"Recordatorio: {meeting.meeting_title} el {meeting.meeting_date} a las {meeting.meeting_time}",
-							"reference_type": "Committee Meeting",
-							"reference_name": meeting.name,
-							"date": meeting.meeting_date,
-							"priority": "Medium",
-						}
-					)
-					todo_doc.insert()
+		if not meetings:
+			return 0
+
+		meetings_by_name = {meeting.name: meeting for meeting in meetings}
+
+		# Asistentes de todas las reuniones en una sola consulta
+		attendees = frappe.get_all(
+			"Meeting Attendee",
+			filters={
+				"parent": ["in", list(meetings_by_name)],
+				"parenttype": "Committee Meeting",
+				"committee_member": ["is", "set"],
+			},
+			fields=["parent", "committee_member"],
+		)
+
+		member_users = get_member_users(attendee.committee_member for attendee in attendees)
+
+		todos = []
+		for attendee in attendees:
+			user = member_users.get(attendee.committee_member)
+			if not user:
+				continue
+
+			meeting = meetings_by_name[attendee.parent]
+			meeting_date = get_datetime(meeting.meeting_date)
+			todos.append(
+				{
+					"allocated_to": user,
+					"description": f"Recordatorio: {meeting.meeting_title} el {meeting_date:%Y-%m-%d} a las {meeting_date:%H:%M}",
+					"reference_type": "Committee Meeting",
+					"reference_name": meeting.name,
+					"date": meeting_date.date(),
+					"priority": "Medium",
+				}
+			)
+
+		return bulk_create_todos(todos)
 
 	except Exception as e:
 		frappe.log_error(f"Error sending meeting reminder: {e!s}")
+		return 0
+
+
+def get_member_users(members):
+	"""Resolve Committee Member → User in a single query"""
+	members = sorted({member for member in members if member})
+	if not members:
+		return {}
+
+	return dict(
+		frappe.get_all(
+			"Committee Member",
+			filters={"name": ["in", members], "user": ["is", "set"]},
+			fields=["name", "user"],
+			as_list=True,
+		)
+	)
+
+
+def bulk_create_todos(todos):
+	"""Create ToDos in batch, skipping the ones that already exist.
+
+	La clave de deduplicación es (reference_type, reference_name, date, allocated_to), de
+	modo que volver a ejecutar un job no duplica recordatorios. La búsqueda de existentes
+	es una sola consulta; cada ToDo nuevo se inserta como documento para que sus hooks
+	actualicen _assign en la referencia y notifiquen al asignado.
+	"""
+	if not todos:
+		return 0
+
+	def dedupe_key(todo):
+		return (
+			todo["reference_type"],
+			todo["reference_name"],
+			str(getdate(todo["date"])),
+			todo["allocated_to"],
+		)
+
+	existing = {
+		dedupe_key(todo)
+		for todo in frappe.get_all(
+			"ToDo",
+			filters={
+				"reference_name": ["in", sorted({todo["reference_name"] for todo in todos})],
+				"status": ["!=", "Cancelled"],
+			},
+			fields=["reference_type", "reference_name", "date", "allocated_to"],
+		)
+		if todo.date
+	}
+
+	created = 0
+	for todo in todos:
+		key = dedupe_key(todo)
+		if key in existing:
+			continue
+		existing.add(key)
+
+		frappe.get_doc({"doctype": "ToDo", "status": "Open", **todo}).insert()
+		created += 1
+
+	return created
 
 
 def generate_weekly_summary(member):
@@ -0,0 +1,171 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests y benchmark del cálculo masivo de KPIs (kpi_batch).
+
+El benchmark mide la duración del job nocturno contra el número de miembros con
+asistencia registrada y verifica que el número de consultas no crece con ellos.
+"""
+
+import time
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from condominium_management.committee_management import kpi_batch
+
+# Periodo histórico aislado para no mezclar datos reales del sitio
+TEST_PERIOD = (2001, 1)
+TEST_MEETING_PREFIX = "CTEST-KPI-MTG"
+
+
+class TestKPIBatch(FrappeTestCase):
+	def setUp(self):
+		self._cleanup()
+
+	def tearDown(self):
+		self._cleanup()
+		frappe.db.commit()
+
+	def _cleanup(self):
+		frappe.db.delete("Meeting Attendee", {"parent": ["like", f"{TEST_MEETING_PREFIX}%"]})
+		frappe.db.delete("Committee Meeting", {"name": ["like", f"{TEST_MEETING_PREFIX}%"]})
+		frappe.db.delete("Committee KPI", {"period_year": TEST_PERIOD[0], "period_month": TEST_PERIOD[1]})
+
+	def _create_meeting(self, suffix, member_count, present_ratio=0.8):
+		"""Reunión con member_count asistentes insertada directamente (sin hooks)"""
+		timestamp = now_datetime()
+		meeting_name = f"{TEST_MEETING_PREFIX}-{suffix}"
+		frappe.db.bulk_insert(
+			"Committee Meeting",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"meeting_title",
+				"meeting_date",
+				"status",
+			],
+			values=[
+				[
+					meeting_name,
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					meeting_name,
+					"2001-01-15 10:00:00",
+					"Terminada",
+				]
+			],
+		)
+
+		present = int(member_count * present_ratio)
+		frappe.db.bulk_insert(
+			"Meeting Attendee",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"idx",
+				"person_name",
+				"committee_member",
+				"attendance_status",
+			],
+			values=[
+				[
+					f"{meeting_name}-{i}",
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					meeting_name,
+					"Committee Meeting",
+					"attendees",
+					i + 1,
+					f"Miembro {i}",
+					f"CTEST-CM-{i}",
+					"Presente" if i < present else "Ausente",
+				]
+				for i in range(member_count)
+			],
+		)
+
+	def test_attendance_rate_from_grouped_query(self):
+		"""La tasa de asistencia sale de una sola consulta agregada."""
+		self._create_meeting("A", 10, present_ratio=0.7)
+
+		metrics = kpi_batch.collect_period_metrics([TEST_PERIOD])
+
+		self.assertAlmostEqual(metrics[TEST_PERIOD]["meeting_attendance_rate"], 70.0)
+		self.assertEqual(metrics[TEST_PERIOD]["transparency_index"], 1)
+
+	def test_upsert_is_idempotent(self):
+		"""Ejecutar el cálculo dos veces actualiza el mismo registro."""
+		self._create_meeting("B", 4)
+
+		first = kpi_batch.calculate_period_kpis([TEST_PERIOD])
+		second = kpi_batch.calculate_period_kpis([TEST_PERIOD])
+
+		self.assertEqual(first["inserted"], 1)
+		self.assertEqual(second["inserted"], 0)
+		self.assertEqual(second["updated"], 1)
+		self.assertEqual(
+			frappe.db.count("Committee KPI", {"period_year": TEST_PERIOD[0], "period_month": TEST_PERIOD[1]}),
+			1,
+		)
+
+	def test_upsert_keeps_approved_status_and_uncomputed_metrics(self):
+		"""Recalcular no pisa el estado aprobado ni las métricas que el lote no calculó."""
+		self._create_meeting("C", 4)
+		kpi_batch.calculate_period_kpis([TEST_PERIOD])
+		kpi_name = frappe.db.get_value(
+			"Committee KPI", {"period_year": TEST_PERIOD[0], "period_month": TEST_PERIOD[1]}
+		)
+		frappe.db.set_value(
+			"Committee KPI", kpi_name, {"status": "Aprobado", "event_budget_efficiency": 87.5}
+		)
+
+		kpi_batch.calculate_period_kpis([TEST_PERIOD])
+
+		kpi = frappe.db.get_value(
+			"Committee KPI",
+			kpi_name,
+			["status", "event_budget_efficiency", "meeting_attendance_rate"],
+			as_dict=True,
+		)
+		self.assertEqual(kpi.status, "Aprobado")
+		self.assertEqual(kpi.event_budget_efficiency, 87.5)
+		self.assertAlmostEqual(kpi.meeting_attendance_rate, 75.0)
+
+	def test_nightly_job_duration_vs_member_count(self):
+		"""Benchmark: la duración y el número de consultas no escalan con los miembros."""
+		results = []
+
+		for member_count in (10, 100, 1000):
+			self._cleanup()
+			self._create_meeting(f"BENCH-{member_count}", member_count)
+
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				start_time = time.perf_counter()
+				kpi_batch.calculate_period_kpis([TEST_PERIOD])
+				execution_time = time.perf_counter() - start_time
+
+			results.append((member_count, sql_spy.call_count, execution_time))
+
+		print("\nmiembros | consultas | segundos")
+		for member_count, query_count, execution_time in results:
+			print(f"{member_count:>8} | {query_count:>9} | {execution_time:.4f}")
+
+		query_counts = {query_count for _, query_count, _ in results}
+		self.assertEqual(len(query_counts), 1, f"El número de consultas varía con los miembros: {results}")
@@ -0,0 +1,192 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests del motor de recurrencia de reuniones (meeting_recurrence).
+"""
+
+from datetime import date, datetime
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from condominium_management.committee_management.meeting_recurrence import (
+	MEETING_TYPE_MAP,
+	get_rule_occurrences,
+	materialize_upcoming_meetings,
+	parse_recurrence_rule,
+)
+
+SCHEDULE_YEAR = now_datetime().year
+REFERENCE_DATE = date(SCHEDULE_YEAR, 3, 1)
+
+
+class TestMeetingRecurrence(FrappeTestCase):
+	def test_monthly_rule_limited_to_window(self):
+		"""Solo se expanden las ocurrencias dentro de la ventana."""
+		occurrences = get_rule_occurrences("FREQ=MONTHLY;BYMONTHDAY=15", 2026, "2026-10-01", "2026-11-30")
+		self.assertEqual(occurrences, [date(2026, 10, 15), date(2026, 11, 15)])
+
+	def test_window_is_clamped_to_schedule_year(self):
+		"""La ventana nunca sale del año del programa."""
+		occurrences = get_rule_occurrences("FREQ=MONTHLY;BYMONTHDAY=15", 2026, "2026-12-01", "2027-02-28")
+		self.assertEqual(occurrences, [date(2026, 12, 15)])
+
+	def test_biweekly_rule(self):
+		"""Reglas semanales con intervalo y día de la semana."""
+		occurrences = get_rule_occurrences(
+			"FREQ=WEEKLY;INTERVAL=2;BYDAY=TU", 2026, "2026-10-01", "2026-10-31"
+		)
+		self.assertEqual(occurrences, [date(2026, 10, 6), date(2026, 10, 20)])
+
+	def test_rrule_prefix_is_accepted(self):
+		"""El prefijo RRULE: es opcional."""
+		rule = parse_recurrence_rule("RRULE:FREQ=YEARLY;BYMONTH=3;BYMONTHDAY=1", 2026)
+		self.assertEqual(rule[0].date(), date(2026, 3, 1))
+
+	def test_invalid_rule_raises(self):
+		"""Una regla inválida se reporta como ValidationError."""
+		with self.assertRaises(frappe.ValidationError):
+			parse_recurrence_rule("FREQ=SOMETIMES", 2026)
+
+	def test_schedule_meeting_types_are_mapped(self):
+		"""Los tipos de planeación se mapean a tipos válidos de Committee Meeting."""
+		self.assertEqual(MEETING_TYPE_MAP.get("Ordinaria"), "Ordinaria")
+
+
+class TestMeetingMaterialization(FrappeTestCase):
+	"""Materialización en bloque de la ventana de anticipación"""
+
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.db.delete("Meeting Schedule", {"name": f"SCH-{SCHEDULE_YEAR}-Trimestral"})
+		schedule = frappe.get_doc(
+			{
+				"doctype": "Meeting Schedule",
+				"schedule_year": SCHEDULE_YEAR,
+				"schedule_period": "Trimestral",
+				"recurrence_rule": "FREQ=MONTHLY;BYMONTHDAY=15",
+				"recurrence_meeting_type": "Ordinaria",
+				"lookahead_days": 60,
+				# Sin creación al aprobar: on_submit materializaría la ventana de hoy
+				"auto_create_meetings": 0,
+				"scheduled_meetings": [
+					# Coincide con la regla: la fila explícita prevalece
+					{"meeting_date": date(SCHEDULE_YEAR, 3, 15), "meeting_type": "Ordinaria"},
+					{
+						"meeting_date": date(SCHEDULE_YEAR, 3, 20),
+						"meeting_type": "Revisión Financiera",
+						"suggested_topics": "Presupuesto CTEST\nCuotas CTEST",
+					},
+					# Fuera de la ventana
+					{"meeting_date": date(SCHEDULE_YEAR, 9, 10), "meeting_type": "Evaluación"},
+				],
+			}
+		)
+		schedule.insert(ignore_permissions=True)
+		schedule.submit()
+		self.schedule = schedule.name
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def get_meetings(self):
+		return frappe.get_all(
+			"Committee Meeting",
+			filters={"meeting_series": self.schedule},
+			fields=["name", "occurrence_date", "meeting_type"],
+			order_by="occurrence_date asc",
+		)
+
+	def test_window_is_inserted_in_bulk(self):
+		"""Las fechas de la tabla y de la regla dentro de la ventana se insertan juntas"""
+		result = materialize_upcoming_meetings([self.schedule], today=REFERENCE_DATE)
+
+		meetings = self.get_meetings()
+		self.assertEqual(result, {"schedules": 1, "created": 3})
+		self.assertEqual(
+			[meeting.occurrence_date for meeting in meetings],
+			[date(SCHEDULE_YEAR, 3, 15), date(SCHEDULE_YEAR, 3, 20), date(SCHEDULE_YEAR, 4, 15)],
+		)
+		self.assertEqual(meetings[1].meeting_type, "Trabajo")
+
+		items = {
+			item.meeting_date: item
+			for item in frappe.get_all(
+				"Scheduled Meeting Item",
+				filters={"parent": self.schedule},
+				fields=["meeting_date", "meeting_created", "linked_meeting"],
+			)
+		}
+		self.assertEqual(items[date(SCHEDULE_YEAR, 3, 20)].linked_meeting, meetings[1].name)
+		self.assertFalse(items[date(SCHEDULE_YEAR, 9, 10)].meeting_created)
+		self.assertEqual(
+			frappe.get_all(
+				"Meeting Agenda Item",
+				filters={"parent": meetings[1].name},
+				pluck="topic_title",
+				order_by="idx asc",
+			),
+			["Presupuesto CTEST", "Cuotas CTEST"],
+		)
+
+	def test_reserved_names_do_not_collide_with_autoname(self):
+		"""Los nombres reservados de la serie no se repiten con los de un insert normal"""
+		materialize_upcoming_meetings([self.schedule], today=REFERENCE_DATE)
+		names = {meeting.name for meeting in self.get_meetings()}
+		prefix = f"MTG-{now_datetime():%y}-{now_datetime():%m}-"
+
+		meeting = frappe.get_doc(
+			{
+				"doctype": "Committee Meeting",
+				"meeting_title": "Reunión CTEST Manual",
+				"meeting_date": now_datetime().replace(year=SCHEDULE_YEAR + 1),
+				"meeting_type": "Ordinaria",
+				"meeting_format": "Virtual",
+				"virtual_meeting_link": "https://meet.google.com/CTEST-recurrence",
+			}
+		).insert(ignore_permissions=True)
+
+		self.assertEqual(len(names), 3)
+		self.assertTrue(all(name.startswith(prefix) for name in names))
+		self.assertNotIn(meeting.name, names)
+
+	def test_existing_occurrence_is_not_duplicated(self):
+		"""Una ocurrencia que ya tiene reunión (llave única serie + fecha) se omite"""
+		frappe.get_doc(
+			{
+				"doctype": "Committee Meeting",
+				"meeting_title": "Reunión CTEST Existente",
+				"meeting_date": datetime(SCHEDULE_YEAR, 4, 15, 18),
+				"meeting_type": "Ordinaria",
+				"meeting_format": "Virtual",
+				"virtual_meeting_link": "https://meet.google.com/CTEST-recurrence",
+				"status": "Terminada",
+				"meeting_series": self.schedule,
+				"occurrence_date": date(SCHEDULE_YEAR, 4, 15),
+			}
+		).insert(ignore_permissions=True)
+
+		result = materialize_upcoming_meetings([self.schedule], today=REFERENCE_DATE)
+
+		self.assertEqual(result["created"], 2)
+		self.assertEqual(len(self.get_meetings()), 3)
+
+	def test_rerun_is_idempotent_and_counts_rule_meetings(self):
+		"""Una segunda corrida no crea nada; los contadores incluyen las reuniones de la regla"""
+		materialize_upcoming_meetings([self.schedule], today=REFERENCE_DATE)
+		result = materialize_upcoming_meetings([self.schedule], today=REFERENCE_DATE)
+
+		self.assertEqual(result["created"], 0)
+		self.assertEqual(len(self.get_meetings()), 3)
+
+		counts = frappe.db.get_value(
+			"Meeting Schedule",
+			self.schedule,
+			["meetings_created_count", "pending_meetings_count"],
+			as_dict=True,
+		)
+		# 2 fechas de la tabla + 1 reunión de la regla; queda 1 fecha de la tabla
+		self.assertEqual(counts.meetings_created_count, 3)
+		self.assertEqual(counts.pending_meetings_count, 1)
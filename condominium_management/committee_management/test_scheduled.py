@@ -0,0 +1,62 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de los jobs programados de Committee Management: creación de ToDos en lote
+y deduplicación por (referencia, fecha).
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from condominium_management.committee_management.scheduled import bulk_create_todos, get_member_users
+
+
+class TestScheduledBatching(FrappeTestCase):
+	def setUp(self):
+		# Los ToDos se insertan como documentos: la referencia debe existir
+		self.reference = frappe.get_doc(
+			{"doctype": "Note", "title": "CTEST recordatorio programado"}
+		).insert()
+
+	def tearDown(self):
+		frappe.db.delete("ToDo", {"reference_name": self.reference.name})
+		frappe.db.delete("Note", {"name": self.reference.name})
+		frappe.db.commit()
+
+	def _todo(self, **overrides):
+		todo = {
+			"allocated_to": "Administrator",
+			"description": "CTEST recordatorio",
+			"reference_type": "Note",
+			"reference_name": self.reference.name,
+			"date": nowdate(),
+			"priority": "High",
+		}
+		todo.update(overrides)
+		return todo
+
+	def test_bulk_create_todos_is_idempotent(self):
+		"""Reejecutar el job no duplica ToDos con la misma referencia y fecha."""
+		self.assertEqual(bulk_create_todos([self._todo()]), 1)
+		self.assertEqual(bulk_create_todos([self._todo()]), 0)
+		self.assertEqual(frappe.db.count("ToDo", {"reference_name": self.reference.name}), 1)
+
+	def test_bulk_create_todos_updates_assignment(self):
+		"""Los ToDos pasan por sus hooks y quedan asignados en la referencia."""
+		bulk_create_todos([self._todo()])
+		self.assertIn("Administrator", frappe.db.get_value("Note", self.reference.name, "_assign"))
+
+	def test_bulk_create_todos_dedupes_within_batch(self):
+		"""Duplicados dentro del mismo lote se insertan una sola vez."""
+		self.assertEqual(bulk_create_todos([self._todo(), self._todo()]), 1)
+
+	def test_different_date_creates_new_todo(self):
+		"""Otra fecha es otra clave de deduplicación."""
+		bulk_create_todos([self._todo()])
+		self.assertEqual(bulk_create_todos([self._todo(date="2001-01-01")]), 1)
+
+	def test_get_member_users_empty(self):
+		"""Sin miembros no se consulta la base de datos."""
+		self.assertEqual(get_member_users([None, ""]), {})
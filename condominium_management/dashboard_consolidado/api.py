@@ -18,6 +18,10 @@ import redis
 from frappe import _
 from frappe.utils import add_days, flt, getdate, now
 
+from condominium_management.physical_spaces.component_health import get_average_health
+from condominium_management.physical_spaces.maintenance_schedule import get_maintenance_due_count
+from condominium_management.physical_spaces.space_utilization import get_utilization_rate
+
 
 @frappe.whitelist()
 def get_dashboard_overview(dashboard_config: str | None = None, company: str | None = None) -> dict[str, Any]:
@@ -329,18 +333,18 @@ def _calculate_compliance_rate(company_filter: str | None = None) -> float:
 
 
 def _get_maintenance_due_count(company_filter: str | None = None) -> int:
-	"""Cuenta mantenimientos vencidos"""
-	return 0  # Placeholder
+	"""Cuenta componentes con mantenimiento vencido"""
+	return get_maintenance_due_count(company=company_filter)
 
 
 def _calculate_space_utilization(company_filter: str | None = None) -> float:
-	"""Calcula utilización de espacios"""
-	return 75.2  # Placeholder
+	"""Calcula utilización de espacios de los últimos 30 días"""
+	return get_utilization_rate(company=company_filter)
 
 
 def _calculate_component_health(company_filter: str | None = None) -> float:
-	"""Calcula salud de componentes"""
-	return 92.1  # Placeholder
+	"""Salud promedio de componentes según Component Health Score"""
+	return get_average_health(company=company_filter)
 
 
 def _calculate_generation_success_rate() -> float:
@@ -15,6 +15,8 @@ from typing import Any, Optional
 import frappe
 from frappe.utils import add_days, cint, flt, getdate
 
+from condominium_management.physical_spaces import component_health, maintenance_schedule, space_utilization
+
 
 class DataAggregator:
 	"""Clase base para agregación de datos por módulo"""
@@ -101,28 +103,18 @@ class PhysicalSpacesDataAggregator(DataAggregator):
 		return result
 
 	def get_maintenance_due_count(self) -> int:
-		"""Espacios con mantenimiento vencido"""
-		# Placeholder - implementar cuando se defina lógica de mantenimiento
-		return 0
+		"""Componentes con mantenimiento vencido"""
+		return maintenance_schedule.get_maintenance_due_count(company=self.company_filter)
 
 	def get_utilization_rate(self) -> float:
-		"""Tasa de utilización de espacios"""
-		total_spaces = self.get_total_spaces()
-		if total_spaces == 0:
-			return 0.0
-
-		# Placeholder - implementar lógica de utilización
-		utilized_spaces = total_spaces * 0.75  # 75% utilizado
-		return (utilized_spaces / total_spaces) * 100
+		"""Tasa de utilización de espacios en el rango del agregador"""
+		return space_utilization.get_utilization_rate(
+			self.date_from, self.date_to, company=self.company_filter
+		)
 
 	def get_component_health_score(self) -> float:
-		"""Puntuación de salud de componentes"""
-		total_components = frappe.db.count("Space Component", self.get_base_filters())
-		if total_components == 0:
-			return 100.0
-
-		# Placeholder - implementar lógica de salud de componentes
-		return 92.1
+		"""Puntuación promedio de salud de componentes"""
+		return component_health.get_average_health(company=self.company_filter)
 
 	def get_all_kpis(self) -> dict[str, Any]:
 		"""Obtiene todos los KPIs del módulo Physical Spaces"""
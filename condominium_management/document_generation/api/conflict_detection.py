@@ -7,10 +7,37 @@ Conflict Detection API para Document Generation Module
 
 APIs para detección de conflictos entre configuraciones de documentos
 y validación de consistencia entre condominios.
+
+Los conflictos entre configuraciones (horarios, ubicaciones y recursos) se resuelven
+contra Configuration Conflict Index (ver document_generation.conflict_index):
+detect_configuration_conflicts revisa una configuración con una consulta por
+dimensión y detect_portfolio_conflicts revisa todas en una sola pasada.
 """
 
 import frappe
 from frappe import _
+from frappe.utils import cstr
+
+from condominium_management.document_generation.conflict_index import (
+	CAPACITY,
+	CONFLICT_STATUSES,
+	LOCATION,
+	RESOURCE,
+	SCHEDULE,
+	find_schedule_overlaps,
+	get_cached_conflicts,
+	get_conflict_field_types,
+	get_duplicate_entries,
+	get_entry_key,
+	get_field_dimensions,
+	get_index_entries,
+	get_matching_entries,
+	get_schedule_entries,
+	matches_patterns,
+	schedules_overlap,
+	set_cached_conflicts,
+)
+from condominium_management.document_generation.template_registry import get_template
 
 
 @frappe.whitelist()
@@ -18,6 +45,9 @@ def detect_configuration_conflicts(config_name):
 	"""
 	Detectar conflictos en configuración específica.
 
+	Los conflictos de horario, ubicación y recurso salen de la caché cuando ningún
+	cambio relevante de la configuración o de sus vecinas la invalidó.
+
 	Args:
 	    config_name (str): Nombre de la Entity Configuration
 
@@ -26,35 +56,61 @@ def detect_configuration_conflicts(config_name):
 	"""
 
 	try:
-		config = frappe.get_doc("Entity Configuration", config_name)
-		conflicts = []
+		return get_configuration_conflicts(frappe.get_doc("Entity Configuration", config_name))
 
-		# Detectar conflictos de horarios
-		conflicts.extend(detect_schedule_conflicts(config))
+	except Exception as e:
+		frappe.log_error(f"Error detectando conflictos para {config_name}: {e!s}", "Conflict Detection API")
+		return []
 
-		# Detectar conflictos de capacidad
-		conflicts.extend(detect_capacity_conflicts(config))
 
-		# Detectar conflictos de ubicación
-		conflicts.extend(detect_location_conflicts(config))
+def get_configuration_conflicts(config, changed_dimensions=()):
+	"""
+	Conflictos de una configuración, re-evaluando solo las dimensiones indicadas.
 
-		# Detectar conflictos de recursos
-		conflicts.extend(detect_resource_conflicts(config))
+	Las dimensiones entre configuraciones (horario, ubicación y recurso) que no están
+	en changed_dimensions se toman de la caché si existe; las que se evalúan se
+	guardan en ella. Capacidad y template se validan en memoria.
 
-		# Detectar inconsistencias con templates
-		conflicts.extend(detect_template_inconsistencies(config))
+	Args:
+	    config (Document): Entity Configuration
+	    changed_dimensions (iterable): Dimensiones que cambiaron (conflict_index)
 
-		return conflicts
+	Returns:
+	    list: Conflictos, en el orden de detect_configuration_conflicts
+	"""
 
-	except Exception as e:
-		frappe.log_error(f"Error detectando conflictos para {config_name}: {e!s}", "Conflict Detection API")
-		return []
+	results = {}
+	for dimension, detector in (
+		(SCHEDULE, detect_schedule_conflicts),
+		(LOCATION, detect_location_conflicts),
+		(RESOURCE, detect_resource_conflicts),
+	):
+		conflicts = None
+		if dimension not in changed_dimensions:
+			conflicts = get_cached_conflicts(config.name, dimension)
+
+		if conflicts is None:
+			conflicts = detector(config)
+			set_cached_conflicts(config.name, dimension, conflicts)
+
+		results[dimension] = conflicts
+
+	return [
+		*results[SCHEDULE],
+		*detect_capacity_conflicts(config),
+		*results[LOCATION],
+		*results[RESOURCE],
+		*detect_template_inconsistencies(config),
+	]
 
 
 def detect_schedule_conflicts(config):
 	"""
 	Detectar conflictos de horarios en configuración.
 
+	Compara los intervalos de sus campos de horario contra las entradas del índice de
+	configuraciones similares (mismo source_doctype y entity_subtype), en una consulta.
+
 	Args:
 	    config (Document): Entity Configuration
 
@@ -62,47 +118,26 @@ def detect_schedule_conflicts(config):
 	    list: Conflictos de horarios encontrados
 	"""
 
-	conflicts = []
-
-	# Obtener campos relacionados con horarios
-	schedule_fields = get_configuration_fields_by_type(config, ["time", "datetime"])
-
-	if not schedule_fields:
-		return conflicts
+	entries = get_configuration_entries(config, SCHEDULE)
+	if not entries:
+		return []
 
-	# Buscar configuraciones similares con horarios conflictivos
-	similar_configs = frappe.get_all(
-		"Entity Configuration",
-		filters={
-			"source_doctype": config.source_doctype,
-			"entity_subtype": config.entity_subtype,
-			"configuration_status": ["in", ["Aprobado", "Pendiente Aprobación"]],
-			"name": ["!=", config.name],
-		},
-		fields=["name", "configuration_name"],
+	others = get_schedule_entries(
+		source_doctype=config.source_doctype,
+		entity_subtype=config.entity_subtype,
+		field_names={entry.field_name for entry in entries},
+		exclude=config.name,
 	)
 
-	for similar_config in similar_configs:
-		try:
-			other_config = frappe.get_doc("Entity Configuration", similar_config["name"])
-
-			# Comparar horarios
-			schedule_conflict = compare_schedule_fields(config, other_config, schedule_fields)
-			if schedule_conflict:
-				conflicts.append(
-					{
-						"type": "schedule_conflict",
-						"severity": "Media",
-						"description": f"Conflicto de horarios con {other_config.configuration_name}",
-						"conflicting_config": other_config.name,
-						"details": schedule_conflict,
-					}
+	details = {}
+	for entry in entries:
+		for other in others:
+			if other.field_name == entry.field_name and schedules_overlap(entry, other):
+				details.setdefault(other.configuration, (other, []))[1].append(
+					build_schedule_detail(entry, other)
 				)
 
-		except Exception as e:
-			frappe.log_error(f"Error comparando horarios con {similar_config['name']}: {e!s}")
-
-	return conflicts
+	return [build_schedule_conflict(other, detail) for other, detail in details.values()]
 
 
 def detect_capacity_conflicts(config):
@@ -119,7 +154,13 @@ def detect_capacity_conflicts(config):
 	conflicts = []
 
 	# Obtener campos relacionados con capacidad
-	capacity_fields = get_configuration_fields_by_name_pattern(config, ["capacity", "limite", "maximo"])
+	# Campos por patrón de nombre o declarados como Capacidad en el tipo de entidad
+	conflict_types = get_conflict_field_types(config)
+	capacity_fields = [
+		field
+		for field in config.configuration_fields
+		if CAPACITY in get_field_dimensions(field, conflict_types)
+	]
 
 	if not capacity_fields:
 		return conflicts
@@ -127,7 +168,7 @@ def detect_capacity_conflicts(config):
 	# Validar capacidades lógicas
 	for field in capacity_fields:
 		try:
-			capacity_value = int(field.field_value) if field.field_value.isdigit() else 0
+			capacity_value = int(field.field_value) if cstr(field.field_value).isdigit() else 0
 
 			# Detectar capacidades ilógicas
 			if capacity_value <= 0:
@@ -177,48 +218,7 @@ def detect_location_conflicts(config):
 	    list: Conflictos de ubicación encontrados
 	"""
 
-	conflicts = []
-
-	# Obtener campos relacionados con ubicación
-	location_fields = get_configuration_fields_by_name_pattern(
-		config, ["ubicacion", "location", "area", "zona", "sector"]
-	)
-
-	if not location_fields:
-		return conflicts
-
-	# Buscar duplicación de ubicaciones
-	for field in location_fields:
-		if not field.field_value:
-			continue
-
-		# Buscar otras configuraciones con la misma ubicación
-		duplicate_locations = frappe.db.sql(
-			"""
-            SELECT DISTINCT ec.name, ec.configuration_name
-            FROM `tabEntity Configuration` ec
-            JOIN `tabConfiguration Field` cf ON cf.parent = ec.name
-            WHERE cf.field_name = %(field_name)s
-            AND cf.field_value = %(field_value)s
-            AND ec.name != %(config_name)s
-            AND ec.configuration_status IN ('Aprobado', 'Pendiente Aprobación')
-        """,
-			{"field_name": field.field_name, "field_value": field.field_value, "config_name": config.name},
-			as_dict=True,
-		)
-
-		if duplicate_locations:
-			conflicts.append(
-				{
-					"type": "location_duplicate",
-					"severity": "Alta",
-					"description": f"Ubicación duplicada: {field.field_value}",
-					"field_name": field.field_name,
-					"conflicting_configs": [loc["name"] for loc in duplicate_locations],
-				}
-			)
-
-	return conflicts
+	return detect_duplicate_conflicts(config, LOCATION)
 
 
 def detect_resource_conflicts(config):
@@ -232,50 +232,31 @@ def detect_resource_conflicts(config):
 	    list: Conflictos de recursos encontrados
 	"""
 
-	conflicts = []
+	return detect_duplicate_conflicts(config, RESOURCE)
 
-	# Obtener campos relacionados con recursos
-	resource_fields = get_configuration_fields_by_name_pattern(
-		config, ["equipo", "equipment", "recurso", "resource"]
-	)
 
-	if not resource_fields:
-		return conflicts
+def detect_duplicate_conflicts(config, dimension):
+	"""
+	Buscar en el índice el mismo valor normalizado en otras configuraciones activas.
 
-	# Detectar asignación múltiple de recursos únicos
-	for field in resource_fields:
-		if not field.field_value:
-			continue
-
-		# Buscar el mismo recurso asignado a otras configuraciones
-		resource_conflicts = frappe.db.sql(
-			"""
-            SELECT DISTINCT ec.name, ec.configuration_name
-            FROM `tabEntity Configuration` ec
-            JOIN `tabConfiguration Field` cf ON cf.parent = ec.name
-            WHERE cf.field_name LIKE %(field_pattern)s
-            AND cf.field_value = %(field_value)s
-            AND ec.name != %(config_name)s
-            AND ec.configuration_status IN ('Aprobado', 'Pendiente Aprobación')
-        """,
-			{
-				"field_pattern": f"%{field.field_name.split('_')[-1]}%",
-				"field_value": field.field_value,
-				"config_name": config.name,
-			},
-			as_dict=True,
-		)
+	Una consulta por dimensión para todos los campos de la configuración.
 
-		if resource_conflicts:
-			conflicts.append(
-				{
-					"type": "resource_conflict",
-					"severity": "Media",
-					"description": f"Recurso {field.field_value} asignado múltiples veces",
-					"field_name": field.field_name,
-					"conflicting_configs": [res["name"] for res in resource_conflicts],
-				}
-			)
+	Args:
+	    config (Document): Entity Configuration
+	    dimension (str): Ubicación o Recurso
+
+	Returns:
+	    list: Un conflicto por campo con valor duplicado
+	"""
+
+	entries = get_configuration_entries(config, dimension)
+	matches = get_matching_entries(entries, exclude=config.name)
+
+	conflicts = []
+	for entry in entries:
+		others = matches.get(get_entry_key(entry))
+		if others:
+			conflicts.append(build_duplicate_conflict(entry, others))
 
 	return conflicts
 
@@ -298,8 +279,7 @@ def detect_template_inconsistencies(config):
 
 	try:
 		# Obtener template actual
-		registry = frappe.get_single("Master Template Registry")
-		template = registry.get_template_by_code(config.applied_template)
+		template = get_template(config.applied_template)
 
 		if not template:
 			conflicts.append(
@@ -362,84 +342,165 @@ def detect_template_inconsistencies(config):
 	return conflicts
 
 
-def get_configuration_fields_by_type(config, field_types):
+def get_configuration_fields_by_name_pattern(config, patterns):
 	"""
-	Obtener campos de configuración por tipo.
+	Obtener campos de configuración por patrón en el nombre.
 
 	Args:
 	    config (Document): Entity Configuration
-	    field_types (list): Lista de tipos de campo a buscar
+	    patterns (list): Lista de patrones a buscar en nombres de campo
 
 	Returns:
-	    list: Campos que coinciden con los tipos
+	    list: Campos que coinciden con algún patrón
 	"""
 
-	return [
-		field
-		for field in config.configuration_fields
-		if field.field_type.lower() in [t.lower() for t in field_types]
-	]
+	return [field for field in config.configuration_fields if matches_patterns(field, patterns)]
 
 
-def get_configuration_fields_by_name_pattern(config, patterns):
-	"""
-	Obtener campos de configuración por patrón en el nombre.
+def get_configuration_entries(config, dimension):
+	"""Entradas del índice de la configuración en memoria (refleja cambios sin guardar)"""
+	entries = get_index_entries(config.name, config.configuration_fields, get_conflict_field_types(config))
+	return [entry for entry in entries if entry.dimension == dimension]
 
-	Args:
-	    config (Document): Entity Configuration
-	    patterns (list): Lista de patrones a buscar en nombres de campo
+
+def build_schedule_detail(entry, other):
+	return {
+		"field_name": entry.field_name,
+		"field_label": entry.field_label,
+		"conflicting_value": entry.field_value,
+		"other_value": other.field_value,
+	}
+
+
+def build_schedule_conflict(other, details):
+	return {
+		"type": "schedule_conflict",
+		"severity": "Media",
+		"description": f"Conflicto de horarios con {other.configuration_name}",
+		"conflicting_config": other.configuration,
+		"details": details,
+	}
+
+
+def build_duplicate_conflict(entry, others):
+	"""Conflicto de un campo cuyo valor aparece en las entradas others"""
+	conflicting_configs = list(dict.fromkeys(other.configuration for other in others))
+
+	if entry.dimension == LOCATION:
+		return {
+			"type": "location_duplicate",
+			"severity": "Alta",
+			"description": f"Ubicación duplicada: {entry.field_value}",
+			"field_name": entry.field_name,
+			"conflicting_configs": conflicting_configs,
+		}
+
+	return {
+		"type": "resource_conflict",
+		"severity": "Media",
+		"description": f"Recurso {entry.field_value} asignado múltiples veces",
+		"field_name": entry.field_name,
+		"conflicting_configs": conflicting_configs,
+	}
+
+
+def get_active_configurations(filters=None):
+	"""
+	Configuraciones activas con sus campos, en dos consultas.
 
 	Returns:
-	    list: Campos que coinciden con algún patrón
+	    list: frappe._dict con configuration_fields, listos para los detectores
 	"""
+	config_filters = {"configuration_status": ["in", list(CONFLICT_STATUSES)]}
+	if filters:
+		config_filters.update(frappe.parse_json(filters))
 
-	matching_fields = []
+	configurations = frappe.get_all(
+		"Entity Configuration",
+		filters=config_filters,
+		fields=["name", "configuration_name", "source_doctype", "entity_subtype", "applied_template"],
+		order_by="name asc",
+	)
+	if not configurations:
+		return []
 
-	for field in config.configuration_fields:
-		field_name_lower = field.field_name.lower()
-		field_label_lower = (field.field_label or "").lower()
+	fields = {}
+	for row in frappe.get_all(
+		"Configuration Field",
+		filters={
+			"parenttype": "Entity Configuration",
+			"parent": ["in", [config.name for config in configurations]],
+		},
+		fields=["parent", "field_name", "field_label", "field_type", "field_value", "is_required"],
+		order_by="idx asc",
+	):
+		fields.setdefault(row.parent, []).append(row)
 
-		for pattern in patterns:
-			pattern_lower = pattern.lower()
-			if pattern_lower in field_name_lower or pattern_lower in field_label_lower:
-				matching_fields.append(field)
-				break
+	for config in configurations:
+		config.configuration_fields = fields.get(config.name, [])
 
-	return matching_fields
+	return configurations
 
 
-def compare_schedule_fields(config1, config2, schedule_fields):
+def detect_portfolio_conflicts(filters=None):
 	"""
-	Comparar campos de horarios entre dos configuraciones.
+	Detectar conflictos de todas las configuraciones activas en una pasada.
+
+	Los duplicados de ubicación y recurso salen de una consulta agrupada sobre el
+	índice y los traslapes de horario de un barrido por intervalos; capacidad y
+	consistencia con el template se validan en memoria.
 
 	Args:
-	    config1 (Document): Primera configuración
-	    config2 (Document): Segunda configuración
-	    schedule_fields (list): Campos de horarios a comparar
+	    filters (dict): Filtros opcionales para configuraciones
 
 	Returns:
-	    dict: Detalles del conflicto si existe, None en caso contrario
+	    dict: Nombre de configuración → lista de conflictos, en el mismo formato que
+	        detect_configuration_conflicts
 	"""
 
-	config2_fields = {f.field_name: f.field_value for f in config2.configuration_fields}
+	configurations = get_active_configurations(filters)
+	targets = {config.name for config in configurations}
 
-	conflicts = []
+	schedule_conflicts = {}
+	for entry, other in find_schedule_overlaps(get_schedule_entries()):
+		for current, conflicting in ((entry, other), (other, entry)):
+			if current.configuration not in targets:
+				continue
 
-	for field in schedule_fields:
-		field_name = field.field_name
-		field_value1 = field.field_value
-		field_value2 = config2_fields.get(field_name)
+			by_config = schedule_conflicts.setdefault(current.configuration, {})
+			by_config.setdefault(conflicting.configuration, (conflicting, []))[1].append(
+				build_schedule_detail(current, conflicting)
+			)
 
-		if field_value1 and field_value2 and field_value1 == field_value2:
-			conflicts.append(
-				{
-					"field_name": field_name,
-					"field_label": field.field_label,
-					"conflicting_value": field_value1,
-				}
+	duplicate_groups = {}
+	for row in get_duplicate_entries():
+		duplicate_groups.setdefault(get_entry_key(row), []).append(row)
+
+	duplicate_conflicts = {LOCATION: {}, RESOURCE: {}}
+	for rows in duplicate_groups.values():
+		for row in rows:
+			if row.configuration not in targets:
+				continue
+
+			others = [other for other in rows if other.configuration != row.configuration]
+			duplicate_conflicts[row.dimension].setdefault(row.configuration, []).append(
+				build_duplicate_conflict(row, others)
 			)
 
-	return conflicts if conflicts else None
+	conflicts = {}
+	for config in configurations:
+		conflicts[config.name] = [
+			*(
+				build_schedule_conflict(other, details)
+				for other, details in schedule_conflicts.get(config.name, {}).values()
+			),
+			*detect_capacity_conflicts(config),
+			*duplicate_conflicts[LOCATION].get(config.name, []),
+			*duplicate_conflicts[RESOURCE].get(config.name, []),
+			*detect_template_inconsistencies(config),
+		]
+
+	return conflicts
 
 
 @frappe.whitelist()
@@ -455,24 +516,16 @@ def get_conflict_summary(filters=None):
 	"""
 
 	try:
-		# Obtener configuraciones activas
-		config_filters = {"configuration_status": ["in", ["Pendiente Aprobación", "Aprobado"]]}
-
-		if filters:
-			config_filters.update(filters)
-
-		configurations = frappe.get_all("Entity Configuration", filters=config_filters, fields=["name"])
+		portfolio_conflicts = detect_portfolio_conflicts(filters)
 
 		summary = {
-			"total_configurations": len(configurations),
+			"total_configurations": len(portfolio_conflicts),
 			"configurations_with_conflicts": 0,
 			"conflicts_by_type": {},
 			"conflicts_by_severity": {"Alta": 0, "Media": 0, "Baja": 0},
 		}
 
-		for config in configurations:
-			conflicts = detect_configuration_conflicts(config["name"])
-
+		for conflicts in portfolio_conflicts.values():
 			if conflicts:
 				summary["configurations_with_conflicts"] += 1
 
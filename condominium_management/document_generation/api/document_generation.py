@@ -0,0 +1,357 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation API - Generación masiva de documentos
+=========================================================
+
+Regenera los documentos (reglamentos, manuales, estatutos) de muchas Entity
+Configuration a la vez, p. ej. después de subir la versión de los templates.
+
+- Las configuraciones se ordenan por template y se reparten en lotes; cada lote es un
+  job de la cola "long", de modo que los workers de RQ renderizan en paralelo en
+  procesos separados.
+- Dentro de un lote, configuraciones, campos y documentos origen se precargan con una
+  consulta por tabla (una por DocType origen y una por DocType de sus tablas hijas), y
+  cada template se compila una vez con template_cache. Los documentos origen se
+  arman en memoria como Document con sus tablas hijas, así que el contexto es el
+  mismo que en Entity Configuration.build_template_context.
+- Cada documento se escribe como File adjunto a su configuración en cuanto se
+  renderiza; el lote no acumula salidas en memoria.
+- Un fallo en un documento se registra y no detiene el lote (savepoint por documento).
+- El progreso por lote queda en Redis y se publica en tiempo real.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+from condominium_management.api_documentation_system.decorator import api_documentation
+from condominium_management.document_generation.template_cache import render_cached_template
+from condominium_management.document_generation.template_registry import get_template_version, get_templates
+
+CHUNK_SIZE = 100
+MAX_CHUNK_SIZE = 1000
+OUTPUT_FORMATS = ("html", "pdf")
+GENERATION_QUEUE = "long"
+GENERATION_TIMEOUT = 3600
+
+ACTIVE_CONFIGURATION_STATUSES = ("Borrador", "Pendiente Aprobación", "Aprobado")
+
+CONFIGURATION_FIELDS = (
+	"name",
+	"configuration_name",
+	"source_doctype",
+	"source_docname",
+	"entity_subtype",
+	"applied_template",
+	"target_document_type",
+	"target_section",
+)
+
+PROGRESS_EVENT = "bulk_document_generation_progress"
+PROGRESS_CACHE_KEY = "document_generation:bulk:{batch_id}"
+# Los registros de progreso caducan a los 7 días
+PROGRESS_TTL = 7 * 24 * 60 * 60
+
+
+@api_documentation(
+	name="Generar Documentos en Lote",
+	description="Regenera en segundo plano los documentos de las Entity Configuration de uno o varios templates",
+	version="v1",
+	collection="document-generation",
+	method="POST",
+)
+@frappe.whitelist()
+def generate_documents(template_codes=None, output_format="html", chunk_size=CHUNK_SIZE):
+	"""
+	Programar la generación masiva de documentos.
+
+	Args:
+	    template_codes (list): Templates a regenerar; todos si se omite
+	    output_format (str): "html" o "pdf"
+	    chunk_size (int): Configuraciones por job
+
+	Returns:
+	    dict: batch_id, total de configuraciones y número de lotes
+	"""
+	frappe.has_permission("Entity Configuration", "write", throw=True)
+
+	if output_format not in OUTPUT_FORMATS:
+		frappe.throw(_("Formato de salida inválido: {0}").format(output_format))
+
+	if isinstance(template_codes, str):
+		template_codes = frappe.parse_json(template_codes)
+
+	filters = {
+		"configuration_status": ["in", ACTIVE_CONFIGURATION_STATUSES],
+		"applied_template": ["is", "set"],
+	}
+	if template_codes:
+		filters["applied_template"] = ["in", template_codes]
+
+	# Ordenadas por template para que cada lote compile la menor cantidad posible
+	names = frappe.get_all(
+		"Entity Configuration", filters=filters, pluck="name", order_by="applied_template asc, name asc"
+	)
+
+	chunk_size = min(max(cint(chunk_size) or CHUNK_SIZE, 1), MAX_CHUNK_SIZE)
+	chunks = [names[start : start + chunk_size] for start in range(0, len(names), chunk_size)]
+	batch_id = frappe.generate_hash(length=10)
+
+	_set_progress(batch_id, "total", len(names))
+	for chunk_index, chunk in enumerate(chunks):
+		frappe.enqueue(
+			"condominium_management.document_generation.api.document_generation.render_configurations",
+			queue=GENERATION_QUEUE,
+			timeout=GENERATION_TIMEOUT,
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+			configuration_names=chunk,
+			output_format=output_format,
+			batch_id=batch_id,
+			chunk_index=chunk_index,
+		)
+
+	return {"batch_id": batch_id, "total": len(names), "chunks": len(chunks)}
+
+
+@frappe.whitelist()
+def get_generation_status(batch_id):
+	"""
+	Progreso de una generación masiva.
+
+	Returns:
+	    dict: total, processed, successful, failed, errors y si terminó
+	"""
+	# hgetall devuelve los campos del hash como bytes
+	progress = {
+		frappe.safe_decode(key): value
+		for key, value in (frappe.cache().hgetall(PROGRESS_CACHE_KEY.format(batch_id=batch_id)) or {}).items()
+	}
+	total = cint(progress.pop("total", 0))
+
+	status = frappe._dict(total=total, processed=0, successful=0, failed=0, errors=[])
+	for chunk in progress.values():
+		status.successful += chunk["successful"]
+		status.failed += chunk["failed"]
+		status.errors.extend(chunk["errors"])
+
+	status.processed = status.successful + status.failed
+	status.completed = status.processed >= total
+	return status
+
+
+def regenerate_documents_for_queue(queue_name, configuration_names):
+	"""Regenerar los documentos de las configuraciones aprobadas en una cola"""
+	return render_configurations(configuration_names, batch_id=queue_name)
+
+
+def render_configurations(configuration_names, output_format="html", batch_id=None, chunk_index=0):
+	"""
+	Renderizar y guardar los documentos de un lote de configuraciones.
+
+	Args:
+	    configuration_names (list): Entity Configuration a procesar
+	    output_format (str): "html" o "pdf"
+	    batch_id (str): Generación masiva a la que pertenece el lote
+	    chunk_index (int): Posición del lote dentro de la generación
+
+	Returns:
+	    dict: successful, failed y errors ({"config", "error"}) del lote
+	"""
+	result = {"successful": 0, "failed": 0, "errors": []}
+	configurations = _load_configurations(configuration_names)
+	if not configurations:
+		return result
+
+	templates = {template.template_code: template.template_content for template in get_templates()}
+	template_version = get_template_version()
+	fields = _load_configuration_fields(configurations)
+	sources = _prefetch_source_documents(configurations)
+
+	for index, config in enumerate(configurations, start=1):
+		frappe.db.savepoint("document_generation")
+		try:
+			template_content = templates.get(config.applied_template)
+			if not template_content:
+				raise frappe.ValidationError(_("Template {0} no encontrado").format(config.applied_template))
+
+			source_doc = sources.get((config.source_doctype, config.source_docname))
+			content = render_cached_template(
+				config.applied_template,
+				template_content,
+				build_context(
+					config,
+					source_doc or {},
+					source_doc.as_dict() if source_doc else {},
+					fields.get(config.name, []),
+				),
+				version=template_version,
+			)
+			_write_output(config, content, output_format, template_version)
+			result["successful"] += 1
+
+		except Exception as e:
+			frappe.db.rollback(save_point="document_generation")
+			result["failed"] += 1
+			result["errors"].append({"config": config.name, "error": str(e)})
+			frappe.log_error(f"Error generando documento de {config.name}: {e!s}", "Bulk Document Generation")
+
+		if batch_id and (index % 10 == 0 or index == len(configurations)):
+			_publish_progress(batch_id, chunk_index, result)
+
+	return result
+
+
+def build_context(config, source_doc, source, fields):
+	"""
+	Contexto de renderizado de una configuración.
+
+	Args:
+	    config: Entity Configuration (documento o dict)
+	    source_doc: Documento origen expuesto como `doc`
+	    source (dict): Valores del documento origen expuestos como `source`
+	    fields: Filas de Configuration Field
+
+	Returns:
+	    dict: Contexto con documento origen, campos activos y metadatos
+	"""
+	context = {"doc": source_doc, "source": source}
+
+	# Agregar campos de configuración
+	for field in fields:
+		if field.get("is_active"):
+			context[field.get("field_name")] = field.get("field_value")
+
+	# Agregar metadatos de configuración
+	context["config"] = {
+		"name": config.get("name"),
+		"configuration_name": config.get("configuration_name"),
+		"entity_subtype": config.get("entity_subtype"),
+		"template_code": config.get("applied_template"),
+		"target_document": config.get("target_document_type"),
+		"target_section": config.get("target_section"),
+	}
+
+	return context
+
+
+def _load_configurations(configuration_names):
+	if not configuration_names:
+		return []
+
+	return frappe.get_all(
+		"Entity Configuration",
+		filters={"name": ["in", list(configuration_names)]},
+		fields=list(CONFIGURATION_FIELDS),
+		order_by="applied_template asc, name asc",
+	)
+
+
+def _load_configuration_fields(configurations):
+	"""Campos de todas las configuraciones del lote en una consulta"""
+	fields = {}
+	for row in frappe.get_all(
+		"Configuration Field",
+		filters={
+			"parenttype": "Entity Configuration",
+			"parent": ["in", [config.name for config in configurations]],
+		},
+		fields=["parent", "field_name", "field_value", "is_active"],
+		order_by="idx asc",
+	):
+		fields.setdefault(row.parent, []).append(row)
+
+	return fields
+
+
+def _prefetch_source_documents(configurations):
+	"""
+	Documentos origen del lote como Document con sus tablas hijas.
+
+	Una consulta por DocType origen y una por DocType hijo, en lugar de un
+	frappe.get_doc por documento.
+
+	Returns:
+	    dict: (doctype, name) → Document
+	"""
+	names_by_doctype = {}
+	for config in configurations:
+		if config.source_doctype and config.source_docname:
+			names_by_doctype.setdefault(config.source_doctype, set()).add(config.source_docname)
+
+	sources = {}
+	for doctype, names in names_by_doctype.items():
+		names = list(names)
+		rows = frappe.get_all(doctype, filters={"name": ["in", names]}, fields=["*"])
+		if not rows:
+			continue
+
+		parentfields_by_child = {}
+		for table_field in frappe.get_meta(doctype).get_table_fields():
+			parentfields_by_child.setdefault(table_field.options, []).append(table_field.fieldname)
+
+		children = {}
+		for child_doctype, parentfields in parentfields_by_child.items():
+			for child in frappe.get_all(
+				child_doctype,
+				filters={"parenttype": doctype, "parentfield": ["in", parentfields], "parent": ["in", names]},
+				fields=["*"],
+				order_by="idx asc",
+			):
+				children.setdefault((child.parent, child.parentfield), []).append(child)
+
+		for row in rows:
+			for parentfields in parentfields_by_child.values():
+				for parentfield in parentfields:
+					row[parentfield] = children.get((row.name, parentfield), [])
+
+			sources[(doctype, row.name)] = frappe.get_doc({**row, "doctype": doctype})
+
+	return sources
+
+
+def _write_output(config, content, output_format, version):
+	"""Guarda el documento generado como archivo privado adjunto a la configuración"""
+	file_name = f"{config.name}-{config.applied_template}-v{version or '0'}"
+	if output_format == "pdf":
+		from frappe.utils.pdf import get_pdf
+
+		content = get_pdf(content)
+		file_name += ".pdf"
+	else:
+		file_name += ".html"
+
+	frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"attached_to_doctype": "Entity Configuration",
+			"attached_to_name": config.name,
+			"is_private": 1,
+			"content": content,
+		}
+	).insert(ignore_permissions=True)
+
+
+def _set_progress(batch_id, key, value):
+	cache_key = PROGRESS_CACHE_KEY.format(batch_id=batch_id)
+	frappe.cache().hset(cache_key, key, value)
+	frappe.cache().expire(frappe.cache().make_key(cache_key), PROGRESS_TTL)
+
+
+def _publish_progress(batch_id, chunk_index, result):
+	_set_progress(batch_id, f"chunk-{chunk_index}", result)
+	status = get_generation_status(batch_id)
+	frappe.publish_realtime(
+		PROGRESS_EVENT,
+		{
+			"batch_id": batch_id,
+			"total": status.total,
+			"processed": status.processed,
+			"failed": status.failed,
+			"timestamp": str(now_datetime()),
+		},
+		user=frappe.session.user,
+	)
@@ -12,6 +12,14 @@ de documentos y asignación automática de templates.
 import frappe
 from frappe import _
 
+from condominium_management.document_generation.template_cache import render_cached_template
+from condominium_management.document_generation.template_registry import (
+	get_assignment_rule,
+	get_template,
+	get_template_version,
+	get_templates,
+)
+
 
 @frappe.whitelist()
 def auto_detect_configuration_needed(doc, entity_config):
@@ -35,8 +43,7 @@ def auto_detect_configuration_needed(doc, entity_config):
 				entity_subtype = str(getattr(doc, detection_field))
 
 		# Buscar regla de auto-asignación
-		registry = frappe.get_single("Master Template Registry")
-		assignment_rule = registry.get_assignment_rule_for_entity(doc.doctype, entity_subtype)
+		assignment_rule = get_assignment_rule(doc.doctype, entity_subtype)
 
 		if not assignment_rule:
 			# No hay regla automática - crear configuración básica
@@ -118,8 +125,7 @@ def create_auto_assigned_configuration(doc, entity_subtype, assignment_rule):
 		return {"success": True, "existing": True, "configuration_name": existing}
 
 	# Obtener template asignado
-	registry = frappe.get_single("Master Template Registry")
-	template = registry.get_template_by_code(assignment_rule["target_template"])
+	template = get_template(assignment_rule["target_template"])
 
 	if not template:
 		return create_basic_configuration(doc, entity_subtype)
@@ -214,18 +220,17 @@ def get_available_templates_for_entity(doctype, entity_subtype=None):
 	"""
 
 	try:
-		registry = frappe.get_single("Master Template Registry")
 		available_templates = []
 
 		# Buscar templates que coincidan con el tipo de entidad
-		for template in registry.infrastructure_templates:
+		for template in get_templates():
 			if template.infrastructure_type == doctype or not template.infrastructure_type:
 				# Verificar si coincide con subtipo
 				if entity_subtype and template.infrastructure_subtype:
 					if template.infrastructure_subtype.lower() == entity_subtype.lower():
-						available_templates.append(template.as_dict())
+						available_templates.append(template)
 				else:
-					available_templates.append(template.as_dict())
+					available_templates.append(template)
 
 		return available_templates
 
@@ -248,8 +253,7 @@ def preview_template_content(template_code, sample_data=None):
 	"""
 
 	try:
-		registry = frappe.get_single("Master Template Registry")
-		template = registry.get_template_by_code(template_code)
+		template = get_template(template_code)
 
 		if not template:
 			return {"success": False, "error": "Template no encontrado"}
@@ -262,7 +266,12 @@ def preview_template_content(template_code, sample_data=None):
 		rendered_content = ""
 		if template.get("template_content"):
 			try:
-				rendered_content = frappe.render_template(template["template_content"], sample_data)
+				rendered_content = render_cached_template(
+					template_code,
+					template["template_content"],
+					sample_data,
+					version=get_template_version(),
+				)
 			except Exception as e:
 				return {"success": False, "error": f"Error renderizando template: {e!s}"}
 
@@ -339,8 +348,8 @@ def validate_template_syntax(template_content, field_definitions=None):
 			for field in field_definitions:
 				test_data[field["field_name"]] = "test_value"
 
-		# Intentar renderizar template
-		frappe.render_template(template_content, test_data)
+		# Intentar renderizar template (compilado una vez por contenido)
+		render_cached_template("validate_template_syntax", template_content, test_data)
 
 		return {"success": True, "valid": True, "message": "Sintaxis válida"}
 
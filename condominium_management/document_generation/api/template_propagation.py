@@ -7,12 +7,53 @@ Template Propagation API para Document Generation Module
 
 APIs para propagación de cambios en templates y gestión de configuraciones
 distribuidas entre múltiples condominios.
+
+La propagación se reparte en lotes persistidos en una Template Propagation:
+
+- Las configuraciones afectadas se ordenan por nombre y se cortan en lotes de
+  CHUNK_SIZE; cada lote guarda su rango (primera y última configuración) y estado.
+- Hasta MAX_CONCURRENT_WORKERS jobs de la cola "long" toman lotes pendientes con
+  bloqueo de fila (SKIP LOCKED), así que varios workers avanzan en paralelo sin
+  repetir trabajo. Cada lote se confirma al terminar: si un job muere o excede su
+  timeout, solo se repite su lote y resume_stalled_propagations lo retoma.
+- Las configuraciones cuyo template_hash coincide con el hash actual de su template
+  (template_registry.get_template_hash) se omiten sin cargarlas.
+- Al crear la propagación se calcula una vez, por template, la diferencia de campos
+  con la propagación anterior. Las configuraciones sincronizadas con esa versión
+  reciben solo la diferencia con SQL en lote (apply_field_diff); el resto se
+  sincroniza completo con get_doc y save.
+- Los contadores se acumulan en la propagación y el porcentaje en el registro.
 """
 
 import frappe
 from frappe import _
+from frappe.utils import add_to_date, cint, flt, now_datetime
 
 from condominium_management.api_documentation_system.decorator import api_documentation
+from condominium_management.document_generation.conflict_index import index_configurations
+from condominium_management.document_generation.template_registry import (
+	diff_template_snapshots,
+	get_template,
+	get_template_codes,
+	get_template_hash,
+	get_template_snapshot,
+)
+
+PROPAGATION_DOCTYPE = "Template Propagation"
+CHUNK_DOCTYPE = "Template Propagation Chunk"
+
+CHUNK_SIZE = 200
+MAX_CONCURRENT_WORKERS = 4
+# Lotes que procesa un job antes de volver a encolarse
+CHUNKS_PER_JOB = 5
+PROPAGATION_QUEUE = "long"
+PROPAGATION_TIMEOUT = 1800
+# Un lote tomado hace más de esto se considera abandonado por su worker
+STALLED_CHUNK_MINUTES = 60
+MAX_LOGGED_ERRORS = 100
+
+ACTIVE_CONFIGURATION_STATUSES = ("Borrador", "Pendiente Aprobación", "Aprobado")
+RUNNING_STATUSES = ("En Cola", "En Progreso")
 
 
 @api_documentation(
@@ -23,95 +64,682 @@ from condominium_management.api_documentation_system.decorator import api_docume
 	method="POST",
 )
 @frappe.whitelist()
-def propagate_template_changes(registry_name, template_version, affected_stats):
+def propagate_template_changes(registry_name, template_version, affected_stats=None, template_codes=None):
 	"""
 	Propagar cambios de templates a configuraciones existentes.
 
-	Esta función se ejecuta como job asíncrono desde el hook de template update.
+	Crea una Template Propagation y programa sus workers; no procesa configuraciones
+	en este request.
 
 	Args:
 	    registry_name (str): Nombre del Master Template Registry
 	    template_version (str): Nueva versión de templates
-	    affected_stats (dict): Estadísticas de configuraciones afectadas
+	    affected_stats (dict): Estadísticas de configuraciones afectadas (informativo)
+	    template_codes (list): Templates a propagar; todos si se omite
+
+	Returns:
+	    str: Nombre de la Template Propagation creada
 	"""
+	frappe.has_permission("Master Template Registry", "write", throw=True)
 
-	try:
-		registry = frappe.get_single("Master Template Registry")
-		propagation_results = {
-			"total_processed": 0,
-			"successful_updates": 0,
-			"failed_updates": 0,
-			"skipped_updates": 0,
-			"errors": [],
-		}
+	if isinstance(template_codes, str):
+		template_codes = frappe.parse_json(template_codes)
 
-		# Obtener configuraciones afectadas por template codes
-		template_codes = [t.template_code for t in registry.infrastructure_templates]
+	return start_propagation(template_codes, template_version)
 
-		if not template_codes:
-			complete_propagation(registry, "Completado", propagation_results)
-			return propagation_results
 
-		affected_configs = frappe.get_all(
+def start_propagation(template_codes=None, registry_version=None, chunk_size=CHUNK_SIZE):
+	"""
+	Crear una Template Propagation con sus lotes y programar los workers.
+
+	Args:
+	    template_codes (list): Templates cambiados; todos los del almacén si se omite
+	    registry_version (str): Versión del registro que se propaga
+	    chunk_size (int): Configuraciones por lote
+
+	Returns:
+	    str: Nombre de la Template Propagation
+	"""
+	if template_codes is None:
+		template_codes = get_template_codes()
+	template_codes = list(template_codes)
+	chunk_size = max(cint(chunk_size) or CHUNK_SIZE, 1)
+	template_diffs = snapshot_template_changes(template_codes)
+
+	names = []
+	if template_codes:
+		names = frappe.get_all(
 			"Entity Configuration",
 			filters={
 				"applied_template": ["in", template_codes],
-				"configuration_status": ["in", ["Borrador", "Pendiente Aprobación", "Aprobado"]],
+				"configuration_status": ["in", ACTIVE_CONFIGURATION_STATUSES],
 			},
-			fields=["name", "applied_template", "configuration_status", "configuration_name"],
+			pluck="name",
+			order_by="name asc",
 		)
 
-		propagation_results["total_processed"] = len(affected_configs)
+	propagation = frappe.new_doc(PROPAGATION_DOCTYPE)
+	propagation.update(
+		{
+			"status": "En Cola",
+			"registry_version": registry_version
+			or frappe.db.get_single_value("Master Template Registry", "template_version"),
+			"template_codes": frappe.as_json(template_codes, indent=None),
+			"template_diffs": frappe.as_json(template_diffs),
+			"chunk_size": chunk_size,
+			"total_configurations": len(names),
+		}
+	)
+	for start in range(0, len(names), chunk_size):
+		chunk = names[start : start + chunk_size]
+		propagation.append(
+			"chunks",
+			{
+				"first_config": chunk[0],
+				"last_config": chunk[-1],
+				"configurations": len(chunk),
+				"status": "Pendiente",
+			},
+		)
+	propagation.insert(ignore_permissions=True)
+
+	frappe.db.set_single_value(
+		"Master Template Registry",
+		{
+			"current_propagation": propagation.name,
+			"propagation_progress": 0 if names else 100,
+			"update_propagation_status": "En Progreso",
+		},
+	)
 
-		# Procesar cada configuración
-		for config_data in affected_configs:
-			try:
-				result = update_single_configuration(config_data, registry)
+	# Sin lotes, un solo worker cierra la propagación
+	for _worker in range(max(min(len(propagation.chunks), MAX_CONCURRENT_WORKERS), 1)):
+		enqueue_propagation_worker(propagation.name)
 
-				if result["success"]:
-					propagation_results["successful_updates"] += 1
-				else:
-					propagation_results["failed_updates"] += 1
-					propagation_results["errors"].append(
-						{"config": config_data["name"], "error": result["error"]}
-					)
+	return propagation.name
 
-			except Exception as e:
-				propagation_results["failed_updates"] += 1
-				propagation_results["errors"].append({"config": config_data["name"], "error": str(e)})
 
-				frappe.log_error(
-					f"Error propagando a configuración {config_data['name']}: {e!s}",
-					"Template Propagation",
-				)
+def snapshot_template_changes(template_codes):
+	"""
+	Calcular una vez por propagación qué cambió en cada template.
 
-		# Completar propagación
-		status = "Completado" if propagation_results["failed_updates"] == 0 else "Completado con Errores"
-		complete_propagation(registry, status, propagation_results)
+	Compara el snapshot guardado en la propagación anterior (synced_snapshot) con el
+	actual y guarda el actual para la siguiente.
 
-		return propagation_results
+	Returns:
+	    dict: template_code → diff_template_snapshots (sin entrada si no hay snapshot
+	        anterior; esas configuraciones se sincronizan completas)
+	"""
+	if not template_codes:
+		return {}
 
-	except Exception as e:
-		frappe.log_error(f"Error crítico en propagación de templates: {e!s}", "Template Propagation Critical")
+	previous = dict(
+		frappe.get_all(
+			"Infrastructure Template",
+			filters={"name": ["in", template_codes]},
+			fields=["name", "synced_snapshot"],
+			as_list=True,
+		)
+	)
+
+	diffs = {}
+	for template_code in template_codes:
+		template = get_template(template_code)
+		if not template:
+			continue
+
+		snapshot = get_template_snapshot(template)
+		diff = diff_template_snapshots(frappe.parse_json(previous.get(template_code) or "null"), snapshot)
+		if diff:
+			diffs[template_code] = diff
+
+		frappe.db.set_value(
+			"Infrastructure Template",
+			template_code,
+			"synced_snapshot",
+			frappe.as_json(snapshot, indent=None),
+			update_modified=False,
+		)
 
-		# Marcar como fallido
+	return diffs
+
+
+def enqueue_propagation_worker(propagation_name):
+	"""Programar un worker para los lotes pendientes de una propagación"""
+	frappe.enqueue(
+		"condominium_management.document_generation.api.template_propagation.run_propagation_worker",
+		queue=PROPAGATION_QUEUE,
+		timeout=PROPAGATION_TIMEOUT,
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+		propagation_name=propagation_name,
+	)
+
+
+def run_propagation_worker(propagation_name):
+	"""
+	Procesar lotes pendientes de una propagación.
+
+	Toma hasta CHUNKS_PER_JOB lotes, confirmando cada uno; si quedan pendientes se
+	vuelve a encolar para liberar el worker, y el último en terminar cierra la
+	propagación.
+	"""
+	status = frappe.db.get_value(PROPAGATION_DOCTYPE, propagation_name, "status")
+	if status not in RUNNING_STATUSES:
+		return
+
+	if status == "En Cola":
+		frappe.db.set_value(
+			PROPAGATION_DOCTYPE,
+			propagation_name,
+			{"status": "En Progreso", "started_on": now_datetime()},
+			update_modified=False,
+		)
+
+	propagation = frappe.db.get_value(
+		PROPAGATION_DOCTYPE, propagation_name, ["template_codes", "template_diffs"], as_dict=True
+	)
+	template_codes = frappe.parse_json(propagation.template_codes or "[]")
+	template_diffs = frappe.parse_json(propagation.template_diffs or "{}")
+
+	for _chunk in range(CHUNKS_PER_JOB):
+		chunk = claim_chunk(propagation_name)
+		if not chunk:
+			break
+
+		frappe.db.savepoint("template_propagation_chunk")
 		try:
-			registry = frappe.get_single("Master Template Registry")
-			registry.db_set("update_propagation_status", "Fallido", update_modified=False)
-			frappe.db.commit()
-		except Exception:
-			pass
+			result = process_chunk(chunk, template_codes, template_diffs)
+		except Exception as e:
+			# El lote vuelve a quedar pendiente para otro worker
+			frappe.db.rollback(save_point="template_propagation_chunk")
+			frappe.db.set_value(CHUNK_DOCTYPE, chunk.name, "status", "Pendiente", update_modified=False)
+			commit()
+			frappe.log_error(
+				f"Error procesando lote {chunk.first_config} - {chunk.last_config}: {e!s}",
+				"Template Propagation",
+			)
+			raise
 
-		raise
+		record_chunk_result(propagation_name, chunk, result)
+	else:
+		if has_pending_chunks(propagation_name):
+			enqueue_propagation_worker(propagation_name)
+			commit()
+			return
+
+	finalize_propagation(propagation_name)
+
+
+def claim_chunk(propagation_name):
+	"""
+	Tomar el siguiente lote pendiente.
+
+	El bloqueo con SKIP LOCKED evita que dos workers tomen el mismo lote; el estado
+	En Proceso se confirma de inmediato.
+	"""
+	chunks = frappe.db.sql(
+		"""
+		SELECT name, first_config, last_config, configurations
+		FROM `tabTemplate Propagation Chunk`
+		WHERE parent = %s AND parenttype = %s AND status = 'Pendiente'
+		ORDER BY idx
+		LIMIT 1
+		FOR UPDATE SKIP LOCKED
+		""",
+		(propagation_name, PROPAGATION_DOCTYPE),
+		as_dict=True,
+	)
+	if not chunks:
+		commit()
+		return None
+
+	frappe.db.set_value(
+		CHUNK_DOCTYPE,
+		chunks[0].name,
+		{"status": "En Proceso", "claimed_on": now_datetime()},
+		update_modified=False,
+	)
+	commit()
+	return chunks[0]
+
+
+def process_chunk(chunk, template_codes, template_diffs=None):
+	"""
+	Sincronizar las configuraciones del rango de un lote.
+
+	Las configuraciones sincronizadas con el snapshot anterior de su template reciben
+	solo la diferencia (apply_field_diff), en lote; las demás se sincronizan completas.
+
+	Args:
+	    chunk (dict): Lote tomado con claim_chunk
+	    template_codes (list): Templates de la propagación
+	    template_diffs (dict): template_code → diff_template_snapshots
+
+	Returns:
+	    dict: updated, skipped, failed y errors ({"config", "error"})
+	"""
+	result = {"updated": 0, "skipped": 0, "failed": 0, "errors": []}
+	template_diffs = template_diffs or {}
+
+	configurations = frappe.get_all(
+		"Entity Configuration",
+		filters=[
+			["name", ">=", chunk.first_config],
+			["name", "<=", chunk.last_config],
+			["applied_template", "in", template_codes],
+			["configuration_status", "in", ACTIVE_CONFIGURATION_STATUSES],
+		],
+		fields=[
+			"name",
+			"applied_template",
+			"template_hash",
+			"configuration_status",
+			"configuration_name",
+			"source_doctype",
+			"source_docname",
+		],
+		order_by="name asc",
+	)
+
+	batches = {}
+	for config_data in configurations:
+		template = get_template(config_data.applied_template)
+		if template and config_data.template_hash == template.content_hash:
+			result["skipped"] += 1
+			continue
+
+		diff = template_diffs.get(config_data.applied_template)
+		if (
+			template
+			and diff
+			and config_data.template_hash == diff["base_hash"]
+			and template.content_hash == diff["target_hash"]
+		):
+			batches.setdefault(config_data.applied_template, []).append(config_data)
+			continue
+
+		_update_configuration(config_data, result)
+
+	for template_code, batch in batches.items():
+		frappe.db.savepoint("template_propagation")
+		try:
+			apply_field_diff(template_diffs[template_code], batch)
+			result["updated"] += len(batch)
+		except Exception as e:
+			frappe.db.rollback(save_point="template_propagation")
+			frappe.log_error(
+				f"Error aplicando cambios de {template_code} en lote, se sincroniza una por una: {e!s}",
+				"Template Propagation",
+			)
+			for config_data in batch:
+				_update_configuration(config_data, result)
+
+	return result
+
+
+def _update_configuration(config_data, result):
+	frappe.db.savepoint("template_propagation")
+	update = update_single_configuration(config_data)
+	if update["success"]:
+		result["updated" if update["changes_made"] else "skipped"] += 1
+	else:
+		frappe.db.rollback(save_point="template_propagation")
+		result["failed"] += 1
+		result["errors"].append({"config": config_data.name, "error": update["error"]})
+		frappe.log_error(
+			f"Error propagando a configuración {config_data.name}: {update['error']}",
+			"Template Propagation",
+		)
 
 
-def update_single_configuration(config_data, registry):
+def apply_field_diff(diff, configurations):
+	"""
+	Aplicar la diferencia de campos de un template a configuraciones sincronizadas con
+	su snapshot anterior.
+
+	El costo depende del tamaño del cambio y no de los campos del template: una
+	actualización por campo modificado, una para los eliminados y un insert en lote
+	para los agregados, más una actualización de las configuraciones.
+
+	- Campos modificados (y agregados que la configuración ya tenía): etiqueta, tipo y
+	  obligatoriedad; el valor por defecto solo llena valores vacíos.
+	- Campos eliminados: se desactivan, igual que en sync_configuration_with_template.
+	- Las configuraciones aprobadas vuelven a Pendiente Aprobación.
+	- Las entradas del índice de conflictos del lote se reescriben.
+
+	Args:
+	    diff (dict): Resultado de template_registry.diff_template_snapshots
+	    configurations (list): Configuraciones (name, configuration_status, ...) del lote
+	"""
+	names = [config.name for config in configurations]
+	values = {
+		"names": names,
+		"parenttype": "Entity Configuration",
+		"timestamp": now_datetime(),
+		"user": frappe.session.user,
+	}
+
+	for field in diff["changed"] + diff["added"]:
+		field_values = {**values, **field, "is_required": cint(field.get("is_required"))}
+		frappe.db.sql(
+			"""
+			UPDATE `tabConfiguration Field`
+			SET field_label = %(field_label)s, field_type = %(field_type)s, is_required = %(is_required)s,
+				last_updated = %(timestamp)s, updated_by = %(user)s, modified = %(timestamp)s
+			WHERE parenttype = %(parenttype)s AND parent IN %(names)s AND field_name = %(field_name)s
+			""",
+			field_values,
+		)
+		if field.get("default_value"):
+			frappe.db.sql(
+				"""
+				UPDATE `tabConfiguration Field`
+				SET field_value = %(default_value)s
+				WHERE parenttype = %(parenttype)s AND parent IN %(names)s AND field_name = %(field_name)s
+					AND COALESCE(field_value, '') = ''
+				""",
+				field_values,
+			)
+
+	if diff["removed"]:
+		frappe.db.sql(
+			"""
+			UPDATE `tabConfiguration Field`
+			SET is_active = 0, last_updated = %(timestamp)s, updated_by = %(user)s, modified = %(timestamp)s
+			WHERE parenttype = %(parenttype)s AND parent IN %(names)s AND field_name IN %(removed)s
+				AND is_active = 1
+			""",
+			{**values, "removed": diff["removed"]},
+		)
+
+	if diff["added"]:
+		_insert_added_fields(diff["added"], values)
+
+	frappe.db.sql(
+		"""
+		UPDATE `tabEntity Configuration`
+		SET target_document_type = %(target_document)s, target_section = %(target_section)s,
+			template_hash = %(target_hash)s, last_template_sync = %(timestamp)s,
+			modified = %(timestamp)s, modified_by = %(user)s,
+			configuration_status = CASE
+				WHEN configuration_status = 'Aprobado' THEN 'Pendiente Aprobación'
+				ELSE configuration_status
+			END
+		WHERE name IN %(names)s
+		""",
+		{
+			**values,
+			"target_document": diff["target_document"],
+			"target_section": diff["target_section"],
+			"target_hash": diff["target_hash"],
+		},
+	)
+
+	# Etiquetas, tipos y valores por defecto cambian las entradas del índice de conflictos
+	index_configurations(names)
+
+	for config in configurations:
+		if config.configuration_status == "Aprobado":
+			frappe.publish_realtime(
+				event="configuration_pending_approval",
+				message={
+					"configuration": config.name,
+					"configuration_name": config.configuration_name,
+					"source_document": f"{config.source_doctype} {config.source_docname}",
+				},
+			)
+
+
+def _insert_added_fields(added, values):
+	"""Insertar en lote los campos nuevos en las configuraciones que no los tienen"""
+	existing = set(
+		frappe.db.sql(
+			"""
+			SELECT parent, field_name FROM `tabConfiguration Field`
+			WHERE parenttype = %(parenttype)s AND parent IN %(names)s AND field_name IN %(added)s
+			""",
+			{**values, "added": [field["field_name"] for field in added]},
+		)
+	)
+	last_idx = dict(
+		frappe.db.sql(
+			"""
+			SELECT parent, MAX(idx) FROM `tabConfiguration Field`
+			WHERE parenttype = %(parenttype)s AND parent IN %(names)s
+			GROUP BY parent
+			""",
+			values,
+		)
+	)
+
+	rows = []
+	for name in values["names"]:
+		idx = cint(last_idx.get(name))
+		for field in added:
+			if (name, field["field_name"]) in existing:
+				continue
+
+			idx += 1
+			rows.append(
+				(
+					frappe.generate_hash(length=10),
+					name,
+					values["parenttype"],
+					"configuration_fields",
+					idx,
+					field["field_name"],
+					field.get("field_label") or field["field_name"],
+					field.get("field_type") or "Data",
+					field.get("default_value") or "",
+					cint(field.get("is_required")),
+					1,
+					values["user"],
+					values["timestamp"],
+					values["user"],
+					values["timestamp"],
+					values["timestamp"],
+					values["user"],
+					values["user"],
+				)
+			)
+
+	frappe.db.bulk_insert(
+		"Configuration Field",
+		fields=[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"field_name",
+			"field_label",
+			"field_type",
+			"field_value",
+			"is_required",
+			"is_active",
+			"created_by",
+			"last_updated",
+			"updated_by",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=rows,
+	)
+
+
+def record_chunk_result(propagation_name, chunk, result):
+	"""Cerrar un lote, sumar sus contadores a la propagación y al registro, y confirmar"""
+	frappe.db.set_value(
+		CHUNK_DOCTYPE,
+		chunk.name,
+		{
+			"status": "Completado",
+			"updated": result["updated"],
+			"skipped": result["skipped"],
+			"failed": result["failed"],
+		},
+		update_modified=False,
+	)
+
+	# La fila de la propagación se bloquea para sumar sin perder actualizaciones
+	propagation = frappe.db.sql(
+		"""
+		SELECT total_configurations, processed, updated, skipped, failed, errors
+		FROM `tabTemplate Propagation`
+		WHERE name = %s
+		FOR UPDATE
+		""",
+		propagation_name,
+		as_dict=True,
+	)[0]
+
+	errors = frappe.parse_json(propagation.errors or "[]")
+	errors.extend(result["errors"][: max(MAX_LOGGED_ERRORS - len(errors), 0)])
+	processed = propagation.processed + result["updated"] + result["skipped"] + result["failed"]
+
+	frappe.db.set_value(
+		PROPAGATION_DOCTYPE,
+		propagation_name,
+		{
+			"processed": processed,
+			"updated": propagation.updated + result["updated"],
+			"skipped": propagation.skipped + result["skipped"],
+			"failed": propagation.failed + result["failed"],
+			"errors": frappe.as_json(errors),
+		},
+		update_modified=False,
+	)
+
+	if is_current_propagation(propagation_name):
+		progress = (
+			flt(processed * 100 / propagation.total_configurations, 2)
+			if propagation.total_configurations
+			else 100
+		)
+		frappe.db.set_single_value("Master Template Registry", "propagation_progress", min(progress, 100))
+
+	commit()
+
+	frappe.publish_realtime(
+		event="template_propagation_progress",
+		message={
+			"propagation": propagation_name,
+			"processed": processed,
+			"total": propagation.total_configurations,
+		},
+	)
+
+
+def commit():
+	"""Confirmar el avance; en tests todo queda en la transacción del test"""
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+
+def has_pending_chunks(propagation_name):
+	return frappe.db.exists(CHUNK_DOCTYPE, {"parent": propagation_name, "status": "Pendiente"})
+
+
+def is_current_propagation(propagation_name):
+	return frappe.db.get_single_value("Master Template Registry", "current_propagation") == propagation_name
+
+
+def finalize_propagation(propagation_name):
+	"""
+	Cerrar la propagación cuando todos sus lotes están completos.
+
+	La fila se bloquea para que solo el último worker la cierre.
+	"""
+	status = frappe.db.sql(
+		"SELECT status FROM `tabTemplate Propagation` WHERE name = %s FOR UPDATE", propagation_name
+	)[0][0]
+
+	open_chunks = frappe.db.count(
+		CHUNK_DOCTYPE, {"parent": propagation_name, "status": ["in", ["Pendiente", "En Proceso"]]}
+	)
+	if status not in RUNNING_STATUSES or open_chunks:
+		commit()
+		return
+
+	propagation = frappe.get_doc(PROPAGATION_DOCTYPE, propagation_name)
+	propagation.db_set(
+		{
+			"status": "Completado" if not propagation.failed else "Completado con Errores",
+			"started_on": propagation.started_on or now_datetime(),
+			"completed_on": now_datetime(),
+		},
+		update_modified=False,
+	)
+
+	if is_current_propagation(propagation_name):
+		registry = frappe.get_single("Master Template Registry")
+		complete_propagation(
+			registry,
+			propagation.status,
+			{
+				"propagation": propagation.name,
+				"total_processed": propagation.processed,
+				"successful_updates": propagation.updated,
+				"failed_updates": propagation.failed,
+				"skipped_updates": propagation.skipped,
+				"errors": frappe.parse_json(propagation.errors or "[]"),
+			},
+		)
+	else:
+		commit()
+
+
+def resume_stalled_propagations():
+	"""
+	Retomar propagaciones interrumpidas (tarea programada cada hora).
+
+	Los lotes tomados hace más de STALLED_CHUNK_MINUTES vuelven a quedar pendientes y
+	cada propagación en curso recupera workers hasta MAX_CONCURRENT_WORKERS.
+	"""
+	stalled_before = add_to_date(now_datetime(), minutes=-STALLED_CHUNK_MINUTES)
+
+	for propagation_name in frappe.get_all(
+		PROPAGATION_DOCTYPE, filters={"status": ["in", RUNNING_STATUSES]}, pluck="name"
+	):
+		frappe.db.sql(
+			"""
+			UPDATE `tabTemplate Propagation Chunk`
+			SET status = 'Pendiente'
+			WHERE parent = %s AND status = 'En Proceso' AND claimed_on < %s
+			""",
+			(propagation_name, stalled_before),
+		)
+
+		chunks = frappe.get_all(
+			CHUNK_DOCTYPE,
+			filters={"parent": propagation_name, "parenttype": PROPAGATION_DOCTYPE},
+			fields=["status", "count(name) as count"],
+			group_by="status",
+		)
+		counts = {row.status: row.count for row in chunks}
+		workers = min(counts.get("Pendiente", 0), MAX_CONCURRENT_WORKERS - counts.get("En Proceso", 0))
+
+		# Sin lotes abiertos solo falta cerrarla
+		if not counts.get("Pendiente") and not counts.get("En Proceso"):
+			workers = 1
+
+		for _worker in range(max(workers, 0)):
+			enqueue_propagation_worker(propagation_name)
+
+	commit()
+
+
+def update_single_configuration(config_data, registry=None):
 	"""
 	Actualizar una configuración individual con cambios de template.
 
 	Args:
 	    config_data (dict): Datos de la configuración a actualizar
-	    registry (Document): Master Template Registry con templates actualizados
+	    registry (Document): Master Template Registry con cambios pendientes (opcional);
+	        sin él se usa el template publicado
 
 	Returns:
 	    dict: Resultado de la actualización
@@ -119,11 +747,16 @@ def update_single_configuration(config_data, registry):
 
 	try:
 		config = frappe.get_doc("Entity Configuration", config_data["name"])
-		template = registry.get_template_by_code(config.applied_template)
+		if registry:
+			template = registry.get_template_by_code(config.applied_template)
+		else:
+			template = get_template(config.applied_template)
 
 		if not template:
 			return {"success": False, "error": f"Template {config.applied_template} no encontrado"}
 
+		template_hash = get_template_hash(template)
+
 		# Sincronizar campos con template actualizado
 		changes_made = sync_configuration_with_template(config, template)
 
@@ -133,6 +766,7 @@ def update_single_configuration(config_data, registry):
 			if original_status == "Aprobado":
 				config.configuration_status = "Pendiente Aprobación"
 
+			config.template_hash = template_hash
 			config.save()
 
 			return {
@@ -141,6 +775,8 @@ def update_single_configuration(config_data, registry):
 				"status_changed": original_status != config.configuration_status,
 			}
 		else:
+			if config.template_hash != template_hash:
+				config.db_set("template_hash", template_hash, update_modified=False)
 			return {"success": True, "changes_made": False}
 
 	except Exception as e:
@@ -254,7 +890,7 @@ def complete_propagation(registry, status, results):
 	# Crear log de propagación
 	create_propagation_log(registry, status, results)
 
-	frappe.db.commit()
+	commit()
 
 
 def create_propagation_log(registry, status, results):
@@ -319,8 +955,28 @@ def get_propagation_status(registry_name=None):
 			"template_version": registry.template_version,
 			"propagation_status": registry.update_propagation_status,
 			"last_update": registry.last_update,
+			"propagation_progress": registry.propagation_progress,
 		}
 
+		# Avance de la propagación en curso o la última ejecutada
+		if registry.current_propagation:
+			stats["current_propagation"] = frappe.db.get_value(
+				PROPAGATION_DOCTYPE,
+				registry.current_propagation,
+				[
+					"name",
+					"status",
+					"total_configurations",
+					"processed",
+					"updated",
+					"skipped",
+					"failed",
+					"started_on",
+					"completed_on",
+				],
+				as_dict=True,
+			)
+
 		# Resultados de última propagación si existen
 		last_result = registry.get("last_propagation_result")
 		if last_result:
@@ -330,7 +986,7 @@ def get_propagation_status(registry_name=None):
 				pass
 
 		# Configuraciones pendientes de sincronización
-		template_codes = [t.template_code for t in registry.infrastructure_templates]
+		template_codes = get_template_codes()
 		if template_codes:
 			pending_sync = frappe.db.count(
 				"Entity Configuration",
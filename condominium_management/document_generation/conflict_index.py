@@ -0,0 +1,758 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation - Índice de conflictos entre configuraciones
+================================================================
+
+Configuration Conflict Index guarda una entrada por cada campo de una Entity
+Configuration que participa en la detección de conflictos entre configuraciones:
+
+- Horario: campos de tipo time/datetime. Además del valor normalizado guardan el
+  intervalo [interval_start, interval_end) en segundos ("08:00-12:00", "08:00",
+  "2025-01-01 10:00 - 2025-01-01 12:00"); un valor puntual ocupa un segundo.
+- Ubicación y Recurso: campos cuyo nombre o etiqueta contiene alguno de
+  LOCATION_PATTERNS o RESOURCE_PATTERNS. Se agrupan por match_key (el nombre del
+  campo, o su último segmento para recursos) y value_hash (hash del valor
+  normalizado: sin espacios repetidos y en minúsculas).
+
+Con el índice, los duplicados de todo el portafolio salen de una consulta agrupada y
+los traslapes de horario de un barrido por intervalos ordenados, en lugar de cargar
+y comparar configuración contra configuración. El estado de la configuración no se
+copia al índice: las consultas lo filtran con un JOIN, así que un cambio de estado no
+requiere reindexar.
+
+Los campos que la Entity Type Configuration declara en su lista de campos de
+conflicto (Conflict Detection Field) participan en la dimensión de su tipo aunque
+su nombre no coincida con los patrones, ya sea por nombre o por el campo origen
+(source_field) del template.
+
+El índice se mantiene desde EntityConfiguration (on_update y on_trash), desde la
+detección diferida y desde la propagación en lote, y se reconstruye completo con
+rebuild_conflict_index(). Al reindexar se comparan las entradas anteriores con las
+nuevas: solo se reescriben las configuraciones cuyas entradas cambiaron y se
+informan las dimensiones afectadas, para re-evaluar únicamente esas.
+
+Los conflictos de horario, ubicación y recurso de cada configuración se guardan en
+caché (Redis, un hash por dimensión). Una entrada que cambia invalida la caché de esa
+dimensión para la propia configuración y para sus vecinas: las que comparten
+(dimension, match_key, value_hash) o, en horarios, el mismo campo del mismo
+source_doctype. La invalidación se repite al confirmar o revertir la transacción.
+"""
+
+import hashlib
+import heapq
+import re
+from functools import partial
+
+import frappe
+from frappe.utils import cint, cstr, flt, get_datetime, now_datetime
+
+from condominium_management.document_generation.entity_type_registry import get_conflict_fields
+from condominium_management.document_generation.template_registry import get_template
+from condominium_management.utils import clear_cache_on_transaction_end
+
+CONFLICT_INDEX_DOCTYPE = "Configuration Conflict Index"
+
+SCHEDULE = "Horario"
+LOCATION = "Ubicación"
+RESOURCE = "Recurso"
+# Dimensiones que se validan en memoria, sin comparar contra otras configuraciones
+CAPACITY = "Capacidad"
+TEMPLATE = "Template"
+
+INDEXED_DIMENSIONS = (SCHEDULE, LOCATION, RESOURCE)
+CONFLICT_DIMENSIONS = (*INDEXED_DIMENSIONS, CAPACITY, TEMPLATE)
+
+# Tipos de Conflict Detection Field con detector; Duplicación y Personalizado no tienen
+CONFLICT_TYPE_DIMENSIONS = {
+	"Horario": SCHEDULE,
+	"Ubicación": LOCATION,
+	"Recurso": RESOURCE,
+	"Capacidad": CAPACITY,
+}
+
+# Solo estas configuraciones compiten por horarios, ubicaciones y recursos
+CONFLICT_STATUSES = ("Aprobado", "Pendiente Aprobación")
+
+SCHEDULE_FIELD_TYPES = ("time", "datetime")
+LOCATION_PATTERNS = ("ubicacion", "location", "area", "zona", "sector")
+RESOURCE_PATTERNS = ("equipo", "equipment", "recurso", "resource")
+CAPACITY_PATTERNS = ("capacity", "limite", "maximo")
+
+CONFLICT_CACHE_KEY = "document_generation:configuration_conflicts"
+
+SECONDS_PER_DAY = 24 * 60 * 60
+REBUILD_BATCH_SIZE = 500
+
+TIME_PATTERN = re.compile(r"^(\d{1,2}):(\d{2})(?::(\d{2}))?$")
+TIME_RANGE_PATTERN = re.compile(
+	r"^(\d{1,2}:\d{2}(?::\d{2})?)\s*(?:-|\u2013|a|to)\s*(\d{1,2}:\d{2}(?::\d{2})?)$", re.IGNORECASE
+)
+RANGE_SEPARATOR_PATTERN = re.compile(r"\s+(?:-|\u2013|a|to)\s+", re.IGNORECASE)
+
+INDEX_COLUMNS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"configuration",
+	"dimension",
+	"field_name",
+	"field_label",
+	"match_key",
+	"field_value",
+	"normalized_value",
+	"value_hash",
+	"interval_start",
+	"interval_end",
+)
+
+ENTRY_FIELDS = """
+	ci.configuration, ci.dimension, ci.field_name, ci.field_label, ci.match_key, ci.field_value,
+	ci.value_hash, ci.interval_start, ci.interval_end, ec.configuration_name, ec.source_doctype,
+	COALESCE(ec.entity_subtype, '') AS entity_subtype
+"""
+
+
+def matches_patterns(field, patterns):
+	"""True si el nombre o la etiqueta del campo contiene alguno de los patrones"""
+	field_name = cstr(field.field_name).lower()
+	field_label = cstr(field.field_label).lower()
+	return any(pattern.lower() in field_name or pattern.lower() in field_label for pattern in patterns)
+
+
+def get_field_dimensions(field, conflict_types=None):
+	"""
+	Dimensiones de conflicto en las que participa un campo de configuración.
+
+	Args:
+	    field (dict): Campo de configuración
+	    conflict_types (dict): field_name → tipo de conflicto declarado (get_conflict_field_types)
+	"""
+	declared = CONFLICT_TYPE_DIMENSIONS.get((conflict_types or {}).get(field.field_name))
+	dimensions = []
+	if cstr(field.field_type).lower() in SCHEDULE_FIELD_TYPES or declared == SCHEDULE:
+		dimensions.append(SCHEDULE)
+	if matches_patterns(field, LOCATION_PATTERNS) or declared == LOCATION:
+		dimensions.append(LOCATION)
+	if matches_patterns(field, RESOURCE_PATTERNS) or declared == RESOURCE:
+		dimensions.append(RESOURCE)
+	if matches_patterns(field, CAPACITY_PATTERNS) or declared == CAPACITY:
+		dimensions.append(CAPACITY)
+
+	return dimensions
+
+
+def get_conflict_field_types(config):
+	"""
+	Tipos de conflicto que la Entity Type Configuration declara para los campos de la
+	configuración, por nombre de campo o por su campo origen en el template.
+
+	Args:
+	    config (dict): Entity Configuration (source_doctype, applied_template, configuration_fields)
+
+	Returns:
+	    dict: field_name → tipo de conflicto
+	"""
+	conflict_fields = get_conflict_fields(config.source_doctype)
+	if not conflict_fields:
+		return {}
+
+	template = get_template(config.applied_template) if config.applied_template else None
+	source_fields = {
+		field_def["field_name"]: field_def.get("source_field")
+		for field_def in (template.template_fields if template else [])
+	}
+
+	conflict_types = {}
+	for field in config.configuration_fields:
+		conflict_type = conflict_fields.get(field.field_name) or conflict_fields.get(
+			source_fields.get(field.field_name)
+		)
+		if conflict_type:
+			conflict_types[field.field_name] = conflict_type
+
+	return conflict_types
+
+
+def get_match_key(field_name, dimension):
+	"""Un recurso se compara por el último segmento de su nombre (equipo_bomba → bomba)"""
+	if dimension == RESOURCE:
+		return cstr(field_name).split("_")[-1].lower()
+
+	return field_name
+
+
+def normalize_value(value):
+	return " ".join(cstr(value).split()).lower()
+
+
+def parse_schedule_interval(value):
+	"""
+	Convertir un horario en un intervalo [inicio, fin) en segundos.
+
+	Acepta una hora o fecha puntual, o un rango separado por "-", "a" o "to". Los
+	rangos de horas que cruzan la medianoche terminan al día siguiente.
+
+	Returns:
+	    tuple: (inicio, fin) o None si el valor no se reconoce como horario
+	"""
+	value = cstr(value).strip()
+	if not value:
+		return None
+
+	match = TIME_RANGE_PATTERN.match(value)
+	parts = match.groups() if match else RANGE_SEPARATOR_PATTERN.split(value)
+	if len(parts) > 2:
+		return None
+
+	try:
+		points = [_to_seconds(part) for part in parts]
+	except (ValueError, OverflowError):
+		return None
+
+	start = points[0]
+	if len(points) == 1:
+		return start, start + 1
+
+	end = points[1]
+	if end <= start:
+		if not TIME_PATTERN.match(parts[1].strip()):
+			return None
+		end += SECONDS_PER_DAY
+
+	return start, end
+
+
+def _to_seconds(value):
+	value = value.strip()
+	match = TIME_PATTERN.match(value)
+	if match:
+		hours, minutes, seconds = (cint(part) for part in match.groups())
+		return hours * 3600 + minutes * 60 + seconds
+
+	return get_datetime(value).timestamp()
+
+
+def get_index_entries(config_name, fields, conflict_types=None):
+	"""
+	Entradas del índice para los campos de una configuración.
+
+	Args:
+	    config_name (str): Nombre de la Entity Configuration
+	    fields (list): Campos de configuración (field_name, field_label, field_type, field_value)
+	    conflict_types (dict): Tipos de conflicto declarados (get_conflict_field_types)
+
+	Returns:
+	    list: Entradas (frappe._dict) con las columnas de Configuration Conflict Index
+	"""
+	entries = []
+	for field in fields:
+		normalized_value = normalize_value(field.field_value)
+		if not normalized_value:
+			continue
+
+		for dimension in get_field_dimensions(field, conflict_types):
+			if dimension not in INDEXED_DIMENSIONS:
+				continue
+
+			interval = parse_schedule_interval(field.field_value) if dimension == SCHEDULE else None
+			entries.append(
+				frappe._dict(
+					configuration=config_name,
+					dimension=dimension,
+					field_name=field.field_name,
+					field_label=field.field_label,
+					match_key=get_match_key(field.field_name, dimension),
+					field_value=cstr(field.field_value),
+					normalized_value=normalized_value,
+					value_hash=hashlib.sha1(normalized_value.encode()).hexdigest(),
+					interval_start=interval[0] if interval else None,
+					interval_end=interval[1] if interval else None,
+				)
+			)
+
+	return entries
+
+
+def get_configuration_signatures(config, conflict_types=None):
+	"""
+	Firmas de las dimensiones que se validan en memoria: capacidad (campos de capacidad y
+	sus valores) y template (template aplicado, campos presentes y cuáles tienen valor).
+	"""
+	capacity = sorted(
+		(cstr(field.field_name), cstr(field.field_label), cstr(field.field_value))
+		for field in config.configuration_fields
+		if CAPACITY in get_field_dimensions(field, conflict_types)
+	)
+	template = (
+		cstr(config.applied_template),
+		sorted((cstr(field.field_name), bool(field.field_value)) for field in config.configuration_fields),
+	)
+
+	return {CAPACITY: capacity, TEMPLATE: template}
+
+
+def get_changed_dimensions(config, previous=None):
+	"""
+	Dimensiones de conflicto que un guardado obliga a re-evaluar, además de las que
+	index_configuration detecte en las entradas del índice.
+
+	- Sin versión anterior, o si la configuración entra o sale de CONFLICT_STATUSES:
+	  todas, porque cambia lo que ven sus vecinas.
+	- Otro source_doctype, entity_subtype o configuration_name: horarios (grupo de
+	  comparación y descripción del conflicto en las vecinas).
+	- Capacidad y template: si cambia su firma (get_configuration_signatures).
+
+	Args:
+	    config (Document): Entity Configuration guardada
+	    previous (Document): Versión anterior (get_doc_before_save)
+
+	Returns:
+	    set: Dimensiones
+	"""
+	if not previous:
+		return set(CONFLICT_DIMENSIONS)
+
+	if (previous.configuration_status in CONFLICT_STATUSES) != (
+		config.configuration_status in CONFLICT_STATUSES
+	):
+		return set(CONFLICT_DIMENSIONS)
+
+	dimensions = set()
+	if any(
+		cstr(previous.get(fieldname)) != cstr(config.get(fieldname))
+		for fieldname in ("source_doctype", "entity_subtype", "configuration_name")
+	):
+		dimensions.add(SCHEDULE)
+
+	current_signatures = get_configuration_signatures(config, get_conflict_field_types(config))
+	previous_signatures = get_configuration_signatures(previous, get_conflict_field_types(previous))
+	dimensions.update(
+		dimension
+		for dimension, signature in current_signatures.items()
+		if previous_signatures[dimension] != signature
+	)
+
+	return dimensions
+
+
+def index_configuration(config, invalidate=()):
+	"""
+	Reindexar una configuración a partir de sus campos en memoria.
+
+	Solo reescribe sus entradas si cambiaron, e invalida la caché de conflictos de las
+	dimensiones que cambiaron (o que se piden en invalidate) para ella y sus vecinas.
+
+	Args:
+	    config (Document): Entity Configuration
+	    invalidate (iterable): Dimensiones a invalidar aunque sus entradas no cambien
+
+	Returns:
+	    set: Dimensiones indexadas cuyas entradas cambiaron
+	"""
+	previous = get_entries([config.name]).get(config.name, [])
+	entries = get_index_entries(config.name, config.configuration_fields, get_conflict_field_types(config))
+
+	changed = get_changed_entry_dimensions(previous, entries)
+	if changed:
+		remove_configurations([config.name], clear_cache=False)
+		_insert_entries(entries)
+
+	invalidate_neighbors(
+		[config.name], previous + entries, changed | set(invalidate), {config.source_doctype}
+	)
+	return changed
+
+
+def index_configurations(config_names):
+	"""
+	Reindexar varias configuraciones con una consulta de configuraciones, una de campos
+	y una de entradas anteriores; solo se reescriben las que cambiaron.
+
+	Returns:
+	    dict: Nombre de configuración → dimensiones indexadas que cambiaron
+	"""
+	config_names = list(config_names)
+	if not config_names:
+		return {}
+
+	configurations = frappe.get_all(
+		"Entity Configuration",
+		filters={"name": ["in", config_names]},
+		fields=["name", "source_doctype", "applied_template"],
+	)
+	fields = {}
+	for row in frappe.get_all(
+		"Configuration Field",
+		filters={"parenttype": "Entity Configuration", "parent": ["in", config_names]},
+		fields=["parent", "field_name", "field_label", "field_type", "field_value"],
+		order_by="idx asc",
+	):
+		fields.setdefault(row.parent, []).append(row)
+
+	previous = get_entries(config_names)
+	changes, entries, affected = {}, [], []
+	for config in configurations:
+		config.configuration_fields = fields.get(config.name, [])
+		config_entries = get_index_entries(
+			config.name, config.configuration_fields, get_conflict_field_types(config)
+		)
+		changed = get_changed_entry_dimensions(previous.get(config.name, []), config_entries)
+		if changed:
+			changes[config.name] = changed
+			entries.extend(config_entries)
+			affected.extend(previous.get(config.name, []) + config_entries)
+
+	if changes:
+		remove_configurations(list(changes), clear_cache=False)
+		_insert_entries(entries)
+		invalidate_neighbors(
+			list(changes),
+			affected,
+			set().union(*changes.values()),
+			{config.source_doctype for config in configurations if config.name in changes},
+		)
+
+	return changes
+
+
+def get_entries(config_names):
+	"""Entradas guardadas de las configuraciones, agrupadas por configuración"""
+	entries = {}
+	for row in frappe.get_all(
+		CONFLICT_INDEX_DOCTYPE,
+		filters={"configuration": ["in", list(config_names)]},
+		fields=list(INDEX_COLUMNS[5:]),
+	):
+		entries.setdefault(row.configuration, []).append(row)
+
+	return entries
+
+
+def get_changed_entry_dimensions(previous, entries):
+	"""Dimensiones cuyas entradas difieren entre dos versiones de una configuración"""
+
+	def signatures(rows):
+		by_dimension = {}
+		for row in rows:
+			by_dimension.setdefault(row.dimension, []).append(
+				(
+					cstr(row.field_name),
+					cstr(row.field_label),
+					cstr(row.match_key),
+					cstr(row.field_value),
+					row.value_hash,
+					None if row.interval_start is None else flt(row.interval_start),
+					None if row.interval_end is None else flt(row.interval_end),
+				)
+			)
+
+		return {dimension: sorted(rows) for dimension, rows in by_dimension.items()}
+
+	previous_signatures, current_signatures = signatures(previous), signatures(entries)
+	return {
+		dimension
+		for dimension in INDEXED_DIMENSIONS
+		if previous_signatures.get(dimension) != current_signatures.get(dimension)
+	}
+
+
+def remove_configurations(config_names, clear_cache=True):
+	frappe.db.delete(CONFLICT_INDEX_DOCTYPE, {"configuration": ["in", list(config_names)]})
+	if clear_cache:
+		clear_cached_conflicts(config_names)
+
+
+def rebuild_conflict_index(batch_size=REBUILD_BATCH_SIZE):
+	"""
+	Reconstruir el índice completo.
+
+	Returns:
+	    int: Configuraciones indexadas
+	"""
+	frappe.db.delete(CONFLICT_INDEX_DOCTYPE)
+	frappe.cache().delete_value([get_cache_key(dimension) for dimension in INDEXED_DIMENSIONS])
+
+	names = frappe.get_all("Entity Configuration", pluck="name", order_by="name asc")
+	for start in range(0, len(names), batch_size):
+		index_configurations(names[start : start + batch_size])
+
+	return len(names)
+
+
+def reindex_source_doctype(source_doctype, batch_size=REBUILD_BATCH_SIZE):
+	"""Reindexar las configuraciones de un DocType, p. ej. al cambiar sus campos de conflicto"""
+	names = frappe.get_all(
+		"Entity Configuration", filters={"source_doctype": source_doctype}, pluck="name", order_by="name asc"
+	)
+	for start in range(0, len(names), batch_size):
+		index_configurations(names[start : start + batch_size])
+
+
+def get_cache_key(dimension):
+	return f"{CONFLICT_CACHE_KEY}:{dimension}"
+
+
+def get_cached_conflicts(config_name, dimension):
+	"""Conflictos en caché de una dimensión; None si no hay"""
+	return frappe.cache().hget(get_cache_key(dimension), config_name)
+
+
+def set_cached_conflicts(config_name, dimension, conflicts):
+	frappe.cache().hset(get_cache_key(dimension), config_name, conflicts)
+
+
+def clear_cached_conflicts(config_names, dimensions=INDEXED_DIMENSIONS):
+	"""Borra la caché de las configuraciones; se repite al confirmar o revertir la
+	transacción, para que una detección con datos sin confirmar no quede en caché"""
+	config_names = list(config_names)
+	if not config_names:
+		return
+
+	clear_cache_on_transaction_end(partial(_clear_cached_conflicts, config_names, tuple(dimensions)))
+
+
+def _clear_cached_conflicts(config_names, dimensions):
+	for dimension in dimensions:
+		frappe.cache().hdel(get_cache_key(dimension), config_names)
+
+
+def invalidate_configuration(config):
+	"""Invalidar la caché de las vecinas de una configuración en todas las dimensiones,
+	p. ej. cuando su estado cambia sin guardar el documento"""
+	entries = get_index_entries(config.name, config.configuration_fields, get_conflict_field_types(config))
+	invalidate_neighbors([config.name], entries, INDEXED_DIMENSIONS, {config.source_doctype})
+
+
+def invalidate_neighbors(config_names, entries, dimensions, source_doctypes):
+	"""
+	Invalidar la caché de conflictos de las configuraciones y de sus vecinas en las
+	dimensiones dadas, con a lo más una consulta por tipo de dimensión.
+
+	Args:
+	    config_names (list): Configuraciones que cambiaron
+	    entries (list): Sus entradas, anteriores y nuevas
+	    dimensions (set): Dimensiones indexadas que cambiaron
+	    source_doctypes (set): DocTypes origen de las configuraciones (grupo de horarios)
+	"""
+	dimensions = set(dimensions) & set(INDEXED_DIMENSIONS)
+	if not dimensions:
+		return
+
+	neighbors = {dimension: set(config_names) for dimension in dimensions}
+
+	duplicate_keys = {get_entry_key(entry) for entry in entries if entry.dimension in dimensions - {SCHEDULE}}
+	if duplicate_keys:
+		for row in frappe.get_all(
+			CONFLICT_INDEX_DOCTYPE,
+			filters={"value_hash": ["in", list({key[2] for key in duplicate_keys})]},
+			fields=["configuration", "dimension", "match_key", "value_hash"],
+		):
+			if get_entry_key(row) in duplicate_keys:
+				neighbors[row.dimension].add(row.configuration)
+
+	schedule_fields = {entry.field_name for entry in entries if entry.dimension == SCHEDULE}
+	if SCHEDULE in dimensions and schedule_fields:
+		neighbors[SCHEDULE].update(
+			frappe.db.sql_list(
+				"""
+				SELECT DISTINCT ci.configuration
+				FROM `tabConfiguration Conflict Index` ci
+				JOIN `tabEntity Configuration` ec ON ec.name = ci.configuration
+				WHERE ci.dimension = %(dimension)s AND ci.field_name IN %(field_names)s
+					AND ec.source_doctype IN %(source_doctypes)s
+				""",
+				{
+					"dimension": SCHEDULE,
+					"field_names": list(schedule_fields),
+					"source_doctypes": list(filter(None, source_doctypes)) or [""],
+				},
+			)
+		)
+
+	for dimension, names in neighbors.items():
+		clear_cached_conflicts(names, [dimension])
+
+
+def _insert_entries(entries):
+	if not entries:
+		return
+
+	timestamp = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		CONFLICT_INDEX_DOCTYPE,
+		fields=INDEX_COLUMNS,
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				*(entry[column] for column in INDEX_COLUMNS[5:]),
+			)
+			for entry in entries
+		],
+	)
+
+
+def get_duplicate_entries(dimensions=(LOCATION, RESOURCE)):
+	"""
+	Entradas cuyo (dimension, match_key, value_hash) se repite en más de una
+	configuración activa, en una sola consulta agrupada.
+	"""
+	return frappe.db.sql(
+		f"""
+		SELECT {ENTRY_FIELDS}
+		FROM `tabConfiguration Conflict Index` ci
+		JOIN `tabEntity Configuration` ec ON ec.name = ci.configuration
+		JOIN (
+			SELECT dup.dimension, dup.match_key, dup.value_hash
+			FROM `tabConfiguration Conflict Index` dup
+			JOIN `tabEntity Configuration` dup_ec ON dup_ec.name = dup.configuration
+			WHERE dup.dimension IN %(dimensions)s AND dup_ec.configuration_status IN %(statuses)s
+			GROUP BY dup.dimension, dup.match_key, dup.value_hash
+			HAVING COUNT(DISTINCT dup.configuration) > 1
+		) duplicates ON duplicates.dimension = ci.dimension
+			AND duplicates.match_key = ci.match_key
+			AND duplicates.value_hash = ci.value_hash
+		WHERE ec.configuration_status IN %(statuses)s
+		ORDER BY ci.configuration
+		""",
+		{"dimensions": list(dimensions), "statuses": CONFLICT_STATUSES},
+		as_dict=True,
+	)
+
+
+def get_matching_entries(entries, exclude=None):
+	"""
+	Entradas de otras configuraciones activas con el mismo (dimension, match_key,
+	value_hash) que alguna de entries, en una consulta.
+
+	Returns:
+	    dict: (dimension, match_key, value_hash) → lista de entradas
+	"""
+	keys = {get_entry_key(entry) for entry in entries}
+	if not keys:
+		return {}
+
+	rows = frappe.db.sql(
+		f"""
+		SELECT {ENTRY_FIELDS}
+		FROM `tabConfiguration Conflict Index` ci
+		JOIN `tabEntity Configuration` ec ON ec.name = ci.configuration
+		WHERE ci.value_hash IN %(hashes)s AND ci.configuration != %(exclude)s
+			AND ec.configuration_status IN %(statuses)s
+		ORDER BY ci.configuration
+		""",
+		{
+			"hashes": list({key[2] for key in keys}),
+			"exclude": exclude or "",
+			"statuses": CONFLICT_STATUSES,
+		},
+		as_dict=True,
+	)
+
+	matches = {}
+	for row in rows:
+		key = get_entry_key(row)
+		if key in keys:
+			matches.setdefault(key, []).append(row)
+
+	return matches
+
+
+def get_schedule_entries(source_doctype=None, entity_subtype=None, field_names=None, exclude=None):
+	"""Entradas de horario de configuraciones activas, opcionalmente de un solo grupo"""
+	conditions = ["ci.dimension = %(dimension)s", "ec.configuration_status IN %(statuses)s"]
+	values = {"dimension": SCHEDULE, "statuses": CONFLICT_STATUSES}
+
+	if source_doctype is not None:
+		conditions.append("ec.source_doctype = %(source_doctype)s")
+		conditions.append("COALESCE(ec.entity_subtype, '') = %(entity_subtype)s")
+		values.update(source_doctype=source_doctype, entity_subtype=cstr(entity_subtype))
+	if field_names:
+		conditions.append("ci.field_name IN %(field_names)s")
+		values["field_names"] = list(field_names)
+	if exclude:
+		conditions.append("ci.configuration != %(exclude)s")
+		values["exclude"] = exclude
+
+	return frappe.db.sql(
+		f"""
+		SELECT {ENTRY_FIELDS}
+		FROM `tabConfiguration Conflict Index` ci
+		JOIN `tabEntity Configuration` ec ON ec.name = ci.configuration
+		WHERE {" AND ".join(conditions)}
+		ORDER BY ec.source_doctype, entity_subtype, ci.field_name, ci.interval_start
+		""",
+		values,
+		as_dict=True,
+	)
+
+
+def get_entry_key(entry):
+	return (entry.dimension, entry.match_key, entry.value_hash)
+
+
+def schedules_overlap(entry, other):
+	"""Dos horarios se traslapan si sus intervalos se cruzan; sin intervalo, si el valor es igual"""
+	if entry.interval_start is None or other.interval_start is None:
+		return entry.value_hash == other.value_hash
+
+	return entry.interval_start < other.interval_end and other.interval_start < entry.interval_end
+
+
+def find_schedule_overlaps(entries):
+	"""
+	Pares de entradas de horario que se traslapan, entre configuraciones distintas del
+	mismo source_doctype, entity_subtype y campo.
+
+	Cada grupo se recorre una vez ordenado por inicio, con un heap de los intervalos
+	abiertos ordenado por fin: al llegar un intervalo se cierran los que terminaron
+	antes de su inicio y el resto se traslapa con él. Los valores que no son horarios
+	reconocibles se comparan por igualdad.
+
+	Returns:
+	    list: Pares (entrada, entrada)
+	"""
+	groups = {}
+	for entry in entries:
+		groups.setdefault((entry.source_doctype, entry.entity_subtype, entry.field_name), []).append(entry)
+
+	overlaps = []
+	for group in groups.values():
+		open_intervals = []
+		same_values = {}
+		intervals = sorted(
+			(entry for entry in group if entry.interval_start is not None),
+			key=lambda entry: entry.interval_start,
+		)
+		for position, entry in enumerate(intervals):
+			while open_intervals and open_intervals[0][0] <= entry.interval_start:
+				heapq.heappop(open_intervals)
+
+			overlaps.extend(
+				(other, entry)
+				for _end, _position, other in open_intervals
+				if other.configuration != entry.configuration
+			)
+			heapq.heappush(open_intervals, (entry.interval_end, position, entry))
+
+		for entry in group:
+			if entry.interval_start is None:
+				same_values.setdefault(entry.value_hash, []).append(entry)
+
+		for same in same_values.values():
+			overlaps.extend(
+				(entry, other)
+				for position, entry in enumerate(same)
+				for other in same[position + 1 :]
+				if other.configuration != entry.configuration
+			)
+
+	return overlaps
@@ -0,0 +1,378 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation - Cola de auto-detección diferida
+=====================================================
+
+Con detección diferida (Entity Type Configuration.deferred_detection, o siempre
+durante una importación de datos), el hook universal after_insert no crea la
+Entity Configuration en la transacción del usuario. Solo registra el evento
+(doctype, name):
+
+- Los eventos del request se juntan en memoria y se escriben al confirmar la
+  transacción en un hash de Redis. La llave es "doctype|name", así que insertar y
+  volver a guardar el mismo documento deja un solo evento.
+- Un único job deduplicado de la cola "short" vacía el hash por lotes de
+  DETECTION_BATCH_SIZE eventos hasta dejarlo vacío. Por DocType hace una consulta de
+  documentos origen y una de configuraciones existentes. Luego reserva los nombres de
+  la serie de una vez y crea configuraciones y campos con bulk_insert.
+- Si la transacción se revierte, los eventos del request se descartan. Los eventos de
+  un lote que falla regresan al hash y la tarea programada cada hora vuelve a
+  programar el job mientras queden pendientes.
+"""
+
+import frappe
+from frappe.model.naming import NamingSeries, parse_naming_series
+from frappe.utils import cint, cstr, now_datetime
+
+from condominium_management.document_generation.conflict_index import index_configurations
+from condominium_management.document_generation.entity_type_registry import (
+	get_entity_type,
+	is_conflict_detection_enabled,
+	register_source_doctype,
+)
+from condominium_management.document_generation.template_registry import (
+	get_assignment_rule,
+	get_assignment_rules,
+	get_template,
+)
+
+DETECTION_QUEUE_KEY = "document_generation:detection_queue"
+DETECTION_JOB_ID = "document_generation_detection_queue"
+DETECTION_BATCH_SIZE = 500
+DETECTION_TIMEOUT = 1500
+
+CONFIGURATION_NAMING_SERIES = "EC-.YYYY.-"
+EVENT_SEPARATOR = "|"
+
+CONFIGURATION_COLUMNS = (
+	"name",
+	"naming_series",
+	"configuration_name",
+	"source_doctype",
+	"source_docname",
+	"entity_subtype",
+	"applied_template",
+	"target_document_type",
+	"target_section",
+	"configuration_status",
+	"auto_assigned",
+	"approval_required",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+)
+
+FIELD_COLUMNS = (
+	"name",
+	"parent",
+	"parenttype",
+	"parentfield",
+	"idx",
+	"field_name",
+	"field_label",
+	"field_type",
+	"field_value",
+	"is_required",
+	"is_active",
+	"created_by",
+	"last_updated",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+)
+
+
+def queue_detection(doc):
+	"""Registrar (doctype, name) para detección diferida al confirmar la transacción"""
+	events = getattr(frappe.local, "document_generation_detection_events", None)
+	if events is None:
+		events = frappe.local.document_generation_detection_events = {}
+		frappe.db.after_commit.add(flush_detection_events)
+		# Un rollback borra los callbacks de after_commit; sin descartar el buffer, los
+		# eventos posteriores del mismo request no volverían a registrar el flush
+		frappe.db.after_rollback.add(discard_detection_events)
+
+	events[f"{doc.doctype}{EVENT_SEPARATOR}{doc.name}"] = frappe.session.user
+
+
+def discard_detection_events():
+	"""Olvidar los eventos de una transacción revertida"""
+	frappe.local.document_generation_detection_events = None
+
+
+def flush_detection_events():
+	"""Escribir los eventos del request en la cola y programar el job que la vacía"""
+	events = getattr(frappe.local, "document_generation_detection_events", None)
+	frappe.local.document_generation_detection_events = None
+	if not events:
+		return
+
+	for event, user in events.items():
+		frappe.cache().hset(DETECTION_QUEUE_KEY, event, user)
+
+	enqueue_detection_job()
+
+
+def enqueue_detection_job():
+	frappe.enqueue(
+		"condominium_management.document_generation.detection_queue.process_detection_queue",
+		queue="short",
+		timeout=DETECTION_TIMEOUT,
+		job_id=DETECTION_JOB_ID,
+		deduplicate=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def get_pending_events():
+	"""Eventos en cola, {"doctype|name": usuario}.
+
+	RedisWrapper.hgetall deserializa los valores pero devuelve los campos del hash como
+	bytes.
+	"""
+	return {
+		frappe.safe_decode(event): user
+		for event, user in (frappe.cache().hgetall(DETECTION_QUEUE_KEY) or {}).items()
+	}
+
+
+def resume_pending_detection():
+	"""
+	Volver a programar el job si quedan eventos (tarea programada cada hora).
+
+	Recupera los eventos de lotes fallidos y los que llegaron cuando el job ya había
+	leído el hash por última vez: mientras el job sigue en ejecución, la deduplicación
+	descarta el enqueue del flush.
+	"""
+	if frappe.cache().hkeys(DETECTION_QUEUE_KEY):
+		enqueue_detection_job()
+
+
+def process_detection_queue(batch_size=DETECTION_BATCH_SIZE):
+	"""
+	Procesar por lotes los eventos pendientes hasta vaciar la cola.
+
+	El job no se vuelve a programar a sí mismo: mientras corre, un enqueue con el mismo
+	job_id se descarta por la deduplicación. Los eventos que lleguen durante un lote se
+	toman en la siguiente vuelta.
+
+	Returns:
+	    dict: created, existing y skipped de todos los lotes
+	"""
+	result = {"created": 0, "existing": 0, "skipped": 0}
+	failed = {}
+
+	while True:
+		pending = get_pending_events()
+		batch = [(event, user) for event, user in pending.items() if event not in failed][:batch_size]
+		if not batch:
+			break
+
+		# Se sacan antes de procesar: un evento que llegue mientras tanto queda para la
+		# siguiente vuelta
+		frappe.cache().hdel(DETECTION_QUEUE_KEY, [event for event, _user in batch])
+
+		events_by_doctype = {}
+		for event, user in batch:
+			doctype, name = event.split(EVENT_SEPARATOR, 1)
+			events_by_doctype.setdefault(doctype, {})[name] = user
+
+		for doctype, events in events_by_doctype.items():
+			try:
+				doctype_result = create_configurations(doctype, events)
+			except Exception as e:
+				frappe.db.rollback()
+				frappe.log_error(
+					f"Error en detección diferida para {doctype} ({len(events)} documentos): {e!s}",
+					"Document Generation Auto Detection",
+				)
+				failed.update((f"{doctype}{EVENT_SEPARATOR}{name}", user) for name, user in events.items())
+				continue
+
+			frappe.db.commit()
+			for key in result:
+				result[key] += doctype_result[key]
+
+	# Los eventos fallidos regresan a la cola para el siguiente job
+	for event, user in failed.items():
+		frappe.cache().hset(DETECTION_QUEUE_KEY, event, user)
+
+	return result
+
+
+def create_configurations(doctype, events):
+	"""
+	Crear en lote las Entity Configuration de documentos de un DocType.
+
+	Replica create_basic_configuration y create_auto_assigned_configuration de
+	api.entity_detection sin cargar ni guardar documento por documento.
+
+	Args:
+	    doctype (str): DocType de los documentos origen
+	    events (dict): name → usuario que lo insertó
+
+	Returns:
+	    dict: created, existing y skipped
+	"""
+	result = {"created": 0, "existing": 0, "skipped": 0}
+	entity_config = get_entity_type(doctype)
+	if not entity_config or not entity_config.requires_configuration:
+		result["skipped"] = len(events)
+		return result
+
+	detection_field = entity_config.detection_field
+	meta = frappe.get_meta(doctype)
+	source_fields = {"name"}
+	if detection_field and meta.has_field(detection_field):
+		source_fields.add(detection_field)
+
+	# Campos del documento origen que los templates copian (source_field)
+	for rule in get_assignment_rules(doctype):
+		template = get_template(rule.target_template)
+		for field in template.template_fields if template else []:
+			if field.get("source_field") and meta.has_field(field["source_field"]):
+				source_fields.add(field["source_field"])
+
+	sources = frappe.get_all(doctype, filters={"name": ["in", list(events)]}, fields=list(source_fields))
+	existing = set(
+		frappe.get_all(
+			"Entity Configuration",
+			filters={
+				"source_doctype": doctype,
+				"source_docname": ["in", [source.name for source in sources]],
+			},
+			pluck="source_docname",
+		)
+	)
+
+	result["skipped"] = len(events) - len(sources)
+	result["existing"] = len(existing)
+	sources = [source for source in sources if source.name not in existing]
+	if not sources:
+		return result
+
+	timestamp = now_datetime()
+	names = reserve_configuration_names(len(sources))
+	configurations, fields, pending_approval = [], [], []
+	for config_name, source in zip(names, sources, strict=True):
+		user = events.get(source.name) or "Administrator"
+		entity_subtype = cstr(source.get(detection_field)) if detection_field else ""
+		rule = get_assignment_rule(doctype, entity_subtype or None)
+		template = get_template(rule.target_template) if rule else None
+
+		if template:
+			pending_approval.append(config_name)
+
+		configurations.append(
+			(
+				config_name,
+				CONFIGURATION_NAMING_SERIES,
+				f"Config-{doctype}-{source.name}",
+				doctype,
+				source.name,
+				entity_subtype,
+				template.template_code if template else None,
+				template.get("target_document") if template else None,
+				template.get("target_section") if template else None,
+				"Pendiente Aprobación" if template else "Borrador",
+				1 if template else 0,
+				1,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+		)
+
+		for idx, field_def in enumerate((template or {}).get("template_fields") or [], start=1):
+			source_field = field_def.get("source_field")
+			field_value = cstr(source.get(source_field)) if source_field else ""
+			fields.append(
+				(
+					frappe.generate_hash(length=10),
+					config_name,
+					"Entity Configuration",
+					"configuration_fields",
+					idx,
+					field_def["field_name"],
+					field_def.get("field_label") or field_def["field_name"],
+					field_def.get("field_type") or "Data",
+					field_value or field_def.get("default_value") or "",
+					cint(field_def.get("is_required")),
+					1,
+					user,
+					timestamp,
+					timestamp,
+					timestamp,
+					user,
+					user,
+				)
+			)
+
+	frappe.db.bulk_insert("Entity Configuration", fields=CONFIGURATION_COLUMNS, values=configurations)
+	if fields:
+		frappe.db.bulk_insert("Configuration Field", fields=FIELD_COLUMNS, values=fields)
+
+	register_source_doctype(doctype)
+	index_configurations(names)
+	result["created"] = len(configurations)
+
+	# Detección de conflictos del lote en una pasada, solo donde está habilitada
+	if pending_approval and is_conflict_detection_enabled(doctype):
+		from condominium_management.document_generation.api.conflict_detection import (
+			detect_portfolio_conflicts,
+		)
+
+		detect_portfolio_conflicts({"name": ["in", pending_approval]})
+
+	_notify_users(doctype, events, dict(zip((source.name for source in sources), names, strict=True)))
+	return result
+
+
+def reserve_configuration_names(count):
+	"""
+	Reservar count nombres consecutivos de CONFIGURATION_NAMING_SERIES.
+
+	Avanza el contador de la serie una sola vez, con la fila bloqueada, en lugar de
+	una actualización por nombre.
+	"""
+	series = NamingSeries(CONFIGURATION_NAMING_SERIES)
+	prefix_and_digits = {}
+
+	def capture_counter(prefix, digits):
+		prefix_and_digits.update(prefix=prefix, digits=digits)
+		return ""
+
+	parse_naming_series(series.series, number_generator=capture_counter)
+	prefix, digits = prefix_and_digits["prefix"], prefix_and_digits["digits"]
+
+	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", prefix)
+	if current:
+		start = cint(current[0][0])
+		frappe.db.sql("UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s", (start + count, prefix))
+	else:
+		start = 0
+		frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+
+	return [f"{prefix}{number:0{digits}d}" for number in range(start + 1, start + count + 1)]
+
+
+def _notify_users(doctype, events, configurations):
+	"""Un evento realtime por usuario con los documentos detectados del lote"""
+	by_user = {}
+	for source_name, config_name in configurations.items():
+		by_user.setdefault(events.get(source_name), []).append(
+			{"name": source_name, "configuration": config_name}
+		)
+
+	for user, documents in by_user.items():
+		if user:
+			frappe.publish_realtime(
+				event="entities_detected_for_configuration",
+				message={"doctype": doctype, "documents": documents},
+				user=user,
+			)
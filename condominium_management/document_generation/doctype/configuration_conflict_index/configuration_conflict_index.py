@@ -0,0 +1,27 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ConfigurationConflictIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Índices del índice de conflictos.
+
+	(dimension, match_key, value_hash) agrupa los valores duplicados;
+	(dimension, field_name, interval_start) ordena los horarios para el barrido.
+	"""
+	frappe.db.add_index(
+		"Configuration Conflict Index",
+		["dimension", "match_key", "value_hash"],
+		index_name="dimension_match_value_index",
+	)
+	frappe.db.add_index(
+		"Configuration Conflict Index",
+		["dimension", "field_name", "interval_start"],
+		index_name="dimension_field_interval_index",
+	)
@@ -5,6 +5,21 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from condominium_management.document_generation.api.document_generation import build_context
+from condominium_management.document_generation.conflict_index import (
+	CONFLICT_DIMENSIONS,
+	get_changed_dimensions,
+	index_configuration,
+	invalidate_configuration,
+	remove_configurations,
+)
+from condominium_management.document_generation.entity_type_registry import (
+	is_conflict_detection_enabled,
+	register_source_doctype,
+)
+from condominium_management.document_generation.template_cache import render_cached_template
+from condominium_management.document_generation.template_registry import get_template, get_template_version
+
 
 class EntityConfiguration(Document):
 	"""
@@ -60,11 +75,18 @@ class EntityConfiguration(Document):
 		"""
 		Procesar después de guardar.
 
-		Detecta conflictos y notifica cambios de estado.
+		Actualiza el índice de conflictos, detecta conflictos y notifica cambios de estado.
 		"""
+		register_source_doctype(self.source_doctype)
+		self.update_conflict_index()
 		self.detect_conflicts_if_enabled()
 		self.notify_status_changes()
 
+	def on_trash(self):
+		"""Quitar la configuración del índice de conflictos."""
+		invalidate_configuration(self)
+		remove_configurations([self.name])
+
 	def validate_source_document(self):
 		"""
 		Validar que el documento origen existe.
@@ -94,8 +116,7 @@ class EntityConfiguration(Document):
 
 		# Obtener template desde Master Template Registry (solo si existe)
 		try:
-			registry = frappe.get_single("Master Template Registry")
-			template = registry.get_template_by_code(self.applied_template)
+			template = get_template(self.applied_template)
 
 			if not template:
 				frappe.throw(_("Template {0} no existe o no está activo").format(self.applied_template))
@@ -123,8 +144,7 @@ class EntityConfiguration(Document):
 
 		# Obtener template para validación (solo si existe)
 		try:
-			registry = frappe.get_single("Master Template Registry")
-			template = registry.get_template_by_code(self.applied_template)
+			template = get_template(self.applied_template)
 
 			if not template:
 				return
@@ -233,28 +253,61 @@ class EntityConfiguration(Document):
 		if self.applied_template and self.has_value_changed("configuration_fields"):
 			self.last_template_sync = frappe.utils.now()
 
+		# Con otro template la próxima propagación debe sincronizar completo
+		if self.has_value_changed("applied_template"):
+			self.template_hash = None
+
+	def update_conflict_index(self):
+		"""
+		Actualizar el índice de conflictos.
+
+		Registra en flags las dimensiones de conflicto que cambiaron con este guardado,
+		para re-evaluar solo esas.
+		"""
+		dimensions = get_changed_dimensions(self, self.get_doc_before_save())
+		dimensions |= index_configuration(self, invalidate=dimensions)
+
+		self.flags.changed_conflict_dimensions = dimensions
+		self.flags.conflicts = None
+
+	def get_conflicts(self):
+		"""
+		Obtener conflictos re-evaluando solo las dimensiones que cambiaron.
+
+		Las demás se sirven de caché, salvo que una vecina la haya invalidado. Se calcula
+		una vez por guardado y lo comparten el controlador y el hook
+		check_configuration_conflicts.
+
+		Returns:
+		    list: Conflictos detectados
+		"""
+		if self.flags.conflicts is None:
+			from condominium_management.document_generation.api.conflict_detection import (
+				get_configuration_conflicts,
+			)
+
+			dimensions = self.flags.changed_conflict_dimensions
+			self.flags.conflicts = get_configuration_conflicts(
+				self, CONFLICT_DIMENSIONS if dimensions is None else dimensions
+			)
+
+		return self.flags.conflicts
+
 	def detect_conflicts_if_enabled(self):
 		"""
 		Detectar conflictos si está habilitado para este tipo de entidad.
 
 		Solo ejecuta detección si el tipo de entidad tiene habilitada
-		la detección de conflictos.
+		la detección de conflictos. Aunque el guardado no cambie nada relevante se
+		consulta: una vecina pudo invalidar la caché de esta configuración.
 		"""
 		if self.configuration_status not in ["Pendiente Aprobación", "Aprobado"]:
 			return
 
 		# Verificar si detección está habilitada
-		entity_config = frappe.db.get_value(
-			"Entity Type Configuration", {"entity_doctype": self.source_doctype}, "conflict_detection_enabled"
-		)
-
-		if entity_config:
+		if is_conflict_detection_enabled(self.source_doctype):
 			try:
-				from condominium_management.document_generation.api.conflict_detection import (
-					detect_configuration_conflicts,
-				)
-
-				conflicts = detect_configuration_conflicts(self.name)
+				conflicts = self.get_conflicts()
 
 				if conflicts:
 					self.handle_detected_conflicts(conflicts)
@@ -359,8 +412,7 @@ class EntityConfiguration(Document):
 
 		# Obtener template (solo si existe)
 		try:
-			registry = frappe.get_single("Master Template Registry")
-			template = registry.get_template_by_code(self.applied_template)
+			template = get_template(self.applied_template)
 
 			if not template or not template.get("template_content"):
 				return ""
@@ -373,7 +425,12 @@ class EntityConfiguration(Document):
 
 		try:
 			# Renderizar template
-			rendered_content = frappe.render_template(template["template_content"], context)
+			rendered_content = render_cached_template(
+				self.applied_template,
+				template["template_content"],
+				context,
+				version=get_template_version(),
+			)
 			return rendered_content
 
 		except Exception as e:
@@ -390,30 +447,10 @@ class EntityConfiguration(Document):
 		Returns:
 		    dict: Contexto con datos del documento origen y campos de configuración
 		"""
-		context = {}
-
-		# Agregar documento origen
 		try:
 			source_doc = frappe.get_doc(self.source_doctype, self.source_docname)
-			context["doc"] = source_doc
-			context["source"] = source_doc.as_dict()
+			source = source_doc.as_dict()
 		except Exception:
-			context["doc"] = {}
-			context["source"] = {}
-
-		# Agregar campos de configuración
-		for field in self.configuration_fields:
-			if field.is_active:
-				context[field.field_name] = field.field_value
-
-		# Agregar metadatos de configuración
-		context["config"] = {
-			"name": self.name,
-			"configuration_name": self.configuration_name,
-			"entity_subtype": self.entity_subtype,
-			"template_code": self.applied_template,
-			"target_document": self.target_document_type,
-			"target_section": self.target_section,
-		}
+			source_doc, source = {}, {}
 
-		return context
+		return build_context(self, source_doc, source, self.configuration_fields)
@@ -4,6 +4,9 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.utils import cint
+
+from condominium_management.document_generation.entity_type_registry import clear_entity_type_index
 
 
 class EntityTypeConfiguration(Document):
@@ -119,6 +122,23 @@ class EntityTypeConfiguration(Document):
 		if self.has_value_changed("auto_detect_on_create") or self.has_value_changed("detection_field"):
 			self.update_existing_configurations()
 
+		# Los hooks universales consultan el índice en caché de tipos de entidad
+		clear_entity_type_index()
+
+		# Los campos de conflicto declarados cambian las entradas del índice de conflictos
+		if self.conflict_fields_changed():
+			frappe.enqueue(
+				"condominium_management.document_generation.conflict_index.reindex_source_doctype",
+				queue="long",
+				timeout=1500,
+				enqueue_after_commit=True,
+				now=frappe.flags.in_test,
+				source_doctype=self.entity_doctype,
+			)
+
+	def on_trash(self):
+		clear_entity_type_index()
+
 	def update_existing_configurations(self):
 		"""
 		Actualizar configuraciones existentes cuando cambia la configuración del tipo.
@@ -140,6 +160,29 @@ class EntityTypeConfiguration(Document):
 					indicator="orange",
 				)
 
+	def conflict_fields_changed(self):
+		"""
+		Verificar si cambió la detección de conflictos o su lista de campos.
+
+		Returns:
+		    bool: True si las configuraciones del tipo deben reindexarse
+		"""
+
+		def signature(doc):
+			return (
+				cint(doc.conflict_detection_enabled),
+				sorted(
+					(field.field_name, field.conflict_type, cint(field.is_active))
+					for field in doc.conflict_fields
+				),
+			)
+
+		previous = self.get_doc_before_save()
+		if not previous:
+			return bool(self.conflict_detection_enabled and self.conflict_fields)
+
+		return signature(previous) != signature(self)
+
 	def get_applicable_document_types(self):
 		"""
 		Obtener lista de tipos de documentos aplicables.
@@ -0,0 +1,58 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+from frappe.utils import cint
+
+from condominium_management.document_generation.doctype.infrastructure_template_definition.infrastructure_template_definition import (
+	InfrastructureTemplateDefinition,
+)
+from condominium_management.document_generation.template_registry import mark_registry_changed
+
+REVISION_FIELDS = ("field_name", "field_type", "is_required", "default_value", "source_field")
+
+
+class InfrastructureTemplate(InfrastructureTemplateDefinition):
+	"""
+	Template de infraestructura publicado en el Master Template Registry.
+
+	Cada template es un registro propio (nombre = template_code), así que guardar
+	uno no carga ni reescribe los demás. Hereda la validación de sintaxis y de campos
+	de Infrastructure Template Definition.
+
+	Parámetros importantes:
+	    template_code (Data): Código único, también nombre del documento
+	    template_revision (Int): Se incrementa con cada cambio de contenido o campos
+	    registry_version (Data): Versión del registro en el último cambio
+
+	Ejemplo de uso:
+	    template = frappe.get_doc("Infrastructure Template", "POOL_AREA")
+	    template.template_content = "..."
+	    template.save()  # Sube la versión del registro y propaga el cambio
+	"""
+
+	def validate(self):
+		super().validate()
+		self.update_revision()
+
+	def update_revision(self):
+		"""Incrementar la revisión si cambió el contenido o los campos del template"""
+		previous = self.get_doc_before_save()
+		if not previous:
+			self.template_revision = cint(self.template_revision) or 1
+			return
+
+		if previous.template_content != self.template_content or _fields_signature(
+			previous
+		) != _fields_signature(self):
+			self.template_revision = cint(previous.template_revision) + 1
+
+	def on_update(self):
+		if not self.flags.from_registry:
+			mark_registry_changed([self.name])
+
+	def on_trash(self):
+		mark_registry_changed([self.name])
+
+
+def _fields_signature(doc):
+	return [tuple(field.get(key) for key in REVISION_FIELDS) for field in doc.template_fields]
@@ -5,6 +5,11 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from condominium_management.document_generation.template_cache import (
+	get_compiled_template,
+	render_cached_template,
+)
+
 
 class InfrastructureTemplateDefinition(Document):
 	"""
@@ -55,8 +60,8 @@ class InfrastructureTemplateDefinition(Document):
 			return
 
 		try:
-			# Usar el validador nativo de Frappe para templates
-			frappe.render_template(self.template_content, {})
+			# Compilar con el entorno Jinja de Frappe; queda en caché para el renderizado
+			get_compiled_template(self.template_code, self.template_content)
 		except Exception as e:
 			frappe.throw(_("Error en sintaxis del template: {0}").format(str(e)))
 
@@ -100,7 +105,7 @@ class InfrastructureTemplateDefinition(Document):
 			context = {}
 
 		try:
-			return frappe.render_template(self.template_content, context)
+			return render_cached_template(self.template_code, self.template_content, context)
 		except Exception as e:
 			frappe.log_error(f"Error renderizando template {self.template_code}: {e!s}")
 			return self.template_content  # Retornar contenido original en caso de error
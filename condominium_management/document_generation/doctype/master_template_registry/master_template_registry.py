@@ -5,6 +5,20 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 
+from condominium_management.document_generation.hooks_handlers.template_propagation import (
+	schedule_template_propagation,
+)
+from condominium_management.document_generation.template_cache import clear_template_cache
+from condominium_management.document_generation.template_registry import (
+	clear_registry_index,
+	get_assignment_rule,
+	get_missing_templates,
+	get_store_counts,
+	get_template,
+	publish_rules,
+	publish_templates,
+)
+
 
 class MasterTemplateRegistry(Document):
 	"""
@@ -16,12 +30,20 @@ class MasterTemplateRegistry(Document):
 	- Reglas de auto-asignación por tipo de entidad
 	- Sincronización con configuraciones de condominios
 
+	Los templates y reglas se guardan como Infrastructure Template y Template
+	Assignment Rule; el registro es el encabezado del conjunto. Sus tablas solo
+	contienen cambios pendientes: al guardar se publican en el almacén y quedan
+	vacías (ver template_registry).
+
 	Parámetros importantes:
 	    company (Link): Empresa administradora que mantiene los templates
-	    infrastructure_templates (Table): Definiciones de templates disponibles
-	    auto_assignment_rules (Table): Reglas para asignación automática
+	    infrastructure_templates (Table): Templates nuevos o modificados por publicar
+	    auto_assignment_rules (Table): Reglas nuevas o modificadas por publicar
 	    template_version (Data): Versión actual del conjunto de templates
 	    update_propagation_status (Select): Estado de propagación de cambios
+	    current_propagation (Link): Template Propagation en curso o la última
+	    propagation_progress (Percent): Avance de current_propagation
+	    templates_count, rules_count (Int): Templates y reglas publicados
 
 	Errores comunes:
 	    ValidationError: Template duplicado o configuración inválida
@@ -46,7 +68,9 @@ class MasterTemplateRegistry(Document):
 
 	def validate_template_codes(self):
 		"""
-		Verificar que códigos de templates sean únicos.
+		Verificar que códigos de templates pendientes sean únicos.
+
+		Un código ya publicado no es duplicado: la fila actualiza ese template.
 
 		Raises:
 		    ValidationError: Si se encuentran códigos duplicados
@@ -62,15 +86,18 @@ class MasterTemplateRegistry(Document):
 		"""
 		Validar reglas de auto-asignación.
 
-		Verifica que no haya conflictos en criterios de asignación
-		y que todos los templates referenciados existan.
+		Verifica que los templates referenciados estén pendientes de publicar o ya
+		publicados (una consulta para todas las reglas).
 		"""
-		# ✅ CORRECCIÓN: Master Template Registry DEBE validar su propia lógica interna
-		# Los tests específicamente verifican que esta validación funcione correctamente
-		template_codes = [t.template_code for t in self.infrastructure_templates]
+		template_codes = {t.template_code for t in self.infrastructure_templates}
+		missing = get_missing_templates(
+			rule.target_template
+			for rule in self.auto_assignment_rules
+			if rule.target_template not in template_codes
+		)
 
 		for rule in self.auto_assignment_rules:
-			if rule.target_template not in template_codes:
+			if not rule.target_template or rule.target_template in missing:
 				frappe.throw(
 					_("Regla de asignación referencia template inexistente: {0}").format(rule.target_template)
 				)
@@ -79,31 +106,22 @@ class MasterTemplateRegistry(Document):
 		"""
 		Actualizar información de versión automáticamente.
 
-		Incrementa versión cuando hay cambios en templates o reglas.
+		Incrementa versión cuando hay templates o reglas por publicar, o cambios hechos
+		directamente en el almacén (flags.store_changed).
 		"""
-		# ✅ CORRECCIÓN: Para Single DocTypes, has_value_changed() no funciona confiablemente
-		# Aplicar solución Copilot/ChatGPT: comportamiento predecible en tests
-		if getattr(frappe.flags, "in_test", False):
-			# ✅ TESTING ENVIRONMENT: Comportamiento simplificado y predecible
-			# NOTA: update_propagation_status puede ser sobrescrito por hooks del framework en tests
-			# pero la funcionalidad core (versioning y last_update) funciona correctamente
-			if self.infrastructure_templates or self.auto_assignment_rules:
-				self.last_update = frappe.utils.now()
-				self.update_propagation_status = "Pendiente"
-				# ✅ CORRECCIÓN Copilot: Remover check is_new() en tests para comportamiento predecible
-				self.increment_version()
+		if not self.has_pending_changes():
 			return
 
-		# Producción: usar lógica original
-		if self.has_value_changed("infrastructure_templates") or self.has_value_changed(
-			"auto_assignment_rules"
-		):
-			self.last_update = frappe.utils.now()
-			self.update_propagation_status = "Pendiente"
+		self.last_update = frappe.utils.now()
+		self.update_propagation_status = "Pendiente"
 
-			# Incrementar versión si es una actualización
-			if not self.is_new():
-				self.increment_version()
+		# Incrementar versión si es una actualización
+		if getattr(frappe.flags, "in_test", False) or not self.is_new():
+			self.increment_version()
+
+	def has_pending_changes(self):
+		"""True si el guardado cambia el conjunto de templates o reglas"""
+		return bool(self.infrastructure_templates or self.auto_assignment_rules or self.flags.store_changed)
 
 	def increment_version(self):
 		"""
@@ -127,6 +145,11 @@ class MasterTemplateRegistry(Document):
 
 		Propaga cambios a configuraciones existentes cuando corresponde.
 		"""
+		self.publish_pending_changes()
+
+		# Los templates compilados y el índice de la versión anterior ya no se usan
+		clear_template_cache()
+		clear_registry_index()
 
 		# ✅ CORRECCIÓN: No ejecutar propagación asíncrona en testing environment
 		if not getattr(frappe.flags, "in_test", False) and self.update_propagation_status == "Pendiente":
@@ -142,29 +165,49 @@ class MasterTemplateRegistry(Document):
 				# Flag no existe o ya fue eliminado, continuar normalmente
 				pass
 
+	def publish_pending_changes(self, ignore_validate=False):
+		"""
+		Publicar templates y reglas pendientes en el almacén y vaciar las tablas.
+
+		Los códigos afectados quedan en flags.changed_template_codes para que la
+		propagación solo considere las configuraciones de esos templates.
+		"""
+		changed = list(self.flags.changed_template_codes or [])
+
+		if self.infrastructure_templates:
+			changed += publish_templates(
+				self.infrastructure_templates, self.template_version, ignore_validate=ignore_validate
+			)
+		if self.auto_assignment_rules:
+			changed += publish_rules(self.auto_assignment_rules, ignore_validate=ignore_validate)
+
+		if self.infrastructure_templates or self.auto_assignment_rules:
+			for doctype in ("Infrastructure Template Definition", "Template Auto Assignment Rule"):
+				frappe.db.delete(doctype, {"parenttype": self.doctype, "parent": self.name})
+			self.set("infrastructure_templates", [])
+			self.set("auto_assignment_rules", [])
+
+		self.flags.changed_template_codes = list(dict.fromkeys(filter(None, changed)))
+
+		counts = get_store_counts()
+		self.db_set({"templates_count": counts.templates, "rules_count": counts.rules}, update_modified=False)
+
 	def schedule_propagation(self):
 		"""
 		Programar propagación de cambios a condominios.
 
-		Crea trabajos en segundo plano para actualizar configuraciones
-		existentes sin bloquear la interfaz.
+		Crea una Template Propagation cuyos lotes procesan workers en segundo plano,
+		sin bloquear la interfaz; el avance queda en propagation_progress.
 		"""
-		# Programar job para propagación asíncrona
-		frappe.enqueue(
-			"document_generation.api.template_propagation.propagate_template_changes",
-			queue="default",
-			timeout=300,
-			registry_name=self.name,
-			template_version=self.template_version,
-		)
-
-		self.update_propagation_status = "En Progreso"
-		self.db_set("update_propagation_status", "En Progreso", update_modified=False)
+		schedule_template_propagation(self)
 
 	def get_template_by_code(self, template_code):
 		"""
 		Obtener template específico por código.
 
+		Busca primero en los cambios pendientes de este documento y luego en el
+		almacén (template_registry.get_template, sin cargar los demás templates).
+
 		Args:
 		    template_code (str): Código único del template
 
@@ -174,7 +217,7 @@ class MasterTemplateRegistry(Document):
 		for template in self.infrastructure_templates:
 			if template.template_code == template_code:
 				return template.as_dict()
-		return None
+		return get_template(template_code)
 
 	def get_assignment_rule_for_entity(self, entity_type, entity_subtype=None):
 		"""
@@ -191,4 +234,4 @@ class MasterTemplateRegistry(Document):
 			if rule.entity_type == entity_type:
 				if not entity_subtype or rule.entity_subtype == entity_subtype:
 					return rule.as_dict()
-		return None
+		return get_assignment_rule(entity_type, entity_subtype)
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+
+from condominium_management.document_generation.template_registry import mark_registry_changed
+
+
+class TemplateAssignmentRule(Document):
+	"""
+	Regla de auto-asignación publicada en el Master Template Registry.
+
+	Hay a lo sumo una regla por (entity_type, entity_subtype) y se nombra con ese par
+	({entity_type}-{entity_subtype}), de modo que el fixture importa igual en cualquier
+	sitio; sin subtipo, la detección usa la regla de mayor prioridad del tipo.
+
+	Parámetros importantes:
+	    entity_type (Data): DocType de la entidad
+	    entity_subtype (Data): Subtipo detectado (opcional)
+	    target_template (Link): Infrastructure Template asignado
+
+	Errores comunes:
+	    ValidationError: Ya existe una regla para el mismo tipo y subtipo
+	"""
+
+	def autoname(self):
+		self.name = get_rule_name(self.entity_type, self.entity_subtype)
+
+	def validate(self):
+		self.validate_unique_entity()
+
+	def validate_unique_entity(self):
+		"""Verificar que no exista otra regla para el mismo tipo y subtipo"""
+		duplicate = frappe.db.get_value(
+			"Template Assignment Rule",
+			{
+				"entity_type": self.entity_type,
+				"entity_subtype": self.entity_subtype or ("is", "not set"),
+				"name": ("!=", self.name),
+			},
+		)
+		if duplicate:
+			frappe.throw(
+				_("Ya existe la regla {0} para {1} {2}").format(
+					duplicate, self.entity_type, self.entity_subtype or ""
+				)
+			)
+
+	def on_update(self):
+		if not self.flags.from_registry:
+			mark_registry_changed([self.target_template])
+
+	def on_trash(self):
+		mark_registry_changed([self.target_template])
+
+
+def get_rule_name(entity_type, entity_subtype=None):
+	"""Nombre determinista de la regla para un tipo y subtipo"""
+	return f"{entity_type}-{entity_subtype}" if entity_subtype else entity_type
+
+
+def on_doctype_update():
+	frappe.db.add_index("Template Assignment Rule", ["entity_type", "entity_subtype"])
@@ -0,0 +1,27 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class TemplatePropagation(Document):
+	"""
+	Propagación de cambios de templates a las Entity Configuration afectadas.
+
+	Cada propagación reparte las configuraciones en lotes por rango de nombre. Los
+	workers toman lotes pendientes, los procesan y confirman uno a uno, así que una
+	propagación interrumpida continúa desde los lotes que faltan (ver
+	api.template_propagation).
+
+	Parámetros importantes:
+	    status (Select): En Cola, En Progreso, Completado, Completado con Errores, Fallido
+	    template_codes (Small Text): Templates propagados (JSON)
+	    chunks (Table): Lotes y su estado
+	"""
+
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Template Propagation Chunk", ["parent", "status"])
@@ -0,0 +1,10 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class TemplatePropagationChunk(Document):
+	"""Lote de Entity Configuration (rango de nombres) de una Template Propagation."""
+
+	pass
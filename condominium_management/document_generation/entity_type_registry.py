@@ -0,0 +1,143 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation - Índice de tipos de entidad
+================================================
+
+Los hooks universales ("*") de auto_detection corren en cada insert y update de
+cualquier DocType del sitio. Para no consultar la base de datos en cada uno, los
+hooks preguntan a este índice:
+
+- entity_types: entity_doctype → Entity Type Configuration (campos de detección)
+- source_doctypes: DocTypes con al menos una Entity Configuration
+- conflict_fields: entity_doctype → {campo: tipo de conflicto} de los Conflict
+  Detection Field activos
+
+Un DocType que no está en el índice sale con una búsqueda en un dict.
+
+El índice vive en dos niveles, igual que el de template_registry:
+
+- Redis (frappe.cache), compartido por todos los workers del sitio.
+- Memoria del proceso, validada contra una versión guardada en Redis una vez por
+  request.
+
+Guardar o borrar un Entity Type Configuration invalida ambos niveles, y también la
+primera Entity Configuration de un DocType nuevo.
+"""
+
+import frappe
+
+from condominium_management.utils import clear_cache_on_transaction_end
+
+ENTITY_TYPE_DOCTYPE = "Entity Type Configuration"
+ENTITY_TYPE_FIELDS = (
+	"entity_doctype",
+	"is_active",
+	"requires_configuration",
+	"auto_detect_on_create",
+	"deferred_detection",
+	"detection_field",
+	"conflict_detection_enabled",
+)
+
+ENTITY_TYPE_INDEX_CACHE_KEY = "document_generation:entity_type_index"
+ENTITY_TYPE_INDEX_VERSION_KEY = "document_generation:entity_type_index_version"
+
+# {sitio: (versión, índice)}
+_process_cache = {}
+
+
+def get_entity_type_index():
+	"""Índice de tipos de entidad del sitio actual"""
+	index = getattr(frappe.local, "document_generation_entity_type_index", None)
+	if index is not None:
+		return index
+
+	version = frappe.cache().get_value(ENTITY_TYPE_INDEX_VERSION_KEY)
+	cached = _process_cache.get(frappe.local.site)
+
+	if version and cached and cached[0] == version:
+		index = cached[1]
+	else:
+		index = frappe.cache().get_value(ENTITY_TYPE_INDEX_CACHE_KEY) if version else None
+		if index is None:
+			index = build_entity_type_index()
+			version = frappe.generate_hash(length=12)
+			frappe.cache().set_value(ENTITY_TYPE_INDEX_CACHE_KEY, index)
+			frappe.cache().set_value(ENTITY_TYPE_INDEX_VERSION_KEY, version)
+		_process_cache[frappe.local.site] = (version, index)
+
+	frappe.local.document_generation_entity_type_index = index
+	return index
+
+
+def build_entity_type_index():
+	"""Compila el índice (tres consultas)"""
+	entity_types = {
+		row.entity_doctype: row
+		for row in frappe.get_all(ENTITY_TYPE_DOCTYPE, fields=list(ENTITY_TYPE_FIELDS))
+	}
+	source_doctypes = frappe.get_all(
+		"Entity Configuration", fields=["source_doctype"], distinct=True, pluck="source_doctype"
+	)
+
+	conflict_fields = {}
+	for row in frappe.get_all(
+		"Conflict Detection Field",
+		filters={"parenttype": ENTITY_TYPE_DOCTYPE, "is_active": 1},
+		fields=["parent", "field_name", "conflict_type"],
+	):
+		conflict_fields.setdefault(row.parent, {})[row.field_name] = row.conflict_type
+
+	return {
+		"entity_types": entity_types,
+		"source_doctypes": frozenset(filter(None, source_doctypes)),
+		"conflict_fields": conflict_fields,
+	}
+
+
+def get_entity_type(doctype):
+	"""Entity Type Configuration activa del DocType o None"""
+	entity_type = get_entity_type_index()["entity_types"].get(doctype)
+	if not entity_type or not entity_type.is_active:
+		return None
+
+	return frappe._dict(entity_type)
+
+
+def is_conflict_detection_enabled(doctype):
+	"""True si el tipo de entidad del DocType tiene detección de conflictos"""
+	entity_type = get_entity_type_index()["entity_types"].get(doctype)
+	return bool(entity_type and entity_type.conflict_detection_enabled)
+
+
+def get_conflict_fields(doctype):
+	"""Campos de conflicto del tipo de entidad (campo → tipo de conflicto); vacío si la
+	detección de conflictos no está habilitada"""
+	if not is_conflict_detection_enabled(doctype):
+		return {}
+
+	return get_entity_type_index()["conflict_fields"].get(doctype, {})
+
+
+def has_configurations(doctype):
+	"""True si algún documento del DocType tiene Entity Configuration"""
+	return doctype in get_entity_type_index()["source_doctypes"]
+
+
+def register_source_doctype(doctype):
+	"""Invalida el índice si es la primera configuración de un DocType"""
+	if doctype and not has_configurations(doctype):
+		clear_entity_type_index()
+
+
+def clear_entity_type_index():
+	"""Invalida el índice en Redis y en memoria; se repite al confirmar o revertir la transacción"""
+	clear_cache_on_transaction_end(_clear_entity_type_index)
+
+
+def _clear_entity_type_index():
+	frappe.cache().delete_value([ENTITY_TYPE_INDEX_CACHE_KEY, ENTITY_TYPE_INDEX_VERSION_KEY])
+	_process_cache.pop(frappe.local.site, None)
+	frappe.local.document_generation_entity_type_index = None
@@ -12,6 +12,24 @@ de documentos y propaga cambios automáticamente.
 import frappe
 from frappe import _
 
+from condominium_management.document_generation.conflict_index import invalidate_configuration
+from condominium_management.document_generation.detection_queue import queue_detection
+from condominium_management.document_generation.entity_type_registry import (
+	get_entity_type,
+	has_configurations,
+)
+from condominium_management.document_generation.template_registry import get_assignment_rule, get_template
+
+
+def skip_universal_hooks():
+	"""
+	Los hooks universales no corren durante instalación, migración, patches ni el
+	setup wizard: ahí se crean documentos de otros módulos cuyos enlaces todavía no
+	existen.
+	"""
+	flags = frappe.flags
+	return bool(flags.in_install or flags.in_migrate or flags.in_patch or flags.in_setup_wizard)
+
 
 def on_document_insert(doc, method):
 	"""
@@ -25,13 +43,12 @@ def on_document_insert(doc, method):
 	    method (str): Método que disparó el hook ('after_insert')
 	"""
 
-	# Solo procesar si el DocType está registrado para configuración
-	entity_config = frappe.db.get_value(
-		"Entity Type Configuration",
-		{"entity_doctype": doc.doctype, "is_active": 1},
-		["requires_configuration", "auto_detect_on_create", "detection_field"],
-		as_dict=True,
-	)
+	if skip_universal_hooks():
+		return
+
+	# Solo procesar si el DocType está registrado para configuración (índice en caché,
+	# sin consultas para DocTypes no registrados)
+	entity_config = get_entity_type(doc.doctype)
 
 	if not entity_config or not entity_config.requires_configuration:
 		return
@@ -39,6 +56,12 @@ def on_document_insert(doc, method):
 	if not entity_config.auto_detect_on_create:
 		return
 
+	# Detección diferida: solo se encola (doctype, name) y un worker crea las
+	# configuraciones en lote; las importaciones siempre van por la cola
+	if entity_config.deferred_detection or frappe.flags.in_import:
+		queue_detection(doc)
+		return
+
 	try:
 		from condominium_management.document_generation.api.entity_detection import (
 			auto_detect_configuration_needed,
@@ -71,6 +94,10 @@ def on_document_update(doc, method):
 	    method (str): Método que disparó el hook ('on_update')
 	"""
 
+	# Sin configuraciones del DocType no hay nada que consultar
+	if skip_universal_hooks() or not has_configurations(doc.doctype):
+		return
+
 	# Verificar si hay configuración existente para este documento
 	existing_configs = frappe.get_all(
 		"Entity Configuration",
@@ -150,11 +177,8 @@ def check_configuration_conflicts(doc, method):
 		return
 
 	try:
-		from condominium_management.document_generation.api.conflict_detection import (
-			detect_configuration_conflicts,
-		)
-
-		conflicts = detect_configuration_conflicts(doc.name)
+		# Mismo resultado que calculó el controlador en on_update, sin re-evaluar
+		conflicts = doc.get_conflicts()
 
 		if conflicts:
 			# Notificar conflictos encontrados
@@ -173,6 +197,8 @@ def check_configuration_conflicts(doc, method):
 			critical_conflicts = [c for c in conflicts if c.get("severity") == "Alta"]
 			if critical_conflicts:
 				doc.db_set("configuration_status", "Requiere Revisión", update_modified=False)
+				# Deja de competir con sus vecinas: sus conflictos en caché ya no valen
+				invalidate_configuration(doc)
 
 	except Exception as e:
 		frappe.log_error(
@@ -242,8 +268,7 @@ def update_configuration_from_source(config_name, source_doc):
 
 			# Verificar si necesita cambio de template (solo si existe)
 			try:
-				registry = frappe.get_single("Master Template Registry")
-				new_rule = registry.get_assignment_rule_for_entity(source_doc.doctype, new_subtype)
+				new_rule = get_assignment_rule(source_doc.doctype, new_subtype)
 
 				if new_rule and new_rule["target_template"] != config.applied_template:
 					config.applied_template = new_rule["target_template"]
@@ -357,5 +382,4 @@ def get_template_by_code(template_code):
 	if not template_code:
 		return None
 
-	registry = frappe.get_single("Master Template Registry")
-	return registry.get_template_by_code(template_code)
+	return get_template(template_code)
@@ -12,6 +12,8 @@ existentes en todos los condominios.
 import frappe
 from frappe import _
 
+from condominium_management.document_generation.api.template_propagation import start_propagation
+
 
 def on_template_update(doc, method):
 	"""
@@ -28,206 +30,63 @@ def on_template_update(doc, method):
 	if doc.update_propagation_status != "Pendiente":
 		return
 
+	schedule_template_propagation(doc)
+
+
+def schedule_template_propagation(doc):
+	"""
+	Programar la propagación de los templates cambiados en este guardado.
+
+	Crea una Template Propagation por lotes (ver api.template_propagation); solo
+	considera las configuraciones de doc.flags.changed_template_codes.
+
+	Args:
+	    doc (Document): Master Template Registry actualizado
+	"""
+
 	try:
 		# Obtener estadísticas de configuraciones afectadas
 		stats = get_affected_configurations_stats(doc)
 
-		if stats["total_configurations"] == 0:
-			# No hay configuraciones que propagar
+		if not doc.flags.changed_template_codes:
+			# No hay templates que propagar
+			doc.update_propagation_status = "Completado"
 			doc.db_set("update_propagation_status", "Completado", update_modified=False)
 			return
 
-		# Programar propagación asíncrona
-		frappe.enqueue(
-			"condominium_management.document_generation.api.template_propagation.propagate_template_changes",
-			queue="default",
-			timeout=900,  # 15 minutos para propagación
-			registry_name=doc.name,
-			template_version=doc.template_version,
-			affected_stats=stats,
-		)
-
-		# Actualizar estado y crear notificaciones
-		doc.db_set("update_propagation_status", "En Progreso", update_modified=False)
-		create_update_notifications(doc, stats)
-
-		frappe.msgprint(
-			_("Propagación de templates iniciada. {0} configuraciones serán actualizadas.").format(
-				stats["total_configurations"]
-			),
-			indicator="blue",
-		)
+		# Programar propagación por lotes; el registro queda En Progreso
+		start_propagation(doc.flags.changed_template_codes, doc.template_version)
+		doc.update_propagation_status = "En Progreso"
+
+		if stats["total_configurations"]:
+			create_update_notifications(doc, stats)
+
+			frappe.msgprint(
+				_("Propagación de templates iniciada. {0} configuraciones serán actualizadas.").format(
+					stats["total_configurations"]
+				),
+				indicator="blue",
+			)
 
 	except Exception as e:
 		frappe.log_error(f"Error iniciando propagación de templates: {e!s}", "Template Propagation Handler")
 		doc.db_set("update_propagation_status", "Fallido", update_modified=False)
 
 
-def propagate_template_changes(registry_name, template_version, affected_stats):
+def propagate_template_changes(registry_name, template_version, affected_stats=None):
 	"""
 	Función asíncrona para propagar cambios de templates.
 
+	Se conserva para jobs ya encolados: delega en la propagación por lotes de
+	api.template_propagation con todos los templates del almacén.
+
 	Args:
 	    registry_name (str): Nombre del Master Template Registry
 	    template_version (str): Versión de templates
 	    affected_stats (dict): Estadísticas de configuraciones afectadas
 	"""
 
-	try:
-		registry = frappe.get_single("Master Template Registry")
-
-		# Obtener todas las configuraciones que usan templates actualizados
-		affected_configs = get_affected_configurations(registry)
-
-		total_updated = 0
-		total_errors = 0
-
-		for config_name in affected_configs:
-			try:
-				config = frappe.get_doc("Entity Configuration", config_name)
-
-				# Sincronizar campos con template actualizado
-				if sync_configuration_fields(config, registry):
-					# Marcar como pendiente de aprobación si estaba aprobado
-					if config.configuration_status == "Aprobado":
-						config.configuration_status = "Pendiente Aprobación"
-
-					config.save()
-					total_updated += 1
-
-			except Exception as e:
-				frappe.log_error(
-					f"Error propagando cambios a configuración {config_name}: {e!s}",
-					"Template Propagation",
-				)
-				total_errors += 1
-
-		# Actualizar estado final
-		if total_errors == 0:
-			registry.db_set("update_propagation_status", "Completado", update_modified=False)
-			status_message = "completada exitosamente"
-		else:
-			registry.db_set("update_propagation_status", "Completado con Errores", update_modified=False)
-			status_message = f"completada con {total_errors} errores"
-
-		# Notificar resultado
-		frappe.publish_realtime(
-			event="template_propagation_completed",
-			message={
-				"registry": registry_name,
-				"template_version": template_version,
-				"total_updated": total_updated,
-				"total_errors": total_errors,
-				"status": status_message,
-			},
-		)
-
-		frappe.db.commit()
-
-	except Exception as e:
-		frappe.log_error(f"Error crítico en propagación de templates: {e!s}", "Template Propagation Critical")
-
-		# Marcar como fallido
-		registry = frappe.get_single("Master Template Registry")
-		registry.db_set("update_propagation_status", "Fallido", update_modified=False)
-		frappe.db.commit()
-
-
-def get_affected_configurations(registry):
-	"""
-	Obtener configuraciones afectadas por cambios en templates.
-
-	Args:
-	    registry (Document): Master Template Registry
-
-	Returns:
-	    list: Lista de nombres de Entity Configuration afectadas
-	"""
-
-	# Obtener códigos de templates que han cambiado
-	template_codes = [t.template_code for t in registry.infrastructure_templates]
-
-	if not template_codes:
-		return []
-
-	# Buscar configuraciones que usan estos templates
-	affected_configs = frappe.get_all(
-		"Entity Configuration",
-		filters={
-			"applied_template": ["in", template_codes],
-			"configuration_status": ["in", ["Borrador", "Pendiente Aprobación", "Aprobado"]],
-		},
-		fields=["name"],
-	)
-
-	return [config["name"] for config in affected_configs]
-
-
-def sync_configuration_fields(config, registry):
-	"""
-	Sincronizar campos de configuración con template actualizado.
-
-	Args:
-	    config (Document): Entity Configuration a sincronizar
-	    registry (Document): Master Template Registry con templates actualizados
-
-	Returns:
-	    bool: True si se realizaron cambios, False en caso contrario
-	"""
-
-	template = registry.get_template_by_code(config.applied_template)
-	if not template:
-		return False
-
-	template_fields = {f["field_name"]: f for f in template.get("template_fields", [])}
-	changes_made = False
-
-	# Actualizar campos existentes
-	for config_field in config.configuration_fields:
-		field_name = config_field.field_name
-
-		if field_name in template_fields:
-			template_field = template_fields[field_name]
-
-			# Actualizar metadatos del campo
-			if config_field.field_label != template_field.get("field_label"):
-				config_field.field_label = template_field.get("field_label")
-				changes_made = True
-
-			if config_field.field_type != template_field.get("field_type"):
-				config_field.field_type = template_field.get("field_type")
-				changes_made = True
-
-			if config_field.is_required != template_field.get("is_required", 0):
-				config_field.is_required = template_field.get("is_required", 0)
-				changes_made = True
-
-		else:
-			# Campo ya no existe en template - marcar para eliminación
-			config_field.is_active = 0
-			changes_made = True
-
-	# Agregar nuevos campos del template
-	existing_fields = [f.field_name for f in config.configuration_fields]
-
-	for field_name, field_def in template_fields.items():
-		if field_name not in existing_fields:
-			config.append(
-				"configuration_fields",
-				{
-					"field_name": field_name,
-					"field_label": field_def.get("field_label"),
-					"field_type": field_def.get("field_type"),
-					"field_value": field_def.get("default_value", ""),
-					"is_required": field_def.get("is_required", 0),
-					"is_active": 1,
-					"created_by": frappe.session.user,
-					"last_updated": frappe.utils.now(),
-				},
-			)
-			changes_made = True
-
-	return changes_made
+	return start_propagation(registry_version=template_version)
 
 
 def update_global_template_version(doc):
@@ -298,7 +157,8 @@ def get_affected_configurations_stats(doc):
 	    dict: Estadísticas de configuraciones afectadas
 	"""
 
-	template_codes = [t.template_code for t in doc.infrastructure_templates]
+	# Solo los templates publicados o modificados en este guardado
+	template_codes = doc.flags.changed_template_codes or []
 
 	if not template_codes:
 		return {"total_configurations": 0}
@@ -6,6 +6,8 @@ import json
 import frappe
 from frappe.utils import add_months, now_datetime
 
+from condominium_management.document_generation.template_registry import get_store_counts
+
 
 def performance_monitoring():
 	"""
@@ -22,12 +24,14 @@ def performance_monitoring():
 			return
 
 		registry = frappe.get_doc("Master Template Registry", registry_name)
+		counts = get_store_counts()
 
-		# Métricas de crecimiento
+		# Métricas de crecimiento; templates y reglas viven en su propio DocType y el
+		# JSON del registro solo incluye el encabezado y los cambios pendientes
 		metrics = {
 			"timestamp": now_datetime().isoformat(),
-			"infrastructure_templates_count": len(registry.infrastructure_templates or []),
-			"auto_assignment_rules_count": len(registry.auto_assignment_rules or []),
+			"infrastructure_templates_count": counts.templates,
+			"auto_assignment_rules_count": counts.rules,
 			"template_version": registry.template_version,
 			"json_size_bytes": len(json.dumps(registry.as_dict())),
 			"json_size_kb": round(len(json.dumps(registry.as_dict())) / 1024, 2),
@@ -48,7 +52,7 @@ def performance_monitoring():
 		if metrics["infrastructure_templates_count"] >= thresholds["templates_critical"]:
 			status = "red"
 			alerts.append(
-				f"🚨 CRÍTICO: {metrics['infrastructure_templates_count']} templates (>= {thresholds['templates_critical']}). Migración a DocTypes separados REQUERIDA."
+				f"🚨 CRÍTICO: {metrics['infrastructure_templates_count']} templates (>= {thresholds['templates_critical']}). Revisar y archivar templates inactivos."
 			)
 		elif metrics["infrastructure_templates_count"] >= thresholds["templates_warning"]:
 			status = "yellow"
@@ -115,8 +119,8 @@ def get_recommendations(metrics, status):
 	if status == "red":
 		recommendations.extend(
 			[
-				"🚨 ACCIÓN INMEDIATA: Implementar migración a DocTypes separados",
-				"📊 Evaluar arquitectura actual vs DocTypes independientes",
+				"🚨 ACCIÓN INMEDIATA: Revisar templates inactivos o duplicados",
+				"📊 Verificar que no queden cambios pendientes sin publicar en el registro",
 				"🔧 Implementar lazy loading para optimizar memoria",
 				"📋 Crear plan de migración de datos existentes",
 			]
@@ -135,7 +139,7 @@ def get_recommendations(metrics, status):
 			[
 				"✅ Performance actual excelente",
 				"📈 Continuar monitoreo mensual",
-				"🔄 Mantener estrategia actual de Single DocType",
+				"🔄 Mantener estrategia actual de templates en DocType independiente",
 			]
 		)
 
@@ -0,0 +1,127 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation - Caché de templates Jinja compilados
+=========================================================
+
+frappe.render_template vuelve a parsear y compilar el contenido en cada llamada. Aquí
+cada template se compila una sola vez por proceso con el entorno Jinja de Frappe y el
+código compilado se guarda en un LRU de tamaño fijo.
+
+El LRU guarda solo código, nunca objetos Template: el entorno de Frappe
+(frappe.local.jenv) se crea por request y sus globales traen la sesión, form_dict,
+idioma y los métodos de frappe.db de ese request. El Template se arma en cada
+llamada con el entorno y los globales del request actual.
+
+La llave es (template_code, versión, hash del contenido): un cambio de contenido nunca
+reutiliza una compilación vieja aunque no se invalide. Al actualizar el Master
+Template Registry se incrementa una generación en Redis; cada proceso la compara una
+vez por request y vacía su LRU si cambió.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import frappe
+from frappe import _
+
+from condominium_management.utils import clear_cache_on_transaction_end
+
+TEMPLATE_CACHE_SIZE = 256
+TEMPLATE_CACHE_GENERATION_KEY = "document_generation:template_cache_generation"
+
+# {sitio: (generación, OrderedDict[llave, código compilado])}
+_process_cache = {}
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def get_compiled_template(template_code, template_content, version=None):
+	"""Template Jinja del request actual para el contenido dado; compila solo si el
+	código no está en caché.
+
+	Args:
+		template_code: Código del template (parte de la llave)
+		template_content: Contenido Jinja
+		version: Versión del template o del registro, si se conoce
+
+	Returns:
+		jinja2.Template
+
+	Raises:
+		ValidationError: Si el contenido usa atributos privados (".__")
+		TemplateSyntaxError: Si la sintaxis Jinja es inválida
+	"""
+	if ".__" in template_content:
+		frappe.throw(_("Template no permitido: {0}").format(template_code))
+
+	cache = _get_site_cache()
+	key = (template_code, version, hashlib.sha1(template_content.encode("utf-8")).hexdigest())
+
+	jenv = frappe.get_jenv()
+	code = cache.get(key)
+	if code is not None:
+		cache.move_to_end(key)
+		_stats["hits"] += 1
+	else:
+		code = jenv.compile(template_content)
+		_stats["misses"] += 1
+
+		cache[key] = code
+		if len(cache) > TEMPLATE_CACHE_SIZE:
+			cache.popitem(last=False)
+
+	# Igual que Environment.from_string, con el código ya compilado
+	return jenv.template_class.from_code(jenv, code, jenv.make_globals(None))
+
+
+def render_cached_template(template_code, template_content, context=None, version=None):
+	"""Renderiza template_content con el template compilado en caché"""
+	if not template_content:
+		return ""
+
+	return get_compiled_template(template_code, template_content, version).render(context or {})
+
+
+def clear_template_cache():
+	"""Vacía el LRU de todos los procesos del sitio; se repite al confirmar o revertir la
+	transacción"""
+	clear_cache_on_transaction_end(_clear_template_cache)
+
+
+def get_template_cache_info():
+	"""Aciertos, fallos y tamaño del LRU del sitio actual"""
+	return frappe._dict(
+		hits=_stats["hits"],
+		misses=_stats["misses"],
+		size=len(_get_site_cache()),
+		max_size=TEMPLATE_CACHE_SIZE,
+	)
+
+
+def _get_site_cache():
+	cache = getattr(frappe.local, "document_generation_template_cache", None)
+	if cache is not None:
+		return cache
+
+	generation = frappe.cache().get_value(TEMPLATE_CACHE_GENERATION_KEY)
+	if not generation:
+		generation = frappe.generate_hash(length=12)
+		frappe.cache().set_value(TEMPLATE_CACHE_GENERATION_KEY, generation)
+
+	cached = _process_cache.get(frappe.local.site)
+	if cached and cached[0] == generation:
+		cache = cached[1]
+	else:
+		cache = OrderedDict()
+		_process_cache[frappe.local.site] = (generation, cache)
+
+	frappe.local.document_generation_template_cache = cache
+	return cache
+
+
+def _clear_template_cache():
+	frappe.cache().delete_value(TEMPLATE_CACHE_GENERATION_KEY)
+	_process_cache.pop(frappe.local.site, None)
+	frappe.local.document_generation_template_cache = None
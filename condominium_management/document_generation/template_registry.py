@@ -0,0 +1,341 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Document Generation - Almacén e índice de templates
+===================================================
+
+Los templates y las reglas de auto-asignación se guardan como registros
+independientes (Infrastructure Template, Template Assignment Rule). El Master
+Template Registry es solo el encabezado: versión, estado de propagación, conteos y
+dos tablas de cambios pendientes que se publican en el almacén al guardar y quedan
+vacías. Cargar, validar y guardar el registro cuesta lo que los templates cambiados,
+no el total.
+
+Las búsquedas usan un índice compilado desde el almacén:
+
+- templates: template_code → template (con sus template_fields y content_hash)
+- rules: (entity_type, entity_subtype) → regla, y entity_type → regla de mayor prioridad
+- template_version del registro
+
+El índice vive en dos niveles, igual que el grafo de reglas de physical_spaces:
+
+- Redis (frappe.cache), compartido por todos los workers del sitio.
+- Memoria del proceso, validada contra una versión guardada en Redis una vez por
+  request.
+
+Cada actualización del registro invalida ambos niveles al momento y de nuevo al
+confirmar la transacción.
+"""
+
+import hashlib
+
+import frappe
+from frappe.model import child_table_fields, default_fields
+
+from condominium_management.utils import clear_cache_on_transaction_end
+
+REGISTRY_DOCTYPE = "Master Template Registry"
+TEMPLATE_DOCTYPE = "Infrastructure Template"
+RULE_DOCTYPE = "Template Assignment Rule"
+
+TEMPLATE_FIELDS = (
+	"template_name",
+	"infrastructure_type",
+	"infrastructure_subtype",
+	"target_document",
+	"target_section",
+	"is_active",
+	"template_content",
+)
+RULE_FIELDS = ("target_template", "priority", "is_active")
+
+# Lo que la propagación copia del template a cada Entity Configuration
+SYNC_FIELDS = ("target_document", "target_section")
+SYNC_FIELD_PROPERTIES = ("field_name", "field_label", "field_type", "is_required", "default_value")
+
+REGISTRY_INDEX_CACHE_KEY = "document_generation:registry_index"
+REGISTRY_INDEX_VERSION_KEY = "document_generation:registry_index_version"
+
+# {sitio: (versión, índice)}
+_process_cache = {}
+
+
+def get_registry_index():
+	"""Índice compilado del almacén de templates del sitio actual"""
+	index = getattr(frappe.local, "document_generation_registry_index", None)
+	if index is not None:
+		return index
+
+	version = frappe.cache().get_value(REGISTRY_INDEX_VERSION_KEY)
+	cached = _process_cache.get(frappe.local.site)
+
+	if version and cached and cached[0] == version:
+		index = cached[1]
+	else:
+		index = frappe.cache().get_value(REGISTRY_INDEX_CACHE_KEY) if version else None
+		if index is None:
+			index = build_registry_index()
+			version = frappe.generate_hash(length=12)
+			frappe.cache().set_value(REGISTRY_INDEX_CACHE_KEY, index)
+			frappe.cache().set_value(REGISTRY_INDEX_VERSION_KEY, version)
+		_process_cache[frappe.local.site] = (version, index)
+
+	frappe.local.document_generation_registry_index = index
+	return index
+
+
+def build_registry_index():
+	"""Compila el índice desde el almacén (cuatro consultas en total)"""
+	templates = {}
+	for row in frappe.get_all(TEMPLATE_DOCTYPE, fields=["*"], order_by="template_code asc"):
+		row.template_fields = []
+		templates[row.name] = row
+
+	if templates:
+		for field in frappe.get_all(
+			"Template Field Definition",
+			filters={"parenttype": TEMPLATE_DOCTYPE},
+			fields=["*"],
+			order_by="idx asc",
+		):
+			if field.parent in templates:
+				templates[field.parent].template_fields.append(field)
+
+	for template in templates.values():
+		template.content_hash = get_template_hash(template)
+
+	rules = {}
+	rules_by_type = {}
+	for rule in frappe.get_all(RULE_DOCTYPE, fields=["*"], order_by="priority desc, creation asc"):
+		rules.setdefault((rule.entity_type, rule.entity_subtype or None), rule)
+		rules_by_type.setdefault(rule.entity_type, rule)
+
+	return {
+		"template_version": frappe.db.get_single_value(REGISTRY_DOCTYPE, "template_version"),
+		"templates": templates,
+		"rules": rules,
+		"rules_by_type": rules_by_type,
+	}
+
+
+def get_template(template_code):
+	"""Template del registro por código o None si no existe"""
+	if not template_code:
+		return None
+
+	template = get_registry_index()["templates"].get(template_code)
+	return frappe._dict(template) if template else None
+
+
+def get_assignment_rule(entity_type, entity_subtype=None):
+	"""Regla de auto-asignación para el tipo (y subtipo) de entidad o None.
+
+	Sin subtipo aplica la regla de mayor prioridad del tipo.
+	"""
+	index = get_registry_index()
+	if entity_subtype:
+		rule = index["rules"].get((entity_type, entity_subtype))
+	else:
+		rule = index["rules_by_type"].get(entity_type)
+
+	return frappe._dict(rule) if rule else None
+
+
+def get_assignment_rules(entity_type):
+	"""Todas las reglas de auto-asignación del tipo de entidad"""
+	return [
+		frappe._dict(rule)
+		for (rule_type, _subtype), rule in get_registry_index()["rules"].items()
+		if rule_type == entity_type
+	]
+
+
+def get_templates():
+	"""Todos los templates del registro ordenados por código"""
+	return [frappe._dict(template) for template in get_registry_index()["templates"].values()]
+
+
+def get_template_codes():
+	"""Códigos de todos los templates del registro"""
+	return list(get_registry_index()["templates"])
+
+
+def get_template_snapshot(template):
+	"""Parte del template que la propagación copia a cada configuración.
+
+	Returns:
+		dict: target_document, target_section y fields ({field_name: propiedades})
+	"""
+	return {
+		**{field: template.get(field) for field in SYNC_FIELDS},
+		"fields": {
+			field.get("field_name"): {prop: field.get(prop) for prop in SYNC_FIELD_PROPERTIES}
+			for field in template.get("template_fields") or []
+		},
+	}
+
+
+def get_template_hash(template):
+	"""Hash de get_template_snapshot.
+
+	Dos templates con el mismo hash producen la misma configuración, aunque cambien
+	nombre, contenido Jinja u otros campos que no se copian.
+	"""
+	snapshot = template if "fields" in template else get_template_snapshot(template)
+	# Independiente del orden de claves para que un snapshot leído de JSON dé el mismo hash
+	content = [
+		[snapshot.get(field) for field in SYNC_FIELDS],
+		[
+			[properties.get(prop) for prop in SYNC_FIELD_PROPERTIES]
+			for _name, properties in sorted(snapshot["fields"].items())
+		],
+	]
+	return hashlib.sha1(frappe.as_json(content, indent=None).encode()).hexdigest()
+
+
+def diff_template_snapshots(previous, current):
+	"""Diferencia de campos entre dos snapshots de un template.
+
+	Returns:
+		dict: base_hash y target_hash de los snapshots, destino actual y los campos
+			added, removed (nombres) y changed; None sin snapshot anterior
+	"""
+	if not previous:
+		return None
+
+	previous_fields, current_fields = previous["fields"], current["fields"]
+	return {
+		"base_hash": get_template_hash(previous),
+		"target_hash": get_template_hash(current),
+		**{field: current.get(field) for field in SYNC_FIELDS},
+		"target_changed": any(previous.get(field) != current.get(field) for field in SYNC_FIELDS),
+		"added": [properties for name, properties in current_fields.items() if name not in previous_fields],
+		"removed": [name for name in previous_fields if name not in current_fields],
+		"changed": [
+			properties
+			for name, properties in current_fields.items()
+			if name in previous_fields and previous_fields[name] != properties
+		],
+	}
+
+
+def get_template_version():
+	"""Versión actual del conjunto de templates"""
+	return get_registry_index()["template_version"]
+
+
+def publish_templates(rows, registry_version=None, ignore_validate=False):
+	"""Crea o actualiza un Infrastructure Template por fila.
+
+	Args:
+		rows: Filas con template_code y los campos de TEMPLATE_FIELDS (y opcionalmente
+			template_fields); lo que la fila no trae se conserva del template existente
+		registry_version: Versión del registro con la que se publican
+		ignore_validate: Publicar sin validar sintaxis (migración de datos existentes)
+
+	Returns:
+		list: Códigos de los templates publicados
+	"""
+	codes = [row.get("template_code") for row in rows]
+	existing = set(frappe.get_all(TEMPLATE_DOCTYPE, filters={"name": ["in", codes]}, pluck="name"))
+
+	for row in rows:
+		if row.get("template_code") in existing:
+			template = frappe.get_doc(TEMPLATE_DOCTYPE, row.get("template_code"))
+		else:
+			template = frappe.new_doc(TEMPLATE_DOCTYPE)
+			template.template_code = row.get("template_code")
+
+		# Los campos sin valor en la fila conservan los del template o los por defecto
+		template.update({field: row.get(field) for field in TEMPLATE_FIELDS if row.get(field) is not None})
+		if row.get("template_fields"):
+			template.set("template_fields", [_child_values(field) for field in row.get("template_fields")])
+
+		template.registry_version = registry_version
+		template.flags.from_registry = True
+		template.flags.ignore_validate = ignore_validate
+		template.save(ignore_permissions=True)
+
+	return codes
+
+
+def publish_rules(rows, ignore_validate=False):
+	"""Crea o actualiza un Template Assignment Rule por (entity_type, entity_subtype).
+
+	Returns:
+		list: Templates destino de las reglas publicadas
+	"""
+	existing = {
+		(rule.entity_type, rule.entity_subtype or None): rule.name
+		for rule in frappe.get_all(
+			RULE_DOCTYPE,
+			filters={"entity_type": ["in", list({row.get("entity_type") for row in rows})]},
+			fields=["name", "entity_type", "entity_subtype"],
+		)
+	}
+
+	for row in rows:
+		key = (row.get("entity_type"), row.get("entity_subtype") or None)
+		if key in existing:
+			rule = frappe.get_doc(RULE_DOCTYPE, existing[key])
+		else:
+			rule = frappe.new_doc(RULE_DOCTYPE)
+			rule.entity_type, rule.entity_subtype = key
+
+		rule.update({field: row.get(field) for field in RULE_FIELDS if row.get(field) is not None})
+		rule.flags.from_registry = True
+		rule.flags.ignore_validate = ignore_validate
+		rule.flags.ignore_links = ignore_validate
+		rule.save(ignore_permissions=True)
+		existing[key] = rule.name
+
+	return [row.get("target_template") for row in rows]
+
+
+def get_missing_templates(template_codes):
+	"""Códigos que no existen en el almacén (una consulta)"""
+	template_codes = set(filter(None, template_codes))
+	if not template_codes:
+		return []
+
+	existing = frappe.get_all(TEMPLATE_DOCTYPE, filters={"name": ["in", list(template_codes)]}, pluck="name")
+	return sorted(template_codes - set(existing))
+
+
+def mark_registry_changed(template_codes):
+	"""Registra en el encabezado un cambio hecho directamente en el almacén.
+
+	Guarda el registro (sin filas pendientes, solo el encabezado) para que suba la
+	versión, se invaliden las cachés y se propague a las configuraciones afectadas.
+	"""
+	registry = frappe.get_single(REGISTRY_DOCTYPE)
+	registry.flags.store_changed = True
+	registry.flags.changed_template_codes = list(template_codes)
+	registry.save(ignore_permissions=True)
+
+
+def get_store_counts():
+	"""Templates y reglas publicados"""
+	return frappe._dict(
+		templates=frappe.db.count(TEMPLATE_DOCTYPE),
+		rules=frappe.db.count(RULE_DOCTYPE),
+	)
+
+
+def clear_registry_index():
+	"""Invalida el índice en Redis y en memoria; se repite al confirmar o revertir la transacción"""
+	clear_cache_on_transaction_end(_clear_registry_index)
+
+
+def _child_values(row):
+	if hasattr(row, "as_dict"):
+		return row.as_dict(no_default_fields=True)
+
+	return {key: value for key, value in row.items() if key not in (*default_fields, *child_table_fields)}
+
+
+def _clear_registry_index():
+	frappe.cache().delete_value([REGISTRY_INDEX_CACHE_KEY, REGISTRY_INDEX_VERSION_KEY])
+	_process_cache.pop(frappe.local.site, None)
+	frappe.local.document_generation_registry_index = None
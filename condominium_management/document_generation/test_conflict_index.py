@@ -0,0 +1,235 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests del índice de conflictos entre configuraciones (conflict_index) y de la
+detección de conflictos que lo usa.
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.document_generation import conflict_index, entity_type_registry
+from condominium_management.document_generation.api import conflict_detection
+
+
+class TestConflictIndex(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+
+	def tearDown(self):
+		frappe.db.delete(
+			"Conflict Detection Field", {"parenttype": "Entity Type Configuration", "parent": "User"}
+		)
+		frappe.db.delete("Entity Type Configuration", {"entity_doctype": "User"})
+		entity_type_registry.clear_entity_type_index()
+		names = frappe.get_all(
+			"Entity Configuration", filters={"configuration_name": ["like", "CTEST%"]}, pluck="name"
+		)
+		if names:
+			conflict_index.remove_configurations(names)
+			frappe.db.delete("Configuration Field", {"parent": ["in", names]})
+			frappe.db.delete("Entity Configuration", {"name": ["in", names]})
+		frappe.db.commit()
+
+	def create_configuration(self, index, location, schedule, status="Aprobado"):
+		config = frappe.get_doc(
+			{
+				"doctype": "Entity Configuration",
+				"naming_series": "EC-.YYYY.-",
+				"configuration_name": f"CTEST Conflictos {index}",
+				"configuration_status": "Borrador",
+				"source_doctype": "User",
+				"source_docname": "Administrator",
+				"entity_subtype": "CTEST",
+				"configuration_fields": [
+					{
+						"field_name": "ubicacion_principal",
+						"field_label": "Ubicación",
+						"field_type": "Data",
+						"field_value": location,
+					},
+					{
+						"field_name": "horario_uso",
+						"field_label": "Horario de Uso",
+						"field_type": "Datetime",
+						"field_value": schedule,
+					},
+					{
+						"field_name": "descripcion",
+						"field_label": "Descripción",
+						"field_type": "Text",
+						"field_value": "Configuración de prueba",
+					},
+				],
+			}
+		).insert(ignore_permissions=True)
+
+		# El estado se asigna directo para que los hooks no cambien el escenario
+		frappe.db.set_value("Entity Configuration", config.name, "configuration_status", status)
+		return config.name
+
+	def test_schedule_interval_parsing(self):
+		"""Horas, rangos, fechas y rangos que cruzan la medianoche se convierten a intervalos"""
+		self.assertEqual(conflict_index.parse_schedule_interval("08:00-12:00"), (28800, 43200))
+		self.assertEqual(conflict_index.parse_schedule_interval("08:00"), (28800, 28801))
+		self.assertEqual(conflict_index.parse_schedule_interval("22:00 a 06:00"), (79200, 108000))
+		self.assertIsNone(conflict_index.parse_schedule_interval("todo el día"))
+
+		start, end = conflict_index.parse_schedule_interval("2026-10-19 08:00:00 - 2026-10-19 10:00:00")
+		self.assertEqual(end - start, 7200)
+
+	def test_sweep_finds_only_overlapping_schedules(self):
+		"""El barrido reporta traslapes y no intervalos contiguos"""
+
+		def entry(config, start, end):
+			return frappe._dict(
+				configuration=config,
+				source_doctype="User",
+				entity_subtype="",
+				field_name="horario_uso",
+				value_hash=f"{start}-{end}",
+				interval_start=start,
+				interval_end=end,
+			)
+
+		entries = [entry("A", 8, 10), entry("B", 9, 11), entry("C", 10, 12), entry("D", 20, 21)]
+		overlaps = {
+			tuple(sorted((first.configuration, second.configuration)))
+			for first, second in conflict_index.find_schedule_overlaps(entries)
+		}
+
+		self.assertEqual(overlaps, {("A", "B"), ("B", "C")})
+
+	def test_conflicts_are_found_through_index(self):
+		"""Ubicaciones normalizadas iguales y horarios traslapados se detectan en el índice"""
+		first = self.create_configuration(1, "Torre A", "2026-10-19 08:00:00 - 2026-10-19 10:00:00")
+		second = self.create_configuration(2, "  torre   a ", "2026-10-19 09:00:00 - 2026-10-19 11:00:00")
+		third = self.create_configuration(3, "Torre B", "2026-10-19 11:00:00 - 2026-10-19 12:00:00")
+		self.create_configuration(4, "Torre A", "2026-10-19 08:00:00 - 2026-10-19 12:00:00", "Borrador")
+
+		conflicts = conflict_detection.detect_configuration_conflicts(first)
+		by_type = {conflict["type"]: conflict for conflict in conflicts}
+
+		self.assertEqual(by_type["location_duplicate"]["conflicting_configs"], [second])
+		self.assertEqual(by_type["schedule_conflict"]["conflicting_config"], second)
+		self.assertFalse(conflict_detection.detect_configuration_conflicts(third))
+
+		# La pasada de portafolio da el mismo resultado que la detección individual
+		portfolio = conflict_detection.detect_portfolio_conflicts({"entity_subtype": "CTEST"})
+		self.assertEqual(set(portfolio), {first, second, third})
+		for name in (first, second, third):
+			self.assertEqual(portfolio[name], conflict_detection.detect_configuration_conflicts(name))
+
+	def test_portfolio_queries_do_not_grow_with_configurations(self):
+		"""Benchmark: el resumen cuesta las mismas consultas con 5 o 50 configuraciones"""
+		query_counts = []
+		for count in (5, 50):
+			for index in range(count):
+				self.create_configuration(
+					index, f"Torre {index % 3}", f"2026-10-19 {8 + index % 10:02d}:00:00"
+				)
+
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				summary = conflict_detection.get_conflict_summary({"entity_subtype": "CTEST"})
+
+			self.assertEqual(summary["total_configurations"], count)
+			query_counts.append(sql_spy.call_count)
+			self.tearDown()
+
+		self.assertEqual(query_counts[0], query_counts[1])
+
+	def set_field_value(self, config_name, field_name, value):
+		config = frappe.get_doc("Entity Configuration", config_name)
+		config.get("configuration_fields", {"field_name": field_name})[0].field_value = value
+		config.save(ignore_permissions=True)
+		return config
+
+	def test_irrelevant_change_is_served_from_cache(self):
+		"""Cambiar un campo sin relevancia no re-evalúa conflictos; una ubicación solo
+		re-evalúa ubicaciones"""
+		name = self.create_configuration(1, "Torre A", "2026-10-19 08:00:00")
+		conflict_detection.detect_configuration_conflicts(name)
+
+		with (
+			patch.object(conflict_detection, "detect_schedule_conflicts", return_value=[]) as schedule,
+			patch.object(conflict_detection, "detect_location_conflicts", return_value=[]) as location,
+		):
+			config = self.set_field_value(name, "descripcion", "Otra descripción")
+			self.assertEqual(config.flags.changed_conflict_dimensions, set())
+			location.assert_not_called()
+
+			config = self.set_field_value(name, "ubicacion_principal", "Torre C")
+			self.assertEqual(config.flags.changed_conflict_dimensions, {conflict_index.LOCATION})
+			location.assert_called_once()
+			schedule.assert_not_called()
+
+	def test_neighbor_change_invalidates_cached_conflicts(self):
+		"""La caché de una configuración se invalida cuando cambia una vecina relevante"""
+		first = self.create_configuration(1, "Torre A", "2026-10-19 08:00:00")
+		second = self.create_configuration(2, "Torre A", "2026-10-19 20:00:00")
+		third = self.create_configuration(3, "Torre B", "2026-10-19 22:00:00")
+		for name in (first, third):
+			conflict_detection.detect_configuration_conflicts(name)
+
+		self.assertEqual(
+			conflict_index.get_cached_conflicts(first, conflict_index.LOCATION)[0]["conflicting_configs"],
+			[second],
+		)
+
+		self.set_field_value(second, "ubicacion_principal", "Torre D")
+
+		self.assertIsNone(conflict_index.get_cached_conflicts(first, conflict_index.LOCATION))
+		self.assertIsNotNone(conflict_index.get_cached_conflicts(third, conflict_index.LOCATION))
+		self.assertIsNotNone(conflict_index.get_cached_conflicts(first, conflict_index.SCHEDULE))
+		self.assertFalse(conflict_detection.detect_configuration_conflicts(first))
+
+		# Guardar la configuración invalidada sin cambios relevantes vuelve a evaluarla
+		conflict_index.clear_cached_conflicts([first])
+		config = self.set_field_value(first, "descripcion", "Otra descripción")
+		self.assertEqual(config.flags.changed_conflict_dimensions, set())
+		self.assertIsNotNone(conflict_index.get_cached_conflicts(first, conflict_index.LOCATION))
+
+	def test_declared_conflict_fields_are_indexed(self):
+		"""Un campo declarado en la lista de campos de conflicto del tipo de entidad entra a su
+		dimensión aunque su nombre no coincida con los patrones"""
+		name = self.create_configuration(1, "Torre A", "2026-10-19 08:00:00")
+		config = frappe.get_doc("Entity Configuration", name)
+		config.append(
+			"configuration_fields",
+			{
+				"field_name": "bio",
+				"field_label": "Notas",
+				"field_type": "Data",
+				"field_value": "Bomba principal",
+			},
+		)
+		config.save(ignore_permissions=True)
+		self.assertFalse(
+			frappe.db.exists(
+				conflict_index.CONFLICT_INDEX_DOCTYPE,
+				{"configuration": name, "dimension": conflict_index.RESOURCE},
+			)
+		)
+
+		frappe.get_doc(
+			{
+				"doctype": "Entity Type Configuration",
+				"entity_doctype": "User",
+				"entity_name": "Usuario",
+				"entity_name_plural": "Usuarios",
+				"owning_module": "Document Generation",
+				"is_active": 1,
+				"conflict_detection_enabled": 1,
+				"conflict_fields": [{"field_name": "bio", "conflict_type": "Recurso"}],
+			}
+		).insert(ignore_permissions=True)
+
+		self.assertTrue(
+			frappe.db.exists(
+				conflict_index.CONFLICT_INDEX_DOCTYPE,
+				{"configuration": name, "dimension": conflict_index.RESOURCE, "field_name": "bio"},
+			)
+		)
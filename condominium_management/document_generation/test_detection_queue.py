@@ -0,0 +1,164 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de la cola de auto-detección diferida (detection_queue).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.document_generation import detection_queue, entity_type_registry
+
+
+class TestDetectionQueue(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		frappe.cache().delete_value(detection_queue.DETECTION_QUEUE_KEY)
+		frappe.get_doc(
+			{
+				"doctype": "Entity Type Configuration",
+				"entity_doctype": "Note",
+				"entity_name": "Nota",
+				"entity_name_plural": "Notas",
+				"owning_module": "Document Generation",
+				"is_active": 1,
+				"requires_configuration": 1,
+				"auto_detect_on_create": 1,
+				"deferred_detection": 1,
+				"applies_to_reglamento": 1,
+			}
+		).insert(ignore_permissions=True)
+		entity_type_registry.clear_entity_type_index()
+
+	def tearDown(self):
+		frappe.local.document_generation_detection_events = None
+		frappe.cache().delete_value(detection_queue.DETECTION_QUEUE_KEY)
+		frappe.db.delete("Entity Configuration", {"source_doctype": "Note"})
+		frappe.db.delete("Note", {"title": ["like", "CTEST%"]})
+		frappe.db.delete("Entity Type Configuration", {"entity_doctype": "Note"})
+		entity_type_registry.clear_entity_type_index()
+		frappe.db.commit()
+
+	def insert_notes(self, count):
+		return [
+			frappe.get_doc({"doctype": "Note", "title": f"CTEST Nota {index}"})
+			.insert(ignore_permissions=True)
+			.name
+			for index in range(count)
+		]
+
+	def flush(self):
+		with patch.object(detection_queue, "enqueue_detection_job") as enqueue:
+			detection_queue.flush_detection_events()
+		return enqueue
+
+	def test_insert_only_queues_event(self):
+		"""El insert no crea la configuración; solo deja el evento para el worker"""
+		names = self.insert_notes(1)
+
+		self.assertFalse(frappe.db.exists("Entity Configuration", {"source_docname": names[0]}))
+		enqueue = self.flush()
+
+		enqueue.assert_called_once()
+		self.assertEqual(list(detection_queue.get_pending_events()), [f"Note|{names[0]}"])
+
+	def test_events_are_coalesced(self):
+		"""Registrar varias veces el mismo documento deja un solo evento"""
+		note = frappe.get_doc({"doctype": "Note", "title": "CTEST Repetida"}).insert(ignore_permissions=True)
+		for _index in range(3):
+			detection_queue.queue_detection(note)
+		self.flush()
+
+		self.assertEqual(len(detection_queue.get_pending_events()), 1)
+
+	def test_worker_creates_configurations_in_batch(self):
+		"""El worker crea una configuración por documento con nombres consecutivos de la serie"""
+		names = self.insert_notes(20)
+		self.flush()
+
+		result = detection_queue.process_detection_queue()
+
+		self.assertEqual(result["created"], 20)
+		configurations = frappe.get_all(
+			"Entity Configuration",
+			filters={"source_doctype": "Note"},
+			fields=["name", "source_docname", "configuration_status", "naming_series"],
+			order_by="name asc",
+		)
+		self.assertEqual(sorted(config.source_docname for config in configurations), sorted(names))
+		self.assertEqual({config.configuration_status for config in configurations}, {"Borrador"})
+		self.assertEqual(len({config.name for config in configurations}), 20)
+		self.assertFalse(detection_queue.get_pending_events())
+
+		# Un segundo evento del mismo documento no duplica su configuración
+		detection_queue.queue_detection(frappe.get_doc("Note", names[0]))
+		self.flush()
+		self.assertEqual(detection_queue.process_detection_queue()["existing"], 1)
+
+	def test_batch_queries_do_not_grow_with_documents(self):
+		"""Benchmark: procesar 100 eventos cuesta las mismas consultas que procesar uno"""
+		query_counts = []
+		for count in (1, 100):
+			self.insert_notes(count)
+			self.flush()
+
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				result = detection_queue.process_detection_queue()
+
+			self.assertEqual(result["created"], count)
+			query_counts.append(sql_spy.call_count)
+			frappe.db.delete("Entity Configuration", {"source_doctype": "Note"})
+			frappe.db.delete("Note", {"title": ["like", "CTEST%"]})
+
+		self.assertEqual(query_counts[0], query_counts[1])
+
+	def test_job_drains_more_than_one_batch(self):
+		"""El job encolado vacía la cola completa, incluidos eventos que llegan durante un lote"""
+		names = self.insert_notes(detection_queue.DETECTION_BATCH_SIZE + 20)
+		late = frappe.get_doc({"doctype": "Note", "title": "CTEST Tardía"}).insert(ignore_permissions=True)
+		frappe.local.document_generation_detection_events.pop(f"Note|{late.name}")
+		create_configurations = detection_queue.create_configurations
+		late_received = []
+
+		def create_and_receive_event(doctype, events):
+			# El evento tardío llega mientras se procesa el primer lote
+			if late.name not in events and not late_received:
+				late_received.append(late.name)
+				frappe.cache().hset(detection_queue.DETECTION_QUEUE_KEY, f"Note|{late.name}", "Administrator")
+			return create_configurations(doctype, events)
+
+		with patch.object(detection_queue, "create_configurations", side_effect=create_and_receive_event):
+			# Pasa por enqueue_detection_job real (en tests corre en el mismo proceso)
+			detection_queue.flush_detection_events()
+
+		self.assertFalse(detection_queue.get_pending_events())
+		self.assertEqual(frappe.db.count("Entity Configuration", {"source_doctype": "Note"}), len(names) + 1)
+
+	def test_failed_batch_returns_to_queue(self):
+		"""Los eventos de un lote que falla regresan a la cola en lugar de perderse"""
+		names = self.insert_notes(3)
+		self.flush()
+
+		with patch.object(detection_queue, "create_configurations", side_effect=Exception("falla")):
+			result = detection_queue.process_detection_queue()
+
+		self.assertEqual(result["created"], 0)
+		self.assertEqual(
+			sorted(detection_queue.get_pending_events()),
+			sorted(f"Note|{name}" for name in names),
+		)
+
+	def test_rollback_discards_events_and_rearms_flush(self):
+		"""Tras un rollback los eventos revertidos se descartan y los siguientes sí se escriben"""
+		detection_queue.queue_detection(frappe._dict(doctype="Note", name="CTEST-REVERTIDA"))
+		frappe.db.rollback()
+		self.assertIsNone(frappe.local.document_generation_detection_events)
+
+		detection_queue.queue_detection(frappe._dict(doctype="Note", name="CTEST-CONFIRMADA"))
+		with patch.object(detection_queue, "enqueue_detection_job"):
+			frappe.db.commit()
+
+		self.assertEqual(list(detection_queue.get_pending_events()), ["Note|CTEST-CONFIRMADA"])
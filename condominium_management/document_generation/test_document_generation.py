@@ -0,0 +1,135 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de la generación masiva de documentos (api.document_generation).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.model.document import Document
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.document_generation import template_registry
+from condominium_management.document_generation.api import document_generation
+from condominium_management.test_factories import TestDataFactory
+
+TEMPLATE_CODE = "CTEST_BULK_TEMPLATE"
+
+REGISTRY_INDEX = {
+	"template_version": "1.2.0",
+	"templates": {
+		TEMPLATE_CODE: {
+			"template_code": TEMPLATE_CODE,
+			"template_content": "{{ config.configuration_name }} - {{ source.name }} - {{ piso }}",
+		}
+	},
+	"rules": {},
+	"rules_by_type": {},
+}
+
+
+class TestBulkDocumentGeneration(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.configurations = []
+		for index in range(5):
+			config = frappe.get_doc(
+				{
+					"doctype": "Entity Configuration",
+					**TestDataFactory.create_entity_configuration_data(),
+					"configuration_name": f"CTEST Generación {index}",
+					"applied_template": TEMPLATE_CODE,
+					"configuration_fields": [
+						{"field_name": "piso", "field_value": str(index), "is_active": 1}
+					],
+				}
+			).insert(ignore_permissions=True)
+			self.configurations.append(config.name)
+
+	def tearDown(self):
+		frappe.db.delete("File", {"attached_to_name": ["in", self.configurations]})
+		frappe.db.delete("Entity Configuration", {"name": ["in", self.configurations]})
+		frappe.db.commit()
+
+	def render(self, names):
+		with patch.object(template_registry, "get_registry_index", return_value=REGISTRY_INDEX):
+			return document_generation.render_configurations(names)
+
+	def test_documents_are_written_as_attachments(self):
+		"""Cada configuración obtiene su documento renderizado como archivo adjunto"""
+		result = self.render(self.configurations)
+
+		self.assertEqual(result["successful"], 5)
+		files = frappe.get_all(
+			"File",
+			filters={
+				"attached_to_doctype": "Entity Configuration",
+				"attached_to_name": self.configurations[2],
+			},
+			pluck="file_name",
+		)
+		self.assertEqual(files, [f"{self.configurations[2]}-{TEMPLATE_CODE}-v1.2.0.html"])
+
+	def test_context_matches_single_rendering(self):
+		"""El contexto en lote es el mismo que arma Entity Configuration"""
+		config = frappe.get_doc("Entity Configuration", self.configurations[0])
+		single = config.build_template_context()
+
+		rows = document_generation._load_configurations([config.name])
+		fields = document_generation._load_configuration_fields(rows)
+		source_doc = document_generation._prefetch_source_documents(rows)[("User", "Administrator")]
+		bulk = document_generation.build_context(
+			rows[0], source_doc, source_doc.as_dict(), fields[config.name]
+		)
+
+		self.assertEqual(bulk["config"], single["config"])
+		self.assertEqual(bulk["piso"], single["piso"])
+
+		# Documento origen completo: mismos campos, tablas hijas y métodos
+		self.assertIsInstance(bulk["doc"], Document)
+		self.assertEqual(bulk["doc"].get_title(), single["doc"].get_title())
+		self.assertEqual(set(bulk["source"]), set(single["source"]))
+		self.assertEqual(
+			sorted(role.role for role in bulk["doc"].roles),
+			sorted(role.role for role in single["doc"].roles),
+		)
+		self.assertEqual(
+			[role["role"] for role in bulk["source"]["roles"]],
+			[role["role"] for role in single["source"]["roles"]],
+		)
+
+	def test_failures_are_isolated(self):
+		"""Una configuración con template inexistente no detiene el lote"""
+		frappe.db.set_value(
+			"Entity Configuration", self.configurations[1], "applied_template", "CTEST_NO_EXISTE"
+		)
+
+		result = self.render(self.configurations)
+
+		self.assertEqual((result["successful"], result["failed"]), (4, 1))
+		self.assertEqual(result["errors"][0]["config"], self.configurations[1])
+
+	def test_batch_queries_do_not_grow_with_configurations(self):
+		"""Configuraciones, campos y documentos origen se cargan con una consulta cada uno"""
+		with patch.object(document_generation, "_write_output"):
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				self.render(self.configurations[:1])
+				single = sql_spy.call_count
+				sql_spy.reset_mock()
+				self.render(self.configurations)
+
+		# Solo crecen los savepoints por documento
+		self.assertLessEqual(sql_spy.call_count, single + 2 * (len(self.configurations) - 1))
+
+	def test_generate_documents_reports_progress(self):
+		"""La generación masiva programa lotes y acumula su progreso"""
+		with patch.object(template_registry, "get_registry_index", return_value=REGISTRY_INDEX):
+			batch = document_generation.generate_documents(template_codes=[TEMPLATE_CODE], chunk_size=2)
+
+		status = document_generation.get_generation_status(batch["batch_id"])
+
+		self.assertEqual((batch["total"], batch["chunks"]), (5, 3))
+		self.assertEqual((status.processed, status.failed), (5, 0))
+		self.assertTrue(status.completed)
@@ -0,0 +1,111 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests del índice de tipos de entidad que filtra los hooks universales
+(entity_type_registry).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.document_generation import entity_type_registry
+from condominium_management.document_generation.hooks_handlers import auto_detection
+from condominium_management.test_factories import TestDataFactory
+
+
+class TestEntityTypeRegistry(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		entity_type_registry.clear_entity_type_index()
+
+	def tearDown(self):
+		frappe.db.delete("Entity Type Configuration", {"entity_doctype": "Note"})
+		frappe.db.delete("ToDo", {"description": ["like", "CTEST%"]})
+		entity_type_registry.clear_entity_type_index()
+		frappe.db.commit()
+
+	def test_unregistered_doctype_hooks_do_not_query(self):
+		"""Para un DocType no registrado los hooks universales no consultan la base de datos"""
+		doc = frappe.get_doc({"doctype": "ToDo", "description": "CTEST gate"})
+		entity_type_registry.get_entity_type_index()
+
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+			for _index in range(1000):
+				auto_detection.on_document_insert(doc, "after_insert")
+				auto_detection.on_document_update(doc, "on_update")
+
+		self.assertEqual(sql_spy.call_count, 0)
+
+	def test_entity_type_changes_invalidate_index(self):
+		"""Registrar o borrar un tipo de entidad se refleja en el índice"""
+		self.assertIsNone(entity_type_registry.get_entity_type("Note"))
+
+		entity_type = frappe.get_doc(
+			{
+				"doctype": "Entity Type Configuration",
+				"entity_doctype": "Note",
+				"entity_name": "Nota",
+				"entity_name_plural": "Notas",
+				"owning_module": "Document Generation",
+				"is_active": 1,
+				"requires_configuration": 1,
+				"auto_detect_on_create": 1,
+				"applies_to_reglamento": 1,
+			}
+		).insert(ignore_permissions=True)
+
+		self.assertTrue(entity_type_registry.get_entity_type("Note").auto_detect_on_create)
+
+		entity_type.delete(ignore_permissions=True)
+		self.assertIsNone(entity_type_registry.get_entity_type("Note"))
+
+	def test_first_configuration_registers_source_doctype(self):
+		"""La primera configuración de un DocType lo agrega a source_doctypes"""
+		frappe.db.delete("Entity Configuration", {"source_doctype": "User"})
+		entity_type_registry.clear_entity_type_index()
+		self.assertFalse(entity_type_registry.has_configurations("User"))
+
+		config = frappe.get_doc(
+			{"doctype": "Entity Configuration", **TestDataFactory.create_entity_configuration_data()}
+		).insert(ignore_permissions=True)
+
+		self.assertTrue(entity_type_registry.has_configurations("User"))
+		config.delete(ignore_permissions=True)
+
+	def test_universal_hooks_insert_overhead(self):
+		"""Benchmark: insertar un DocType no registrado cuesta lo mismo con y sin los hooks
+		universales"""
+		entity_type_registry.get_entity_type_index()
+		query_counts = []
+
+		for enabled in (False, True):
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				self.insert_todos(200, enabled)
+
+			query_counts.append(sql_spy.call_count)
+
+		self.assertEqual(query_counts[0], query_counts[1])
+
+	def insert_todos(self, count, hooks_enabled):
+		def noop(doc, method=None):
+			pass
+
+		with (
+			patch.object(
+				auto_detection,
+				"on_document_insert",
+				auto_detection.on_document_insert if hooks_enabled else noop,
+			),
+			patch.object(
+				auto_detection,
+				"on_document_update",
+				auto_detection.on_document_update if hooks_enabled else noop,
+			),
+		):
+			for index in range(count):
+				frappe.get_doc({"doctype": "ToDo", "description": f"CTEST benchmark {index}"}).insert(
+					ignore_permissions=True
+				)
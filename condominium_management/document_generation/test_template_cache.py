@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de la caché de templates Jinja compilados (template_cache).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.document_generation import template_cache
+
+TEMPLATE = "Reglamento de {{ condominium }}: {{ rules | length }} reglas"
+
+
+class TestTemplateCache(FrappeTestCase):
+	def setUp(self):
+		template_cache.clear_template_cache()
+
+	def test_template_is_compiled_once_for_many_documents(self):
+		"""Generar 1,000 documentos del mismo template lo compila una sola vez"""
+		jenv = frappe.get_jenv()
+		with patch.object(jenv, "compile", wraps=jenv.compile) as compile_spy:
+			outputs = [
+				template_cache.render_cached_template(
+					"CTEST_REGLAMENTO",
+					TEMPLATE,
+					{"condominium": f"Condominio {index}", "rules": [1, 2, 3]},
+					version="1.0.0",
+				)
+				for index in range(1000)
+			]
+
+		self.assertEqual(compile_spy.call_count, 1)
+		self.assertEqual(outputs[7], "Reglamento de Condominio 7: 3 reglas")
+
+	def test_content_or_version_change_recompiles(self):
+		"""Un contenido o versión distintos nunca reutilizan la compilación anterior"""
+		first = template_cache.render_cached_template("CTEST_AVISO", "Hola {{ name }}", {"name": "A"})
+		second = template_cache.render_cached_template("CTEST_AVISO", "Adiós {{ name }}", {"name": "A"})
+		template_cache.render_cached_template("CTEST_AVISO", "Adiós {{ name }}", {"name": "A"}, version="2")
+
+		self.assertEqual((first, second), ("Hola A", "Adiós A"))
+		self.assertEqual(template_cache.get_template_cache_info().size, 3)
+
+	def test_least_recently_used_template_is_evicted(self):
+		"""El LRU descarta el template usado hace más tiempo"""
+		with patch.object(template_cache, "TEMPLATE_CACHE_SIZE", 2):
+			template_cache.get_compiled_template("CTEST_A", "A")
+			template_cache.get_compiled_template("CTEST_B", "B")
+			template_cache.get_compiled_template("CTEST_A", "A")
+			template_cache.get_compiled_template("CTEST_C", "C")
+
+			misses = template_cache.get_template_cache_info().misses
+			template_cache.get_compiled_template("CTEST_A", "A")
+			self.assertEqual(template_cache.get_template_cache_info().misses, misses)
+			template_cache.get_compiled_template("CTEST_B", "B")
+			self.assertEqual(template_cache.get_template_cache_info().misses, misses + 1)
+
+	def test_clear_empties_cache(self):
+		"""Invalidar la caché (actualización del registro) obliga a recompilar"""
+		template_cache.get_compiled_template("CTEST_A", "A")
+		template_cache.clear_template_cache()
+
+		self.assertEqual(template_cache.get_template_cache_info().size, 0)
+
+	def test_private_attributes_are_rejected(self):
+		"""Igual que frappe.render_template, no se permiten atributos privados"""
+		with self.assertRaises(frappe.ValidationError):
+			template_cache.get_compiled_template("CTEST_MALO", "{{ ''.__class__ }}")
+
+	def test_cached_template_uses_current_request_globals(self):
+		"""Un template en caché ve la sesión del request que lo renderiza, no la del que
+		lo compiló"""
+		content = "{{ frappe.session.user }}"
+		hits = template_cache.get_template_cache_info().hits
+		try:
+			frappe.set_user("Administrator")
+			frappe.local.jenv = None
+			first = template_cache.render_cached_template("CTEST_SESION", content)
+
+			# Request nuevo de otro usuario: Frappe arma un entorno Jinja nuevo
+			frappe.set_user("Guest")
+			frappe.local.jenv = None
+			second = template_cache.render_cached_template("CTEST_SESION", content)
+		finally:
+			frappe.set_user("Administrator")
+			frappe.local.jenv = None
+
+		self.assertEqual((first, second), ("Administrator", "Guest"))
+		self.assertEqual(template_cache.get_template_cache_info().hits, hits + 1)
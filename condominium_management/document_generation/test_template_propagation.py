@@ -0,0 +1,184 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de la propagación de templates por lotes (api.template_propagation).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from condominium_management.document_generation import template_registry
+from condominium_management.document_generation.api import template_propagation
+from condominium_management.test_factories import TestDataFactory
+
+TEMPLATE_CODE = "CTEST_PROPAGACION"
+
+
+class TestTemplatePropagation(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		self.publish_template([{"field_name": "piso", "field_label": "Piso", "field_type": "Data"}])
+
+		self.configurations = []
+		for index in range(5):
+			config = frappe.get_doc(
+				{
+					"doctype": "Entity Configuration",
+					**TestDataFactory.create_entity_configuration_data(),
+					"configuration_name": f"CTEST Propagación {index}",
+					"applied_template": TEMPLATE_CODE,
+				}
+			).insert(ignore_permissions=True)
+			self.configurations.append(config.name)
+
+	def tearDown(self):
+		propagations = frappe.get_all(
+			"Template Propagation", filters={"template_codes": ["like", f"%{TEMPLATE_CODE}%"]}, pluck="name"
+		)
+		frappe.db.delete("Template Propagation Chunk", {"parent": ["in", propagations or [""]]})
+		frappe.db.delete("Template Propagation", {"name": ["in", propagations or [""]]})
+		frappe.db.delete("Entity Configuration", {"name": ["in", self.configurations]})
+		frappe.db.delete("Infrastructure Template", {"name": TEMPLATE_CODE})
+		frappe.db.delete("Template Field Definition", {"parent": TEMPLATE_CODE})
+		template_registry.clear_registry_index()
+		frappe.db.commit()
+
+	def publish_template(self, fields):
+		template_registry.publish_templates(
+			[
+				{
+					**TestDataFactory.create_master_template_data(),
+					"template_code": TEMPLATE_CODE,
+					"template_fields": fields,
+				}
+			]
+		)
+		template_registry.clear_registry_index()
+
+	def propagate(self, chunk_size=2):
+		name = template_propagation.start_propagation([TEMPLATE_CODE], chunk_size=chunk_size)
+		return frappe.get_doc("Template Propagation", name)
+
+	def test_propagation_processes_every_chunk(self):
+		"""Los lotes cubren todas las configuraciones y el avance llega al registro"""
+		propagation = self.propagate()
+
+		self.assertEqual(len(propagation.chunks), 3)
+		self.assertEqual(propagation.status, "Completado")
+		self.assertEqual((propagation.processed, propagation.updated), (5, 5))
+		self.assertEqual(frappe.db.get_single_value("Master Template Registry", "propagation_progress"), 100)
+
+		config = frappe.get_doc("Entity Configuration", self.configurations[3])
+		self.assertEqual([field.field_name for field in config.configuration_fields], ["piso"])
+		self.assertEqual(config.template_hash, template_registry.get_template(TEMPLATE_CODE).content_hash)
+
+	def test_unchanged_template_is_skipped(self):
+		"""Una segunda propagación sin cambios en los campos no carga ninguna configuración"""
+		self.propagate()
+
+		with patch.object(template_propagation, "update_single_configuration") as update:
+			propagation = self.propagate()
+
+		update.assert_not_called()
+		self.assertEqual((propagation.updated, propagation.skipped), (0, 5))
+
+	def test_changed_fields_are_propagated(self):
+		"""Un campo nuevo cambia el hash y vuelve a sincronizar las configuraciones"""
+		self.propagate()
+		self.publish_template(
+			[
+				{"field_name": "piso", "field_label": "Piso", "field_type": "Data"},
+				{"field_name": "torre", "field_label": "Torre", "field_type": "Data"},
+			]
+		)
+
+		propagation = self.propagate()
+
+		self.assertEqual(propagation.updated, 5)
+		config = frappe.get_doc("Entity Configuration", self.configurations[0])
+		self.assertIn("torre", [field.field_name for field in config.configuration_fields])
+
+	def test_workers_are_capped(self):
+		"""Se programan a lo sumo MAX_CONCURRENT_WORKERS workers por propagación"""
+		with patch.object(template_propagation, "enqueue_propagation_worker") as enqueue:
+			propagation = self.propagate(chunk_size=1)
+
+		self.assertEqual(len(propagation.chunks), 5)
+		self.assertEqual(enqueue.call_count, template_propagation.MAX_CONCURRENT_WORKERS)
+		self.assertEqual(propagation.status, "En Cola")
+
+	def test_interrupted_propagation_resumes(self):
+		"""Un lote abandonado vuelve a quedar pendiente y los lotes completos no se repiten"""
+		with patch.object(template_propagation, "enqueue_propagation_worker"):
+			propagation = self.propagate()
+
+			with patch.object(template_propagation, "CHUNKS_PER_JOB", 1):
+				template_propagation.run_propagation_worker(propagation.name)
+
+			stalled = template_propagation.claim_chunk(propagation.name)
+			frappe.db.set_value(
+				"Template Propagation Chunk",
+				stalled.name,
+				"claimed_on",
+				add_to_date(now_datetime(), hours=-2),
+			)
+
+			template_propagation.resume_stalled_propagations()
+
+		self.assertEqual(
+			frappe.db.get_value("Template Propagation Chunk", stalled.name, "status"), "Pendiente"
+		)
+
+		with patch.object(template_propagation, "update_single_configuration") as update:
+			update.return_value = {"success": True, "changes_made": True}
+			template_propagation.run_propagation_worker(propagation.name)
+
+		propagation.reload()
+		self.assertEqual(propagation.status, "Completado")
+		self.assertEqual(propagation.processed, 5)
+		# El primer lote (2 configuraciones) ya estaba confirmado
+		self.assertEqual(update.call_count, 3)
+
+	def test_field_diff_is_applied_without_loading_configurations(self):
+		"""Solo la diferencia de campos se aplica, en lote y sin get_doc por configuración"""
+		self.propagate()
+		self.publish_template(
+			[
+				{"field_name": "piso", "field_label": "Nivel", "field_type": "Data"},
+				{"field_name": "torre", "field_label": "Torre", "field_type": "Data", "default_value": "A"},
+			]
+		)
+
+		with patch.object(template_propagation, "update_single_configuration") as update:
+			propagation = self.propagate()
+
+		update.assert_not_called()
+		self.assertEqual(propagation.updated, 5)
+
+		diff = frappe.parse_json(propagation.template_diffs)[TEMPLATE_CODE]
+		self.assertEqual([field["field_name"] for field in diff["added"]], ["torre"])
+		self.assertEqual([field["field_name"] for field in diff["changed"]], ["piso"])
+
+		config = frappe.get_doc("Entity Configuration", self.configurations[4])
+		fields = {field.field_name: field for field in config.configuration_fields}
+		self.assertEqual(fields["piso"].field_label, "Nivel")
+		self.assertEqual((fields["torre"].field_value, fields["torre"].idx), ("A", 2))
+		self.assertEqual(config.template_hash, template_registry.get_template(TEMPLATE_CODE).content_hash)
+
+	def test_removed_field_is_deactivated(self):
+		"""Un campo eliminado del template queda inactivo en las configuraciones"""
+		self.propagate()
+		self.publish_template([{"field_name": "torre", "field_label": "Torre", "field_type": "Data"}])
+
+		propagation = self.propagate()
+
+		self.assertEqual(frappe.parse_json(propagation.template_diffs)[TEMPLATE_CODE]["removed"], ["piso"])
+		self.assertFalse(
+			frappe.db.get_value(
+				"Configuration Field", {"parent": self.configurations[0], "field_name": "piso"}, "is_active"
+			)
+		)
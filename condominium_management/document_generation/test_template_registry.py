@@ -0,0 +1,180 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests del almacén de templates y su índice en caché (template_registry).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now
+
+from condominium_management.document_generation import template_registry
+from condominium_management.test_factories import TestDataFactory
+
+
+class TestTemplateRegistryIndex(FrappeTestCase):
+	def setUp(self):
+		frappe.set_user("Administrator")
+		registry = frappe.get_single("Master Template Registry")
+		TestDataFactory.create_template_with_assignment_rules(registry)
+		registry.save()
+
+	def tearDown(self):
+		# setUp publica POOL_TEMPLATE y su regla Amenity-piscina en cada test
+		templates = frappe.get_all(
+			"Infrastructure Template",
+			or_filters=[["name", "like", "CTEST_%"], ["name", "=", "POOL_TEMPLATE"]],
+			pluck="name",
+		)
+		frappe.db.delete("Template Assignment Rule", {"target_template": ["in", templates]})
+		frappe.db.delete("Template Field Definition", {"parent": ["in", templates]})
+		frappe.db.delete("Infrastructure Template", {"name": ["in", templates]})
+		template_registry.clear_registry_index()
+		frappe.db.commit()
+
+	def test_lookups_match_registry_methods(self):
+		"""El índice devuelve lo mismo que los métodos del registro"""
+		registry = frappe.get_single("Master Template Registry")
+
+		template = template_registry.get_template("POOL_TEMPLATE")
+		rule = template_registry.get_assignment_rule("Amenity", "piscina")
+
+		self.assertEqual(
+			template.template_name, registry.get_template_by_code("POOL_TEMPLATE")["template_name"]
+		)
+		self.assertEqual(rule.target_template, "POOL_TEMPLATE")
+		self.assertTrue(frappe.db.exists("Template Assignment Rule", "Amenity-piscina"))
+		self.assertEqual(template_registry.get_assignment_rule("Amenity").target_template, "POOL_TEMPLATE")
+		self.assertEqual(template_registry.get_template_version(), registry.template_version)
+		self.assertIsNone(template_registry.get_template("NONEXISTENT"))
+		self.assertIsNone(template_registry.get_assignment_rule("Nonexistent", "type"))
+
+	def test_lookups_do_not_load_registry(self):
+		"""Con el índice en caché las búsquedas no consultan la base de datos"""
+		template_registry.get_template("POOL_TEMPLATE")
+
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+			for _index in range(100):
+				template_registry.get_template("POOL_TEMPLATE")
+				template_registry.get_assignment_rule("Amenity", "piscina")
+
+		self.assertEqual(sql_spy.call_count, 0)
+
+	def test_saving_registry_publishes_pending_rows(self):
+		"""Las filas del registro se publican como registros propios y la tabla queda vacía"""
+		registry = frappe.get_single("Master Template Registry")
+		registry.append(
+			"infrastructure_templates",
+			{
+				**TestDataFactory.create_master_template_data(),
+				"template_code": "CTEST_PUBLICADO",
+				"template_fields": [
+					{"field_name": "capacity", "field_label": "Capacidad", "field_type": "Int"}
+				],
+			},
+		)
+		registry.save()
+
+		template = frappe.get_doc("Infrastructure Template", "CTEST_PUBLICADO")
+		self.assertEqual([field.field_name for field in template.template_fields], ["capacity"])
+		self.assertEqual(template.registry_version, registry.template_version)
+		self.assertEqual(registry.infrastructure_templates, [])
+		self.assertEqual(registry.templates_count, frappe.db.count("Infrastructure Template"))
+		self.assertEqual(
+			frappe.db.count("Infrastructure Template Definition", {"parent": "Master Template Registry"}), 0
+		)
+
+	def test_registry_update_invalidates_index(self):
+		"""Guardar el registro reconstruye el índice con los cambios"""
+		template_registry.get_template("POOL_TEMPLATE")
+
+		registry = frappe.get_single("Master Template Registry")
+		registry.append(
+			"infrastructure_templates",
+			{**TestDataFactory.create_master_template_data(), "template_code": "POOL_TEMPLATE"},
+		)
+		registry.save()
+
+		self.assertEqual(
+			template_registry.get_template("POOL_TEMPLATE").template_name,
+			TestDataFactory.create_master_template_data()["template_name"],
+		)
+
+	def test_direct_edit_bumps_registry_version(self):
+		"""Editar un template publicado sube su revisión y la versión del registro"""
+		version = frappe.db.get_single_value("Master Template Registry", "template_version")
+
+		template = frappe.get_doc("Infrastructure Template", "POOL_TEMPLATE")
+		revision = template.template_revision
+		template.template_content = "Reglamento de piscina: {{ doc.name }}"
+		template.save()
+
+		self.assertEqual(template.template_revision, revision + 1)
+		self.assertNotEqual(
+			frappe.db.get_single_value("Master Template Registry", "template_version"), version
+		)
+		self.assertIn("{{ doc.name }}", template_registry.get_template("POOL_TEMPLATE").template_content)
+
+	def test_registry_save_does_not_grow_with_templates(self):
+		"""Benchmark: con 1,000 templates publicados, cargar y guardar el registro con un
+		cambio cuesta lo mismo que con el almacén casi vacío"""
+		query_counts = []
+		for template_count in (0, 1000):
+			if template_count:
+				self.insert_templates(template_count)
+
+			with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+				registry = frappe.get_single("Master Template Registry")
+				registry.append(
+					"infrastructure_templates",
+					{
+						**TestDataFactory.create_master_template_data(),
+						"template_code": f"CTEST_CAMBIO_{template_count}",
+					},
+				)
+				registry.save()
+
+			query_counts.append(sql_spy.call_count)
+
+		self.assertEqual(query_counts[0], query_counts[1])
+		self.assertLess(len(frappe.as_json(frappe.get_single("Master Template Registry").as_dict())), 4096)
+
+	def insert_templates(self, count):
+		timestamp = now()
+		frappe.db.bulk_insert(
+			"Infrastructure Template",
+			fields=[
+				"name",
+				"template_code",
+				"template_name",
+				"infrastructure_type",
+				"target_document",
+				"template_content",
+				"is_active",
+				"template_revision",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+			],
+			values=[
+				(
+					f"CTEST_{index:04d}",
+					f"CTEST_{index:04d}",
+					f"Template {index}",
+					"Amenity",
+					"Reglamento",
+					"Reglamento {{ doc.name }} " * 200,
+					1,
+					1,
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+				)
+				for index in range(count)
+			],
+		)
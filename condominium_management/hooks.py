@@ -196,15 +196,14 @@ after_migrate = [
 # Document Generation Events
 # ---------------------------
 # Universal hooks for auto-detection of entities requiring document configuration
-# TEMPORALMENTE DESACTIVADOS: Los hooks universales ("*") interfieren con el setup wizard de ERPNext
-# causando errores de validación de enlaces durante CI. Se reactivarán después del merge.
-# ISSUE #7: Reactivar hooks universales con verificaciones de contexto
-# PRIORIDAD: CRÍTICA - Debe resolverse inmediatamente después del merge
+# Los hooks universales ("*") salen con una búsqueda en el índice en caché de
+# document_generation.entity_type_registry para DocTypes no registrados, y no corren
+# durante instalación, migración, patches ni el setup wizard (ISSUE #7).
 doc_events = {
-	# "*": {
-	# 	"after_insert": "condominium_management.document_generation.hooks_handlers.auto_detection.on_document_insert",
-	# 	"on_update": "condominium_management.document_generation.hooks_handlers.auto_detection.on_document_update",
-	# },
+	"*": {
+		"after_insert": "condominium_management.document_generation.hooks_handlers.auto_detection.on_document_insert",
+		"on_update": "condominium_management.document_generation.hooks_handlers.auto_detection.on_document_update",
+	},
 	# Committee Management — Assembly validation on native Event
 	"Event": {
 		"validate": "condominium_management.committee_management.event_hooks.validate_assembly",
@@ -237,6 +236,7 @@ doc_events = {
 	# -----------------------------
 	# Hooks específicos para módulo Physical Spaces - validaciones y actualizaciones
 	"Physical Space": {
+		"validate": "condominium_management.physical_spaces.hooks_handlers.space_validation.validate",
 		"after_insert": "condominium_management.physical_spaces.hooks_handlers.space_detection.after_insert",
 		"on_update": "condominium_management.physical_spaces.hooks_handlers.space_detection.on_update",
 	},
@@ -304,10 +304,17 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
+	"hourly": [
+		"condominium_management.document_generation.api.template_propagation.resume_stalled_propagations",
+		"condominium_management.document_generation.detection_queue.resume_pending_detection",
+	],
 	"monthly": ["condominium_management.document_generation.scheduled.performance_monitoring"],
 	"daily": [
 		"condominium_management.committee_management.scheduled.check_pending_meetings",
 		"condominium_management.committee_management.scheduled.check_overdue_agreements",
+		"condominium_management.physical_spaces.space_utilization.refresh_recent_occupancy",
+		"condominium_management.physical_spaces.component_health.update_component_health_scores",
+		"condominium_management.physical_spaces.maintenance_schedule.generate_due_work_orders",
 		"condominium_management.committee_management.scheduled.calculate_daily_kpis",
 	],
 	"weekly": [
@@ -336,6 +343,8 @@ fixtures = [
 	"Master Template Registry",  # ✅ ENABLED - Single DocType. NOTA: campo last_update es volátil
 	#                              (se actualiza al usar el sistema). Revertir master_template_registry.json
 	#                              después de export-fixtures hasta diseñar solución definitiva.
+	"Infrastructure Template",  # Templates publicados del registro (antes tabla del Single)
+	"Template Assignment Rule",  # Reglas de auto-asignación publicadas (antes tabla del Single)
 	{
 		"dt": "Entity Type Configuration",
 		"filters": [["name", "in", ["Service Management Contract"]]],
@@ -0,0 +1,27 @@
+import frappe
+
+
+def execute():
+	"""Calcular attendance_rate para reuniones ya terminadas.
+
+	Un solo UPDATE con la agregación de Meeting Attendee; las reuniones sin asistentes
+	quedan en 0. Idempotente: recalcula el mismo valor si se vuelve a ejecutar.
+	"""
+	if not frappe.db.has_column("Committee Meeting", "attendance_rate"):
+		return
+
+	frappe.db.sql("""
+		UPDATE `tabCommittee Meeting` cm
+		LEFT JOIN (
+			SELECT parent,
+				SUM(CASE WHEN attendance_status IN ('Presente', 'Virtual') THEN 1 ELSE 0 END) AS attended,
+				COUNT(*) AS total
+			FROM `tabMeeting Attendee`
+			WHERE parenttype = 'Committee Meeting'
+			GROUP BY parent
+		) summary ON summary.parent = cm.name
+		SET cm.attendance_rate = IF(IFNULL(summary.total, 0) > 0, summary.attended * 100 / summary.total, 0)
+		WHERE cm.status = 'Terminada'
+	""")
+
+	frappe.db.commit()
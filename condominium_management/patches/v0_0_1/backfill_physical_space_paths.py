@@ -0,0 +1,9 @@
+import frappe
+
+from condominium_management.physical_spaces.space_hierarchy import backfill_space_paths
+
+
+def execute():
+	"""Calcular space_path de espacios históricos sin ruta; el árbol pagina por ella"""
+	backfill_space_paths()
+	frappe.db.commit()
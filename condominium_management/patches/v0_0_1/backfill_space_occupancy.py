@@ -0,0 +1,9 @@
+import frappe
+
+from condominium_management.physical_spaces.space_utilization import backfill_occupancy
+
+
+def execute():
+	"""Llenar Space Occupancy de periodos anteriores; el job diario solo cubre la ventana reciente"""
+	backfill_occupancy()
+	frappe.db.commit()
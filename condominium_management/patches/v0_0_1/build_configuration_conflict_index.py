@@ -0,0 +1,9 @@
+import frappe
+
+from condominium_management.document_generation.conflict_index import rebuild_conflict_index
+
+
+def execute():
+	"""Construir el índice de conflictos de las Entity Configuration existentes"""
+	rebuild_conflict_index()
+	frappe.db.commit()
@@ -0,0 +1,9 @@
+import frappe
+
+from condominium_management.physical_spaces.space_hierarchy import rebuild_closure
+
+
+def execute():
+	"""Construir la tabla de cierre de Physical Space para la jerarquía existente"""
+	rebuild_closure()
+	frappe.db.commit()
@@ -0,0 +1,10 @@
+import frappe
+
+
+def execute():
+	"""Mover templates y reglas del Master Template Registry a sus propios DocTypes"""
+	registry = frappe.get_single("Master Template Registry")
+
+	# Se migran tal cual: las filas del Single nunca pasaron por la validación del template
+	registry.publish_pending_changes(ignore_validate=True)
+	frappe.db.commit()
@@ -0,0 +1,26 @@
+import frappe
+
+from condominium_management.document_generation.doctype.template_assignment_rule.template_assignment_rule import (
+	get_rule_name,
+)
+from condominium_management.document_generation.template_registry import clear_registry_index
+
+
+def execute():
+	"""Renombrar reglas con nombre hash a {entity_type}-{entity_subtype} para que el fixture sea portable"""
+	for rule in frappe.get_all(
+		"Template Assignment Rule", fields=["name", "entity_type", "entity_subtype"], order_by="creation asc"
+	):
+		new_name = get_rule_name(rule.entity_type, rule.entity_subtype)
+		if rule.name != new_name:
+			frappe.rename_doc(
+				"Template Assignment Rule",
+				rule.name,
+				new_name,
+				force=True,
+				show_alert=False,
+				rebuild_search=False,
+			)
+
+	clear_registry_index()
+	frappe.db.commit()
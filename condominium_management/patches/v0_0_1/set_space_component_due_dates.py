@@ -0,0 +1,9 @@
+import frappe
+
+from condominium_management.physical_spaces.maintenance_schedule import refresh_due_dates
+
+
+def execute():
+	"""Calcular empresa y próxima fecha de mantenimiento de los componentes existentes"""
+	refresh_due_dates()
+	frappe.db.commit()
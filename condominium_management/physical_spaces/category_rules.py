@@ -0,0 +1,147 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Grafo de reglas de categorías y tipos de componente
+=====================================================================
+
+Compila en una sola estructura las reglas que las validaciones consultan en cada
+guardado: categorías padre/hijo permitidas y requisitos de cada Space Category, y
+prefijo, campos obligatorios y plan de mantenimiento de cada Component Type.
+
+El grafo vive en dos niveles:
+
+- Redis (frappe.cache), compartido por todos los workers del sitio.
+- Memoria del proceso, validada contra una versión guardada en Redis una vez por
+  request, para que las validaciones sean búsquedas en diccionarios.
+
+Cualquier cambio en Space Category o Component Type (on_update, on_trash) invalida
+ambos niveles al momento y de nuevo al confirmar la transacción.
+"""
+
+import frappe
+
+from condominium_management.utils import clear_cache_on_transaction_end
+
+RULE_GRAPH_CACHE_KEY = "physical_spaces:rule_graph"
+RULE_GRAPH_VERSION_KEY = "physical_spaces:rule_graph_version"
+
+CATEGORY_REQUIREMENTS = ("requires_components", "requires_dimensions", "requires_capacity")
+COMPONENT_TYPE_REQUIREMENTS = (
+	"requires_brand",
+	"requires_model",
+	"requires_installation_date",
+	"requires_warranty",
+	"requires_specifications",
+)
+COMPONENT_TYPE_MAINTENANCE = ("default_maintenance_frequency", "maintenance_interval", "maintenance_type")
+
+# {sitio: (versión, grafo)}
+_process_cache = {}
+
+
+def get_rule_graph():
+	"""Grafo compilado de reglas del sitio actual"""
+	graph = getattr(frappe.local, "physical_spaces_rule_graph", None)
+	if graph is not None:
+		return graph
+
+	version = frappe.cache().get_value(RULE_GRAPH_VERSION_KEY)
+	cached = _process_cache.get(frappe.local.site)
+
+	if version and cached and cached[0] == version:
+		graph = cached[1]
+	else:
+		graph = frappe.cache().get_value(RULE_GRAPH_CACHE_KEY) if version else None
+		if graph is None:
+			graph = build_rule_graph()
+			version = frappe.generate_hash(length=12)
+			frappe.cache().set_value(RULE_GRAPH_CACHE_KEY, graph)
+			frappe.cache().set_value(RULE_GRAPH_VERSION_KEY, version)
+		_process_cache[frappe.local.site] = (version, graph)
+
+	frappe.local.physical_spaces_rule_graph = graph
+	return graph
+
+
+def build_rule_graph():
+	"""Compila el grafo desde la base de datos (cuatro consultas en total)"""
+	categories = {
+		row.name: {
+			"category_name": row.category_name,
+			"is_active": row.is_active,
+			**{field: row.get(field) for field in CATEGORY_REQUIREMENTS},
+			"allowed_parents": [],
+			"allowed_children": [],
+		}
+		for row in frappe.get_all(
+			"Space Category", fields=["name", "category_name", "is_active", *CATEGORY_REQUIREMENTS]
+		)
+	}
+
+	for doctype, fieldname, key in (
+		("Allowed Parent Category", "parent_category", "allowed_parents"),
+		("Allowed Child Category", "child_category", "allowed_children"),
+	):
+		for row in frappe.get_all(
+			doctype,
+			filters={"parenttype": "Space Category"},
+			fields=["parent", fieldname],
+			order_by="idx asc",
+		):
+			if row.parent in categories and row.get(fieldname):
+				categories[row.parent][key].append(row.get(fieldname))
+
+	component_types = {
+		row.name: {
+			"code_prefix": row.code_prefix,
+			"is_active": row.is_active,
+			**{field: row.get(field) for field in COMPONENT_TYPE_REQUIREMENTS},
+			**{field: row.get(field) for field in COMPONENT_TYPE_MAINTENANCE},
+		}
+		for row in frappe.get_all(
+			"Component Type",
+			fields=[
+				"name",
+				"code_prefix",
+				"is_active",
+				*COMPONENT_TYPE_REQUIREMENTS,
+				*COMPONENT_TYPE_MAINTENANCE,
+			],
+		)
+	}
+
+	return {"categories": categories, "component_types": component_types}
+
+
+def get_category_rules(category):
+	"""Reglas de una Space Category o None si no existe"""
+	return get_rule_graph()["categories"].get(category)
+
+
+def get_component_type_rules(component_type):
+	"""Reglas de un Component Type o None si no existe"""
+	return get_rule_graph()["component_types"].get(component_type)
+
+
+def is_parent_category_allowed(category, parent_category):
+	"""True si la categoría acepta a parent_category como padre.
+
+	Una categoría sin lista de padres permitidos acepta cualquiera.
+	"""
+	rules = get_category_rules(category)
+	if not rules or not rules["allowed_parents"] or not parent_category:
+		return True
+
+	return parent_category in rules["allowed_parents"]
+
+
+def clear_rule_graph():
+	"""Invalida el grafo en Redis y en memoria; se repite al confirmar o revertir la transacción"""
+	clear_cache_on_transaction_end(_clear_rule_graph)
+
+
+def _clear_rule_graph():
+	frappe.cache().delete_value([RULE_GRAPH_CACHE_KEY, RULE_GRAPH_VERSION_KEY])
+	_process_cache.pop(frappe.local.site, None)
+	frappe.local.physical_spaces_rule_graph = None
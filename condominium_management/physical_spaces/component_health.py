@@ -0,0 +1,243 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Salud de componentes
+======================================
+
+Calcula una puntuación de salud (0-100) por Space Component a partir de:
+
+- Antigüedad contra la vida útil estimada del Component Type.
+- Estado del componente.
+- Días desde el último mantenimiento contra su frecuencia de mantenimiento.
+- Vigencia de la garantía.
+
+El cálculo es un solo INSERT ... SELECT ... ON DUPLICATE KEY UPDATE sobre
+Component Health Score: la base de datos puntúa todos los componentes del lote a la
+vez. El job diario solo recalcula componentes nuevos, modificados (o cuyo espacio o
+tipo cambió) desde su último cálculo, y los que llevan más de STALE_DAYS sin
+recalcular para reflejar el paso del tiempo.
+
+Los acumulados por espacio, categoría, tipo o empresa son una consulta agregada
+sobre la tabla de puntuaciones.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, flt, getdate, now_datetime, nowdate
+
+SCORE_DOCTYPE = "Component Health Score"
+
+# Pesos de cada factor en la puntuación final (suman 1)
+WEIGHTS = {"age": 0.45, "status": 0.30, "maintenance": 0.15, "warranty": 0.10}
+
+STATUS_SCORES = {
+	"Activo": 100,
+	"Pendiente Instalación": 80,
+	"En Mantenimiento": 60,
+	"Inactivo": 40,
+	"Fuera de Servicio": 0,
+}
+DEFAULT_STATUS_SCORE = 50
+
+# Vida útil supuesta cuando el tipo no la define
+DEFAULT_LIFESPAN_YEARS = 15
+
+MAINTENANCE_INTERVAL_DAYS = {
+	"Semanal": 7,
+	"Quincenal": 15,
+	"Mensual": 30,
+	"Trimestral": 90,
+	"Semestral": 180,
+	"Anual": 365,
+	"Bianual": 730,
+}
+# Sin registro de mantenimiento en un tipo que lo requiere
+NO_MAINTENANCE_SCORE = 50
+
+WARRANTY_ACTIVE_SCORE = 100
+WARRANTY_EXPIRED_SCORE = 50
+NO_WARRANTY_SCORE = 70
+
+# Días tras los cuales una puntuación se recalcula aunque el componente no cambie
+STALE_DAYS = 7
+
+# Por debajo de este valor un componente se considera en riesgo
+CRITICAL_THRESHOLD = 40
+
+GROUP_BY_COLUMNS = {
+	"physical_space": "score.physical_space",
+	"space_category": "score.space_category",
+	"component_type": "score.component_type",
+	"company": "score.company",
+}
+
+
+def update_component_health_scores(full=False):
+	"""Job diario: puntúa los componentes pendientes y elimina puntuaciones huérfanas.
+
+	Args:
+		full: Recalcula todos los componentes en lugar de solo los cambiados
+	"""
+	timestamp = now_datetime()
+	today = getdate(nowdate())
+	values = {
+		"timestamp": timestamp,
+		"user": frappe.session.user,
+		"today": today,
+		"stale_before": add_days(timestamp, -STALE_DAYS),
+		"lifespan": DEFAULT_LIFESPAN_YEARS,
+	}
+
+	incremental_condition = (
+		""
+		if full
+		else """
+		AND (
+			score.name IS NULL
+			OR component.modified > score.calculated_on
+			OR space.modified > score.calculated_on
+			OR component_type.modified > score.calculated_on
+			OR score.calculated_on < %(stale_before)s
+		)
+	"""
+	)
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabComponent Health Score` (
+			name, creation, modified, owner, modified_by, docstatus, idx,
+			component, physical_space, component_type, company, space_category,
+			component_status, age_years, health_score, calculated_on
+		)
+		SELECT
+			component.name, %(timestamp)s, %(timestamp)s, %(user)s, %(user)s, 0, 0,
+			component.name, space.name, component.component_type, space.company, space.space_category,
+			component.status, {_age_years_expression()}, {_health_score_expression()}, %(timestamp)s
+		FROM `tabSpace Component` component
+		JOIN `tabPhysical Space` space
+			ON space.name = component.parent AND component.parenttype = 'Physical Space'
+		LEFT JOIN `tabComponent Type` component_type ON component_type.name = component.component_type
+		LEFT JOIN `tabComponent Health Score` score ON score.name = component.name
+		WHERE 1 = 1 {incremental_condition}
+		ON DUPLICATE KEY UPDATE
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by),
+			physical_space = VALUES(physical_space),
+			component_type = VALUES(component_type),
+			company = VALUES(company),
+			space_category = VALUES(space_category),
+			component_status = VALUES(component_status),
+			age_years = VALUES(age_years),
+			health_score = VALUES(health_score),
+			calculated_on = VALUES(calculated_on)
+	""",
+		values,
+	)
+
+	frappe.db.sql(
+		"""
+		DELETE score FROM `tabComponent Health Score` score
+		LEFT JOIN `tabSpace Component` component ON component.name = score.name
+		WHERE component.name IS NULL
+	"""
+	)
+
+
+def get_health_rollup(group_by="physical_space", company=None):
+	"""Salud promedio agregada por dimensión en una sola consulta.
+
+	Args:
+		group_by: physical_space, space_category, component_type o company
+		company: Filtro opcional por empresa
+
+	Returns:
+		list[dict]: group, components, health_score (promedio), critical (componentes en riesgo)
+	"""
+	if group_by not in GROUP_BY_COLUMNS:
+		frappe.throw(_("Agrupación de salud inválida: {0}").format(group_by))
+
+	company_condition = "WHERE score.company = %(company)s" if company else ""
+	rows = frappe.db.sql(
+		f"""
+		SELECT {GROUP_BY_COLUMNS[group_by]} AS group_key, COUNT(*) AS components,
+			AVG(score.health_score) AS health_score,
+			SUM(score.health_score < %(critical)s) AS critical
+		FROM `tabComponent Health Score` score
+		{company_condition}
+		GROUP BY group_key
+		ORDER BY health_score ASC
+	""",
+		{"company": company, "critical": CRITICAL_THRESHOLD},
+		as_dict=True,
+	)
+
+	return [
+		frappe._dict(
+			group=row.group_key or None,
+			components=cint(row.components),
+			health_score=flt(row.health_score, 2),
+			critical=cint(row.critical),
+		)
+		for row in rows
+	]
+
+
+def get_average_health(company=None):
+	"""Salud promedio de los componentes puntuados; 100 si no hay componentes"""
+	filters = {"company": company} if company else {}
+	result = frappe.get_all(SCORE_DOCTYPE, filters=filters, fields=["AVG(health_score) AS average"])
+	average = result[0].average if result else None
+
+	return flt(average, 2) if average is not None else 100.0
+
+
+def _age_years_expression():
+	return (
+		"GREATEST(DATEDIFF(%(today)s, COALESCE(component.installation_date, component.inventory_date, "
+		"DATE(component.creation))), 0) / 365.25"
+	)
+
+
+def _health_score_expression():
+	"""Expresión SQL de la puntuación ponderada; todos los factores en escala 0-100"""
+	lifespan = "COALESCE(NULLIF(component_type.estimated_lifespan_years, 0), %(lifespan)s)"
+	age_score = f"GREATEST(0, 1 - ({_age_years_expression()}) / {lifespan}) * 100"
+
+	status_cases = " ".join(
+		f"WHEN {frappe.db.escape(status)} THEN {score}" for status, score in STATUS_SCORES.items()
+	)
+	status_score = f"CASE component.status {status_cases} ELSE {DEFAULT_STATUS_SCORE} END"
+
+	interval_cases = " ".join(
+		f"WHEN {frappe.db.escape(frequency)} THEN {days}"
+		for frequency, days in MAINTENANCE_INTERVAL_DAYS.items()
+	)
+	frequency = (
+		"COALESCE(NULLIF(component.maintenance_frequency, ''), component_type.default_maintenance_frequency)"
+	)
+	periods = "GREATEST(COALESCE(NULLIF(component.maintenance_interval, 0), component_type.maintenance_interval, 1), 1)"
+	interval = f"(CASE {frequency} {interval_cases} ELSE NULL END * {periods})"
+	# 100 mientras esté dentro de la frecuencia; baja a 0 al acumular dos periodos de retraso
+	maintenance_score = f"""
+		CASE
+			WHEN {interval} IS NULL THEN 100
+			WHEN component.last_maintenance_date IS NULL THEN {NO_MAINTENANCE_SCORE}
+			ELSE GREATEST(0, LEAST(100,
+				100 - (DATEDIFF(%(today)s, component.last_maintenance_date) - {interval}) * 50 / {interval}
+			))
+		END
+	"""
+
+	warranty_score = f"""
+		CASE
+			WHEN component.warranty_expiry_date IS NULL THEN {NO_WARRANTY_SCORE}
+			WHEN component.warranty_expiry_date >= %(today)s THEN {WARRANTY_ACTIVE_SCORE}
+			ELSE {WARRANTY_EXPIRED_SCORE}
+		END
+	"""
+
+	return (
+		f"ROUND({WEIGHTS['age']} * ({age_score}) + {WEIGHTS['status']} * ({status_score})"
+		f" + {WEIGHTS['maintenance']} * ({maintenance_score}) + {WEIGHTS['warranty']} * ({warranty_score}), 2)"
+	)
@@ -0,0 +1,16 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ComponentHealthScore(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Índice para los acumulados por empresa y espacio"""
+	frappe.db.add_index(
+		"Component Health Score", ["company", "physical_space"], index_name="company_space_index"
+	)
@@ -5,6 +5,10 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import cstr
 
+from condominium_management.physical_spaces.category_rules import clear_rule_graph
+from condominium_management.physical_spaces.inventory_codes import GENERIC_PREFIX, reserve_inventory_codes
+from condominium_management.physical_spaces.maintenance_schedule import refresh_due_dates
+
 
 class ComponentType(Document):
 	def before_save(self):
@@ -62,6 +66,7 @@ class ComponentType(Document):
 		"""Obtener configuración de mantenimiento para este tipo"""
 		return {
 			"default_frequency": self.default_maintenance_frequency,
+			"maintenance_interval": self.maintenance_interval or 1,
 			"maintenance_type": self.maintenance_type,
 			"estimated_lifespan_years": self.estimated_lifespan_years,
 			"critical_component": self.critical_component,
@@ -119,10 +124,22 @@ class ComponentType(Document):
 
 	def on_update(self):
 		"""Hook después de actualizar"""
+		clear_rule_graph()
+
 		# Actualizar componentes existentes que usen este tipo
 		if self.has_value_changed("component_template_code") or self.has_value_changed("template_version"):
 			self.update_existing_components()
 
+		if self.has_value_changed("default_maintenance_frequency") or self.has_value_changed(
+			"maintenance_interval"
+		):
+			# El grafo de reglas ya está invalidado: el recálculo usa la regla nueva
+			refresh_due_dates(component_type=self.name)
+
+	def on_trash(self):
+		"""Hook al eliminar"""
+		clear_rule_graph()
+
 	def update_existing_components(self):
 		"""Actualizar componentes existentes que usen este tipo"""
 		components = frappe.get_all("Space Component", filters={"component_type": self.name}, fields=["name"])
@@ -135,28 +152,4 @@ class ComponentType(Document):
 
 	def get_next_inventory_code(self):
 		"""Obtener el siguiente código de inventario para este tipo"""
-		# Buscar el último código usado
-		last_code = frappe.db.sql(
-			"""
-            SELECT inventory_code
-            FROM `tabSpace Component`
-            WHERE component_type = %s
-            AND inventory_code LIKE %s
-            ORDER BY inventory_code DESC
-            LIMIT 1
-        """,
-			(self.name, f"{self.code_prefix}%"),
-		)
-
-		if last_code:
-			# Extraer número y incrementar
-			last_num = last_code[0][0].replace(self.code_prefix, "").replace("-", "")
-			try:
-				next_num = int(last_num) + 1
-				return f"{self.code_prefix}-{next_num:04d}"
-			except ValueError:
-				# Si no se puede convertir, usar timestamp
-				return f"{self.code_prefix}-{frappe.utils.now_datetime().strftime('%Y%m%d%H%M%S')}"
-		else:
-			# Primer código
-			return f"{self.code_prefix}-0001"
+		return reserve_inventory_codes(self.code_prefix or GENERIC_PREFIX, 1)[0]
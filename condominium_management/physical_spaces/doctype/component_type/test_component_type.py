@@ -4,6 +4,11 @@
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from condominium_management.physical_spaces.inventory_codes import (
+	assign_inventory_codes,
+	reserve_inventory_codes,
+)
+
 
 class TestComponentType(FrappeTestCase):
 	def test_component_type_creation(self):
@@ -209,6 +214,40 @@ class TestComponentType(FrappeTestCase):
 		# (En un test real, crearíamos el componente)
 		# El próximo código debería ser LED-0002
 
+	def test_inventory_codes_reserved_in_batch(self):
+		"""Reservar N códigos devuelve consecutivos sin repetir y rebasa 9999"""
+		first_batch = reserve_inventory_codes("CTESTINV", 3)
+		second_batch = reserve_inventory_codes("CTESTINV", 2)
+
+		self.assertEqual(first_batch, ["CTESTINV-0001", "CTESTINV-0002", "CTESTINV-0003"])
+		self.assertEqual(second_batch, ["CTESTINV-0004", "CTESTINV-0005"])
+
+		frappe.db.sql("UPDATE `tabSeries` SET `current` = 9999 WHERE `name` = 'INV-CTESTINV-'")
+		self.assertEqual(reserve_inventory_codes("CTESTINV", 1), ["CTESTINV-10000"])
+
+	def test_assign_inventory_codes_groups_by_type(self):
+		"""Componentes sin código reciben códigos por prefijo de su tipo"""
+		component_type = frappe.get_doc(
+			{
+				"doctype": "Component Type",
+				"component_type_name": "Test Bomba CTEST",
+				"code_prefix": "CTESTBOM",
+				"category": "Hidráulico",
+			}
+		)
+		component_type.insert()
+
+		components = [
+			{"component_type": component_type.name},
+			{"component_type": component_type.name, "inventory_code": "MANUAL-1"},
+			{"component_type": None},
+		]
+
+		self.assertEqual(assign_inventory_codes(components), 2)
+		self.assertEqual(components[0]["inventory_code"], "CTESTBOM-0001")
+		self.assertEqual(components[1]["inventory_code"], "MANUAL-1")
+		self.assertTrue(components[2]["inventory_code"].startswith("COMP-"))
+
 	def test_component_categories(self):
 		"""Test categorías válidas de componentes"""
 		valid_categories_with_prefixes = [
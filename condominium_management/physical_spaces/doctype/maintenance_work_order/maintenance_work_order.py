@@ -0,0 +1,28 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import today
+
+from condominium_management.physical_spaces.maintenance_schedule import record_maintenance
+
+
+class MaintenanceWorkOrder(Document):
+	def validate(self):
+		"""Fecha de realización por defecto al completar"""
+		if self.status == "Completada" and not self.completion_date:
+			self.completion_date = today()
+
+	def on_update(self):
+		"""Registrar el mantenimiento en el componente al completar la orden"""
+		if self.status == "Completada" and self.has_value_changed("status"):
+			record_maintenance(self.component, self.completion_date)
+
+
+def on_doctype_update():
+	"""Una orden por componente y fecha programada"""
+	frappe.db.add_unique(
+		"Maintenance Work Order", ["component", "due_date"], constraint_name="unique_component_due"
+	)
+	frappe.db.add_index("Maintenance Work Order", ["company", "status"], index_name="company_status_index")
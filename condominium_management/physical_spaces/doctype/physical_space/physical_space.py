@@ -5,12 +5,35 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import now_datetime
 
+from condominium_management.physical_spaces import space_hierarchy
+from condominium_management.physical_spaces.hooks_handlers.component_validation import (
+	get_unchanged_components,
+	validate_components,
+)
+from condominium_management.physical_spaces.inventory_codes import assign_inventory_codes
+from condominium_management.physical_spaces.maintenance_schedule import set_due_dates
+
 
 class PhysicalSpace(Document):
+	# Los renglones de la tabla de cierre se eliminan en on_trash
+	ignore_linked_doctypes = ("Physical Space Closure",)
+
 	def before_naming(self):
 		"""Hook antes de establecer nombre - generar código"""
 		self.generate_space_code()
 
+	def validate(self):
+		"""Validar todas las filas de componentes en un solo paso.
+
+		Las filas ya guardadas que no cambiaron solo generan advertencias: los
+		componentes se guardaron sin estas reglas antes de que el espacio las validara.
+		"""
+		previous = self.get_doc_before_save()
+		unchanged = get_unchanged_components(
+			self.space_components, previous.space_components if previous else []
+		)
+		validate_components(self.space_components, unchanged)
+
 	def before_save(self):
 		"""Hook antes de guardar - validar jerarquía"""
 		# Defensive coding para ERROR #6 - asegurar parent_space es string
@@ -20,6 +43,7 @@ class PhysicalSpace(Document):
 		self.validate_hierarchy()
 		self.update_hierarchy_info()
 		self.generate_component_inventory_codes()
+		set_due_dates(self.space_components, self.company)
 
 	def generate_space_code(self):
 		"""Generar código único del espacio usando series por company."""
@@ -41,23 +65,12 @@ class PhysicalSpace(Document):
 				frappe.throw("Se detectó una referencia circular en la jerarquía")
 
 	def has_circular_reference(self):
-		"""Detectar referencias circulares en jerarquía"""
-		visited = set()
-		current = self.parent_space
+		"""Detectar referencias circulares en jerarquía.
 
-		while current:
-			if current in visited:
-				return True
-			visited.add(current)
-
-			parent_doc = frappe.get_doc("Physical Space", current)
-			current = parent_doc.parent_space
-
-			# Límite de seguridad
-			if len(visited) > 100:
-				frappe.throw("Jerarquía demasiado profunda")
-
-		return False
+		Hay ciclo si el nuevo padre está dentro del subárbol de este espacio: una sola
+		búsqueda por la llave única (ancestor, descendant) de la tabla de cierre.
+		"""
+		return space_hierarchy.is_descendant(self.name, self.parent_space)
 
 	def update_hierarchy_info(self):
 		"""Actualizar información jerárquica automáticamente"""
@@ -92,20 +105,8 @@ class PhysicalSpace(Document):
 			return []
 
 	def get_space_hierarchy_children(self, include_self=False):
-		"""Obtener todos los hijos recursivamente - SIN limitaciones nested set"""
-		children = []
-		if include_self:
-			children.append(self.name)
-
-		direct_children = frappe.get_all(
-			"Physical Space", filters={"parent_space": self.name}, fields=["name"]
-		)
-
-		for child in direct_children:
-			child_doc = frappe.get_doc("Physical Space", child.name)
-			children.extend(child_doc.get_space_hierarchy_children(include_self=True))
-
-		return children
+		"""Obtener todos los hijos recursivamente con una sola consulta a la tabla de cierre"""
+		return space_hierarchy.get_subtree(self.name, include_self=include_self)
 
 	def load_template_fields(self):
 		"""Cargar campos dinámicos basados en space_category"""
@@ -120,6 +121,8 @@ class PhysicalSpace(Document):
 
 	def after_insert(self):
 		"""Hook para Document Generation automático"""
+		space_hierarchy.insert_node(self.name, self.parent_space)
+
 		if self.space_category:
 			# TODO: Integrar con Document Generation cuando esté disponible
 			# frappe.enqueue(
@@ -132,21 +135,34 @@ class PhysicalSpace(Document):
 
 	def on_update(self):
 		"""Hook después de actualizar"""
+		if not self.flags.in_insert and self.has_value_changed("parent_space"):
+			space_hierarchy.move_node(self.name, self.parent_space)
+
 		self.update_children_hierarchy()
 
+	def on_trash(self):
+		"""Eliminar los vínculos de la tabla de cierre"""
+		space_hierarchy.delete_node(self.name)
+
 	def update_children_hierarchy(self):
-		"""Actualizar jerarquía de espacios hijos cuando cambie el padre"""
-		children = frappe.get_all("Physical Space", filters={"parent_space": self.name}, fields=["name"])
+		"""Actualizar jerarquía de espacios hijos cuando cambie el padre o el nombre"""
+		previous = self.get_doc_before_save()
+		if not previous:
+			return
 
-		for child in children:
-			child_doc = frappe.get_doc("Physical Space", child.name)
-			child_doc.update_hierarchy_info()
-			child_doc.save()
+		if previous.space_path == self.space_path and previous.space_level == self.space_level:
+			return
+
+		space_hierarchy.update_subtree_paths(
+			self.name, previous.space_path, self.space_path, self.space_level
+		)
 
 	def generate_component_inventory_codes(self):
-		"""Generar códigos de inventario para componentes sin código"""
-		for component in self.space_components:
-			if not component.inventory_code and component.component_type:
-				# Usar el método de ComponentType para generar código único
-				component_type_doc = frappe.get_doc("Component Type", component.component_type)
-				component.inventory_code = component_type_doc.get_next_inventory_code()
+		"""Generar códigos de inventario para componentes sin código, reservados en bloque por tipo"""
+		assign_inventory_codes([component for component in self.space_components if component.component_type])
+
+
+def on_doctype_update():
+	"""Índices del árbol de espacios: hijos directos y búsqueda por prefijo de ruta"""
+	frappe.db.add_index("Physical Space", ["parent_space", "space_path"], index_name="parent_path_index")
+	frappe.db.add_index("Physical Space", ["company", "space_path"], index_name="company_path_index")
@@ -4,6 +4,8 @@
 import frappe
 from frappe.tests import UnitTestCase
 
+from condominium_management.physical_spaces import space_hierarchy
+
 
 class TestPhysicalSpace(UnitTestCase):
 	def setUp(self):
@@ -144,8 +146,113 @@ class TestPhysicalSpace(UnitTestCase):
 		# Formato esperado: TC-0001, TC-0002, etc. (abbr de "Test Condominium" = TC)
 		self.assertRegex(space.space_code, r"^TC-\d{4}$")
 
+	def _create_space(self, space_name, parent_space=None):
+		space = frappe.get_doc(
+			{
+				"doctype": "Physical Space",
+				"space_name": space_name,
+				"company": "Test Condominium",
+				"parent_space": parent_space,
+			}
+		)
+		space.insert()
+		return space
+
+	def test_closure_ancestors_and_depth_limited_children(self):
+		"""La tabla de cierre resuelve ancestros e hijos por profundidad"""
+		torre = self._create_space("Torre E")
+		piso = self._create_space("Piso 3", torre.name)
+		apto = self._create_space("Apartamento 301", piso.name)
+
+		self.assertEqual(space_hierarchy.get_ancestors(apto.name), [torre.name, piso.name])
+		self.assertEqual([row.name for row in space_hierarchy.get_children(torre.name)], [piso.name])
+		self.assertEqual(
+			[(row.name, row.depth) for row in space_hierarchy.get_children(torre.name, max_depth=2)],
+			[(piso.name, 1), (apto.name, 2)],
+		)
+		self.assertTrue(space_hierarchy.is_descendant(torre.name, apto.name))
+		self.assertFalse(space_hierarchy.is_descendant(apto.name, torre.name))
+
+	def test_closure_follows_moved_subtree(self):
+		"""Mover un espacio reubica todo su subárbol en la tabla de cierre"""
+		torre_f = self._create_space("Torre F")
+		torre_g = self._create_space("Torre G")
+		piso = self._create_space("Piso 4", torre_f.name)
+		apto = self._create_space("Apartamento 401", piso.name)
+
+		piso.parent_space = torre_g.name
+		piso.save()
+
+		self.assertEqual(space_hierarchy.get_subtree(torre_f.name), [])
+		self.assertEqual(space_hierarchy.get_subtree(torre_g.name), [piso.name, apto.name])
+		self.assertEqual(space_hierarchy.get_ancestors(apto.name), [torre_g.name, piso.name])
+
+	def test_move_repaths_whole_subtree(self):
+		"""Mover o renombrar un espacio recalcula ruta y nivel de todos sus descendientes"""
+		torre_i = self._create_space("Torre I")
+		torre_j = self._create_space("Torre J")
+		piso = self._create_space("Piso 6", torre_i.name)
+		apto = self._create_space("Apartamento 601", piso.name)
+
+		piso.parent_space = torre_j.name
+		piso.save()
+
+		self.assertEqual(
+			frappe.db.get_value("Physical Space", apto.name, ["space_path", "space_level"]),
+			("/Torre J/Piso 6/Apartamento 601", 2),
+		)
+
+		torre_j.space_name = "Torre J Norte"
+		torre_j.save()
+
+		self.assertEqual(
+			frappe.db.get_value("Physical Space", apto.name, "space_path"),
+			"/Torre J Norte/Piso 6/Apartamento 601",
+		)
+
+	def test_rebuild_closure_matches_incremental_maintenance(self):
+		"""Reconstruir la tabla desde parent_space produce los mismos vínculos"""
+		torre = self._create_space("Torre H")
+		piso = self._create_space("Piso 5", torre.name)
+		apto = self._create_space("Apartamento 501", piso.name)
+
+		space_hierarchy.rebuild_closure()
+
+		self.assertEqual(
+			space_hierarchy.get_subtree(torre.name, include_self=True), [torre.name, piso.name, apto.name]
+		)
+
+	def test_category_requirements_are_enforced(self):
+		"""El hook de validación aplica los requisitos de la categoría al crear o modificarlos"""
+		frappe.get_doc(
+			{"doctype": "Space Category", "category_name": "Bodega CTEST", "requires_dimensions": 1}
+		).insert()
+		self.addCleanup(frappe.delete_doc, "Space Category", "Bodega CTEST", force=True)
+
+		values = {
+			"doctype": "Physical Space",
+			"space_name": "Bodega 1",
+			"company": "Test Condominium",
+			"space_category": "Bodega CTEST",
+		}
+		self.assertRaises(frappe.ValidationError, frappe.get_doc(values).insert)
+
+		space = frappe.get_doc({**values, "area_m2": 12}).insert()
+
+		# Un espacio guardado antes de las reglas se puede seguir editando
+		frappe.db.set_value("Physical Space", space.name, "area_m2", 0)
+		space.reload()
+		space.description = "Bodega de mantenimiento"
+		space.save()
+
+		space.parent_space = self._create_space("Torre K").name
+		self.assertRaises(frappe.ValidationError, space.save)
+
 	def tearDown(self):
 		"""Limpiar datos de prueba"""
 		# Eliminar espacios de prueba
+		spaces = frappe.get_all("Physical Space", filters={"company": "Test Condominium"}, pluck="name")
+		if spaces:
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
 		frappe.db.delete("Physical Space", {"company": "Test Condominium"})
 		frappe.db.commit()
@@ -0,0 +1,24 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class PhysicalSpaceClosure(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Índices de la tabla de cierre de Physical Space.
+
+	(ancestor, descendant) es único y resuelve subárboles y detección de ciclos;
+	(descendant, depth) resuelve la lista de ancestros ordenada.
+	"""
+	frappe.db.add_unique(
+		"Physical Space Closure", ["ancestor", "descendant"], constraint_name="unique_ancestor_descendant"
+	)
+	frappe.db.add_index("Physical Space Closure", ["ancestor", "depth"], index_name="ancestor_depth_index")
+	frappe.db.add_index(
+		"Physical Space Closure", ["descendant", "depth"], index_name="descendant_depth_index"
+	)
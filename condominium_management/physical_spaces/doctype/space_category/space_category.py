@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import cstr
 
+from condominium_management.physical_spaces.category_rules import clear_rule_graph
+
 
 class SpaceCategory(Document):
 	def before_save(self):
@@ -97,10 +99,16 @@ class SpaceCategory(Document):
 
 	def on_update(self):
 		"""Hook después de actualizar"""
+		clear_rule_graph()
+
 		# Actualizar espacios existentes que usen esta categoría
 		if self.has_value_changed("ps_template_code") or self.has_value_changed("template_version"):
 			self.update_existing_spaces()
 
+	def on_trash(self):
+		"""Hook al eliminar"""
+		clear_rule_graph()
+
 	def update_existing_spaces(self):
 		"""Actualizar espacios existentes que usen esta categoría"""
 		spaces = frappe.get_all("Physical Space", filters={"space_category": self.name}, fields=["name"])
@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import cstr, today
 
+from condominium_management.physical_spaces.inventory_codes import assign_inventory_codes
+
 
 class SpaceComponent(Document):
 	def before_save(self):
@@ -54,37 +56,7 @@ class SpaceComponent(Document):
 
 	def generate_inventory_code(self):
 		"""Generar código de inventario automático"""
-		if self.component_type:
-			# Obtener prefijo del tipo de componente
-			component_type_doc = frappe.get_doc("Component Type", self.component_type)
-			prefix = component_type_doc.get("code_prefix", "COMP")
-		else:
-			prefix = "COMP"
-
-		# Generar código secuencial
-		last_code = frappe.db.sql(
-			"""
-            SELECT inventory_code
-            FROM `tabSpace Component`
-            WHERE inventory_code LIKE %s
-            ORDER BY inventory_code DESC
-            LIMIT 1
-        """,
-			f"{prefix}%",
-		)
-
-		if last_code:
-			# Extraer número y incrementar
-			last_num = last_code[0][0].replace(prefix, "").replace("-", "")
-			try:
-				next_num = int(last_num) + 1
-				self.inventory_code = f"{prefix}-{next_num:04d}"
-			except ValueError:
-				# Si no se puede convertir, usar timestamp
-				self.inventory_code = f"{prefix}-{frappe.utils.now_datetime().strftime('%Y%m%d%H%M%S')}"
-		else:
-			# Primer código
-			self.inventory_code = f"{prefix}-0001"
+		assign_inventory_codes([self])
 
 	def get_all_subcomponents(self, include_self=False):
 		"""Obtener todos los subcomponentes recursivamente"""
@@ -104,9 +76,13 @@ class SpaceComponent(Document):
 		return components
 
 	def get_maintenance_schedule(self):
-		"""Obtener programación de mantenimiento para este componente"""
-		# TODO: Integrar con módulo de mantenimiento cuando esté disponible
-		return []
+		"""Obtener las órdenes de mantenimiento de este componente"""
+		return frappe.get_all(
+			"Maintenance Work Order",
+			filters={"component": self.name},
+			fields=["name", "due_date", "status", "completion_date", "maintenance_type"],
+			order_by="due_date desc",
+		)
 
 	def get_component_hierarchy_path(self):
 		"""Obtener la ruta completa de la jerarquía del componente"""
@@ -140,3 +116,8 @@ class SpaceComponent(Document):
 			# TODO: Implementar validaciones específicas por tipo cuando esté disponible
 			# el sistema de templates
 			pass
+
+
+def on_doctype_update():
+	"""Índice para el conteo de mantenimientos por vencer por empresa"""
+	frappe.db.add_index("Space Component", ["company", "next_due_date"], index_name="company_next_due_index")
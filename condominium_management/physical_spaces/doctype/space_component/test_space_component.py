@@ -1,10 +1,14 @@
 # Copyright (c) 2025, Buzola and contributors
 # For license information, please see license.txt
 
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 from frappe.utils import add_years, today
 
+from condominium_management.physical_spaces.hooks_handlers.component_validation import validate_components
+
 
 class TestSpaceComponent(FrappeTestCase):
 	def setUp(self):
@@ -243,6 +247,90 @@ class TestSpaceComponent(FrappeTestCase):
 		component = space.space_components[0]
 		self.assertEqual(component.installation_date, install_date)
 
+	def test_batched_validation_reports_all_errors(self):
+		"""Los errores de todas las filas se reportan juntos"""
+		space = frappe.get_doc(
+			{
+				"doctype": "Physical Space",
+				"space_name": "Test Validación en Lote",
+				"company": "Test Company",
+				"space_components": [
+					{"component_name": "Bomba 1", "component_type": "Test Component Type", "quantity": 0},
+					{
+						"component_name": "Bomba 2",
+						"component_type": "Test Component Type",
+						"inventory_code": "TEST-DUP-1",
+					},
+					{
+						"component_name": "Bomba 3",
+						"component_type": "Test Component Type",
+						"inventory_code": "TEST-DUP-1",
+					},
+				],
+			}
+		)
+
+		with self.assertRaises(frappe.ValidationError) as context:
+			space.insert()
+
+		message = str(context.exception)
+		self.assertIn("Fila 1 (Bomba 1)", message)
+		self.assertIn("Fila 2 (Bomba 2)", message)
+		self.assertIn("Fila 3 (Bomba 3)", message)
+
+	def test_batched_validation_query_count(self):
+		"""Validar 200 componentes no abre una consulta por componente"""
+		space = frappe.get_doc(
+			{
+				"doctype": "Physical Space",
+				"space_name": "Cuarto de Máquinas Test",
+				"company": "Test Company",
+				"space_components": [
+					{
+						"component_name": f"Equipo {index}",
+						"component_type": "Test Component Type",
+						"inventory_code": f"TEST-BATCH-{index:04d}",
+					}
+					for index in range(200)
+				],
+			}
+		)
+		space.insert()
+		for index, component in enumerate(space.space_components[1:], start=1):
+			component.parent_component = space.space_components[index // 10].name
+
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+			validate_components(space.space_components)
+
+		self.assertLessEqual(sql_spy.call_count, 2)
+
+	def test_existing_non_compliant_space_still_saves(self):
+		"""Un espacio con componentes guardados fuera de regla se puede volver a guardar;
+		la regla se exige cuando se modifica la fila"""
+		space = frappe.get_doc(
+			{
+				"doctype": "Physical Space",
+				"space_name": "Test Espacio Heredado",
+				"company": "Test Company",
+				"space_components": [
+					{"component_name": "Bomba Heredada", "component_type": "Test Component Type"}
+				],
+			}
+		).insert()
+		# Dato histórico guardado antes de que el espacio validara sus componentes
+		frappe.db.set_value("Space Component", space.space_components[0].name, "quantity", 0)
+
+		space = frappe.get_doc("Physical Space", space.name)
+		space.append(
+			"space_components", {"component_name": "Bomba Nueva", "component_type": "Test Component Type"}
+		)
+		space.save()
+		self.assertEqual(len(space.space_components), 2)
+
+		space.space_components[0].brand = "Grundfos"
+		with self.assertRaises(frappe.ValidationError):
+			space.save()
+
 	def tearDown(self):
 		# Limpiar datos de prueba específicos de esta clase
 		frappe.db.rollback()
@@ -0,0 +1,16 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class SpaceOccupancy(Document):
+	pass
+
+
+def on_doctype_update():
+	"""Un renglón por espacio y día; la llave única permite reconstruir por rango"""
+	frappe.db.add_unique(
+		"Space Occupancy", ["physical_space", "occupancy_date"], constraint_name="unique_space_day"
+	)
@@ -4,6 +4,8 @@
 import frappe
 from frappe.utils import now_datetime
 
+from condominium_management.physical_spaces.inventory_codes import assign_inventory_codes
+
 
 def after_insert(doc, method):
 	"""Hook después de insertar Space Component"""
@@ -28,49 +30,13 @@ def after_insert(doc, method):
 def generate_inventory_code(doc):
 	"""Generar código de inventario automáticamente"""
 	try:
-		if doc.component_type:
-			component_type = frappe.get_doc("Component Type", doc.component_type)
-			next_code = component_type.get_next_inventory_code()
-
-			# Actualizar el documento
-			frappe.db.set_value("Space Component", doc.name, "inventory_code", next_code)
-			doc.inventory_code = next_code
-
-		else:
-			# Generar código genérico
-			next_code = get_generic_inventory_code()
-			frappe.db.set_value("Space Component", doc.name, "inventory_code", next_code)
-			doc.inventory_code = next_code
+		assign_inventory_codes([doc])
+		frappe.db.set_value("Space Component", doc.name, "inventory_code", doc.inventory_code)
 
 	except Exception as e:
 		frappe.log_error(f"Error generando código de inventario: {e!s}")
 
 
-def get_generic_inventory_code():
-	"""Generar código de inventario genérico"""
-	# Buscar el último código genérico usado
-	last_code = frappe.db.sql("""
-        SELECT inventory_code
-        FROM `tabSpace Component`
-        WHERE inventory_code LIKE 'COMP-%'
-        ORDER BY inventory_code DESC
-        LIMIT 1
-    """)
-
-	if last_code:
-		# Extraer número y incrementar
-		last_num = last_code[0][0].replace("COMP-", "")
-		try:
-			next_num = int(last_num) + 1
-			return f"COMP-{next_num:04d}"
-		except ValueError:
-			# Si no se puede convertir, usar timestamp
-			return f"COMP-{frappe.utils.now_datetime().strftime('%Y%m%d%H%M%S')}"
-	else:
-		# Primer código
-		return "COMP-0001"
-
-
 def create_initial_configuration(doc):
 	"""Crear configuración inicial para el componente"""
 	try:
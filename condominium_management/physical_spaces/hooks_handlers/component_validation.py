@@ -2,144 +2,286 @@
 # For license information, please see license.txt
 
 import frappe
-from frappe.utils import today
+from frappe.utils import cstr, flt, getdate, today
 
+from condominium_management.physical_spaces.category_rules import get_component_type_rules
 
-def validate(doc, method):
-	"""Hook de validación para Space Component"""
-	try:
-		# Validar jerarquía de componentes
-		validate_component_hierarchy(doc)
+VALID_STATUSES = ("Activo", "Inactivo", "En Mantenimiento", "Fuera de Servicio", "Pendiente Instalación")
+
+# Límite de seguridad de la jerarquía de componentes
+MAX_COMPONENT_DEPTH = 50
 
-		# Validar requisitos del tipo de componente
-		validate_component_type_requirements(doc)
+# Campos que deciden las reglas de un componente; si no cambian, la fila no se vuelve
+# a exigir al guardar el espacio
+RULE_FIELDS = (
+	"parent_component",
+	"component_type",
+	"brand",
+	"model",
+	"technical_specifications",
+	"inventory_code",
+	"status",
+	"quantity",
+	"inventory_date",
+	"installation_date",
+	"warranty_expiry_date",
+)
+DATE_FIELDS = ("inventory_date", "installation_date", "warranty_expiry_date")
 
-		# Validar datos específicos del componente
-		validate_component_data(doc)
 
-		# Establecer valores por defecto
-		set_default_values(doc)
+def validate(doc, method):
+	"""Hook de validación para Space Component"""
+	try:
+		validate_components([doc])
 
 	except Exception as e:
 		frappe.log_error(f"Error en validación de Space Component: {e!s}")
 		raise
 
 
-def validate_component_hierarchy(doc):
-	"""Validar jerarquía de componentes"""
+def validate_components(components, unchanged=()):
+	"""Valida en un solo paso todas las filas de componentes de un espacio.
+
+	Las reglas de tipo salen del grafo en caché; los componentes padre que no están en
+	el lote se precargan por nivel de jerarquía y la unicidad de códigos de inventario
+	se verifica con una sola consulta. Todos los errores se reportan juntos.
+
+	Args:
+		components: Filas de Space Component (p. ej. PhysicalSpace.space_components)
+		unchanged: Nombres de filas ya guardadas sin cambios en RULE_FIELDS; sus
+			incumplimientos se avisan sin impedir el guardado
+	"""
+	components = [component for component in components if component]
+	if not components:
+		return
+
+	hierarchy = load_component_hierarchy(components)
+	duplicated_codes = get_duplicated_inventory_codes(components)
+	errors = []
+	warnings = []
+
+	for component in components:
+		row_errors = [
+			*validate_component_hierarchy(component, hierarchy),
+			*validate_component_type_requirements(component),
+			*validate_component_data(component, warnings),
+		]
+		if component.inventory_code and component.inventory_code in duplicated_codes:
+			row_errors.append(
+				f"Ya existe un componente con el código de inventario '{component.inventory_code}'"
+			)
+
+		parent = hierarchy.get(component.parent_component)
+		if parent:
+			validate_compatible_types(component, parent)
+		if parent and parent.status == "Fuera de Servicio":
+			warnings.append(
+				f"Advertencia: El componente padre '{parent.component_name}' está fuera de servicio"
+			)
+
+		label = _row_label(component) if len(components) > 1 else None
+		row_errors = [f"{label}: {error}" if label else error for error in row_errors]
+		if component.name and component.name in unchanged:
+			# Filas guardadas antes de que el espacio validara sus componentes
+			warnings.extend(f"Advertencia: {error}" for error in row_errors)
+		else:
+			errors.extend(row_errors)
+
+	if errors:
+		frappe.throw("<br>".join(errors))
+
+	for component in components:
+		set_default_values(component)
+
+	if warnings:
+		frappe.msgprint("<br>".join(dict.fromkeys(warnings)))
+
+
+def get_unchanged_components(components, previous_components):
+	"""Nombres de las filas que ya estaban guardadas y no cambiaron en RULE_FIELDS"""
+	previous = {row.name: _rule_signature(row) for row in previous_components or [] if row.name}
+	return {
+		component.name
+		for component in components
+		if component.name in previous and previous[component.name] == _rule_signature(component)
+	}
+
+
+def _rule_signature(component):
+	"""Valores de RULE_FIELDS normalizados (fechas y números llegan como texto del form)"""
+	values = []
+	for field in RULE_FIELDS:
+		value = component.get(field)
+		if field in DATE_FIELDS:
+			values.append(cstr(getdate(value)) if value else "")
+		elif field == "quantity":
+			values.append(flt(value))
+		else:
+			values.append(cstr(value))
+	return tuple(values)
+
+
+def load_component_hierarchy(components):
+	"""{nombre: (parent_component, status, component_name)} del lote y de sus ancestros.
+
+	Los padres que no están en el lote se leen en una consulta por nivel de jerarquía.
+	"""
+	hierarchy = {
+		component.name: frappe._dict(
+			parent_component=component.parent_component,
+			status=component.status,
+			component_name=component.component_name,
+		)
+		for component in components
+		if component.name
+	}
+
+	pending = {component.parent_component for component in components} - set(hierarchy) - {None, ""}
+	for _level in range(MAX_COMPONENT_DEPTH):
+		if not pending:
+			break
+
+		for row in frappe.get_all(
+			"Space Component",
+			filters={"name": ["in", list(pending)]},
+			fields=["name", "parent_component", "status", "component_name"],
+		):
+			hierarchy[row.name] = row
+
+		pending = {hierarchy[name].parent_component for name in pending if name in hierarchy}
+		pending = pending - set(hierarchy) - {None, ""}
+
+	return hierarchy
+
+
+def get_duplicated_inventory_codes(components):
+	"""Códigos de inventario repetidos dentro del lote o usados por otro componente"""
+	codes = [component.inventory_code for component in components if component.inventory_code]
+	if not codes:
+		return set()
+
+	duplicated = {code for code in codes if codes.count(code) > 1}
+	names = [component.name for component in components if component.name]
+	filters = {"inventory_code": ["in", list(set(codes))]}
+	if names:
+		filters["name"] = ["not in", names]
+
+	duplicated.update(frappe.get_all("Space Component", filters=filters, pluck="inventory_code"))
+	return duplicated
+
+
+def validate_component_hierarchy(doc, hierarchy):
+	"""Errores de jerarquía de un componente"""
+	if not doc.parent_component:
+		return []
+
 	# Validar que no sea su propio padre
 	if doc.parent_component == doc.name:
-		frappe.throw("Un componente no puede ser su propio padre")
-
-	# Validar referencias circulares
-	if doc.parent_component and has_circular_reference(doc):
-		frappe.throw("Se detectó una referencia circular en la jerarquía de componentes")
+		return ["Un componente no puede ser su propio padre"]
 
+	if doc.parent_component not in hierarchy:
+		return [f"El componente padre '{doc.parent_component}' no existe"]
 
-def has_circular_reference(doc):
-	"""Detectar referencias circulares en jerarquía de componentes"""
+	# Validar referencias circulares
 	visited = set()
 	current = doc.parent_component
-
 	while current:
-		if current in visited:
-			return True
+		if current == doc.name or current in visited:
+			return ["Se detectó una referencia circular en la jerarquía de componentes"]
 		visited.add(current)
 
-		# Obtener componente padre - usar get_value para evitar cargar doc completo
-		parent_component = frappe.db.get_value("Space Component", current, "parent_component")
-		current = parent_component
-
 		# Límite de seguridad
-		if len(visited) > 50:
-			frappe.throw("Jerarquía de componentes demasiado profunda")
+		if len(visited) > MAX_COMPONENT_DEPTH:
+			return ["Jerarquía de componentes demasiado profunda"]
+
+		parent = hierarchy.get(current)
+		current = parent.parent_component if parent else None
 
-	return False
+	return []
 
 
 def validate_component_type_requirements(doc):
-	"""Validar requisitos específicos del tipo de componente"""
+	"""Errores por requisitos específicos del tipo de componente"""
 	if not doc.component_type:
-		return
-
-	try:
-		component_type = frappe.get_doc("Component Type", doc.component_type)
+		return []
 
-		# Obtener reglas de validación del tipo
-		validation_rules = component_type.get_validation_rules()
+	# Reglas del tipo desde el grafo en caché (sin leer el Component Type)
+	validation_rules = get_component_type_rules(doc.component_type)
+	if validation_rules is None:
+		return [f"El tipo de componente '{doc.component_type}' no existe"]
 
-		# Validar campos obligatorios según el tipo
-		errors = []
+	# Validar campos obligatorios según el tipo
+	errors = []
 
-		if validation_rules.get("requires_brand") and not doc.brand:
-			errors.append("La marca es obligatoria para este tipo de componente")
+	if validation_rules.get("requires_brand") and not doc.brand:
+		errors.append("La marca es obligatoria para este tipo de componente")
 
-		if validation_rules.get("requires_model") and not doc.model:
-			errors.append("El modelo es obligatorio para este tipo de componente")
+	if validation_rules.get("requires_model") and not doc.model:
+		errors.append("El modelo es obligatorio para este tipo de componente")
 
-		if validation_rules.get("requires_installation_date") and not doc.installation_date:
-			errors.append("La fecha de instalación es obligatoria para este tipo de componente")
+	if validation_rules.get("requires_installation_date") and not doc.installation_date:
+		errors.append("La fecha de instalación es obligatoria para este tipo de componente")
 
-		if validation_rules.get("requires_warranty") and not doc.warranty_expiry_date:
-			errors.append("La información de garantía es obligatoria para este tipo de componente")
+	if validation_rules.get("requires_warranty") and not doc.warranty_expiry_date:
+		errors.append("La información de garantía es obligatoria para este tipo de componente")
 
-		if validation_rules.get("requires_specifications") and not doc.technical_specifications:
-			errors.append("Las especificaciones técnicas son obligatorias para este tipo de componente")
+	if validation_rules.get("requires_specifications") and not doc.technical_specifications:
+		errors.append("Las especificaciones técnicas son obligatorias para este tipo de componente")
 
-		# Reportar errores
-		if errors:
-			frappe.throw("<br>".join(errors))
+	return errors
 
-	except frappe.DoesNotExistError:
-		frappe.throw(f"El tipo de componente '{doc.component_type}' no existe")
 
+def validate_component_data(doc, warnings):
+	"""Errores en datos específicos del componente"""
+	errors = []
 
-def validate_component_data(doc):
-	"""Validar datos específicos del componente"""
 	# Validar cantidad
 	if doc.quantity is not None and doc.quantity <= 0:
-		frappe.throw("La cantidad debe ser mayor a cero")
+		errors.append("La cantidad debe ser mayor a cero")
 
-	# Validar fechas
-	validate_dates(doc)
+	errors.extend(validate_dates(doc))
+	errors.extend(validate_status(doc, warnings))
 
-	# Validar estado
-	validate_status(doc)
+	return errors
 
 
 def validate_dates(doc):
-	"""Validar coherencia de fechas"""
-	today_date = today()
+	"""Errores de coherencia de fechas"""
+	errors = []
+	today_date = getdate(today())
+	inventory_date = getdate(doc.inventory_date) if doc.inventory_date else None
+	installation_date = getdate(doc.installation_date) if doc.installation_date else None
+	warranty_expiry_date = getdate(doc.warranty_expiry_date) if doc.warranty_expiry_date else None
 
 	# La fecha de inventario no puede ser futura
-	if doc.inventory_date and doc.inventory_date > today_date:
-		frappe.throw("La fecha de entrada a inventario no puede ser futura")
+	if inventory_date and inventory_date > today_date:
+		errors.append("La fecha de entrada a inventario no puede ser futura")
 
 	# La fecha de instalación debe ser posterior o igual a la de inventario
-	if doc.installation_date and doc.inventory_date:
-		if doc.installation_date < doc.inventory_date:
-			frappe.throw("La fecha de instalación no puede ser anterior a la fecha de inventario")
+	if installation_date and inventory_date and installation_date < inventory_date:
+		errors.append("La fecha de instalación no puede ser anterior a la fecha de inventario")
 
 	# La fecha de garantía debe ser posterior a la de instalación
-	if doc.warranty_expiry_date and doc.installation_date:
-		if doc.warranty_expiry_date <= doc.installation_date:
-			frappe.throw("La fecha de vencimiento de garantía debe ser posterior a la fecha de instalación")
+	if warranty_expiry_date and installation_date and warranty_expiry_date <= installation_date:
+		errors.append("La fecha de vencimiento de garantía debe ser posterior a la fecha de instalación")
 
+	return errors
 
-def validate_status(doc):
-	"""Validar estado del componente"""
-	valid_statuses = ["Activo", "Inactivo", "En Mantenimiento", "Fuera de Servicio", "Pendiente Instalación"]
 
-	if doc.status and doc.status not in valid_statuses:
-		frappe.throw(f"Estado inválido. Debe ser uno de: {', '.join(valid_statuses)}")
+def validate_status(doc, warnings):
+	"""Errores de estado del componente; las incoherencias leves van a warnings"""
+	if doc.status and doc.status not in VALID_STATUSES:
+		return [f"Estado inválido. Debe ser uno de: {', '.join(VALID_STATUSES)}"]
 
 	# Validar coherencia del estado con fechas
 	if doc.status == "Pendiente Instalación" and doc.installation_date:
-		if doc.installation_date <= today():
-			frappe.msgprint(
+		if getdate(doc.installation_date) <= getdate(today()):
+			warnings.append(
 				"El componente tiene fecha de instalación pero está marcado como 'Pendiente Instalación'"
 			)
 
+	return []
+
 
 def set_default_values(doc):
 	"""Establecer valores por defecto"""
@@ -159,36 +301,6 @@ def set_default_values(doc):
 			doc.status = "Pendiente Instalación"
 
 
-def validate_inventory_code_uniqueness(doc):
-	"""Validar unicidad del código de inventario"""
-	if doc.inventory_code:
-		# Verificar que no existe otro componente con el mismo código
-		existing = frappe.db.get_value(
-			"Space Component", filters={"inventory_code": doc.inventory_code, "name": ["!=", doc.name]}
-		)
-		if existing:
-			frappe.throw(f"Ya existe un componente con el código de inventario '{doc.inventory_code}'")
-
-
-def validate_parent_component_consistency(doc):
-	"""Validar consistencia con componente padre"""
-	if doc.parent_component:
-		try:
-			parent_doc = frappe.get_doc("Space Component", doc.parent_component)
-
-			# El componente hijo debe tener el mismo o compatible tipo
-			validate_compatible_types(doc, parent_doc)
-
-			# Validar que el padre esté activo
-			if parent_doc.status == "Fuera de Servicio":
-				frappe.msgprint(
-					f"Advertencia: El componente padre '{parent_doc.component_name}' está fuera de servicio"
-				)
-
-		except frappe.DoesNotExistError:
-			frappe.throw(f"El componente padre '{doc.parent_component}' no existe")
-
-
 def validate_compatible_types(child_doc, parent_doc):
 	"""Validar que los tipos de componente sean compatibles"""
 	# TODO: Implementar lógica de compatibilidad de tipos cuando esté disponible
@@ -206,3 +318,9 @@ def validate_technical_specifications_format(doc):
 			)
 
 		# TODO: Implementar validaciones más específicas según el tipo de componente
+
+
+def _row_label(component):
+	if component.idx:
+		return f"Fila {component.idx} ({component.component_name})"
+	return component.component_name or component.name
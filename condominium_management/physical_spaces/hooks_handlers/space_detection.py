@@ -24,8 +24,7 @@ def after_insert(doc, method):
 def on_update(doc, method):
 	"""Hook al actualizar Physical Space"""
 	try:
-		# Actualizar jerarquía de espacios hijos
-		update_children_hierarchy(doc)
+		# La jerarquía de los hijos la recalcula PhysicalSpace.update_children_hierarchy
 
 		# Actualizar templates si cambió la categoría
 		if doc.has_value_changed("space_category"):
@@ -62,20 +61,6 @@ def create_initial_configuration(doc):
 		doc.template_fields = {}
 
 
-def update_children_hierarchy(doc):
-	"""Actualizar jerarquía de espacios hijos"""
-	if doc.has_value_changed("space_name") or doc.has_value_changed("space_path"):
-		children = frappe.get_all("Physical Space", filters={"parent_space": doc.name}, fields=["name"])
-
-		for child in children:
-			try:
-				child_doc = frappe.get_doc("Physical Space", child.name)
-				child_doc.update_hierarchy_info()
-				child_doc.save()
-			except Exception as e:
-				frappe.log_error(f"Error actualizando hijo {child.name}: {e!s}")
-
-
 def update_template_fields(doc):
 	"""Actualizar campos del template cuando cambia la categoría"""
 	if doc.space_category:
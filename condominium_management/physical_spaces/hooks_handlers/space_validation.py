@@ -2,67 +2,46 @@
 # For license information, please see license.txt
 
 import frappe
-from frappe.utils import now_datetime
 
+from condominium_management.physical_spaces.category_rules import (
+	get_category_rules,
+	is_parent_category_allowed,
+)
 
-def validate(doc, method):
-	"""Hook de validación para Physical Space"""
-	try:
-		# Validar jerarquía
-		validate_hierarchy(doc)
+# Campos de los que dependen los requisitos y padres permitidos de la categoría
+CATEGORY_RULE_FIELDS = ("space_category", "parent_space", "area_m2", "max_capacity")
 
-		# Validar categoría si está configurada
-		validate_category_requirements(doc)
-
-	except Exception as e:
-		frappe.log_error(f"Error en validación de Physical Space: {e!s}")
-		raise
 
+def validate(doc, method):
+	"""Hook de validación para Physical Space.
 
-def before_save(doc, method):
-	"""Hook antes de guardar Physical Space"""
+	La jerarquía (propio padre y ciclos) la valida PhysicalSpace.before_save con la
+	tabla de cierre; aquí solo se aplican las reglas de la categoría.
+	"""
 	try:
-		# Generar código si no existe
-		if not doc.space_code:
-			doc.generate_space_code()
-
-		# Actualizar información de jerarquía
-		doc.update_hierarchy_info()
+		# Validar categoría si está configurada
+		if has_category_rule_changes(doc):
+			validate_category_requirements(doc)
 
 	except Exception as e:
-		frappe.log_error(f"Error en before_save de Physical Space: {e!s}")
+		frappe.log_error(f"Error en validación de Physical Space: {e!s}")
 		raise
 
 
-def validate_hierarchy(doc):
-	"""Validar jerarquía del espacio físico"""
-	# Validar que no sea su propio padre
-	if doc.parent_space == doc.name:
-		frappe.throw("Un espacio no puede ser su propio padre")
-
-	# Validar referencias circulares
-	if doc.parent_space and has_circular_reference(doc):
-		frappe.throw("Se detectó una referencia circular en la jerarquía")
-
-
-def has_circular_reference(doc):
-	"""Detectar referencias circulares en jerarquía"""
-	visited = set()
-	current = doc.parent_space
-
-	while current:
-		if current in visited:
-			return True
-		visited.add(current)
+def has_category_rule_changes(doc):
+	"""True si el espacio es nuevo o cambió algo que las reglas de su categoría revisan.
 
-		parent_doc = frappe.get_doc("Physical Space", current)
-		current = parent_doc.parent_space
+	Los espacios guardados antes de que se aplicaran las reglas siguen pudiéndose
+	editar mientras no se toquen categoría, padre, dimensiones, capacidad o componentes.
+	"""
+	previous = doc.get_doc_before_save()
+	if not previous:
+		return True
 
-		# Límite de seguridad
-		if len(visited) > 100:
-			frappe.throw("Jerarquía demasiado profunda")
+	if any(doc.has_value_changed(field) for field in CATEGORY_RULE_FIELDS):
+		return True
 
-	return False
+	return bool(previous.space_components) != bool(doc.space_components)
 
 
 def validate_category_requirements(doc):
@@ -70,42 +49,48 @@ def validate_category_requirements(doc):
 	if not doc.space_category:
 		return
 
-	try:
-		category = frappe.get_doc("Space Category", doc.space_category)
+	# Reglas de la categoría desde el grafo en caché (sin leer la Space Category)
+	category = get_category_rules(doc.space_category)
+	if category is None:
+		frappe.throw(f"La categoría '{doc.space_category}' no existe")
 
-		# Validar campos obligatorios según categoría
-		if category.requires_dimensions:
-			if not doc.area_m2:
-				frappe.throw(f"La categoría '{category.category_name}' requiere especificar el área en m²")
+	validate_category_fields(doc, category)
 
-		if category.requires_capacity:
-			if not doc.max_capacity:
-				frappe.throw(
-					f"La categoría '{category.category_name}' requiere especificar la capacidad máxima"
-				)
+	# Validar jerarquía permitida
+	validate_category_hierarchy(doc, category)
 
-		if category.requires_components:
-			if not doc.space_components:
-				frappe.throw(f"La categoría '{category.category_name}' requiere especificar componentes")
 
-		# Validar jerarquía permitida
-		validate_category_hierarchy(doc, category)
+def validate_category_fields(doc, category):
+	"""Validar campos obligatorios según categoría"""
+	if category["requires_dimensions"]:
+		if not doc.area_m2:
+			frappe.throw(f"La categoría '{category['category_name']}' requiere especificar el área en m²")
 
-	except frappe.DoesNotExistError:
-		frappe.throw(f"La categoría '{doc.space_category}' no existe")
+	if category["requires_capacity"]:
+		if not doc.max_capacity:
+			frappe.throw(
+				f"La categoría '{category['category_name']}' requiere especificar la capacidad máxima"
+			)
+
+	if category["requires_components"]:
+		if not doc.space_components:
+			frappe.throw(f"La categoría '{category['category_name']}' requiere especificar componentes")
 
 
 def validate_category_hierarchy(doc, category):
 	"""Validar jerarquía permitida por la categoría"""
-	if doc.parent_space and category.allowed_parent_categories:
-		parent_doc = frappe.get_doc("Physical Space", doc.parent_space)
-		if parent_doc.space_category:
-			allowed_parents = [row.parent_category for row in category.allowed_parent_categories]
-			if parent_doc.space_category not in allowed_parents:
-				frappe.throw(
-					f"La categoría '{category.category_name}' no puede ser hija de "
-					f"la categoría '{parent_doc.space_category}'"
-				)
+	if doc.parent_space and category["allowed_parents"]:
+		parent_category = frappe.db.get_value("Physical Space", doc.parent_space, "space_category")
+		validate_parent_category(doc, category, parent_category)
+
+
+def validate_parent_category(doc, category, parent_category):
+	"""Validar que la categoría del padre esté entre las permitidas"""
+	if parent_category and not is_parent_category_allowed(doc.space_category, parent_category):
+		frappe.throw(
+			f"La categoría '{category['category_name']}' no puede ser hija de "
+			f"la categoría '{parent_category}'"
+		)
 
 
 def validate_cost_center(doc):
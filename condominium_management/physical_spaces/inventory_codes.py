@@ -0,0 +1,106 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Asignación de códigos de inventario
+=====================================================
+
+Los códigos de inventario de Space Component tienen la forma {code_prefix}-{####}. Cada
+prefijo tiene un contador propio en tabSeries ("INV-{prefix}-") que se avanza con
+FOR UPDATE, de modo que dos guardados concurrentes nunca obtienen el mismo código y
+reservar N códigos es una sola operación. El consecutivo es numérico, por lo que
+después de 9999 continúa con 10000 sin depender del orden de cadenas.
+
+La primera vez que se usa un prefijo, su contador se inicializa con el mayor
+consecutivo numérico ya registrado en Space Component.
+"""
+
+import frappe
+
+from condominium_management.physical_spaces.category_rules import get_component_type_rules
+from condominium_management.utils import reserve_series_numbers
+
+# Prefijo para componentes sin tipo o tipos sin code_prefix
+GENERIC_PREFIX = "COMP"
+CODE_DIGITS = 4
+
+# Consecutivos más largos corresponden a códigos históricos basados en fecha/hora
+MAX_SEED_DIGITS = 9
+
+
+def get_series_key(prefix):
+	return f"INV-{prefix}-"
+
+
+def reserve_inventory_codes(prefix, count):
+	"""Reserva `count` códigos de inventario consecutivos para un prefijo.
+
+	Args:
+		prefix: code_prefix del Component Type (o GENERIC_PREFIX)
+		count: Número de códigos a reservar
+
+	Returns:
+		list: Códigos reservados en orden, p. ej. ["MOT-0012", "MOT-0013"]
+	"""
+	prefix = prefix or GENERIC_PREFIX
+	series = get_series_key(prefix)
+	_seed_series(series, prefix)
+
+	return [f"{prefix}-{number:0{CODE_DIGITS}d}" for number in reserve_series_numbers(series, count)]
+
+
+def assign_inventory_codes(components):
+	"""Asigna código a los componentes que no lo tienen.
+
+	Toma los prefijos del grafo de reglas en caché y reserva los códigos de cada
+	prefijo en una sola llamada.
+
+	Args:
+		components: Filas de Space Component (documentos o dicts)
+
+	Returns:
+		int: Número de códigos asignados
+	"""
+	pending = [component for component in components if not component.get("inventory_code")]
+	if not pending:
+		return 0
+
+	by_prefix = {}
+	for component in pending:
+		rules = get_component_type_rules(component.get("component_type")) or {}
+		prefix = rules.get("code_prefix") or GENERIC_PREFIX
+		by_prefix.setdefault(prefix, []).append(component)
+
+	for prefix, prefix_components in by_prefix.items():
+		codes = reserve_inventory_codes(prefix, len(prefix_components))
+		for component, code in zip(prefix_components, codes, strict=True):
+			if isinstance(component, dict):
+				component["inventory_code"] = code
+			else:
+				component.inventory_code = code
+
+	return len(pending)
+
+
+def _seed_series(series, prefix):
+	"""Inicializa el contador del prefijo con el mayor consecutivo existente"""
+	if frappe.db.sql("SELECT 1 FROM `tabSeries` WHERE `name` = %s", series):
+		return
+
+	offset = len(prefix) + 2
+	frappe.db.sql(
+		"""
+		INSERT IGNORE INTO `tabSeries` (`name`, `current`)
+		SELECT %(series)s, IFNULL(MAX(CAST(SUBSTRING(inventory_code, %(offset)s) AS UNSIGNED)), 0)
+		FROM `tabSpace Component`
+		WHERE LEFT(inventory_code, %(prefix_length)s) = %(code_prefix)s
+			AND SUBSTRING(inventory_code, %(offset)s) REGEXP %(digits)s
+	""",
+		{
+			"series": series,
+			"offset": offset,
+			"prefix_length": offset - 1,
+			"code_prefix": f"{prefix}-",
+			"digits": f"^[0-9]{{1,{MAX_SEED_DIGITS}}}$",
+		},
+	)
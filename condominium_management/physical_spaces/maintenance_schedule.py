@@ -0,0 +1,239 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Plan de mantenimiento de componentes
+======================================================
+
+Cada Space Component hereda de su Component Type una regla de recurrencia
+(frecuencia x intervalo) que puede sobrescribir. Al guardar el Physical Space se
+precalcula next_due_date a partir del último mantenimiento (o de la instalación) y se
+copia la empresa del espacio, de modo que "componentes por vencer" es un rango sobre
+el índice (company, next_due_date) de Space Component.
+
+Un job diario genera en bloque las Maintenance Work Order de los componentes que
+vencen dentro de WORK_ORDER_LEAD_DAYS; la llave única (component, due_date) evita
+duplicar órdenes de la misma fecha. Completar una orden registra el mantenimiento en
+el componente y recorre su próxima fecha.
+"""
+
+import frappe
+from frappe.utils import add_days, add_months, cint, getdate, now_datetime, nowdate
+
+from condominium_management.physical_spaces.category_rules import get_component_type_rules
+from condominium_management.utils import reserve_series_names
+
+WORK_ORDER_DOCTYPE = "Maintenance Work Order"
+WORK_ORDER_SERIES = "MWO-"
+WORK_ORDER_DIGITS = 5
+
+# Días de anticipación con que se generan las órdenes de trabajo
+WORK_ORDER_LEAD_DAYS = 7
+
+# Frecuencia -> (unidad, periodos); "Según Condición" no programa mantenimientos
+FREQUENCY_RULES = {
+	"Semanal": ("days", 7),
+	"Quincenal": ("days", 14),
+	"Mensual": ("months", 1),
+	"Trimestral": ("months", 3),
+	"Semestral": ("months", 6),
+	"Anual": ("months", 12),
+	"Bianual": ("months", 24),
+}
+
+# Estados en los que un componente no recibe mantenimiento programado
+UNSCHEDULED_STATUSES = ("Inactivo", "Fuera de Servicio", "Pendiente Instalación")
+
+COMPONENT_FIELDS = (
+	"name",
+	"component_type",
+	"status",
+	"maintenance_frequency",
+	"maintenance_interval",
+	"last_maintenance_date",
+	"installation_date",
+	"inventory_date",
+	"next_due_date",
+)
+
+BATCH_SIZE = 1000
+
+
+def calculate_next_due_date(component):
+	"""Próxima fecha de mantenimiento de un componente o None si no se programa.
+
+	La regla del componente (maintenance_frequency, maintenance_interval) tiene
+	prioridad sobre la de su Component Type.
+	"""
+	if component.get("status") in UNSCHEDULED_STATUSES:
+		return None
+
+	rules = get_component_type_rules(component.get("component_type")) or {}
+	frequency = component.get("maintenance_frequency") or rules.get("default_maintenance_frequency")
+	if frequency not in FREQUENCY_RULES:
+		return None
+
+	base_date = (
+		component.get("last_maintenance_date")
+		or component.get("installation_date")
+		or component.get("inventory_date")
+	)
+	if not base_date:
+		return None
+
+	interval = cint(component.get("maintenance_interval")) or cint(rules.get("maintenance_interval")) or 1
+	unit, periods = FREQUENCY_RULES[frequency]
+	if unit == "days":
+		return getdate(add_days(base_date, periods * interval))
+
+	return getdate(add_months(base_date, periods * interval))
+
+
+def set_due_dates(components, company):
+	"""Copia la empresa y calcula next_due_date en las filas de un Physical Space"""
+	for component in components:
+		component.company = company
+		component.next_due_date = calculate_next_due_date(component)
+
+
+def refresh_due_dates(component_type=None):
+	"""Recalcula empresa y next_due_date de componentes ya guardados.
+
+	Se usa cuando cambia la regla de un Component Type y para la carga inicial. Solo
+	escribe las filas cuyo valor cambió, en lotes y sin alterar `modified`.
+
+	Returns:
+		int: Componentes actualizados
+	"""
+	conditions = ["component.parenttype = 'Physical Space'"]
+	if component_type:
+		conditions.append("component.component_type = %(component_type)s")
+
+	components = frappe.db.sql(
+		f"""
+		SELECT {", ".join(f"component.{field}" for field in COMPONENT_FIELDS)},
+			component.company, space.company AS space_company
+		FROM `tabSpace Component` component
+		JOIN `tabPhysical Space` space ON space.name = component.parent
+		WHERE {" AND ".join(conditions)}
+	""",
+		{"component_type": component_type},
+		as_dict=True,
+	)
+
+	updates = {}
+	for component in components:
+		next_due_date = calculate_next_due_date(component)
+		current = getdate(component.next_due_date) if component.next_due_date else None
+		if next_due_date != current or component.company != component.space_company:
+			updates[component.name] = {"next_due_date": next_due_date, "company": component.space_company}
+
+	if updates:
+		frappe.db.bulk_update("Space Component", updates, chunk_size=BATCH_SIZE, update_modified=False)
+
+	return len(updates)
+
+
+def record_maintenance(component, maintenance_date):
+	"""Registra un mantenimiento realizado y recorre la próxima fecha del componente"""
+	row = frappe.db.get_value("Space Component", component, COMPONENT_FIELDS, as_dict=True)
+	if not row:
+		return
+
+	row.last_maintenance_date = getdate(maintenance_date)
+	frappe.db.set_value(
+		"Space Component",
+		component,
+		{
+			"last_maintenance_date": row.last_maintenance_date,
+			"next_due_date": calculate_next_due_date(row),
+		},
+	)
+
+
+def generate_due_work_orders(as_of=None):
+	"""Job diario: crea en bloque las órdenes de trabajo de componentes por vencer.
+
+	Args:
+		as_of: Fecha de referencia (hoy por defecto)
+
+	Returns:
+		int: Órdenes creadas
+	"""
+	horizon = add_days(getdate(as_of or nowdate()), WORK_ORDER_LEAD_DAYS)
+
+	due = frappe.db.sql(
+		"""
+		SELECT component.name, component.parent, component.company, component.component_name,
+			component.component_type, component.inventory_code, component.next_due_date,
+			component_type.maintenance_type
+		FROM `tabSpace Component` component
+		LEFT JOIN `tabComponent Type` component_type ON component_type.name = component.component_type
+		LEFT JOIN `tabMaintenance Work Order` work_order
+			ON work_order.component = component.name AND work_order.due_date = component.next_due_date
+		WHERE component.next_due_date <= %(horizon)s
+			AND component.parenttype = 'Physical Space'
+			AND component.company IS NOT NULL
+			AND work_order.name IS NULL
+		ORDER BY component.next_due_date, component.name
+	""",
+		{"horizon": horizon},
+		as_dict=True,
+	)
+	if not due:
+		return 0
+
+	names = reserve_series_names(WORK_ORDER_SERIES, len(due), digits=WORK_ORDER_DIGITS)
+	timestamp = now_datetime()
+	user = frappe.session.user
+
+	frappe.db.bulk_insert(
+		WORK_ORDER_DOCTYPE,
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"company",
+			"physical_space",
+			"component",
+			"component_name",
+			"component_type",
+			"inventory_code",
+			"maintenance_type",
+			"due_date",
+			"status",
+		],
+		values=[
+			[
+				name,
+				timestamp,
+				timestamp,
+				user,
+				user,
+				row.company,
+				row.parent,
+				row.name,
+				row.component_name,
+				row.component_type,
+				row.inventory_code,
+				row.maintenance_type,
+				row.next_due_date,
+				"Pendiente",
+			]
+			for name, row in zip(names, due, strict=True)
+		],
+		chunk_size=BATCH_SIZE,
+	)
+
+	return len(due)
+
+
+def get_maintenance_due_count(company=None, as_of=None):
+	"""Componentes con mantenimiento vencido a la fecha; un conteo por rango indexado"""
+	filters = {"next_due_date": ["<=", getdate(as_of or nowdate())]}
+	if company:
+		filters["company"] = company
+
+	return frappe.db.count("Space Component", filters)
@@ -0,0 +1,316 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Tabla de cierre de la jerarquía
+=================================================
+
+Physical Space Closure guarda un renglón (ancestor, descendant, depth) por cada par
+ancestro/descendiente, incluido el propio espacio con depth 0. Con ella el subárbol,
+los ancestros y los hijos hasta cierta profundidad se resuelven con una sola consulta
+indexada, y la detección de ciclos es una búsqueda por llave única.
+
+La tabla se mantiene desde PhysicalSpace (after_insert, on_update y on_trash) y se
+reconstruye completa con rebuild_closure(). También permite recalcular space_path y
+space_level de todo un subárbol con un solo UPDATE cuando un espacio se mueve o se
+renombra, sin guardar cada descendiente.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+CLOSURE_DOCTYPE = "Physical Space Closure"
+
+# Mismo límite de seguridad que la validación histórica de jerarquía
+MAX_HIERARCHY_DEPTH = 100
+
+# Subárboles con más descendientes se recalculan en segundo plano
+BACKGROUND_REPATH_THRESHOLD = 500
+
+DEFAULT_CHILD_FIELDS = ("name", "space_name", "parent_space", "space_level", "space_path", "is_active")
+
+
+def _audit_values():
+	timestamp = now_datetime()
+	return {"now": timestamp, "user": frappe.session.user}
+
+
+def insert_node(space, parent_space=None):
+	"""Registra un espacio nuevo: su renglón propio y uno por cada ancestro del padre"""
+	frappe.db.sql(
+		"""
+		INSERT IGNORE INTO `tabPhysical Space Closure`
+			(name, creation, modified, owner, modified_by, ancestor, descendant, depth)
+		SELECT UUID(), %(now)s, %(now)s, %(user)s, %(user)s, ancestor, %(space)s, depth + 1
+		FROM `tabPhysical Space Closure`
+		WHERE descendant = %(parent)s
+		UNION ALL
+		SELECT UUID(), %(now)s, %(now)s, %(user)s, %(user)s, %(space)s, %(space)s, 0
+	""",
+		{"space": space, "parent": parent_space or "", **_audit_values()},
+	)
+
+
+def move_node(space, new_parent=None):
+	"""Mueve el subárbol de un espacio bajo un nuevo padre (o a la raíz).
+
+	Se eliminan los vínculos entre los ancestros anteriores y todo el subárbol, y se
+	insertan los del producto cruzado (ancestros del nuevo padre por subárbol). Los
+	vínculos internos del subárbol no cambian.
+	"""
+	frappe.db.sql(
+		"""
+		DELETE link
+		FROM `tabPhysical Space Closure` link
+		JOIN `tabPhysical Space Closure` subtree
+			ON subtree.descendant = link.descendant AND subtree.ancestor = %(space)s
+		JOIN `tabPhysical Space Closure` supertree
+			ON supertree.ancestor = link.ancestor AND supertree.descendant = %(space)s
+			AND supertree.depth > 0
+	""",
+		{"space": space},
+	)
+
+	if not new_parent:
+		return
+
+	frappe.db.sql(
+		"""
+		INSERT IGNORE INTO `tabPhysical Space Closure`
+			(name, creation, modified, owner, modified_by, ancestor, descendant, depth)
+		SELECT UUID(), %(now)s, %(now)s, %(user)s, %(user)s,
+			supertree.ancestor, subtree.descendant, supertree.depth + subtree.depth + 1
+		FROM `tabPhysical Space Closure` supertree
+		JOIN `tabPhysical Space Closure` subtree ON subtree.ancestor = %(space)s
+		WHERE supertree.descendant = %(parent)s
+	""",
+		{"space": space, "parent": new_parent, **_audit_values()},
+	)
+
+
+def delete_node(space):
+	"""Elimina todos los vínculos de un espacio"""
+	frappe.db.sql(
+		"""
+		DELETE FROM `tabPhysical Space Closure`
+		WHERE descendant = %(space)s OR ancestor = %(space)s
+	""",
+		{"space": space},
+	)
+
+
+def update_subtree_paths(space, old_path, new_path, new_level):
+	"""Programa el recálculo de rutas y niveles de los descendientes de un espacio.
+
+	Los subárboles grandes se procesan como job en segundo plano una vez confirmada
+	la transacción; el resto se actualiza en línea.
+	"""
+	descendants = frappe.db.count(CLOSURE_DOCTYPE, {"ancestor": space, "depth": [">", 0]})
+	if not descendants:
+		return
+
+	if descendants > BACKGROUND_REPATH_THRESHOLD and not frappe.flags.in_test:
+		frappe.enqueue(
+			"condominium_management.physical_spaces.space_hierarchy.repath_subtree",
+			queue="long",
+			timeout=1500,
+			enqueue_after_commit=True,
+			space=space,
+			old_path=old_path,
+			new_path=new_path,
+			new_level=new_level,
+		)
+		return
+
+	repath_subtree(space, old_path, new_path, new_level)
+
+
+def repath_subtree(space, old_path, new_path, new_level):
+	"""Recalcula space_path y space_level de todo el subárbol con un solo UPDATE.
+
+	La ruta se obtiene reemplazando el prefijo old_path por new_path y el nivel a partir
+	de la profundidad en la tabla de cierre. Es SQL directo: solo cambian ruta y nivel,
+	así que no se ejecutan validaciones ni hooks por documento. Las rutas que no empiezan
+	con old_path (datos históricos) conservan su valor y solo se corrige el nivel.
+	"""
+	old_prefix = f"{old_path or ''}/"
+
+	frappe.db.sql(
+		"""
+		UPDATE `tabPhysical Space` space
+		JOIN `tabPhysical Space Closure` closure ON closure.descendant = space.name
+		SET space.space_path = IF(
+				LEFT(space.space_path, %(prefix_length)s) = %(old_prefix)s,
+				CONCAT(%(new_path)s, SUBSTRING(space.space_path, %(prefix_length)s)),
+				space.space_path
+			),
+			space.space_level = %(level)s + closure.depth
+		WHERE closure.ancestor = %(space)s AND closure.depth > 0
+	""",
+		{
+			"space": space,
+			"old_prefix": old_prefix,
+			"prefix_length": len(old_prefix),
+			"new_path": new_path or "",
+			"level": cint(new_level),
+		},
+	)
+
+
+def rebuild_closure():
+	"""Reconstruye la tabla completa a partir de parent_space, un nivel por consulta.
+
+	Returns:
+		int: Profundidad máxima encontrada
+	"""
+	values = _audit_values()
+
+	frappe.db.delete(CLOSURE_DOCTYPE)
+	frappe.db.sql(
+		"""
+		INSERT INTO `tabPhysical Space Closure`
+			(name, creation, modified, owner, modified_by, ancestor, descendant, depth)
+		SELECT UUID(), %(now)s, %(now)s, %(user)s, %(user)s, name, name, 0
+		FROM `tabPhysical Space`
+	""",
+		values,
+	)
+
+	depth = 0
+	while depth < MAX_HIERARCHY_DEPTH:
+		frappe.db.sql(
+			"""
+			INSERT IGNORE INTO `tabPhysical Space Closure`
+				(name, creation, modified, owner, modified_by, ancestor, descendant, depth)
+			SELECT UUID(), %(now)s, %(now)s, %(user)s, %(user)s, closure.ancestor, space.name, %(depth)s
+			FROM `tabPhysical Space Closure` closure
+			JOIN `tabPhysical Space` space ON space.parent_space = closure.descendant
+			WHERE closure.depth = %(previous_depth)s
+		""",
+			{**values, "depth": depth + 1, "previous_depth": depth},
+		)
+
+		if not frappe.db.exists(CLOSURE_DOCTYPE, {"depth": depth + 1}):
+			break
+		depth += 1
+
+	return depth
+
+
+def backfill_space_paths():
+	"""Calcula space_path de los espacios que no la tienen a partir de la tabla de cierre.
+
+	La ruta es la concatenación de los nombres de sus ancestros, de la raíz al propio
+	espacio. Requiere la tabla de cierre completa (rebuild_closure).
+	"""
+	frappe.db.sql(
+		"""
+		UPDATE `tabPhysical Space` space
+		JOIN (
+			SELECT closure.descendant,
+				CONCAT('/', GROUP_CONCAT(ancestor.space_name ORDER BY closure.depth DESC SEPARATOR '/'))
+					AS space_path
+			FROM `tabPhysical Space Closure` closure
+			JOIN `tabPhysical Space` ancestor ON ancestor.name = closure.ancestor
+			GROUP BY closure.descendant
+		) computed ON computed.descendant = space.name
+		SET space.space_path = computed.space_path
+		WHERE IFNULL(space.space_path, '') = ''
+	"""
+	)
+
+
+def is_descendant(ancestor, descendant):
+	"""True si descendant está en el subárbol de ancestor (incluido él mismo)"""
+	if not ancestor or not descendant:
+		return False
+
+	return bool(
+		frappe.db.sql(
+			"""
+			SELECT 1 FROM `tabPhysical Space Closure`
+			WHERE ancestor = %s AND descendant = %s
+			LIMIT 1
+		""",
+			(ancestor, descendant),
+		)
+	)
+
+
+def get_subtree(space, include_self=False, max_depth=None):
+	"""Nombres del subárbol de un espacio, ordenados por profundidad"""
+	conditions = ["ancestor = %(space)s"]
+	if not include_self:
+		conditions.append("depth > 0")
+	if max_depth is not None:
+		conditions.append("depth <= %(max_depth)s")
+
+	return frappe.db.sql_list(
+		f"""
+		SELECT descendant FROM `tabPhysical Space Closure`
+		WHERE {" AND ".join(conditions)}
+		ORDER BY depth, descendant
+	""",
+		{"space": space, "max_depth": cint(max_depth)},
+	)
+
+
+def get_ancestors(space, include_self=False):
+	"""Nombres de los ancestros de un espacio, desde la raíz hasta el padre"""
+	return frappe.db.sql_list(
+		f"""
+		SELECT ancestor FROM `tabPhysical Space Closure`
+		WHERE descendant = %(space)s {"" if include_self else "AND depth > 0"}
+		ORDER BY depth DESC
+	""",
+		{"space": space},
+	)
+
+
+def get_children(space, max_depth=1, fields=None):
+	"""Descendientes hasta max_depth niveles con sus datos, en una sola consulta.
+
+	Args:
+		space: Espacio raíz (None para las raíces de la jerarquía)
+		max_depth: Niveles a incluir (1 = solo hijos directos)
+		fields: Campos de Physical Space a devolver
+
+	Returns:
+		list[dict]: Incluye "depth" relativo a space
+	"""
+	fields = _validate_fields(fields or DEFAULT_CHILD_FIELDS)
+	columns = ", ".join(f"space.`{field}`" for field in fields)
+
+	if not space:
+		return frappe.db.sql(
+			f"""
+			SELECT {columns}, 1 AS depth FROM `tabPhysical Space` space
+			WHERE IFNULL(space.parent_space, '') = ''
+			ORDER BY space.space_name
+		""",
+			as_dict=True,
+		)
+
+	return frappe.db.sql(
+		f"""
+		SELECT {columns}, closure.depth
+		FROM `tabPhysical Space Closure` closure
+		JOIN `tabPhysical Space` space ON space.name = closure.descendant
+		WHERE closure.ancestor = %(space)s AND closure.depth BETWEEN 1 AND %(max_depth)s
+		ORDER BY closure.depth, space.space_name
+	""",
+		{"space": space, "max_depth": max(cint(max_depth), 1)},
+		as_dict=True,
+	)
+
+
+def _validate_fields(fields):
+	meta = frappe.get_meta("Physical Space")
+	valid_fields = []
+	for field in fields:
+		if field != "name" and not meta.has_field(field):
+			frappe.throw(_("Campo inválido para Physical Space: {0}").format(field))
+		valid_fields.append(field)
+
+	return valid_fields
@@ -0,0 +1,284 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Importación masiva de espacios
+================================================
+
+Carga inicial de la jerarquía de un condominio: recibe un árbol anidado (JSON) o una
+lista plana con referencias al padre (JSON/CSV), reserva todos los códigos de espacio
+con una sola operación sobre la serie de la empresa, calcula niveles y rutas en memoria
+en orden topológico e inserta espacios y tabla de cierre en lotes.
+
+Las inserciones no pasan por los hooks por documento de Physical Space; todo lo que
+esos hooks calculan o validan (código, nivel, ruta, jerarquía, requisitos y padres
+permitidos de la categoría y template_fields inicial) se resuelve aquí sobre el lote,
+con las reglas de categoría del grafo en caché.
+"""
+
+import csv
+import io
+import json
+from collections import deque
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now_datetime
+
+from condominium_management.physical_spaces.category_rules import get_category_rules
+from condominium_management.physical_spaces.hooks_handlers.space_validation import (
+	validate_category_fields,
+	validate_parent_category,
+)
+from condominium_management.utils import reserve_series_names
+
+BATCH_SIZE = 1000
+
+# Mismo formato que PhysicalSpace.generate_space_code: {abbr}-.####
+SPACE_CODE_DIGITS = 4
+
+SPACE_FIELDS = ("space_name", "space_category", "description", "area_m2", "height_m", "max_capacity")
+
+
+@frappe.whitelist()
+def import_spaces(company, spaces=None, csv_content=None, parent_space=None):
+	"""Importa un árbol de espacios físicos para una empresa.
+
+	Args:
+		company: Empresa propietaria de los espacios
+		spaces: Lista JSON de nodos. Cada nodo admite space_name, space_category,
+			description, area_m2, height_m, max_capacity, is_active y, opcionalmente,
+			children (árbol anidado) o key/parent_key (lista plana)
+		csv_content: Alternativa a spaces: CSV con columnas key, parent_key, space_name...
+		parent_space: Physical Space existente bajo el cual cuelgan las raíces del árbol
+
+	parent_key puede referirse a otro nodo del lote o a un Physical Space existente.
+
+	Returns:
+		dict: {"created": int, "names": {key: nombre del espacio}}
+	"""
+	frappe.has_permission("Physical Space", "create", throw=True)
+
+	if csv_content:
+		nodes = _flatten(list(csv.DictReader(io.StringIO(csv_content))))
+	else:
+		if isinstance(spaces, str):
+			spaces = json.loads(spaces)
+		nodes = _flatten(spaces or [])
+
+	if not nodes:
+		return {"created": 0, "names": {}}
+
+	abbr = frappe.db.get_value("Company", company, "abbr")
+	if not abbr:
+		frappe.throw(_("La empresa {0} no existe").format(company))
+
+	for node in nodes:
+		node.parent_key = node.parent_key or parent_space
+
+	existing_parents = _get_existing_parents(nodes, company)
+	_validate_categories(nodes)
+	ordered = _topological_order(nodes, existing_parents)
+	_validate_category_rules(ordered, existing_parents)
+
+	names = reserve_series_names(f"{abbr}-", len(ordered), digits=SPACE_CODE_DIGITS)
+	space_rows, closure_rows = _build_rows(ordered, names, company, existing_parents)
+
+	timestamp = now_datetime()
+	user = frappe.session.user
+	audit = [timestamp, timestamp, user, user]
+
+	frappe.db.bulk_insert(
+		"Physical Space",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"space_code",
+			"company",
+			"parent_space",
+			"space_level",
+			"space_path",
+			"is_active",
+			"template_fields",
+			*SPACE_FIELDS,
+		],
+		values=[[row[0], *audit, *row[1:]] for row in space_rows],
+		chunk_size=BATCH_SIZE,
+	)
+
+	frappe.db.bulk_insert(
+		"Physical Space Closure",
+		fields=["name", "creation", "modified", "owner", "modified_by", "ancestor", "descendant", "depth"],
+		values=[[frappe.generate_hash(length=10), *audit, *row] for row in closure_rows],
+		chunk_size=BATCH_SIZE,
+	)
+
+	return {
+		"created": len(ordered),
+		"names": {node.key: name for node, name in zip(ordered, names, strict=True)},
+	}
+
+
+def _flatten(spaces):
+	"""Normaliza árbol anidado o lista plana a nodos con key/parent_key"""
+	nodes = []
+	pending = deque((space, None) for space in spaces)
+
+	while pending:
+		space, parent_key = pending.popleft()
+		node = frappe._dict({field: (space.get(field) or None) for field in SPACE_FIELDS})
+		node.key = str(space.get("key") or "").strip() or f"#{len(nodes) + 1}"
+		node.parent_key = parent_key or str(space.get("parent_key") or "").strip() or None
+		node.is_active = cint(space.get("is_active")) if space.get("is_active") not in (None, "") else 1
+
+		if not node.space_name:
+			frappe.throw(_("Fila {0}: space_name es obligatorio").format(len(nodes) + 1))
+
+		nodes.append(node)
+		pending.extend((child, node.key) for child in space.get("children") or [])
+
+	keys = [node.key for node in nodes]
+	if len(keys) != len(set(keys)):
+		frappe.throw(_("Las llaves (key) de los espacios deben ser únicas"))
+
+	return nodes
+
+
+def _get_existing_parents(nodes, company):
+	"""Padres que ya existen en la base, con su ruta, nivel y ancestros, en dos consultas"""
+	keys = {node.key for node in nodes}
+	references = sorted(
+		{node.parent_key for node in nodes if node.parent_key and node.parent_key not in keys}
+	)
+	if not references:
+		return {}
+
+	parents = {
+		row.name: row
+		for row in frappe.get_all(
+			"Physical Space",
+			filters={"name": ["in", references]},
+			fields=["name", "company", "space_category", "space_level", "space_path"],
+		)
+	}
+
+	missing = [reference for reference in references if reference not in parents]
+	if missing:
+		frappe.throw(_("Espacios padre no encontrados: {0}").format(", ".join(missing)))
+
+	other_company = [name for name, parent in parents.items() if parent.company != company]
+	if other_company:
+		frappe.throw(_("Los espacios padre pertenecen a otra empresa: {0}").format(", ".join(other_company)))
+
+	for parent in parents.values():
+		parent.ancestors = []
+
+	for row in frappe.get_all(
+		"Physical Space Closure",
+		filters={"descendant": ["in", references]},
+		fields=["ancestor", "descendant", "depth"],
+	):
+		parents[row.descendant].ancestors.append((row.ancestor, row.depth))
+
+	return parents
+
+
+def _validate_categories(nodes):
+	categories = sorted({node.space_category for node in nodes if node.space_category})
+	if not categories:
+		return
+
+	existing = set(frappe.get_all("Space Category", filters={"name": ["in", categories]}, pluck="name"))
+	missing = [category for category in categories if category not in existing]
+	if missing:
+		frappe.throw(_("Categorías de espacio no encontradas: {0}").format(", ".join(missing)))
+
+
+def _validate_category_rules(ordered, existing_parents):
+	"""Requisitos y padres permitidos de cada categoría, igual que en la validación por documento"""
+	categories = {node.key: node.space_category for node in ordered}
+	categories.update({name: parent.space_category for name, parent in existing_parents.items()})
+
+	for node in ordered:
+		category = get_category_rules(node.space_category) if node.space_category else None
+		if not category:
+			continue
+
+		space = frappe._dict(
+			space_category=node.space_category,
+			area_m2=flt(node.area_m2),
+			max_capacity=cint(node.max_capacity),
+			space_components=[],
+		)
+		validate_category_fields(space, category)
+		if node.parent_key and category["allowed_parents"]:
+			validate_parent_category(space, category, categories.get(node.parent_key))
+
+
+def _topological_order(nodes, existing_parents):
+	"""Ordena los nodos de forma que cada padre preceda a sus hijos; detecta ciclos"""
+	children = {}
+	roots = deque()
+	for node in nodes:
+		if node.parent_key and node.parent_key not in existing_parents:
+			children.setdefault(node.parent_key, []).append(node)
+		else:
+			roots.append(node)
+
+	ordered = []
+	while roots:
+		node = roots.popleft()
+		ordered.append(node)
+		roots.extend(children.pop(node.key, []))
+
+	if len(ordered) != len(nodes):
+		frappe.throw(_("La jerarquía importada contiene referencias circulares"))
+
+	return ordered
+
+
+def _build_rows(ordered, names, company, existing_parents):
+	"""Calcula código, nivel, ruta y vínculos de cierre de cada espacio en memoria"""
+	placed = {}
+	space_rows = []
+	closure_rows = []
+
+	for node, name in zip(ordered, names, strict=True):
+		parent = placed.get(node.parent_key) or existing_parents.get(node.parent_key)
+
+		if parent:
+			level = cint(parent.space_level) + 1
+			path = f"{parent.space_path}/{node.space_name}"
+			ancestors = [(ancestor, depth + 1) for ancestor, depth in parent.ancestors]
+		else:
+			level = 0
+			path = f"/{node.space_name}"
+			ancestors = []
+
+		ancestors.append((name, 0))
+		placed[node.key] = frappe._dict(name=name, space_level=level, space_path=path, ancestors=ancestors)
+
+		space_rows.append(
+			[
+				name,
+				name,
+				company,
+				parent.name if parent else None,
+				level,
+				path,
+				node.is_active,
+				"{}",
+				node.space_name,
+				node.space_category,
+				node.description,
+				flt(node.area_m2),
+				flt(node.height_m),
+				cint(node.max_capacity),
+			]
+		)
+		closure_rows.extend([ancestor, name, depth] for ancestor, depth in ancestors)
+
+	return space_rows, closure_rows
@@ -0,0 +1,177 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - API ligera del árbol de espacios
+==================================================
+
+Endpoints para que la interfaz recorra la jerarquía por páginas sin cargar documentos
+completos: cada nodo trae solo nombre, categoría, ruta y conteos de hijos y
+componentes.
+
+La paginación es por llave (keyset) sobre (space_path, name): el cursor es la llave
+del último nodo devuelto y la siguiente página continúa desde ahí con un rango
+indexado, sin OFFSET. Ordenar por ruta deja cada subárbol en orden de recorrido.
+Todos los espacios deben tener space_path: un NULL no cumple la condición del cursor
+y el renglón se saltaría (ver space_hierarchy.backfill_space_paths).
+
+Las consultas son SQL directo, así que no aplican permisos por documento: cada
+endpoint exige la empresa, valida el permiso del usuario sobre ella y filtra por
+ella.
+
+Índices usados (Physical Space, on_doctype_update):
+
+- (parent_space, space_path): hijos directos y conteo de hijos.
+- (company, space_path): búsqueda por prefijo de ruta.
+- Physical Space Closure (ancestor, depth): descendientes hasta cierta profundidad.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NODE_COLUMNS = """
+	space.name, space.space_name, space.space_category, space.space_level, space.space_path,
+	space.is_active,
+	(SELECT COUNT(*) FROM `tabPhysical Space` child WHERE child.parent_space = space.name) AS child_count,
+	(
+		SELECT COUNT(*) FROM `tabSpace Component` component
+		WHERE component.parent = space.name AND component.parenttype = 'Physical Space'
+	) AS component_count
+"""
+
+
+@frappe.whitelist()
+def get_tree_children(parent=None, company=None, max_depth=1, cursor=None, limit=DEFAULT_PAGE_SIZE):
+	"""Página de descendientes de un espacio (o de las raíces) hasta max_depth niveles.
+
+	Args:
+		parent: Physical Space cuyos descendientes se listan; vacío para las raíces
+		company: Empresa de los espacios; obligatoria sin parent, con parent se toma la
+			del espacio
+		max_depth: Niveles a incluir bajo parent (1 = hijos directos)
+		cursor: next_cursor de la página anterior
+		limit: Tamaño de página (máximo MAX_PAGE_SIZE)
+
+	Returns:
+		dict: {"nodes": [...], "next_cursor": str | None}
+	"""
+	if parent:
+		frappe.has_permission("Physical Space", "read", doc=parent, throw=True)
+		# El subárbol pertenece a la empresa del espacio padre
+		company = frappe.db.get_value("Physical Space", parent, "company")
+
+	_check_company_permission(company)
+
+	limit = _page_size(limit)
+	max_depth = max(cint(max_depth), 1)
+	values = {"parent": parent, "company": company, "max_depth": max_depth, "limit": limit + 1}
+	conditions = ["space.company = %(company)s"]
+
+	if parent and max_depth > 1:
+		source = """`tabPhysical Space Closure` closure
+			JOIN `tabPhysical Space` space ON space.name = closure.descendant"""
+		conditions.append("closure.ancestor = %(parent)s AND closure.depth BETWEEN 1 AND %(max_depth)s")
+	elif parent:
+		source = "`tabPhysical Space` space"
+		conditions.append("space.parent_space = %(parent)s")
+	else:
+		# Las raíces y, con max_depth > 1, sus descendientes hasta ese nivel
+		source = "`tabPhysical Space` space"
+		conditions.append("space.space_level < %(max_depth)s")
+		if max_depth == 1:
+			conditions.append("IFNULL(space.parent_space, '') = ''")
+
+	return _fetch_page(source, conditions, values, cursor, limit)
+
+
+@frappe.whitelist()
+def search_tree(company, path_prefix, cursor=None, limit=DEFAULT_PAGE_SIZE):
+	"""Página de espacios de una empresa cuya ruta comienza con path_prefix.
+
+	Args:
+		company: Empresa de los espacios
+		path_prefix: Prefijo de space_path, p. ej. "/Torre A/Piso"
+		cursor: next_cursor de la página anterior
+		limit: Tamaño de página (máximo MAX_PAGE_SIZE)
+
+	Returns:
+		dict: {"nodes": [...], "next_cursor": str | None}
+	"""
+	_check_company_permission(company)
+
+	limit = _page_size(limit)
+	values = {
+		"company": company,
+		"path_prefix": f"{_escape_like(path_prefix or '')}%",
+		"limit": limit + 1,
+	}
+	conditions = ["space.company = %(company)s", "space.space_path LIKE %(path_prefix)s"]
+
+	return _fetch_page("`tabPhysical Space` space", conditions, values, cursor, limit)
+
+
+def _check_company_permission(company):
+	"""Permiso de lectura de Physical Space y de la empresa cuyos espacios se listan"""
+	frappe.has_permission("Physical Space", "read", throw=True)
+
+	if not company:
+		frappe.throw(_("La empresa es obligatoria para recorrer el árbol de espacios"))
+
+	frappe.has_permission("Company", "read", doc=company, throw=True)
+
+
+def _fetch_page(source, conditions, values, cursor, limit):
+	"""Ejecuta la consulta de una página y arma el cursor de la siguiente"""
+	if cursor:
+		values["cursor_path"], values["cursor_name"] = _decode_cursor(cursor)
+		conditions.append(
+			"(space.space_path > %(cursor_path)s"
+			" OR (space.space_path = %(cursor_path)s AND space.name > %(cursor_name)s))"
+		)
+
+	nodes = frappe.db.sql(
+		f"""
+		SELECT {NODE_COLUMNS}
+		FROM {source}
+		WHERE {" AND ".join(conditions)}
+		ORDER BY space.space_path, space.name
+		LIMIT %(limit)s
+	""",
+		values,
+		as_dict=True,
+	)
+
+	next_cursor = None
+	if len(nodes) > limit:
+		nodes = nodes[:limit]
+		next_cursor = json.dumps([nodes[-1].space_path, nodes[-1].name])
+
+	for node in nodes:
+		node.child_count = cint(node.child_count)
+		node.component_count = cint(node.component_count)
+		node.expandable = node.child_count > 0
+
+	return {"nodes": nodes, "next_cursor": next_cursor}
+
+
+def _page_size(limit):
+	return min(max(cint(limit) or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+
+
+def _decode_cursor(cursor):
+	try:
+		space_path, name = json.loads(cursor)
+	except (TypeError, ValueError):
+		frappe.throw(_("Cursor de paginación inválido"))
+
+	return space_path or "", name or ""
+
+
+def _escape_like(value):
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,369 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Physical Spaces - Motor de ocupación y utilización
+==================================================
+
+Las reservas de cada espacio (reuniones de comité presenciales, eventos comunitarios y
+asambleas) se convierten en un mapa de bits por espacio y día: 96 franjas de 15
+minutos. El mapa se guarda en Space Occupancy partido en cuatro bloques de 6 horas
+(24 bits cada uno) para que quepa en columnas enteras.
+
+La utilización por categoría, piso, edificio, empresa o periodo se calcula con una
+sola consulta agregada que aplica la máscara de horario de operación a cada bloque y
+cuenta bits con BIT_COUNT; no se recorren reservas ni renglones en Python.
+"""
+
+from datetime import datetime, timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import (
+	add_days,
+	cint,
+	flt,
+	get_datetime,
+	get_first_day,
+	get_last_day,
+	get_time,
+	getdate,
+	now_datetime,
+	nowdate,
+)
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOTS_PER_BLOCK = 24
+BLOCK_FIELDS = ("slots_night", "slots_morning", "slots_afternoon", "slots_evening")
+BLOCK_MASK = (1 << SLOTS_PER_BLOCK) - 1
+
+# Horario en que un espacio se considera disponible (horas, fin exclusivo)
+DEFAULT_OPERATING_HOURS = (6, 22)
+
+# Duración supuesta por tipo de reserva; las reuniones, eventos sin hora de fin y
+# asambleas solo registran su inicio
+DEFAULT_BOOKING_MINUTES = {
+	"Committee Meeting": 120,
+	"Community Event": 120,
+	"Assembly Management": 180,
+}
+
+# Campo de fecha de cada tipo de reserva; la más antigua marca el inicio del histórico
+BOOKING_DATE_FIELDS = {
+	"Committee Meeting": "meeting_date",
+	"Community Event": "event_date",
+	"Assembly Management": "assembly_date",
+}
+
+# Ventana que mantiene al día el job diario: historia reciente y reservas próximas
+REFRESH_DAYS_BEFORE = 7
+REFRESH_DAYS_AFTER = 30
+
+GROUP_BY_COLUMNS = {
+	"space_category": "space.space_category",
+	"floor": "space.floor_reference",
+	"building": "space.building_reference",
+	"company": "space.company",
+	"physical_space": "space.name",
+}
+
+
+def interval_mask(start_minute, end_minute):
+	"""Máscara de 96 bits con las franjas que toca el intervalo [start, end) del día"""
+	first_slot = max(cint(start_minute) // SLOT_MINUTES, 0)
+	last_slot = min(-(-cint(end_minute) // SLOT_MINUTES), SLOTS_PER_DAY)
+	if last_slot <= first_slot:
+		return 0
+
+	return ((1 << (last_slot - first_slot)) - 1) << first_slot
+
+
+def split_mask(mask):
+	"""Parte una máscara diaria en los cuatro bloques de Space Occupancy"""
+	return [(mask >> (SLOTS_PER_BLOCK * block)) & BLOCK_MASK for block in range(len(BLOCK_FIELDS))]
+
+
+def operating_mask(operating_hours=DEFAULT_OPERATING_HOURS):
+	start_hour, end_hour = operating_hours or (0, 24)
+	return interval_mask(start_hour * 60, end_hour * 60)
+
+
+def collect_bookings(start_date, end_date, spaces=None):
+	"""Reservas con espacio físico que se traslapan con [start_date, end_date].
+
+	Returns:
+		list[tuple]: (physical_space, inicio, fin) como datetimes
+	"""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	# Una reserva que empieza el día anterior puede cruzar la medianoche
+	window = [add_days(start_date, -1), end_date]
+	space_filter = {"physical_space": ["in", list(spaces)]} if spaces else {"physical_space": ["is", "set"]}
+
+	bookings = []
+
+	for meeting in frappe.get_all(
+		"Committee Meeting",
+		filters={
+			**space_filter,
+			"meeting_format": ["!=", "Virtual"],
+			"meeting_date": ["between", [window[0], f"{window[1]} 23:59:59"]],
+		},
+		fields=["physical_space", "meeting_date"],
+	):
+		start = get_datetime(meeting.meeting_date)
+		end = start + timedelta(minutes=DEFAULT_BOOKING_MINUTES["Committee Meeting"])
+		bookings.append((meeting.physical_space, start, end))
+
+	for event in frappe.get_all(
+		"Community Event",
+		filters={**space_filter, "status": ["!=", "Cancelado"], "event_date": ["between", window]},
+		fields=["physical_space", "event_date", "start_time", "end_time"],
+	):
+		event_date = getdate(event.event_date)
+		start = datetime.combine(event_date, get_time(event.start_time or "00:00:00"))
+		if event.start_time and event.end_time:
+			end = datetime.combine(event_date, get_time(event.end_time))
+			if end <= start:
+				end += timedelta(days=1)
+		elif event.start_time:
+			end = start + timedelta(minutes=DEFAULT_BOOKING_MINUTES["Community Event"])
+		else:
+			# Evento sin horario: ocupa el día completo
+			end = start + timedelta(days=1)
+		bookings.append((event.physical_space, start, end))
+
+	for assembly in frappe.get_all(
+		"Assembly Management",
+		filters={
+			**space_filter,
+			"docstatus": ["<", 2],
+			"status": ["!=", "Cancelada"],
+			"assembly_date": ["between", [window[0], f"{window[1]} 23:59:59"]],
+		},
+		fields=["physical_space", "assembly_date"],
+	):
+		start = get_datetime(assembly.assembly_date)
+		end = start + timedelta(minutes=DEFAULT_BOOKING_MINUTES["Assembly Management"])
+		bookings.append((assembly.physical_space, start, end))
+
+	return bookings
+
+
+def build_day_masks(bookings, start_date=None, end_date=None):
+	"""Combina las reservas en una máscara por (espacio, día), partiendo las que cruzan días"""
+	start_date = getdate(start_date) if start_date else None
+	end_date = getdate(end_date) if end_date else None
+	masks = {}
+
+	for space, start, end in bookings:
+		day = start.date()
+		while datetime.combine(day, datetime.min.time()) < end:
+			day_start = datetime.combine(day, datetime.min.time())
+			start_minute = max((start - day_start).total_seconds() // 60, 0)
+			end_minute = min((end - day_start).total_seconds() // 60, 24 * 60)
+
+			if (not start_date or day >= start_date) and (not end_date or day <= end_date):
+				key = (space, day)
+				masks[key] = masks.get(key, 0) | interval_mask(start_minute, end_minute)
+
+			day += timedelta(days=1)
+
+	return masks
+
+
+def rebuild_occupancy(start_date, end_date, spaces=None):
+	"""Reconstruye Space Occupancy para el rango; idempotente.
+
+	Returns:
+		int: Renglones (espacio, día) con ocupación
+	"""
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	masks = build_day_masks(collect_bookings(start_date, end_date, spaces), start_date, end_date)
+
+	filters = {"occupancy_date": ["between", [start_date, end_date]]}
+	if spaces:
+		filters["physical_space"] = ["in", list(spaces)]
+	frappe.db.delete("Space Occupancy", filters)
+
+	if not masks:
+		return 0
+
+	timestamp = now_datetime()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		"Space Occupancy",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"physical_space",
+			"occupancy_date",
+			"occupied_slots",
+			*BLOCK_FIELDS,
+		],
+		values=[
+			[
+				frappe.generate_hash(length=10),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				space,
+				day,
+				mask.bit_count(),
+				*split_mask(mask),
+			]
+			for (space, day), mask in sorted(masks.items())
+		],
+		chunk_size=5000,
+	)
+
+	return len(masks)
+
+
+def refresh_recent_occupancy():
+	"""Job diario: recalcula la ocupación de la ventana reciente y próxima"""
+	today = getdate(nowdate())
+	return rebuild_occupancy(add_days(today, -REFRESH_DAYS_BEFORE), add_days(today, REFRESH_DAYS_AFTER))
+
+
+def backfill_occupancy(spaces=None):
+	"""Reconstruye la ocupación histórica mes por mes, desde la primera reserva con espacio.
+
+	refresh_recent_occupancy solo cubre la ventana reciente; esto llena los periodos
+	anteriores (instalaciones existentes o reservas registradas tarde).
+
+	Returns:
+		int: Renglones (espacio, día) con ocupación
+	"""
+	space_filter = {"physical_space": ["in", list(spaces)]} if spaces else {"physical_space": ["is", "set"]}
+	first_dates = [
+		frappe.db.get_value(doctype, space_filter, f"MIN({fieldname})")
+		for doctype, fieldname in BOOKING_DATE_FIELDS.items()
+	]
+	first_dates = [getdate(first_date) for first_date in first_dates if first_date]
+	if not first_dates:
+		return 0
+
+	end_date = add_days(getdate(nowdate()), REFRESH_DAYS_AFTER)
+	month_start = get_first_day(min(first_dates))
+	rows = 0
+
+	while month_start <= end_date:
+		month_end = min(getdate(get_last_day(month_start)), end_date)
+		rows += rebuild_occupancy(month_start, month_end, spaces)
+		month_start = add_days(month_end, 1)
+
+	return rows
+
+
+def get_utilization(
+	start_date,
+	end_date,
+	group_by=None,
+	period=None,
+	company=None,
+	operating_hours=DEFAULT_OPERATING_HOURS,
+):
+	"""Utilización de espacios activos agregada por dimensión y periodo.
+
+	Args:
+		start_date, end_date: Rango de fechas (inclusive)
+		group_by: space_category, floor, building, company, physical_space o None
+		period: "month" para desglosar por mes, None para todo el rango
+		company: Filtro opcional por empresa
+		operating_hours: (hora inicio, hora fin) de disponibilidad de los espacios
+
+	Returns:
+		list[dict]: group, period, spaces, occupied_slots, available_slots, utilization (%)
+	"""
+	if group_by and group_by not in GROUP_BY_COLUMNS:
+		frappe.throw(_("Agrupación de utilización inválida: {0}").format(group_by))
+	if period not in (None, "month"):
+		frappe.throw(_("Periodo de utilización inválido: {0}").format(period))
+
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	group_column = GROUP_BY_COLUMNS[group_by] if group_by else "''"
+	period_column = "DATE_FORMAT(occupancy.occupancy_date, '%%Y-%%m')" if period else "''"
+
+	mask = operating_mask(operating_hours)
+	values = {"start": start_date, "end": end_date, "company": company}
+	values.update({f"mask_{block}": block_mask for block, block_mask in enumerate(split_mask(mask))})
+	company_condition = "AND space.company = %(company)s" if company else ""
+	occupied_expression = " + ".join(
+		f"BIT_COUNT(occupancy.{field} & %(mask_{block})s)" for block, field in enumerate(BLOCK_FIELDS)
+	)
+
+	occupied = {
+		(row.group_key, row.period): cint(row.occupied)
+		for row in frappe.db.sql(
+			f"""
+			SELECT {group_column} AS group_key, {period_column} AS period, SUM({occupied_expression}) AS occupied
+			FROM `tabSpace Occupancy` occupancy
+			JOIN `tabPhysical Space` space ON space.name = occupancy.physical_space
+			WHERE occupancy.occupancy_date BETWEEN %(start)s AND %(end)s
+				AND space.is_active = 1 {company_condition}
+			GROUP BY group_key, period
+		""",
+			values,
+			as_dict=True,
+		)
+	}
+
+	space_counts = frappe.db.sql(
+		f"""
+		SELECT {group_column} AS group_key, COUNT(*) AS spaces
+		FROM `tabPhysical Space` space
+		WHERE space.is_active = 1 {company_condition}
+		GROUP BY group_key
+	""",
+		values,
+		as_dict=True,
+	)
+
+	slots_per_day = mask.bit_count()
+	results = []
+	for period_key, days in _period_days(start_date, end_date, period):
+		for row in space_counts:
+			occupied_slots = occupied.get((row.group_key, period_key), 0)
+			available_slots = cint(row.spaces) * days * slots_per_day
+			results.append(
+				frappe._dict(
+					group=row.group_key or None,
+					period=period_key or None,
+					spaces=cint(row.spaces),
+					occupied_slots=occupied_slots,
+					available_slots=available_slots,
+					utilization=flt(occupied_slots / available_slots * 100, 2) if available_slots else 0.0,
+				)
+			)
+
+	return results
+
+
+def get_utilization_rate(start_date=None, end_date=None, company=None):
+	"""Utilización global (%) de los espacios activos; por defecto los últimos 30 días"""
+	end_date = getdate(end_date or nowdate())
+	start_date = getdate(start_date or add_days(end_date, -29))
+
+	results = get_utilization(start_date, end_date, company=company)
+	return results[0].utilization if results else 0.0
+
+
+def _period_days(start_date, end_date, period):
+	"""[(clave de periodo, días del rango dentro del periodo)]"""
+	if not period:
+		return [("", (end_date - start_date).days + 1)]
+
+	periods = []
+	current = start_date
+	while current <= end_date:
+		next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+		period_end = min(next_month - timedelta(days=1), end_date)
+		periods.append((current.strftime("%Y-%m"), (period_end - current).days + 1))
+		current = next_month
+
+	return periods
@@ -0,0 +1,84 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests del grafo de reglas en caché (category_rules).
+"""
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.physical_spaces import category_rules
+
+
+class TestCategoryRules(FrappeTestCase):
+	def setUp(self):
+		category_rules.clear_rule_graph()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		category_rules.clear_rule_graph()
+
+	def _create_component_type(self, **values):
+		component_type = frappe.get_doc(
+			{
+				"doctype": "Component Type",
+				"component_type_name": "Test Caché CTEST",
+				"code_prefix": "CTESTCACHE",
+				"category": "Otro",
+				**values,
+			}
+		)
+		component_type.insert()
+		return component_type
+
+	def test_cached_lookups_do_not_query_database(self):
+		"""Con el grafo cargado, las validaciones son búsquedas en memoria"""
+		self._create_component_type(requires_brand=1)
+		category_rules.get_rule_graph()
+
+		with patch.object(frappe.db, "sql", wraps=frappe.db.sql) as sql_spy:
+			rules = category_rules.get_component_type_rules("Test Caché CTEST")
+			category_rules.get_component_type_rules("Test Caché CTEST")
+
+		self.assertEqual(sql_spy.call_count, 0)
+		self.assertTrue(rules["requires_brand"])
+		self.assertEqual(rules["code_prefix"], "CTESTCACHE")
+
+	def test_process_cache_survives_new_request(self):
+		"""Un request nuevo reutiliza el grafo en memoria si la versión en Redis no cambió"""
+		category_rules.get_rule_graph()
+		frappe.local.physical_spaces_rule_graph = None
+
+		with patch.object(category_rules, "build_rule_graph") as build:
+			category_rules.get_rule_graph()
+
+		build.assert_not_called()
+
+	def test_component_type_update_invalidates_graph(self):
+		"""Guardar un Component Type invalida el grafo"""
+		component_type = self._create_component_type()
+		self.assertFalse(category_rules.get_component_type_rules(component_type.name)["requires_model"])
+
+		component_type.requires_model = 1
+		component_type.save()
+
+		self.assertTrue(category_rules.get_component_type_rules(component_type.name)["requires_model"])
+
+	def test_unknown_entries_return_none(self):
+		"""Categorías o tipos inexistentes se reportan como None"""
+		self.assertIsNone(category_rules.get_category_rules("CTEST inexistente"))
+		self.assertIsNone(category_rules.get_component_type_rules("CTEST inexistente"))
+		self.assertTrue(category_rules.is_parent_category_allowed("CTEST inexistente", "Otra"))
+
+	def test_rollback_discards_graph_built_from_uncommitted_data(self):
+		"""Un grafo reconstruido dentro de una transacción revertida no queda en Redis"""
+		component_type = self._create_component_type()
+		self.assertIsNotNone(category_rules.get_component_type_rules(component_type.name))
+
+		frappe.db.rollback()
+
+		self.assertIsNone(frappe.cache().get_value(category_rules.RULE_GRAPH_VERSION_KEY))
+		self.assertIsNone(category_rules.get_component_type_rules(component_type.name))
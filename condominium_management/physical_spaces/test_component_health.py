@@ -0,0 +1,223 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests y benchmark del cálculo de salud de componentes (component_health).
+"""
+
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_years, now_datetime, nowdate
+
+from condominium_management.physical_spaces import component_health
+from condominium_management.physical_spaces.space_import import import_spaces
+from condominium_management.test_factories import TestDataFactory
+
+TEST_COMPANY = "Test Condominium"
+TEST_COMPONENT_TYPE = "Test Bomba Salud"
+
+
+class TestComponentHealth(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		TestDataFactory.create_test_company(TEST_COMPANY)
+
+		if not frappe.db.exists("Component Type", TEST_COMPONENT_TYPE):
+			frappe.get_doc(
+				{
+					"doctype": "Component Type",
+					"component_type_name": TEST_COMPONENT_TYPE,
+					"code_prefix": "TBS",
+					"category": "Mecánico",
+					"estimated_lifespan_years": 10,
+					"default_maintenance_frequency": "Mensual",
+				}
+			).insert()
+
+	def tearDown(self):
+		spaces = frappe.get_all("Physical Space", filters={"company": TEST_COMPANY}, pluck="name")
+		if spaces:
+			frappe.db.delete("Space Component", {"parent": ["in", spaces]})
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
+		frappe.db.delete("Component Health Score", {"company": TEST_COMPANY})
+		frappe.db.delete("Physical Space", {"company": TEST_COMPANY})
+		frappe.db.commit()
+
+	def test_new_component_in_good_state_scores_high(self):
+		"""Componente nuevo, activo, con mantenimiento al día y garantía vigente"""
+		space = self._create_space()
+		self._insert_components(
+			space,
+			[
+				{
+					"installation_date": nowdate(),
+					"last_maintenance_date": nowdate(),
+					"warranty_expiry_date": add_years(nowdate(), 1),
+				}
+			],
+		)
+
+		component_health.update_component_health_scores()
+
+		score = frappe.get_all(
+			"Component Health Score", filters={"physical_space": space}, fields=["health_score"]
+		)[0]
+		self.assertEqual(score.health_score, 100.0)
+
+	def test_old_out_of_service_component_scores_low(self):
+		"""Componente al final de su vida útil, fuera de servicio y sin mantenimiento"""
+		space = self._create_space()
+		self._insert_components(
+			space,
+			[
+				{
+					"status": "Fuera de Servicio",
+					"installation_date": add_years(nowdate(), -12),
+					"warranty_expiry_date": add_years(nowdate(), -10),
+				}
+			],
+		)
+
+		component_health.update_component_health_scores()
+
+		score = frappe.get_all(
+			"Component Health Score", filters={"physical_space": space}, fields=["health_score", "age_years"]
+		)[0]
+		self.assertLess(score.health_score, component_health.CRITICAL_THRESHOLD)
+		self.assertGreater(score.age_years, 11.9)
+
+	def test_only_changed_components_are_recalculated(self):
+		"""Una segunda corrida solo toca los componentes modificados"""
+		space = self._create_space()
+		names = self._insert_components(space, [{"installation_date": nowdate()}] * 3)
+		component_health.update_component_health_scores()
+
+		calculated_on = add_days(now_datetime(), -1)
+		frappe.db.sql(
+			"UPDATE `tabComponent Health Score` SET calculated_on = %s WHERE name IN %s",
+			(calculated_on, tuple(names)),
+		)
+		# Espacio, tipo y componentes sin cambios desde ese cálculo
+		for doctype, filters in (
+			("Physical Space", {"name": space}),
+			("Component Type", {"name": TEST_COMPONENT_TYPE}),
+			("Space Component", {"name": ["in", names]}),
+		):
+			frappe.db.set_value(
+				doctype, filters, "modified", add_days(calculated_on, -1), update_modified=False
+			)
+		frappe.db.set_value("Space Component", names[0], "status", "Inactivo", update_modified=True)
+
+		component_health.update_component_health_scores()
+
+		recalculated = frappe.get_all(
+			"Component Health Score",
+			filters={"name": ["in", names], "calculated_on": [">", calculated_on]},
+			pluck="name",
+		)
+		self.assertEqual(recalculated, [names[0]])
+
+	def test_scores_of_deleted_components_are_removed(self):
+		"""Las puntuaciones de componentes eliminados se depuran en la siguiente corrida"""
+		space = self._create_space()
+		names = self._insert_components(space, [{}, {}])
+		component_health.update_component_health_scores()
+
+		frappe.db.delete("Space Component", {"name": names[0]})
+		component_health.update_component_health_scores()
+
+		self.assertFalse(frappe.db.exists("Component Health Score", names[0]))
+		self.assertTrue(frappe.db.exists("Component Health Score", names[1]))
+
+	def test_rollup_per_space(self):
+		"""El acumulado por espacio promedia la salud de sus componentes"""
+		healthy = self._create_space("Salón CTEST")
+		damaged = self._create_space("Cuarto de Máquinas CTEST")
+		self._insert_components(healthy, [{"installation_date": nowdate()}])
+		self._insert_components(damaged, [{"status": "Fuera de Servicio"}])
+		component_health.update_component_health_scores()
+
+		rollup = {
+			row.group: row
+			for row in component_health.get_health_rollup("physical_space", company=TEST_COMPANY)
+		}
+
+		self.assertEqual(rollup[healthy].components, 1)
+		self.assertGreater(rollup[healthy].health_score, rollup[damaged].health_score)
+		self.assertEqual(
+			component_health.get_average_health(TEST_COMPANY),
+			round((rollup[healthy].health_score + rollup[damaged].health_score) / 2, 2),
+		)
+
+	def test_scoring_benchmark_10000_components(self):
+		"""Benchmark: puntuar 10,000 componentes en una sola corrida"""
+		spaces = list(
+			import_spaces(TEST_COMPANY, spaces=[{"space_name": f"Espacio {i}"} for i in range(500)])[
+				"names"
+			].values()
+		)
+		for index, space in enumerate(spaces):
+			self._insert_components(
+				space, [{"installation_date": add_years(nowdate(), -(index % 15))} for _ in range(20)]
+			)
+
+		start_time = time.perf_counter()
+		component_health.update_component_health_scores()
+		rollup = component_health.get_health_rollup("company", company=TEST_COMPANY)
+		execution_time = time.perf_counter() - start_time
+
+		print(f"\n10,000 componentes puntuados y acumulados en {execution_time:.3f}s")
+		self.assertEqual(rollup[0].components, 10000)
+
+	def _create_space(self, space_name="Espacio CTEST"):
+		return import_spaces(TEST_COMPANY, spaces=[{"key": "space", "space_name": space_name}])["names"][
+			"space"
+		]
+
+	def _insert_components(self, space, components):
+		timestamp = now_datetime()
+		names = [frappe.generate_hash(length=10) for _ in components]
+		frappe.db.bulk_insert(
+			"Space Component",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"idx",
+				"component_name",
+				"component_type",
+				"status",
+				"installation_date",
+				"last_maintenance_date",
+				"warranty_expiry_date",
+			],
+			values=[
+				[
+					name,
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					space,
+					"Physical Space",
+					"space_components",
+					idx,
+					f"Bomba {idx}",
+					TEST_COMPONENT_TYPE,
+					component.get("status", "Activo"),
+					component.get("installation_date"),
+					component.get("last_maintenance_date"),
+					component.get("warranty_expiry_date"),
+				]
+				for idx, (name, component) in enumerate(zip(names, components, strict=True), start=1)
+			],
+		)
+		return names
@@ -0,0 +1,202 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests y benchmark del plan de mantenimiento de componentes (maintenance_schedule).
+"""
+
+import time
+from datetime import date
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, add_months, getdate, now_datetime, nowdate
+
+from condominium_management.physical_spaces import maintenance_schedule
+from condominium_management.physical_spaces.space_import import import_spaces
+from condominium_management.test_factories import TestDataFactory
+
+TEST_COMPANY = "Test Condominium"
+TEST_COMPONENT_TYPE = "Test Bomba Mantenimiento"
+
+
+class TestMaintenanceSchedule(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		TestDataFactory.create_test_company(TEST_COMPANY)
+
+		if not frappe.db.exists("Component Type", TEST_COMPONENT_TYPE):
+			frappe.get_doc(
+				{
+					"doctype": "Component Type",
+					"component_type_name": TEST_COMPONENT_TYPE,
+					"code_prefix": "TBM",
+					"category": "Mecánico",
+					"default_maintenance_frequency": "Mensual",
+					"maintenance_type": "Preventivo",
+				}
+			).insert()
+
+	def tearDown(self):
+		spaces = frappe.get_all("Physical Space", filters={"company": TEST_COMPANY}, pluck="name")
+		if spaces:
+			frappe.db.delete("Space Component", {"parent": ["in", spaces]})
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
+		frappe.db.delete("Maintenance Work Order", {"company": TEST_COMPANY})
+		frappe.db.delete("Physical Space", {"company": TEST_COMPANY})
+		frappe.db.commit()
+
+	def test_component_rule_overrides_type_rule(self):
+		"""La frecuencia e intervalo del componente tienen prioridad sobre los del tipo"""
+		component = frappe._dict(
+			component_type=TEST_COMPONENT_TYPE,
+			status="Activo",
+			maintenance_frequency="Semanal",
+			maintenance_interval=2,
+			last_maintenance_date=date(2026, 1, 1),
+		)
+		self.assertEqual(maintenance_schedule.calculate_next_due_date(component), date(2026, 1, 15))
+
+		component.maintenance_frequency = None
+		component.maintenance_interval = None
+		self.assertEqual(maintenance_schedule.calculate_next_due_date(component), date(2026, 2, 1))
+
+		component.status = "Fuera de Servicio"
+		self.assertIsNone(maintenance_schedule.calculate_next_due_date(component))
+
+	def test_due_date_is_set_on_save(self):
+		"""Guardar el espacio copia la empresa y precalcula next_due_date"""
+		space = self._create_space_with_component(installation_date="2026-01-31")
+		component = space.space_components[0]
+
+		self.assertEqual(component.company, TEST_COMPANY)
+		self.assertEqual(getdate(component.next_due_date), date(2026, 2, 28))
+
+	def test_type_rule_change_refreshes_components(self):
+		"""Cambiar la frecuencia del tipo recalcula sus componentes existentes"""
+		space = self._create_space_with_component(installation_date="2026-01-01")
+		component_type = frappe.get_doc("Component Type", TEST_COMPONENT_TYPE)
+		component_type.default_maintenance_frequency = "Trimestral"
+		component_type.save()
+
+		try:
+			next_due_date = frappe.db.get_value(
+				"Space Component", space.space_components[0].name, "next_due_date"
+			)
+			self.assertEqual(getdate(next_due_date), date(2026, 4, 1))
+		finally:
+			component_type.default_maintenance_frequency = "Mensual"
+			component_type.save()
+
+	def test_work_orders_are_generated_once(self):
+		"""El job crea una orden por componente vencido y no la duplica"""
+		self._create_space_with_component(installation_date=add_months(nowdate(), -2))
+
+		self.assertEqual(maintenance_schedule.generate_due_work_orders(), 1)
+		self.assertEqual(maintenance_schedule.generate_due_work_orders(), 0)
+
+		work_order = frappe.get_all(
+			"Maintenance Work Order",
+			filters={"company": TEST_COMPANY},
+			fields=["status", "maintenance_type", "component_name"],
+		)[0]
+		self.assertEqual(work_order.status, "Pendiente")
+		self.assertEqual(work_order.maintenance_type, "Preventivo")
+
+	def test_completing_work_order_advances_due_date(self):
+		"""Completar la orden registra el mantenimiento y recorre la próxima fecha"""
+		space = self._create_space_with_component(installation_date=add_months(nowdate(), -2))
+		self.assertEqual(maintenance_schedule.get_maintenance_due_count(TEST_COMPANY), 1)
+
+		maintenance_schedule.generate_due_work_orders()
+		work_order = frappe.get_doc(
+			"Maintenance Work Order",
+			frappe.get_all("Maintenance Work Order", filters={"company": TEST_COMPANY}, pluck="name")[0],
+		)
+		work_order.status = "Completada"
+		work_order.save()
+
+		component = frappe.db.get_value(
+			"Space Component",
+			space.space_components[0].name,
+			["last_maintenance_date", "next_due_date"],
+			as_dict=True,
+		)
+		self.assertEqual(getdate(component.last_maintenance_date), getdate(nowdate()))
+		self.assertEqual(getdate(component.next_due_date), getdate(add_months(nowdate(), 1)))
+		self.assertEqual(maintenance_schedule.get_maintenance_due_count(TEST_COMPANY), 0)
+
+	def test_work_order_benchmark_10000_components(self):
+		"""Benchmark: 10,000 componentes vencidos, conteo y generación de órdenes"""
+		spaces = list(
+			import_spaces(TEST_COMPANY, spaces=[{"space_name": f"Espacio {i}"} for i in range(500)])[
+				"names"
+			].values()
+		)
+		due_date = add_days(nowdate(), -1)
+		timestamp = now_datetime()
+		frappe.db.bulk_insert(
+			"Space Component",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"parent",
+				"parenttype",
+				"parentfield",
+				"idx",
+				"component_name",
+				"component_type",
+				"company",
+				"next_due_date",
+			],
+			values=[
+				[
+					frappe.generate_hash(length=10),
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					space,
+					"Physical Space",
+					"space_components",
+					idx,
+					f"Bomba {idx}",
+					TEST_COMPONENT_TYPE,
+					TEST_COMPANY,
+					due_date,
+				]
+				for space in spaces
+				for idx in range(1, 21)
+			],
+			chunk_size=5000,
+		)
+
+		start_time = time.perf_counter()
+		due_count = maintenance_schedule.get_maintenance_due_count(TEST_COMPANY)
+		count_time = time.perf_counter() - start_time
+
+		start_time = time.perf_counter()
+		created = maintenance_schedule.generate_due_work_orders()
+		generation_time = time.perf_counter() - start_time
+
+		print(
+			f"\nConteo de vencidos en {count_time:.4f}s; {created} órdenes generadas en {generation_time:.3f}s"
+		)
+		self.assertEqual(due_count, 10000)
+		self.assertEqual(created, 10000)
+
+	def _create_space_with_component(self, **component):
+		return frappe.get_doc(
+			{
+				"doctype": "Physical Space",
+				"space_name": "Cuarto de Bombas CTEST",
+				"company": TEST_COMPANY,
+				"space_components": [
+					{"component_name": "Bomba CTEST", "component_type": TEST_COMPONENT_TYPE, **component}
+				],
+			}
+		).insert()
@@ -0,0 +1,167 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests y benchmark de la importación masiva de espacios (space_import).
+"""
+
+import re
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.physical_spaces import space_hierarchy
+from condominium_management.physical_spaces.space_import import import_spaces
+from condominium_management.test_factories import TestDataFactory
+
+TEST_COMPANY = "Test Condominium"
+
+
+class TestSpaceImport(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.company = TestDataFactory.create_test_company(TEST_COMPANY)
+
+	def tearDown(self):
+		spaces = frappe.get_all("Physical Space", filters={"company": TEST_COMPANY}, pluck="name")
+		if spaces:
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
+		frappe.db.delete("Physical Space", {"company": TEST_COMPANY})
+		frappe.db.commit()
+
+	def test_nested_tree_import(self):
+		"""Un árbol anidado se importa con niveles, rutas y tabla de cierre"""
+		result = import_spaces(
+			TEST_COMPANY,
+			spaces=[
+				{
+					"key": "torre",
+					"space_name": "Torre CTEST",
+					"children": [
+						{"key": "piso", "space_name": "Piso 1", "children": [{"space_name": "Depto 101"}]}
+					],
+				}
+			],
+		)
+
+		self.assertEqual(result["created"], 3)
+		piso = frappe.db.get_value(
+			"Physical Space",
+			result["names"]["piso"],
+			["space_level", "space_path", "parent_space"],
+			as_dict=True,
+		)
+		self.assertEqual(piso.space_level, 1)
+		self.assertEqual(piso.space_path, "/Torre CTEST/Piso 1")
+		self.assertEqual(piso.parent_space, result["names"]["torre"])
+		self.assertRegex(result["names"]["torre"], rf"^{re.escape(self.company.abbr)}-\d{{4}}$")
+		self.assertEqual(len(space_hierarchy.get_subtree(result["names"]["torre"])), 2)
+
+	def test_csv_import_under_existing_parent(self):
+		"""Las filas CSV pueden colgar de un espacio existente"""
+		parent = import_spaces(TEST_COMPANY, spaces=[{"key": "torre", "space_name": "Torre CTEST"}])
+		torre = parent["names"]["torre"]
+
+		result = import_spaces(
+			TEST_COMPANY,
+			csv_content=(f"key,parent_key,space_name,area_m2\nb,a,Depto 1,80\na,{torre},Piso 1,\n"),
+		)
+
+		self.assertEqual(
+			frappe.db.get_value("Physical Space", result["names"]["b"], "space_path"),
+			"/Torre CTEST/Piso 1/Depto 1",
+		)
+		self.assertEqual(space_hierarchy.get_ancestors(result["names"]["b"]), [torre, result["names"]["a"]])
+
+	def test_cycle_is_rejected(self):
+		"""Referencias circulares dentro del lote se rechazan antes de insertar"""
+		with self.assertRaises(frappe.ValidationError):
+			import_spaces(
+				TEST_COMPANY,
+				spaces=[
+					{"key": "a", "parent_key": "b", "space_name": "A"},
+					{"key": "b", "parent_key": "a", "space_name": "B"},
+				],
+			)
+
+	def test_category_rules_are_enforced(self):
+		"""Los requisitos y padres permitidos de la categoría se validan antes de insertar"""
+		frappe.get_doc({"doctype": "Space Category", "category_name": "Torre Import CTEST"}).insert()
+		frappe.get_doc(
+			{
+				"doctype": "Space Category",
+				"category_name": "Depto Import CTEST",
+				"requires_dimensions": 1,
+				"allowed_parent_categories": [{"parent_category": "Torre Import CTEST"}],
+			}
+		).insert()
+		self.addCleanup(frappe.delete_doc, "Space Category", "Torre Import CTEST", force=True)
+		self.addCleanup(frappe.delete_doc, "Space Category", "Depto Import CTEST", force=True)
+
+		with self.assertRaises(frappe.ValidationError):
+			import_spaces(
+				TEST_COMPANY, spaces=[{"space_name": "Depto 1", "space_category": "Depto Import CTEST"}]
+			)
+
+		with self.assertRaises(frappe.ValidationError):
+			import_spaces(
+				TEST_COMPANY,
+				spaces=[
+					{
+						"space_name": "Piso 1",
+						"space_category": "Depto Import CTEST",
+						"area_m2": 500,
+						"children": [
+							{"space_name": "Depto 1", "space_category": "Depto Import CTEST", "area_m2": 80}
+						],
+					}
+				],
+			)
+
+		result = import_spaces(
+			TEST_COMPANY,
+			spaces=[
+				{
+					"key": "torre",
+					"space_name": "Torre CTEST",
+					"space_category": "Torre Import CTEST",
+					"children": [
+						{"space_name": "Depto 1", "space_category": "Depto Import CTEST", "area_m2": 80}
+					],
+				}
+			],
+		)
+		self.assertEqual(result["created"], 2)
+		self.assertEqual(
+			frappe.db.get_value("Physical Space", result["names"]["torre"], "template_fields"), "{}"
+		)
+
+	def test_import_benchmark(self):
+		"""Benchmark: 10,000 espacios (16 torres x 24 pisos x 25 departamentos) en un solo lote"""
+		towers, floors, units = 16, 24, 25
+		spaces = [
+			{
+				"space_name": f"Torre {tower}",
+				"children": [
+					{
+						"space_name": f"Piso {floor}",
+						"children": [
+							{"space_name": f"Depto {floor}{unit:02}"} for unit in range(1, units + 1)
+						],
+					}
+					for floor in range(1, floors + 1)
+				],
+			}
+			for tower in range(1, towers + 1)
+		]
+		expected = towers + towers * floors + towers * floors * units
+
+		start_time = time.perf_counter()
+		result = import_spaces(TEST_COMPANY, spaces=spaces)
+		execution_time = time.perf_counter() - start_time
+
+		print(f"\n{result['created']} espacios importados en {execution_time:.2f}s (objetivo: < 60s)")
+		self.assertEqual(expected, 10000)
+		self.assertEqual(result["created"], expected)
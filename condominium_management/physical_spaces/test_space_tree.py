@@ -0,0 +1,135 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests de la API paginada del árbol de espacios (space_tree).
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from condominium_management.physical_spaces import space_hierarchy, space_tree
+from condominium_management.physical_spaces.space_import import import_spaces
+from condominium_management.test_factories import TestDataFactory
+
+TEST_COMPANY = "Test Condominium"
+OTHER_COMPANY = "Test Condominium Ajeno"
+TEST_USER = "ctest-space-tree@example.com"
+
+
+class TestSpaceTree(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		TestDataFactory.create_test_company(TEST_COMPANY)
+		TestDataFactory.create_test_company(OTHER_COMPANY)
+		if not frappe.db.exists("User", TEST_USER):
+			frappe.get_doc(
+				{
+					"doctype": "User",
+					"email": TEST_USER,
+					"first_name": "CTEST Árbol",
+					"send_welcome_email": 0,
+					"roles": [{"role": "Property Manager"}],
+				}
+			).insert(ignore_permissions=True)
+
+	def setUp(self):
+		floors = [
+			{
+				"key": f"piso-{floor}",
+				"space_name": f"Piso {floor}",
+				"children": [{"space_name": f"Depto {floor}{unit:02d}"} for unit in range(1, 6)],
+			}
+			for floor in range(1, 8)
+		]
+		self.names = import_spaces(
+			TEST_COMPANY, spaces=[{"key": "torre", "space_name": "Torre CTEST", "children": floors}]
+		)["names"]
+
+	def tearDown(self):
+		frappe.set_user("Administrator")
+		frappe.db.delete("User Permission", {"user": TEST_USER})
+		spaces = frappe.get_all("Physical Space", filters={"company": TEST_COMPANY}, pluck="name")
+		if spaces:
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
+		frappe.db.delete("Physical Space", {"company": TEST_COMPANY})
+		frappe.db.commit()
+
+	def test_children_are_paginated_by_cursor(self):
+		"""Las páginas cubren todos los hijos directos sin repetir ni saltar"""
+		seen = []
+		cursor = None
+		pages = 0
+		while True:
+			page = space_tree.get_tree_children(self.names["torre"], cursor=cursor, limit=3)
+			seen.extend(node.space_name for node in page["nodes"])
+			pages += 1
+			cursor = page["next_cursor"]
+			if not cursor:
+				break
+
+		self.assertEqual(pages, 3)
+		self.assertEqual(seen, [f"Piso {floor}" for floor in range(1, 8)])
+
+	def test_children_include_counts(self):
+		"""Cada nodo trae conteo de hijos y componentes y si es expandible"""
+		node = space_tree.get_tree_children(self.names["torre"], limit=1)["nodes"][0]
+
+		self.assertEqual(node.name, self.names["piso-1"])
+		self.assertEqual(node.child_count, 5)
+		self.assertEqual(node.component_count, 0)
+		self.assertTrue(node.expandable)
+
+	def test_depth_limited_children(self):
+		"""Con max_depth=2 se listan pisos y departamentos en orden de recorrido"""
+		page = space_tree.get_tree_children(self.names["torre"], max_depth=2, limit=500)
+		paths = [node.space_path for node in page["nodes"]]
+
+		self.assertEqual(len(paths), 7 + 35)
+		self.assertEqual(paths[:2], ["/Torre CTEST/Piso 1", "/Torre CTEST/Piso 1/Depto 101"])
+		self.assertIsNone(page["next_cursor"])
+
+	def test_roots_of_company(self):
+		"""Sin parent se listan las raíces de la empresa"""
+		nodes = space_tree.get_tree_children(company=TEST_COMPANY)["nodes"]
+
+		self.assertEqual([node.name for node in nodes], [self.names["torre"]])
+
+	def test_search_by_path_prefix(self):
+		"""La búsqueda por prefijo de ruta devuelve el subárbol coincidente"""
+		nodes = space_tree.search_tree(TEST_COMPANY, "/Torre CTEST/Piso 3")["nodes"]
+
+		self.assertEqual(
+			[node.space_name for node in nodes], ["Piso 3", *[f"Depto 3{unit:02d}" for unit in range(1, 6)]]
+		)
+		self.assertEqual(space_tree.search_tree(TEST_COMPANY, "/Torre_CTEST")["nodes"], [])
+
+	def test_company_is_required_and_checked(self):
+		"""Sin empresa no se listan raíces; sin permiso sobre la empresa no se lista nada"""
+		with self.assertRaises(frappe.ValidationError):
+			space_tree.get_tree_children()
+
+		frappe.get_doc(
+			{"doctype": "User Permission", "user": TEST_USER, "allow": "Company", "for_value": OTHER_COMPANY}
+		).insert(ignore_permissions=True)
+		frappe.set_user(TEST_USER)
+
+		with self.assertRaises(frappe.PermissionError):
+			space_tree.get_tree_children(company=TEST_COMPANY)
+		with self.assertRaises(frappe.PermissionError):
+			space_tree.get_tree_children(self.names["torre"])
+		with self.assertRaises(frappe.PermissionError):
+			space_tree.search_tree(TEST_COMPANY, "/Torre CTEST")
+
+	def test_spaces_without_path_are_backfilled(self):
+		"""Un espacio histórico sin ruta recupera la suya y vuelve a aparecer en las páginas"""
+		frappe.db.set_value("Physical Space", self.names["piso-2"], "space_path", None)
+
+		space_hierarchy.backfill_space_paths()
+
+		self.assertEqual(
+			frappe.db.get_value("Physical Space", self.names["piso-2"], "space_path"), "/Torre CTEST/Piso 2"
+		)
+		nodes = space_tree.get_tree_children(self.names["torre"], limit=500)["nodes"]
+		self.assertEqual(len(nodes), 7)
@@ -0,0 +1,204 @@
+# Copyright (c) 2025, Buzola and contributors
+# For license information, please see license.txt
+
+"""
+Tests y benchmark del motor de ocupación (space_utilization).
+
+El benchmark carga un año de ocupación para 2,000 espacios y mide la consulta de
+utilización por categoría y mes.
+"""
+
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, getdate, now_datetime, nowdate
+
+from condominium_management.physical_spaces import space_utilization
+from condominium_management.physical_spaces.space_import import import_spaces
+from condominium_management.test_factories import TestDataFactory
+
+TEST_COMPANY = "Test Condominium"
+TEST_YEAR = 2001
+
+
+class TestSpaceUtilization(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		TestDataFactory.create_test_company(TEST_COMPANY)
+
+	def tearDown(self):
+		spaces = frappe.get_all("Physical Space", filters={"company": TEST_COMPANY}, pluck="name")
+		if spaces:
+			frappe.db.delete("Committee Meeting", {"physical_space": ["in", spaces]})
+			frappe.db.delete("Space Occupancy", {"physical_space": ["in", spaces]})
+			frappe.db.delete("Physical Space Closure", {"descendant": ["in", spaces]})
+		frappe.db.delete("Physical Space", {"company": TEST_COMPANY})
+		frappe.db.commit()
+
+	def test_interval_mask_rounds_to_slots(self):
+		"""Un intervalo marca todas las franjas de 15 minutos que toca"""
+		mask = space_utilization.interval_mask(10 * 60 + 5, 11 * 60)
+		self.assertEqual(mask.bit_count(), 4)
+		self.assertEqual(mask, 0b1111 << 40)
+
+	def test_bookings_crossing_midnight_are_split(self):
+		"""Una reserva de 23:00 a 01:00 ocupa franjas en ambos días"""
+		start = datetime(TEST_YEAR, 3, 1, 23, 0)
+		masks = space_utilization.build_day_masks([("CTEST-SPACE", start, start + timedelta(hours=2))])
+
+		self.assertEqual(masks[("CTEST-SPACE", date(TEST_YEAR, 3, 1))].bit_count(), 4)
+		self.assertEqual(masks[("CTEST-SPACE", date(TEST_YEAR, 3, 2))].bit_count(), 4)
+
+	def test_overlapping_bookings_are_merged(self):
+		"""Reservas traslapadas no cuentan dos veces las mismas franjas"""
+		start = datetime(TEST_YEAR, 3, 1, 10, 0)
+		masks = space_utilization.build_day_masks(
+			[
+				("CTEST-SPACE", start, start + timedelta(hours=2)),
+				("CTEST-SPACE", start + timedelta(hours=1), start + timedelta(hours=3)),
+			]
+		)
+
+		self.assertEqual(masks[("CTEST-SPACE", date(TEST_YEAR, 3, 1))].bit_count(), 12)
+
+	def test_rebuild_occupancy_from_committee_meetings(self):
+		"""Las reuniones presenciales ocupan su espacio la duración supuesta; las virtuales no"""
+		names = import_spaces(TEST_COMPANY, spaces=[{"key": "salon", "space_name": "Salón CTEST"}])["names"]
+		meeting_day = getdate(add_days(nowdate(), 10))
+		for meeting_format, hour in (("Presencial", 10), ("Virtual", 16)):
+			frappe.get_doc(
+				{
+					"doctype": "Committee Meeting",
+					"meeting_title": f"CTEST Ocupación {meeting_format}",
+					"meeting_date": datetime.combine(meeting_day, datetime.min.time()).replace(hour=hour),
+					"meeting_type": "Ordinaria",
+					"meeting_format": meeting_format,
+					"physical_space": names["salon"],
+					"virtual_meeting_link": "https://meet.google.com/CTEST-occupancy",
+				}
+			).insert(ignore_permissions=True)
+
+		bookings = space_utilization.collect_bookings(meeting_day, meeting_day, [names["salon"]])
+		self.assertEqual(len(bookings), 1)
+
+		rows = space_utilization.rebuild_occupancy(meeting_day, meeting_day, [names["salon"]])
+		occupancy = frappe.get_all(
+			"Space Occupancy",
+			filters={"physical_space": names["salon"], "occupancy_date": meeting_day},
+			fields=["occupied_slots"],
+		)
+
+		minutes = space_utilization.DEFAULT_BOOKING_MINUTES["Committee Meeting"]
+		self.assertEqual(rows, 1)
+		self.assertEqual(occupancy[0].occupied_slots, minutes // space_utilization.SLOT_MINUTES)
+
+	def test_backfill_fills_past_periods(self):
+		"""El backfill reconstruye meses anteriores a la ventana del job diario"""
+		names = import_spaces(TEST_COMPANY, spaces=[{"key": "salon", "space_name": "Salón CTEST"}])["names"]
+		meeting = frappe.get_doc(
+			{
+				"doctype": "Committee Meeting",
+				"meeting_title": "CTEST Ocupación histórica",
+				"meeting_date": add_days(now_datetime(), 10),
+				"meeting_type": "Ordinaria",
+				"meeting_format": "Presencial",
+				"physical_space": names["salon"],
+			}
+		).insert(ignore_permissions=True)
+		past = add_days(now_datetime(), -60).replace(hour=10, minute=0, second=0, microsecond=0)
+		frappe.db.set_value("Committee Meeting", meeting.name, "meeting_date", past)
+
+		space_utilization.refresh_recent_occupancy()
+		self.assertFalse(frappe.db.exists("Space Occupancy", {"physical_space": names["salon"]}))
+
+		self.assertEqual(space_utilization.backfill_occupancy([names["salon"]]), 1)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Space Occupancy",
+				{"physical_space": names["salon"], "occupancy_date": past.date()},
+				"occupied_slots",
+			),
+			space_utilization.DEFAULT_BOOKING_MINUTES["Committee Meeting"] // space_utilization.SLOT_MINUTES,
+		)
+
+	def test_utilization_per_space(self):
+		"""La utilización de cada espacio se mide contra sus franjas disponibles"""
+		names = import_spaces(
+			TEST_COMPANY,
+			spaces=[{"key": "salon", "space_name": "Salón CTEST"}, {"key": "gym", "space_name": "Gym CTEST"}],
+		)["names"]
+		# Salón ocupado de 10:00 a 14:00 (16 franjas de las 64 del horario 06-22)
+		mask = space_utilization.interval_mask(10 * 60, 14 * 60)
+		self._insert_occupancy([(names["salon"], date(TEST_YEAR, 3, 1), mask)])
+
+		rows = space_utilization.get_utilization(
+			date(TEST_YEAR, 3, 1), date(TEST_YEAR, 3, 1), group_by="physical_space", company=TEST_COMPANY
+		)
+		by_space = {row.group: row for row in rows}
+
+		self.assertEqual(by_space[names["salon"]].occupied_slots, 16)
+		self.assertEqual(by_space[names["salon"]].utilization, 25.0)
+		self.assertEqual(by_space[names["gym"]].utilization, 0.0)
+
+	def test_utilization_benchmark_one_year_2000_spaces(self):
+		"""Benchmark: 1 año x 2,000 espacios, utilización por categoría y mes"""
+		spaces = [{"space_name": f"Espacio {i}"} for i in range(2000)]
+		names = list(import_spaces(TEST_COMPANY, spaces=spaces)["names"].values())
+
+		rng = random.Random(42)
+		start = date(TEST_YEAR, 1, 1)
+		rows = []
+		for day_offset in range(365):
+			day = start + timedelta(days=day_offset)
+			for space in rng.sample(names, 600):
+				start_minute = rng.randrange(6 * 60, 20 * 60, 15)
+				rows.append((space, day, space_utilization.interval_mask(start_minute, start_minute + 120)))
+		self._insert_occupancy(rows)
+
+		start_time = time.perf_counter()
+		results = space_utilization.get_utilization(
+			start, date(TEST_YEAR, 12, 31), group_by="space_category", period="month", company=TEST_COMPANY
+		)
+		execution_time = time.perf_counter() - start_time
+
+		print(
+			f"\n{len(rows)} renglones espacio-día, utilización por categoría y mes en {execution_time:.3f}s"
+		)
+		self.assertEqual(len(results), 12)
+		self.assertAlmostEqual(sum(row.occupied_slots for row in results), len(rows) * 8)
+
+	def _insert_occupancy(self, rows):
+		timestamp = now_datetime()
+		frappe.db.bulk_insert(
+			"Space Occupancy",
+			fields=[
+				"name",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+				"physical_space",
+				"occupancy_date",
+				"occupied_slots",
+				*space_utilization.BLOCK_FIELDS,
+			],
+			values=[
+				[
+					frappe.generate_hash(length=12),
+					timestamp,
+					timestamp,
+					"Administrator",
+					"Administrator",
+					space,
+					day,
+					mask.bit_count(),
+					*space_utilization.split_mask(mask),
+				]
+				for space, day, mask in rows
+			],
+			chunk_size=5000,
+		)
@@ -302,3 +302,52 @@ def check_app_permission():
 		return False
 
 	return True
+
+
+def reserve_series_names(prefix, count, digits=3):
+	"""Reserva `count` valores consecutivos de una serie de nombres en una sola operación.
+
+	Equivale a llamar `count` veces a getseries(prefix, digits): bloquea la fila de
+	tabSeries con FOR UPDATE, avanza el contador una sola vez y devuelve los nombres
+	ya formateados, para inserciones masivas que no pasan por autoname.
+
+	Args:
+		prefix: Prefijo de la serie, p. ej. "MTG-26-10-"
+		count: Número de nombres a reservar
+		digits: Dígitos del consecutivo
+
+	Returns:
+		list: Nombres reservados en orden
+	"""
+	return [f"{prefix}{str(number).zfill(digits)}" for number in reserve_series_numbers(prefix, count)]
+
+
+def reserve_series_numbers(series, count):
+	"""Reserva `count` consecutivos del contador `series` de tabSeries.
+
+	Returns:
+		range: Números reservados en orden
+	"""
+	if count <= 0:
+		return range(0)
+
+	frappe.db.sql("INSERT IGNORE INTO `tabSeries` (`name`, `current`) VALUES (%s, 0)", series)
+	current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", series)[0][0]
+	frappe.db.sql("UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s", (current + count, series))
+
+	return range(current + 1, current + count + 1)
+
+
+def clear_cache_on_transaction_end(clear):
+	"""Invalida una caché compartida ahora y otra vez al terminar la transacción.
+
+	Una lectura posterior en la misma transacción reconstruye la caché con datos sin
+	confirmar y la guarda en Redis. Repetir clear() al confirmar descarta esa copia; al
+	revertir evita que datos que nunca se confirmaron sobrevivan en Redis.
+
+	Args:
+		clear: Función sin argumentos que borra Redis, la memoria del proceso y frappe.local
+	"""
+	clear()
+	frappe.db.after_commit.add(clear)
+	frappe.db.after_rollback.add(clear)